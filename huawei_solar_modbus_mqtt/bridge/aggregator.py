@@ -0,0 +1,158 @@
+# bridge/aggregator.py
+
+"""
+Fenster-Aggregation: schnell samplen, einmal pro Fenster publizieren.
+
+Problem:
+    Sampling- und Publish-Rate waren dasselbe (HUAWEI_POLL_INTERVAL). Für
+    eine genaue Energiebilanz braucht es ~2s Samples, für einen kleinen
+    HA-Recorder aber nur einen Wert alle 30s. Ein einzelner Momentanwert
+    alle 30s verpasst Lastspitzen (Wasserkocher, Wolkendurchgang) komplett.
+
+Lösung (HUAWEI_SAMPLE_INTERVAL > 0):
+    - Zwischen zwei vollen Cycles werden die Leistungswerte (FAST_REGISTERS)
+      alle sample_interval Sekunden gelesen und nur akkumuliert
+    - Der volle Cycle schließt das Fenster: publiziert wird der Mittelwert
+      statt des Momentanwerts, dazu {key}_min und {key}_max
+    - Akkumulatoren: feste array('d') pro Statistik (min, max, sum, last),
+      ein Slot pro Key - pro Sample keine Allokation, nur Slot-Updates
+
+Position in der Pipeline:
+    transform_filtered() (inkl. TotalIncreasingFilter) → apply() → publish_data()
+"""
+
+import logging
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .config.mappings import REGISTER_MAPPING
+from .config.registers import FAST_REGISTERS
+
+logger = logging.getLogger("huawei.aggregator")
+
+# Aggregierte Keys: die Leistungswerte des Fast-Tiers (einzige Werte die
+# zwischen zwei vollen Cycles gelesen werden)
+AGGREGATED_KEYS: Tuple[str, ...] = tuple(REGISTER_MAPPING[name] for name in FAST_REGISTERS)
+
+_INF = float("inf")
+
+
+class WindowAggregator:
+    """Laufende min/max/mean/last Akkumulatoren pro Key für ein Publish-Fenster."""
+
+    def __init__(self, keys: Iterable[str] = AGGREGATED_KEYS, companions: bool = True):
+        """
+        Initialisiert die Akkumulatoren.
+
+        Args:
+            keys: Zu aggregierende MQTT-Keys
+            companions: {key}_min / {key}_max zusätzlich publizieren
+        """
+        self.keys: Tuple[str, ...] = tuple(keys)
+        self.companions = companions
+        self._index = {key: i for i, key in enumerate(self.keys)}
+        self._companion_keys = [(f"{key}_min", f"{key}_max") for key in self.keys]
+        size = len(self.keys)
+        self._min = array("d", [_INF] * size)
+        self._max = array("d", [-_INF] * size)
+        self._sum = array("d", [0.0] * size)
+        self._last = array("d", [0.0] * size)
+        self._count = array("L", [0] * size)
+
+    def add(self, values: Dict[str, Any]) -> None:
+        """
+        Akkumuliert ein Sample (nur die aggregierten Keys, Rest wird ignoriert).
+
+        Args:
+            values: Transformierte MQTT-Werte (Fast-Read oder voller Cycle)
+        """
+        index = self._index
+        for key, value in values.items():
+            i = index.get(key)
+            if i is None or isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            if value < self._min[i]:
+                self._min[i] = value
+            if value > self._max[i]:
+                self._max[i] = value
+            self._sum[i] += value
+            self._last[i] = value
+            self._count[i] += 1
+
+    def apply(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Schließt das Fenster: data wird als letztes Sample akkumuliert, dann
+        werden die Momentanwerte durch den Fenster-Mittelwert ersetzt (in-place).
+
+        Args:
+            data: Gefilterte MQTT-Daten des vollen Cycles
+
+        Returns:
+            data mit Mittelwerten (+ {key}_min / {key}_max)
+        """
+        self.add(data)
+        for i, key in enumerate(self.keys):
+            count = self._count[i]
+            if not count:
+                continue
+            data[key] = round(self._sum[i] / count, 1)
+            if self.companions:
+                key_min, key_max = self._companion_keys[i]
+                data[key_min] = self._min[i]
+                data[key_max] = self._max[i]
+        self.reset()
+        return data
+
+    def snapshot(self, key: str) -> Optional[Dict[str, float]]:
+        """Aktueller Fensterstand eines Keys (None ohne Samples)."""
+        i = self._index.get(key)
+        if i is None or not self._count[i]:
+            return None
+        count = self._count[i]
+        return {
+            "min": self._min[i],
+            "max": self._max[i],
+            "mean": self._sum[i] / count,
+            "last": self._last[i],
+            "count": count,
+        }
+
+    @property
+    def samples(self) -> int:
+        """Höchste Sample-Anzahl eines Keys im laufenden Fenster."""
+        return max(self._count, default=0)
+
+    def reset(self) -> None:
+        """Beginnt ein neues Fenster (Slots überschreiben, keine neuen Arrays)."""
+        for i in range(len(self.keys)):
+            self._min[i] = _INF
+            self._max[i] = -_INF
+            self._sum[i] = 0.0
+            self._count[i] = 0
+
+
+def companion_sensors(sensors: List[Dict[str, Any]], keys: Iterable[str] = AGGREGATED_KEYS) -> List[Dict[str, Any]]:
+    """
+    Discovery-Definitionen für {key}_min / {key}_max (standardmäßig deaktiviert).
+
+    Args:
+        sensors: Basis-Sensoren (NUMERIC_SENSORS)
+        keys: Aggregierte Keys
+
+    Returns:
+        Zwei Sensoren pro aggregiertem Key, abgeleitet vom Basis-Sensor
+    """
+    wanted = set(keys)
+    result = []
+    for sensor in sensors:
+        if sensor["key"] not in wanted:
+            continue
+        for suffix, label in (("min", "Min"), ("max", "Max")):
+            companion = {k: v for k, v in sensor.items() if k != "value_template"}
+            companion.update(
+                name=f"{sensor['name']} {label}",
+                key=f"{sensor['key']}_{suffix}",
+                enabled=False,
+            )
+            result.append(companion)
+    return result
@@ -0,0 +1,161 @@
+# bridge/binary_payload.py
+
+"""
+Kompaktes Binärformat (MessagePack) für Nicht-HA Consumer.
+
+Problem:
+    Eigene Analytics-Consumer parsen pro Inverter und Cycle ~2 KB JSON
+    (Key-Namen machen den Großteil aus). Auf Mobilfunk-Standorten kostet
+    das Bandbreite, bei hoher Rate CPU beim Parsen.
+
+Lösung:
+    Zusätzlicher, optionaler Publish auf {topic}/binary mit festem Schema:
+
+        [schema_id, last_update, v0, v1, ..., vN]
+
+    - MessagePack-Array, Werte in der Reihenfolge von FIELDS (keine Key-Namen)
+    - fehlende Werte = nil (Position bleibt stabil)
+    - schema_id = CRC32 über Version + Feldliste, ändert sich nur wenn
+      sich FIELDS ändert
+
+    Die Schema-Beschreibung (JSON) liegt retained auf {topic}/binary/schema,
+    Consumer ordnen Werte über schema_id → fields zu. Das HA JSON-Topic
+    bleibt unverändert.
+
+Encoder:
+    msgpack (C-Extension) wenn installiert, sonst ein kleiner eingebauter
+    Encoder für die benötigten Typen (nil, bool, int, float64, str, array).
+    Beide erzeugen identische Bytes.
+"""
+
+import struct
+import zlib
+from typing import Any, Dict, List
+
+from .config.mappings import REGISTER_MAPPING
+from .config.sensors_mqtt import NUMERIC_SENSORS, TEXT_SENSORS
+
+try:
+    import msgpack
+
+    HAS_MSGPACK = True
+except ImportError:
+    msgpack = None  # type: ignore[assignment]
+    HAS_MSGPACK = False
+
+SCHEMA_VERSION = 1
+
+# Feste Feldreihenfolge: alle MQTT-Keys die transform_data() erzeugen kann
+FIELDS: List[str] = list(dict.fromkeys(REGISTER_MAPPING.values()))
+
+SCHEMA_ID: int = zlib.crc32(f"{SCHEMA_VERSION}:{','.join(FIELDS)}".encode())
+
+_UNITS = {sensor["key"]: sensor.get("unit_of_measurement") for sensor in NUMERIC_SENSORS}
+_TEXT_KEYS = frozenset(sensor["key"] for sensor in TEXT_SENSORS)
+
+
+def schema_description() -> Dict[str, Any]:
+    """
+    Versionierte Schema-Beschreibung (wird retained als JSON publiziert).
+
+    Returns:
+        Dict mit schema_id, Version, Encoding, Array-Layout und Feldliste
+    """
+    return {
+        "schema_id": SCHEMA_ID,
+        "version": SCHEMA_VERSION,
+        "encoding": "msgpack",
+        "layout": ["schema_id", "last_update", "fields..."],
+        "fields": [
+            {"key": key, "type": "string" if key in _TEXT_KEYS else "number", "unit": _UNITS.get(key)} for key in FIELDS
+        ],
+    }
+
+
+def encode(data: Dict[str, Any]) -> bytes:
+    """
+    Kodiert einen (gefilterten) Payload im festen Schema.
+
+    Keys außerhalb von FIELDS werden ignoriert, fehlende Keys werden nil.
+
+    Args:
+        data: Payload wie für publish_data() (inkl. last_update)
+
+    Returns:
+        MessagePack-Bytes
+    """
+    row: List[Any] = [SCHEMA_ID, int(data.get("last_update", 0))]
+    row.extend(data.get(key) for key in FIELDS)
+    if HAS_MSGPACK:
+        return bytes(msgpack.packb(row, default=str))  # type: ignore[union-attr]
+    return _pack(row)
+
+
+def _pack(obj: Any) -> bytes:
+    """Minimaler MessagePack-Encoder (Teilmenge, Fallback ohne msgpack)."""
+    out = bytearray()
+    _pack_into(out, obj)
+    return bytes(out)
+
+
+def _pack_into(out: bytearray, obj: Any) -> None:
+    if obj is None:
+        out.append(0xC0)
+    elif obj is True:
+        out.append(0xC3)
+    elif obj is False:
+        out.append(0xC2)
+    elif isinstance(obj, int):
+        _pack_int(out, obj)
+    elif isinstance(obj, float):
+        out += b"\xcb" + struct.pack(">d", obj)
+    elif isinstance(obj, str):
+        raw = obj.encode()
+        n = len(raw)
+        if n < 32:
+            out.append(0xA0 | n)
+        elif n < 0x100:
+            out += struct.pack(">BB", 0xD9, n)
+        elif n < 0x10000:
+            out += struct.pack(">BH", 0xDA, n)
+        else:
+            out += struct.pack(">BI", 0xDB, n)
+        out += raw
+    elif isinstance(obj, (list, tuple)):
+        n = len(obj)
+        if n < 16:
+            out.append(0x90 | n)
+        elif n < 0x10000:
+            out += struct.pack(">BH", 0xDC, n)
+        else:
+            out += struct.pack(">BI", 0xDD, n)
+        for item in obj:
+            _pack_into(out, item)
+    else:
+        # Wie msgpack.packb(default=str): unbekannte Typen als String
+        _pack_into(out, str(obj))
+
+
+def _pack_int(out: bytearray, value: int) -> None:
+    # Kleinste Darstellung wählen (wie msgpack)
+    if 0 <= value < 0x80:
+        out.append(value)
+    elif -32 <= value < 0:
+        out += struct.pack(">b", value)
+    elif value >= 0:
+        if value < 0x100:
+            out += struct.pack(">BB", 0xCC, value)
+        elif value < 0x10000:
+            out += struct.pack(">BH", 0xCD, value)
+        elif value < 0x100000000:
+            out += struct.pack(">BI", 0xCE, value)
+        else:
+            out += struct.pack(">BQ", 0xCF, value)
+    elif value >= -0x80:
+        out += struct.pack(">Bb", 0xD0, value)
+    elif value >= -0x8000:
+        out += struct.pack(">Bh", 0xD1, value)
+    elif value >= -0x80000000:
+        out += struct.pack(">Bi", 0xD2, value)
+    else:
+        out += struct.pack(">Bq", 0xD3, value)
@@ -0,0 +1,184 @@
+# bridge/capability_profile.py
+
+"""
+Beobachtetes Capability-Profil: welche Sensoren liefern auf dieser Anlage Daten.
+
+Problem:
+    Die Discovery kündigt alle ~70 Sensoren an - auch ohne Batterie, Meter
+    oder PV3/4. HA führt dann Dutzende tote Entities, deren Templates trotzdem
+    jeden Cycle gerendert werden (und im Recorder landen).
+
+Lösung (HUAWEI_CAPABILITY_DISCOVERY):
+    - Jeder publizierte Payload wird beobachtet: ein Key ist "supported",
+      sobald er einmal mit gültigem Wert im Payload stand (Modbus-Platzhalter
+      und Lesefehler verwirft transform.py vorher)
+    - Nach min_cycles vollen Cycles ist das Profil komplett: Discovery-Keys
+      die nie Daten hatten sind "unsupported" - ihre Entities werden mit
+      leerer Config zurückgezogen
+    - Taucht ein unsupported Key später doch auf (Batterie nachgerüstet,
+      Register nachts ungültig), wird er wieder supported und neu angekündigt
+    - Andere Seriennummer → Profil wird verworfen und neu gelernt
+
+Das Profil liegt versioniert als JSON in /data (atomar via os.replace) und
+gilt damit ab dem ersten Start nach dem Lernen - auch vor dem ersten Read.
+Neue Sensoren späterer Versionen sind nicht im Profil und werden angekündigt.
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Any, Collection, Dict, FrozenSet, Optional, Set
+
+from .__version__ import __version__
+
+logger = logging.getLogger("huawei.capabilities")
+
+# Format der Profil-Datei - bei inkompatibler Änderung erhöhen (altes Profil wird neu gelernt)
+PROFILE_VERSION = 1
+
+
+class CapabilityProfile:
+    """Lernt aus den publizierten Payloads, welche Discovery-Keys Daten liefern."""
+
+    def __init__(self, path: str, candidates: Collection[str], min_cycles: int = 10, save_interval: float = 300.0):
+        """
+        Initialisiert ein leeres Profil (load() liest das gespeicherte).
+
+        Args:
+            path: JSON-Datei für das Profil
+            candidates: Keys aller Discovery-Sensoren (Basis für "unsupported")
+            min_cycles: Volle Cycles bis das Profil als komplett gilt
+            save_interval: Mindestabstand zwischen zwei Speichervorgängen (s)
+        """
+        self.path = path
+        self.candidates = frozenset(candidates)
+        self.min_cycles = min_cycles
+        self.save_interval = save_interval
+        self.cycles = 0
+        self.serial_number: Optional[str] = None
+        self._supported: Set[str] = set()
+        self._unsupported: Set[str] = set()
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+    @property
+    def complete(self) -> bool:
+        """True sobald genug Cycles beobachtet wurden."""
+        return self.cycles >= self.min_cycles
+
+    def unsupported(self) -> FrozenSet[str]:
+        """Keys deren Entities zurückgezogen werden (leer solange unvollständig)."""
+        return frozenset(self._unsupported) if self.complete else frozenset()
+
+    def observe(self, data: Dict[str, Any]) -> bool:
+        """
+        Beobachtet einen publizierten Payload (voller Cycle).
+
+        Args:
+            data: Publizierter Payload (nach Transform, Filter, Extras)
+
+        Returns:
+            True wenn sich die Discovery ändert (Profil komplett geworden,
+            Key wieder supported, neues Gerät) - Aufrufer publiziert neu
+        """
+        changed = False
+        serial = data.get("serial_number")
+        if serial is not None and self.serial_number is not None and str(serial) != self.serial_number:
+            logger.warning(f"Serial number changed ({self.serial_number} → {serial}), relearning capabilities")
+            changed = bool(self.unsupported())
+            self.cycles = 0
+            self._supported.clear()
+            self._unsupported.clear()
+        if serial is not None:
+            self.serial_number = str(serial)
+
+        new_keys = [key for key in data if key not in self._supported]
+        if new_keys:
+            self._supported.update(new_keys)
+            self._dirty = True
+            returned = self._unsupported.intersection(new_keys)
+            if returned:
+                self._unsupported -= returned
+                if self.complete:
+                    logger.info(f"🧩 Capabilities: {', '.join(sorted(returned))} now supported")
+                    changed = True
+
+        if not self.complete:
+            self.cycles += 1
+            self._dirty = True
+            if self.complete:
+                self._unsupported = set(self.candidates - self._supported)
+                logger.info(
+                    f"🧩 Capabilities learned: {len(self.candidates) - len(self._unsupported)} "
+                    f"of {len(self.candidates)} sensors supported"
+                )
+                changed = changed or bool(self._unsupported)
+
+        if changed:
+            self.save()
+        return changed
+
+    def load(self) -> bool:
+        """
+        Lädt das gespeicherte Profil.
+
+        Returns:
+            True wenn ein gültiges Profil geladen wurde
+        """
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("version") != PROFILE_VERSION:
+                raise ValueError(f"version {saved.get('version')} != {PROFILE_VERSION}")
+            cycles = int(saved["cycles"])
+            supported = set(saved["supported"])
+            unsupported = set(saved["unsupported"])
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Capability profile not loaded ({self.path}): {e}")
+            return False
+        self.cycles = cycles
+        self.serial_number = saved.get("serial_number")
+        self._supported = supported
+        self._unsupported = unsupported - supported
+        logger.info(
+            f"🧩 Capability profile loaded: {len(self._supported)} keys supported, "
+            f"{len(self.unsupported())} retracted ({self.cycles} cycles)"
+        )
+        return True
+
+    def save_if_due(self) -> None:
+        """Speichert wenn save_interval seit dem letzten Speichern vergangen ist."""
+        if time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
+
+    def save(self) -> None:
+        """Schreibt das Profil atomar (tmp-Datei + os.replace), nur bei Änderungen."""
+        self._last_save = time.monotonic()
+        if not self.path or not self._dirty:
+            return
+        tmp = f"{self.path}.tmp"
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "version": PROFILE_VERSION,
+                        "bridge_version": __version__,
+                        "saved_at": int(time.time()),
+                        "serial_number": self.serial_number,
+                        "cycles": self.cycles,
+                        "supported": sorted(self._supported),
+                        "unsupported": sorted(self._unsupported),
+                    },
+                    f,
+                    indent=2,
+                )
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"Capability profile not saved ({self.path}): {e}")
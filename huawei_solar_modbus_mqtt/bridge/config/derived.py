@@ -0,0 +1,101 @@
+# bridge/config/derived.py
+
+"""Derived metrics computed in the bridge from the transformed values.
+
+Each entry declares one derived key:
+    - key: MQTT key in the payload (must not collide with REGISTER_MAPPING)
+    - expr: Python expression over MQTT keys and other derived keys
+            (arithmetic, comparisons, `x if cond else y`, abs/min/max/round)
+    - min / max: optional clamp of the result
+    - round: digits (default 0 = integer, None = unrounded)
+    - publish: False = intermediate value, not in payload or discovery
+    - name, unit_of_measurement, device_class, state_class, icon, enabled,
+      entity_category: discovery fields (see sensors_mqtt.py)
+
+A metric is skipped (key not published this cycle) when an input is missing
+or not numeric, the expression evaluates to None or divides by zero.
+
+derived_metrics.py compiles this list once at startup into an ordered plan
+(dependencies first); errors in a definition stop the start.
+
+Sign conventions (see sensors_mqtt.py):
+    meter_power_active: positive = grid import, negative = export
+    battery_power: positive = charging, negative = discharging
+"""
+
+from typing import Any, Dict, List
+
+DERIVED_METRICS: List[Dict[str, Any]] = [
+    # === Energy flow ===
+    {
+        "key": "power_house",
+        "expr": "power_active + meter_power_active",  # AC output + grid import
+        "min": 0,
+        "name": "House Load",
+        "unit_of_measurement": "W",
+        "device_class": "power",
+        "state_class": "measurement",
+        "icon": "mdi:home-lightning-bolt",
+        "enabled": True,
+    },
+    {
+        "key": "self_consumption_ratio",  # Share of PV used on site (not exported)
+        "expr": "100 * (power_input - max(0, -meter_power_active)) / power_input if power_input > 0 else None",
+        "min": 0,
+        "max": 100,
+        "round": 1,
+        "name": "Self-Consumption Ratio",
+        "unit_of_measurement": "%",
+        "state_class": "measurement",
+        "icon": "mdi:home-percent",
+        "enabled": True,
+    },
+    {
+        "key": "autarky",  # Share of house load not covered by the grid
+        "expr": "100 * (1 - max(0, meter_power_active) / power_house) if power_house > 0 else None",
+        "min": 0,
+        "max": 100,
+        "round": 1,
+        "name": "Autarky",
+        "unit_of_measurement": "%",
+        "state_class": "measurement",
+        "icon": "mdi:home-battery",
+        "enabled": True,
+    },
+    # === PV strings (V x I) ===
+    *(
+        {
+            "key": f"power_PV{n}",
+            "expr": f"voltage_PV{n} * current_PV{n}",
+            "min": 0,
+            "name": f"PV{n} Power",
+            "unit_of_measurement": "W",
+            "device_class": "power",
+            "state_class": "measurement",
+            "icon": "mdi:solar-panel",
+            "enabled": n <= 2,  # PV3/PV4 only on larger inverters
+        }
+        for n in range(1, 5)
+    ),
+    # === Phase imbalance (meter currents) ===
+    {
+        "key": "current_meter_avg",
+        "expr": "(abs(current_meter_A) + abs(current_meter_B) + abs(current_meter_C)) / 3",
+        "round": None,
+        "publish": False,
+    },
+    {
+        "key": "phase_imbalance_meter",  # Max deviation from the mean phase current (NEMA)
+        "expr": (
+            "100 * max(abs(abs(current_meter_A) - current_meter_avg), abs(abs(current_meter_B) - current_meter_avg), "
+            "abs(abs(current_meter_C) - current_meter_avg)) / current_meter_avg if current_meter_avg > 0 else None"
+        ),
+        "round": 1,
+        "name": "Phase Imbalance",
+        "unit_of_measurement": "%",
+        "state_class": "measurement",
+        "icon": "mdi:scale-unbalanced",
+        "enabled": False,  # 3-phase meter only
+        "entity_category": "diagnostic",
+    },
+]
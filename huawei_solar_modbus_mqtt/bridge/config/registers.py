@@ -120,3 +120,50 @@ ESSENTIAL_REGISTERS = [
     "storage_unit_2_soc",
     "storage_unit_3_soc",
 ]
+
+# Fast tier (burst mode, see poll_scheduler.py)
+#
+# Read every 1-2s while a large power change is in progress. Kept minimal so a
+# fast read takes ~4 Modbus round trips instead of a full cycle.
+FAST_REGISTERS = [
+    "input_power",  # power_input - PV generation
+    "active_power",  # power_active - AC output (needed for house load)
+    "power_meter_active_power",  # meter_power_active - grid import/export
+    "storage_charge_discharge_power",  # battery_power - battery charge/discharge
+]
+
+# Liveness tier (idle mode, see poll_scheduler.py)
+#
+# Read every poll_interval while the inverter is idle (night, no battery
+# activity) to keep the status online and detect the first sign of activity.
+LIVENESS_REGISTERS = [
+    "device_status",  # inverter_status - Standby / On-grid
+    "input_power",  # power_input - PV generation
+    "storage_running_status",  # battery_status - standby / running
+    "storage_charge_discharge_power",  # battery_power - battery charge/discharge
+]
+
+# Static tier (lowest priority, see modbus_scheduler.py)
+#
+# Device information that never changes at runtime - read after everything else
+# when several requests compete for the connection.
+STATIC_REGISTERS = [
+    "model_name",
+    "serial_number",
+    "rated_power",
+    "startup_time",
+]
+
+# Write tier (command path, see write_queue.py)
+#
+# Settable via {topic}/command/set/<key> when write_commands is enabled.
+# key → (register, min, max) - whole numbers in the register unit (W / %).
+# The battery limits read above (storage_maximum_charge_power, 37046) are the
+# rated limits and read-only; the settable limits live at 47075/47077.
+WRITABLE_REGISTERS = {
+    "battery_max_charging_power": ("storage_maximum_charging_power", 0, 50000),
+    "battery_max_discharging_power": ("storage_maximum_discharging_power", 0, 50000),
+    "battery_grid_charge_max_power": ("storage_maximum_power_of_charge_from_grid", 0, 50000),
+    "battery_charging_cutoff_soc": ("storage_charging_cutoff_capacity", 90, 100),
+    "battery_discharging_cutoff_soc": ("storage_discharging_cutoff_capacity", 0, 20),
+}
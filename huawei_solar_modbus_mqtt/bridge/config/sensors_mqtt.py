@@ -660,6 +660,119 @@ NUMERIC_SENSORS: List[Dict[str, Any]] = [
     },
 ]
 
+# Aus Leistungs-Samples integrierte Energie-Zähler (energy_integrator.py)
+# Nur in Discovery wenn HUAWEI_ENERGY_INTEGRATION aktiv ist
+INTEGRATED_ENERGY_SENSORS: List[Dict[str, Any]] = [
+    {
+        "name": "PV Energy (integrated)",  # Aus power_input integriert
+        "key": "energy_pv_integrated",
+        "unit_of_measurement": "kWh",
+        "device_class": "energy",
+        "state_class": "total_increasing",
+        "icon": "mdi:solar-power",
+        "enabled": True,
+    },
+    {
+        "name": "House Consumption (integrated)",  # power_active + Netzbezug
+        "key": "energy_house_integrated",
+        "unit_of_measurement": "kWh",
+        "device_class": "energy",
+        "state_class": "total_increasing",
+        "icon": "mdi:home-lightning-bolt",
+        "enabled": True,
+    },
+    {
+        "name": "Battery Charge Energy (integrated)",
+        "key": "energy_battery_charge_integrated",
+        "unit_of_measurement": "kWh",
+        "device_class": "energy",
+        "state_class": "total_increasing",
+        "icon": "mdi:battery-arrow-up",
+        "enabled": True,
+    },
+    {
+        "name": "Battery Discharge Energy (integrated)",
+        "key": "energy_battery_discharge_integrated",
+        "unit_of_measurement": "kWh",
+        "device_class": "energy",
+        "state_class": "total_increasing",
+        "icon": "mdi:battery-arrow-down",
+        "enabled": True,
+    },
+    {
+        "name": "Grid Import Energy (integrated)",
+        "key": "energy_grid_import_integrated",
+        "unit_of_measurement": "kWh",
+        "device_class": "energy",
+        "state_class": "total_increasing",
+        "icon": "mdi:transmission-tower-import",
+        "enabled": True,
+    },
+    {
+        "name": "Grid Export Energy (integrated)",
+        "key": "energy_grid_export_integrated",
+        "unit_of_measurement": "kWh",
+        "device_class": "energy",
+        "state_class": "total_increasing",
+        "icon": "mdi:transmission-tower-export",
+        "enabled": True,
+    },
+    {
+        "name": "Meter Phase A Import Energy (integrated)",  # Nur bei 3-Phasen Meter
+        "key": "energy_meter_A_import_integrated",
+        "unit_of_measurement": "kWh",
+        "device_class": "energy",
+        "state_class": "total_increasing",
+        "icon": "mdi:transmission-tower-import",
+        "enabled": False,
+    },
+    {
+        "name": "Meter Phase A Export Energy (integrated)",
+        "key": "energy_meter_A_export_integrated",
+        "unit_of_measurement": "kWh",
+        "device_class": "energy",
+        "state_class": "total_increasing",
+        "icon": "mdi:transmission-tower-export",
+        "enabled": False,
+    },
+    {
+        "name": "Meter Phase B Import Energy (integrated)",
+        "key": "energy_meter_B_import_integrated",
+        "unit_of_measurement": "kWh",
+        "device_class": "energy",
+        "state_class": "total_increasing",
+        "icon": "mdi:transmission-tower-import",
+        "enabled": False,
+    },
+    {
+        "name": "Meter Phase B Export Energy (integrated)",
+        "key": "energy_meter_B_export_integrated",
+        "unit_of_measurement": "kWh",
+        "device_class": "energy",
+        "state_class": "total_increasing",
+        "icon": "mdi:transmission-tower-export",
+        "enabled": False,
+    },
+    {
+        "name": "Meter Phase C Import Energy (integrated)",
+        "key": "energy_meter_C_import_integrated",
+        "unit_of_measurement": "kWh",
+        "device_class": "energy",
+        "state_class": "total_increasing",
+        "icon": "mdi:transmission-tower-import",
+        "enabled": False,
+    },
+    {
+        "name": "Meter Phase C Export Energy (integrated)",
+        "key": "energy_meter_C_export_integrated",
+        "unit_of_measurement": "kWh",
+        "device_class": "energy",
+        "state_class": "total_increasing",
+        "icon": "mdi:transmission-tower-export",
+        "enabled": False,
+    },
+]
+
 # Text-Sensoren ohne unit_of_measurement
 # Für Status-Strings, Modellnamen, etc.
 TEXT_SENSORS: List[Dict[str, Any]] = [
@@ -0,0 +1,197 @@
+# bridge/config_reload.py
+
+"""
+Hot Reload der Add-on Optionen ohne Neustart.
+
+Problem:
+    Jede Options-Änderung (Poll-Intervall, Log-Level, Burst-Modus, ...)
+    bedeutet Add-on Neustart: Modbus-Verbindung weg (SDongle braucht lange
+    für den Reconnect), Filter-Reset, komplette Discovery neu.
+
+Lösung:
+    Reload-Anforderung per SIGHUP oder MQTT ({topic}/command/reload).
+    Beim nächsten Loop-Durchlauf liest main() /data/options.json neu, übernimmt
+    geänderte Werte nach os.environ (gleiche Namen wie run.sh) und wendet sie
+    auf Logging, Scheduler und Binär-Payload an - Modbus, MQTT und Filter
+    bleiben unangetastet.
+
+    Optionen die eine neue Verbindung bräuchten (Host, Port, Topic, MQTT-Login,
+    History, Schreib-Kommandos) oder andere Discovery-Entities ergeben
+    (Fenster-Aggregation, Energie-Integration, abgeleitete Metriken) oder nur beim Start
+    wirken (Snapshot) werden nicht übernommen, nur als Warnung geloggt.
+
+Thread-Sicherheit:
+    Die Anforderung ist ein threading.Event - gesetzt aus Signal-Handler
+    oder paho-Thread, abgeholt im asyncio-Loop (consume_reload()).
+    Nach bind_reload() weckt sie zusätzlich laufende Wartephasen
+    (wait_reload(), per call_soon_threadsafe) - sonst würde ein Reload im
+    Idle-Modus erst nach Minuten übernommen.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from typing import List, Optional
+
+from .settings import DEFAULT_OPTIONS_PATH, OPTION_ENV, Settings, options_to_env, reset_settings
+
+logger = logging.getLogger("huawei.reload")
+
+# Zur Laufzeit änderbare Optionen (ENV-Namen siehe settings.OPTION_ENV)
+RELOADABLE_OPTIONS = (
+    "log_level",
+    "status_timeout",
+    "poll_interval",
+    "fast_poll_threshold",
+    "fast_poll_interval",
+    "fast_poll_hold",
+    "idle_poll_interval",
+    "binary_payload",
+)
+
+# Optionen die nur mit Neustart wirksam werden
+RESTART_OPTIONS = (
+    "modbus_host",
+    "modbus_port",
+    "slave_id",
+    "mqtt_topic",
+    "discovery_retain",
+    "discovery_mode",
+    "sample_interval",
+    "energy_integration",
+    "derived_metrics",
+    "state_snapshot",
+    "capability_discovery",
+    "register_profile",
+    "history_enabled",
+    "history_retention_days",
+    "history_commit_interval",
+    "write_commands",
+    "write_min_interval",
+    "loop_monitor",
+    "loop_lag_threshold",
+)
+
+_reload_requested = threading.Event()
+
+# Weckt wait_reload() im asyncio-Loop (gesetzt von bind_reload())
+_wake_loop: Optional[asyncio.AbstractEventLoop] = None
+_wake_event: Optional[asyncio.Event] = None
+
+
+def bind_reload(loop: asyncio.AbstractEventLoop) -> None:
+    """Verbindet die Reload-Anforderung mit dem Event-Loop (Aufruf in main())."""
+    global _wake_loop, _wake_event
+    _wake_loop = loop
+    _wake_event = asyncio.Event()
+    if _reload_requested.is_set():
+        _wake_event.set()
+
+
+def request_reload(source: str) -> None:
+    """
+    Fordert einen Reload beim nächsten Loop-Durchlauf an.
+
+    Args:
+        source: Auslöser für das Log ("SIGHUP", "mqtt")
+    """
+    logger.info(f"🔄 Config reload requested ({source})")
+    _reload_requested.set()
+    loop, event = _wake_loop, _wake_event
+    if loop is not None and event is not None:
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            # Loop bereits geschlossen (Shutdown) - consume_reload() reicht
+            pass
+
+
+def consume_reload() -> bool:
+    """True (einmalig) wenn seit dem letzten Aufruf ein Reload angefordert wurde."""
+    if not _reload_requested.is_set():
+        return False
+    _reload_requested.clear()
+    if _wake_event is not None and _wake_loop is _running_loop():
+        _wake_event.clear()
+    return True
+
+
+async def wait_reload(timeout: float) -> bool:
+    """
+    Wartet timeout Sekunden, endet früher bei einer Reload-Anforderung.
+
+    Ohne bind_reload() im laufenden Loop (Tests, Tools) ein normales sleep.
+
+    Returns:
+        True wenn ein Reload angefordert wurde (Aufrufer beendet das Warten)
+    """
+    event = _wake_event
+    if event is None or _wake_loop is not asyncio.get_running_loop():
+        await asyncio.sleep(timeout)
+        return False
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        sleeper = asyncio.ensure_future(asyncio.sleep(max(0.0, deadline - loop.time())))
+        waiter = asyncio.ensure_future(event.wait())
+        try:
+            await asyncio.wait((sleeper, waiter), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            sleeper.cancel()
+            waiter.cancel()
+        if waiter.done() and not waiter.cancelled() and _reload_requested.is_set():
+            return True
+        if sleeper.done() and not sleeper.cancelled():
+            return False
+        # Verspätetes Wecken - Reload wurde schon von consume_reload() abgeholt
+        event.clear()
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def reload_options(path: str = "") -> List[str]:
+    """
+    Liest die Optionen neu und übernimmt geänderte Werte nach os.environ.
+
+    Die neuen Werte werden vorher als Settings validiert - bei ungültigen
+    Werten bleibt os.environ unverändert. Bei Änderungen wird der
+    Settings-Cache verworfen (get_settings() lädt neu).
+
+    Args:
+        path: options.json (default: HUAWEI_OPTIONS_PATH oder /data/options.json)
+
+    Returns:
+        Namen der geänderten ENV-Variablen (leer = nichts zu tun)
+
+    Raises:
+        OSError, ValueError: options.json fehlt, ist kein gültiges JSON
+                             oder enthält ungültige Werte
+    """
+    path = path or os.environ.get("HUAWEI_OPTIONS_PATH", DEFAULT_OPTIONS_PATH)
+    with open(path, encoding="utf-8") as f:
+        new_env = options_to_env(json.load(f))
+
+    for option in RESTART_OPTIONS:
+        env = OPTION_ENV[option]
+        if env in new_env and new_env[env] != os.environ.get(env):
+            logger.warning(f"Option '{option}' changed - restart the add-on to apply it")
+
+    updates = {}
+    for option in RELOADABLE_OPTIONS:
+        env = OPTION_ENV[option]
+        if env in new_env and os.environ.get(env) != new_env[env]:
+            updates[env] = new_env[env]
+            logger.info(f"🔄 {option} = {new_env[env]}")
+
+    if updates:
+        Settings.from_env({**os.environ, **updates})  # ValueError → nichts übernehmen
+        os.environ.update(updates)
+        reset_settings()
+    return list(updates)
@@ -0,0 +1,215 @@
+# bridge/derived_metrics.py
+
+"""
+Abgeleitete Metriken: einmal kompiliert, ein Durchlauf pro Cycle.
+
+Problem:
+    Hauslast, Eigenverbrauchsquote, Autarkie, String-Leistung (V x I) und
+    Phasen-Schieflast werden in jeder Installation per HA-Template berechnet -
+    jedes Template wird bei jeder MQTT-Message neu gerendert (Jinja).
+
+Lösung (HUAWEI_DERIVED_METRICS):
+    - Deklarative Definitionen in config/derived.py (Key, Ausdruck, Clamp,
+      Rundung, Discovery-Felder)
+    - compile_plan() parst jeden Ausdruck einmal beim Start (ast), prüft die
+      erlaubte Syntax, ermittelt die Abhängigkeiten und sortiert topologisch
+      (abgeleitete Keys dürfen andere abgeleitete Keys verwenden)
+    - DerivedPlan.apply() wertet die fertigen Code-Objekte in dieser
+      Reihenfolge über den gefilterten Payload aus - ein Pass, in-place
+    - Discovery-Configs werden aus denselben Definitionen erzeugt
+
+Erlaubt in Ausdrücken:
+    Zahlen, Keys, + - * / // % **, Vergleiche, and/or/not,
+    "x if cond else y", None, abs(), min(), max(), round()
+"""
+
+import ast
+import logging
+from dataclasses import dataclass
+from types import CodeType
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .config.derived import DERIVED_METRICS
+from .config.mappings import REGISTER_MAPPING
+
+logger = logging.getLogger("huawei.derived")
+
+FUNCTIONS = {"abs": abs, "min": min, "max": max, "round": round}
+
+_ALLOWED_NODES = (
+    ast.Expression,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.BoolOp,
+    ast.Compare,
+    ast.IfExp,
+    ast.Call,
+    ast.Name,
+    ast.Load,
+    ast.Constant,
+    ast.operator,
+    ast.unaryop,
+    ast.boolop,
+    ast.cmpop,
+)
+
+# Discovery-Felder die 1:1 aus der Definition übernommen werden
+_SENSOR_FIELDS = ("name", "unit_of_measurement", "device_class", "state_class", "icon", "enabled", "entity_category")
+
+_GLOBALS: Dict[str, Any] = {"__builtins__": {}, **FUNCTIONS}
+
+
+@dataclass(frozen=True)
+class Step:
+    """Eine kompilierte Metrik im Auswertungsplan."""
+
+    key: str
+    code: CodeType
+    inputs: Tuple[str, ...]
+    low: Optional[float]
+    high: Optional[float]
+    digits: Optional[int]
+    publish: bool
+
+
+class DerivedPlan:
+    """Geordneter Auswertungsplan über den transformierten Payload."""
+
+    def __init__(self, steps: List[Step]):
+        self.steps = steps
+        self._internal = tuple(step.key for step in steps if not step.publish)
+
+    def apply(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Berechnet alle Metriken in Abhängigkeits-Reihenfolge (in-place).
+
+        Args:
+            data: Gefilterte MQTT-Daten
+
+        Returns:
+            data mit abgeleiteten Keys (fehlende Eingaben → Key fehlt)
+        """
+        for step in self.steps:
+            data.pop(step.key, None)  # Wert vom letzten Cycle (Fast-Read Merge) nicht weiterverwenden
+            if not all(_is_number(data.get(name)) for name in step.inputs):
+                continue
+            try:
+                value = eval(step.code, _GLOBALS, data)  # noqa: S307 - nur geprüfte Ausdrücke
+            except (ZeroDivisionError, OverflowError, TypeError, ValueError):
+                continue
+            if not _is_number(value):
+                continue
+            if step.low is not None and value < step.low:
+                value = step.low
+            if step.high is not None and value > step.high:
+                value = step.high
+            if step.digits is not None:
+                value = round(value, step.digits) if step.digits else int(round(value))
+            data[step.key] = value
+
+        for key in self._internal:
+            data.pop(key, None)
+        return data
+
+    @property
+    def keys(self) -> List[str]:
+        """Publizierte Keys in Auswertungs-Reihenfolge."""
+        return [step.key for step in self.steps if step.publish]
+
+
+def compile_plan(definitions: Iterable[Dict[str, Any]] = DERIVED_METRICS) -> DerivedPlan:
+    """
+    Kompiliert die Definitionen zu einem geordneten Plan (einmal beim Start).
+
+    Args:
+        definitions: Liste wie config/derived.py DERIVED_METRICS
+
+    Returns:
+        DerivedPlan
+
+    Raises:
+        ValueError: Ungültige Syntax, unbekannte Funktion, doppelter Key,
+                    Kollision mit einem Register-Key oder Zyklus
+    """
+    register_keys = set(REGISTER_MAPPING.values())
+    compiled: Dict[str, Tuple[Step, Tuple[str, ...]]] = {}
+
+    for definition in definitions:
+        key = definition["key"]
+        if key in compiled:
+            raise ValueError(f"Derived metric '{key}' defined twice")
+        if key in register_keys:
+            raise ValueError(f"Derived metric '{key}' collides with a register key")
+        code, names = _compile_expression(key, definition["expr"])
+        step = Step(
+            key=key,
+            code=code,
+            inputs=names,
+            low=definition.get("min"),
+            high=definition.get("max"),
+            digits=definition.get("round", 0),
+            publish=definition.get("publish", True),
+        )
+        compiled[key] = (step, names)
+
+    return DerivedPlan(_order(compiled))
+
+
+def _compile_expression(key: str, expr: str) -> Tuple[CodeType, Tuple[str, ...]]:
+    """Parst und prüft einen Ausdruck, liefert Code-Objekt und verwendete Keys."""
+    try:
+        tree = ast.parse(expr, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Derived metric '{key}': invalid expression ({e.msg})") from None
+
+    names = []
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Derived metric '{key}': {type(node).__name__} not allowed")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+                raise ValueError(f"Derived metric '{key}': only {', '.join(FUNCTIONS)} can be called")
+        elif isinstance(node, ast.Name) and node.id not in FUNCTIONS and node.id not in names:
+            names.append(node.id)
+    return compile(tree, f"<derived:{key}>", "eval"), tuple(names)
+
+
+def _order(compiled: Dict[str, Tuple[Step, Tuple[str, ...]]]) -> List[Step]:
+    """Topologische Sortierung: abgeleitete Eingaben vor ihren Verwendern."""
+    ordered: List[Step] = []
+    state: Dict[str, int] = {}  # 1 = in Arbeit, 2 = fertig
+
+    def visit(key: str, path: Tuple[str, ...]) -> None:
+        if state.get(key) == 2:
+            return
+        if state.get(key) == 1:
+            raise ValueError(f"Derived metrics form a cycle: {' -> '.join(path + (key,))}")
+        state[key] = 1
+        step, names = compiled[key]
+        for name in names:
+            if name in compiled:
+                visit(name, path + (key,))
+        state[key] = 2
+        ordered.append(step)
+
+    for key in compiled:
+        visit(key, ())
+    return ordered
+
+
+def derived_sensors(definitions: Iterable[Dict[str, Any]] = DERIVED_METRICS) -> List[Dict[str, Any]]:
+    """
+    Discovery-Definitionen der publizierten Metriken (Format wie NUMERIC_SENSORS).
+
+    Args:
+        definitions: Liste wie config/derived.py DERIVED_METRICS
+    """
+    return [
+        {"key": d["key"], **{field: d[field] for field in _SENSOR_FIELDS if field in d}}
+        for d in definitions
+        if d.get("publish", True)
+    ]
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
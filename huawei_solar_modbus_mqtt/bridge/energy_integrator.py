@@ -0,0 +1,195 @@
+# bridge/energy_integrator.py
+
+"""
+Hochaufgelöste Energie-Zähler aus Leistungs-Samples (Trapez-Integration).
+
+Problem:
+    daily_yield_energy und die Batterie-Tageszähler des Inverters ändern sich
+    nur grob (0.01 kWh Schritte, verzögert). Für Hausverbrauch und die
+    einzelnen Meter-Phasen gibt es gar keine Energie-Zähler.
+
+Lösung (HUAWEI_ENERGY_INTEGRATION):
+    - Jeder Read (voller Cycle, Fast-Read, Sampling) liefert Leistungswerte
+      mit monotonem Zeitstempel des Producers (nicht des Consumers - Queue-
+      Wartezeit verfälscht sonst dt)
+    - Pro Quelle: E += (P_alt + P_neu) / 2 * dt, getrennt nach Richtung
+      (Bezug/Einspeisung, Laden/Entladen) - jeder Zähler steigt nur
+    - Lücken explizit: dt > max_gap (Verbindungsausfall, Neustart) wird NICHT
+      überbrückt, nur gezählt - lieber fehlende als erfundene Energie
+    - Persistenz: Zählerstände als JSON in /data (atomar via os.replace),
+      alle save_interval Sekunden und beim Beenden. Nach einem Neustart laufen
+      die Zähler weiter (total_increasing ohne Reset in HA)
+
+Keine zusätzlichen Modbus-Reads - nur bereits gelesene Werte.
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, TypeGuard
+
+logger = logging.getLogger("huawei.energy")
+
+
+def _house_power(values: Dict[str, Any]) -> Optional[float]:
+    """Hausverbrauch = AC-Ausgang + Netzbezug (meter_power_active: pos=Bezug)."""
+    active = values.get("power_active")
+    meter = values.get("meter_power_active")
+    if not _is_number(active) or not _is_number(meter):
+        return None
+    return max(0.0, active + meter)
+
+
+def _key(name: str) -> Callable[[Dict[str, Any]], Optional[float]]:
+    def get(values: Dict[str, Any]) -> Optional[float]:
+        value = values.get(name)
+        return value if _is_number(value) else None
+
+    return get
+
+
+def _is_number(value: Any) -> TypeGuard[float]:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+# Quelle → (Leistung aus Werten, Zähler für positive Leistung, Zähler für negative Leistung)
+SOURCES: Dict[str, Tuple[Callable[[Dict[str, Any]], Optional[float]], str, Optional[str]]] = {
+    "pv": (_key("power_input"), "energy_pv_integrated", None),
+    "house": (_house_power, "energy_house_integrated", None),
+    "battery": (
+        _key("battery_power"),
+        "energy_battery_charge_integrated",
+        "energy_battery_discharge_integrated",
+    ),
+    "grid": (
+        _key("meter_power_active"),
+        "energy_grid_import_integrated",
+        "energy_grid_export_integrated",
+    ),
+    **{
+        f"meter_{phase}": (
+            _key(f"power_meter_{phase}"),
+            f"energy_meter_{phase}_import_integrated",
+            f"energy_meter_{phase}_export_integrated",
+        )
+        for phase in "ABC"
+    },
+}
+
+INTEGRATED_KEYS = tuple(key for _, pos, neg in SOURCES.values() for key in (pos, neg) if key is not None)
+
+# Wh → kWh, 0.1 Wh Auflösung im Payload
+_KWH_DIGITS = 4
+
+
+class EnergyIntegrator:
+    """Trapez-Integration der Leistungswerte zu total_increasing Zählern (kWh)."""
+
+    def __init__(self, path: str = "", max_gap: float = 90.0, save_interval: float = 300.0):
+        """
+        Initialisiert den Integrator.
+
+        Args:
+            path: JSON-Datei für die Zählerstände ("" = keine Persistenz)
+            max_gap: Größter Sample-Abstand (s), der noch integriert wird
+            save_interval: Mindestabstand zwischen zwei Speichervorgängen (s)
+        """
+        self.path = path
+        self.max_gap = max_gap
+        self.save_interval = save_interval
+        self._totals: Dict[str, float] = {key: 0.0 for key in INTEGRATED_KEYS}
+        self._last: Dict[str, Tuple[float, float]] = {}
+        self._gaps = 0
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+    def load(self) -> "EnergyIntegrator":
+        """Lädt gespeicherte Zählerstände (fehlende/defekte Datei = Start bei 0)."""
+        if not self.path or not os.path.exists(self.path):
+            return self
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+            for key, value in saved.get("totals", {}).items():
+                if key in self._totals and _is_number(value):
+                    self._totals[key] = float(value)
+            logger.debug(f"Energy counters loaded from {self.path}")
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Energy counters not loaded ({self.path}): {e}")
+        return self
+
+    def add(self, values: Dict[str, Any], mono: float) -> None:
+        """
+        Integriert ein Sample.
+
+        Args:
+            values: Transformierte MQTT-Werte (Momentanwerte, nicht aggregiert)
+            mono: time.monotonic() des Reads
+        """
+        for source, (power_of, positive, negative) in SOURCES.items():
+            power = power_of(values)
+            if power is None:
+                continue
+            last = self._last.get(source)
+            if last is not None and mono <= last[0]:
+                # Veraltetes Sample (Reihenfolge vertauscht) - nicht zurückspringen
+                continue
+            self._last[source] = (mono, power)
+            if last is None:
+                continue
+
+            dt = mono - last[0]
+            if dt > self.max_gap:
+                self._gaps += 1
+                logger.debug(f"Energy gap {source}: {dt:.0f}s not integrated")
+                continue
+            self._integrate(last[1], power, dt, positive, negative)
+
+    def _integrate(self, p0: float, p1: float, dt: float, positive: str, negative: Optional[str]) -> None:
+        """Trapez über [p0, p1], bei Vorzeichenwechsel am Nulldurchgang geteilt (Wh → kWh)."""
+        segments: Tuple[float, ...]
+        if p0 * p1 < 0:
+            # Nulldurchgang: zwei Dreiecke statt eines Trapezes über beide Richtungen
+            t0 = dt * abs(p0) / (abs(p0) + abs(p1))
+            segments = ((p0 / 2 * t0), (p1 / 2 * (dt - t0)))
+        else:
+            segments = ((p0 + p1) / 2 * dt,)
+
+        for watt_seconds in segments:
+            if watt_seconds > 0:
+                self._totals[positive] += watt_seconds / 3_600_000
+            elif watt_seconds < 0 and negative is not None:
+                self._totals[negative] += -watt_seconds / 3_600_000
+        self._dirty = True
+
+    def totals(self) -> Dict[str, float]:
+        """Aktuelle Zählerstände in kWh (für den Payload)."""
+        return {key: round(value, _KWH_DIGITS) for key, value in self._totals.items()}
+
+    @property
+    def gaps(self) -> int:
+        """Anzahl nicht integrierter Lücken seit dem Start."""
+        return self._gaps
+
+    def save_if_due(self) -> None:
+        """Speichert wenn save_interval seit dem letzten Speichern vergangen ist."""
+        if time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
+
+    def save(self) -> None:
+        """Schreibt die Zählerstände atomar (tmp-Datei + os.replace)."""
+        self._last_save = time.monotonic()
+        if not self.path or not self._dirty:
+            return
+        tmp = f"{self.path}.tmp"
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"saved_at": int(time.time()), "totals": self._totals}, f)
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except OSError as e:
+            logger.warning(f"Energy counters not saved ({self.path}): {e}")
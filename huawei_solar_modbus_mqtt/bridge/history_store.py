@@ -0,0 +1,348 @@
+# bridge/history_store.py
+
+"""
+Lokaler Zeitreihen-Speicher (SQLite, WAL) mit Downsampling.
+
+Problem:
+    Jeder Read wird publiziert und dann vergessen. Nach einem HA Recorder
+    Purge oder einem Broker-Ausfall gibt es keine Quelle mehr für die Werte.
+
+Lösung:
+    Optionaler SQLite-Speicher in /data (überlebt Add-on Updates):
+    - samples:    Rohwerte pro Cycle (numerische Keys, gefiltert wie publiziert)
+    - aggregates: 1-Minuten und 1-Stunden Buckets
+                  min/max/mean/last für Messwerte, delta für total_increasing
+
+SD-Karten-Schonung:
+    - Pro Cycle wird nur im RAM gepuffert, kein Disk-I/O
+    - Commit alle commit_interval Sekunden in EINER Transaktion
+      (Rohwerte + bis dahin aufgelaufene Aggregate)
+    - Puffer ist auf MAX_PENDING_ROWS begrenzt (früherer Commit statt RAM-Wachstum)
+    - WAL + synchronous=NORMAL: sequentielle Writes, kein fsync pro Commit
+    - Retention-Cleanup höchstens einmal pro Stunde
+
+Aggregate werden inkrementell per UPSERT gemergt: Ein Bucket, der über
+mehrere Commits (oder einen Neustart) verteilt ist, ergibt trotzdem die
+korrekten min/max/mean/last/delta Werte.
+"""
+
+import logging
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .config.sensors_mqtt import INTEGRATED_ENERGY_SENSORS, NUMERIC_SENSORS
+
+logger = logging.getLogger("huawei.history")
+
+# Aggregations-Auflösungen in Sekunden
+RESOLUTION_MINUTE = 60
+RESOLUTION_HOUR = 3600
+RESOLUTIONS = (RESOLUTION_MINUTE, RESOLUTION_HOUR)
+
+# Aufbewahrung der Aggregate (Rohwerte: retention_days)
+AGGREGATE_RETENTION_DAYS = {RESOLUTION_MINUTE: 30, RESOLUTION_HOUR: 730}
+
+# Obergrenze für gepufferte Rohwerte (~60 Keys x 160 Cycles)
+MAX_PENDING_ROWS = 10000
+
+# Keys die nicht gespeichert werden (Metadaten, keine Messwerte)
+SKIP_KEYS = frozenset({"last_update"})
+
+# Counter: Aggregate speichern Zuwachs statt Mittelwert-Semantik
+TOTAL_INCREASING_KEYS = frozenset(
+    sensor["key"]
+    for sensor in NUMERIC_SENSORS + INTEGRATED_ENERGY_SENSORS
+    if sensor.get("state_class") == "total_increasing"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS keys (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS samples (
+    ts REAL NOT NULL,
+    key_id INTEGER NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts);
+CREATE TABLE IF NOT EXISTS aggregates (
+    resolution INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    key_id INTEGER NOT NULL,
+    min_value REAL NOT NULL,
+    max_value REAL NOT NULL,
+    mean_value REAL NOT NULL,
+    last_value REAL NOT NULL,
+    delta REAL,
+    samples INTEGER NOT NULL,
+    PRIMARY KEY (resolution, bucket, key_id)
+) WITHOUT ROWID;
+"""
+
+UPSERT_AGGREGATE = """
+INSERT INTO aggregates (resolution, bucket, key_id, min_value, max_value, mean_value, last_value, delta, samples)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (resolution, bucket, key_id) DO UPDATE SET
+    min_value = MIN(min_value, excluded.min_value),
+    max_value = MAX(max_value, excluded.max_value),
+    mean_value = (mean_value * samples + excluded.mean_value * excluded.samples) / (samples + excluded.samples),
+    last_value = excluded.last_value,
+    delta = CASE WHEN delta IS NULL THEN excluded.delta ELSE delta + COALESCE(excluded.delta, 0) END,
+    samples = samples + excluded.samples
+"""
+
+
+class _Bucket:
+    """Laufendes Aggregat eines Keys in einem Zeit-Bucket (seit letztem Commit)."""
+
+    __slots__ = ("min", "max", "total", "count", "last", "delta")
+
+    def __init__(self, value: float, delta: Optional[float]):
+        self.min = self.max = self.total = self.last = value
+        self.count = 1
+        self.delta = delta
+
+    def add(self, value: float, delta: Optional[float]) -> None:
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.total += value
+        self.count += 1
+        self.last = value
+        if delta is not None:
+            self.delta = (self.delta or 0.0) + delta
+
+
+class HistoryStore:
+    """Puffert Cycles im RAM und schreibt sie gebündelt in SQLite."""
+
+    def __init__(
+        self,
+        path: str,
+        commit_interval: float = 300.0,
+        retention_days: float = 7,
+    ):
+        """
+        Initialisiert den Speicher (ohne Datei zu öffnen).
+
+        Args:
+            path: Pfad zur SQLite-Datei (z.B. /data/history.db)
+            commit_interval: Sekunden zwischen zwei Commits
+            retention_days: Aufbewahrung der Rohwerte in Tagen
+        """
+        self.path = path
+        self.commit_interval = commit_interval
+        self.retention_days = retention_days
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._key_ids: Dict[str, int] = {}
+        self._pending: List[Tuple[float, int, float]] = []
+        self._buckets: Dict[Tuple[int, int, int], _Bucket] = {}
+        self._last_counter: Dict[int, float] = {}
+        self._last_commit = 0.0
+        self._last_prune = 0.0
+
+    def open(self) -> "HistoryStore":
+        """Öffnet die Datenbank, aktiviert WAL und legt das Schema an."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._key_ids = {name: key_id for key_id, name in self._conn.execute("SELECT id, name FROM keys")}
+        self._last_counter = self._load_last_counters(self._conn)
+        # Zeitbasis ab open() - monotonic() zählt ab Boot, 0.0 hinge von der Uptime ab
+        self._last_commit = self._last_prune = time.monotonic()
+        logger.debug(f"History store opened: {self.path} ({len(self._key_ids)} keys)")
+        return self
+
+    def _load_last_counters(self, conn: sqlite3.Connection) -> Dict[int, float]:
+        """
+        Letzter gespeicherter Zählerstand pro total_increasing Key.
+
+        Ohne diesen Startwert wäre das erste Delta nach einem Neustart 0 -
+        die während der Downtime gezählte Energie fehlte in delta/sum.
+        """
+        counters: Dict[int, float] = {}
+        for key in TOTAL_INCREASING_KEYS:
+            key_id = self._key_ids.get(key)
+            if key_id is None:
+                continue
+            row = conn.execute(
+                "SELECT value FROM samples WHERE key_id = ? ORDER BY ts DESC LIMIT 1", (key_id,)
+            ).fetchone()
+            if row is not None:
+                counters[key_id] = float(row[0])
+        return counters
+
+    def close(self) -> None:
+        """Schreibt offene Daten und schließt die Datenbank."""
+        if self._conn is None:
+            return
+        self.flush()
+        self._conn.close()
+        self._conn = None
+
+    def record(self, data: Dict[str, Any], ts: Optional[float] = None) -> None:
+        """
+        Puffert einen Cycle (nur RAM, Disk-I/O erst beim Commit).
+
+        Args:
+            data: Gefilterte MQTT-Daten (wie publiziert)
+            ts: Unix-Timestamp des Reads (default: jetzt)
+        """
+        conn = self._conn
+        if conn is None:
+            return
+
+        ts = time.time() if ts is None else ts
+        for key, value in data.items():
+            if key in SKIP_KEYS or isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+
+            key_id = self._key_ids.get(key)
+            if key_id is None:
+                key_id = self._register_key(conn, key)
+            value = float(value)
+            self._pending.append((ts, key_id, value))
+
+            delta = None
+            if key in TOTAL_INCREASING_KEYS:
+                last = self._last_counter.get(key_id)
+                # Rückgang = Tages-Reset (z.B. energy_yield_day um Mitternacht)
+                delta = 0.0 if last is None else (value - last if value >= last else value)
+                self._last_counter[key_id] = value
+
+            for resolution in RESOLUTIONS:
+                bucket_key = (resolution, int(ts // resolution) * resolution, key_id)
+                bucket = self._buckets.get(bucket_key)
+                if bucket is None:
+                    self._buckets[bucket_key] = _Bucket(value, delta)
+                else:
+                    bucket.add(value, delta)
+
+        if len(self._pending) >= MAX_PENDING_ROWS or time.monotonic() - self._last_commit >= self.commit_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Schreibt Puffer und Aggregate in einer Transaktion."""
+        if self._conn is None:
+            return
+
+        pending, buckets = self._pending, self._buckets
+        self._pending, self._buckets = [], {}
+        self._last_commit = time.monotonic()
+        if not pending and not buckets:
+            return
+
+        start = time.perf_counter()
+        try:
+            with self._conn:
+                self._conn.executemany("INSERT INTO samples (ts, key_id, value) VALUES (?, ?, ?)", pending)
+                self._conn.executemany(
+                    UPSERT_AGGREGATE,
+                    [
+                        (res, bucket, key_id, b.min, b.max, b.total / b.count, b.last, b.delta, b.count)
+                        for (res, bucket, key_id), b in buckets.items()
+                    ],
+                )
+        except sqlite3.Error as e:
+            # Verlust eines Batches ist besser als ein hängender Cycle
+            logger.error(f"History commit failed, {len(pending)} samples dropped: {e}")
+            return
+
+        logger.debug(
+            f"💾 History: {len(pending)} samples, {len(buckets)} aggregates "
+            f"committed in {(time.perf_counter() - start) * 1000:.1f}ms"
+        )
+
+        if time.monotonic() - self._last_prune >= RESOLUTION_HOUR:
+            self.prune()
+
+    def prune(self, now: Optional[float] = None) -> None:
+        """Löscht Rohwerte und Aggregate außerhalb der Retention."""
+        if self._conn is None:
+            return
+
+        now = time.time() if now is None else now
+        self._last_prune = time.monotonic()
+        try:
+            with self._conn:
+                removed = self._conn.execute(
+                    "DELETE FROM samples WHERE ts < ?", (now - self.retention_days * 86400,)
+                ).rowcount
+                for resolution, days in AGGREGATE_RETENTION_DAYS.items():
+                    removed += self._conn.execute(
+                        "DELETE FROM aggregates WHERE resolution = ? AND bucket < ?",
+                        (resolution, now - days * 86400),
+                    ).rowcount
+        except sqlite3.Error as e:
+            logger.error(f"History retention cleanup failed: {e}")
+            return
+
+        if removed:
+            logger.debug(f"💾 History: {removed} rows removed (retention)")
+
+    def iter_samples(self, start: float, end: float) -> Iterator[Tuple[float, Dict[str, float]]]:
+        """
+        Liefert Rohwerte als (ts, {key: value}) in zeitlicher Reihenfolge.
+
+        Streamt über den Cursor - konstanter Speicher auch für Monate an Daten.
+        Nur bereits committete Daten sind sichtbar.
+        """
+        if self._conn is None:
+            return
+
+        cursor = self._conn.execute(
+            "SELECT s.ts, k.name, s.value FROM samples s JOIN keys k ON k.id = s.key_id "
+            "WHERE s.ts >= ? AND s.ts < ? ORDER BY s.ts",
+            (start, end),
+        )
+        current_ts: Optional[float] = None
+        values: Dict[str, float] = {}
+        for ts, name, value in cursor:
+            if ts != current_ts:
+                if current_ts is not None:
+                    yield current_ts, values
+                current_ts, values = ts, {}
+            values[name] = value
+        if current_ts is not None:
+            yield current_ts, values
+
+    def iter_aggregates(self, resolution: int, start: float, end: float) -> Iterator[Dict[str, Any]]:
+        """Liefert Aggregate einer Auflösung als Dicts, sortiert nach Bucket und Key."""
+        if self._conn is None:
+            return
+
+        cursor = self._conn.execute(
+            "SELECT a.bucket, k.name, a.min_value, a.max_value, a.mean_value, a.last_value, a.delta, a.samples "
+            "FROM aggregates a JOIN keys k ON k.id = a.key_id "
+            "WHERE a.resolution = ? AND a.bucket >= ? AND a.bucket < ? ORDER BY a.bucket, k.name",
+            (resolution, start, end),
+        )
+        for bucket, name, min_value, max_value, mean_value, last_value, delta, samples in cursor:
+            yield {
+                "bucket": bucket,
+                "key": name,
+                "min": min_value,
+                "max": max_value,
+                "mean": mean_value,
+                "last": last_value,
+                "delta": delta,
+                "samples": samples,
+            }
+
+    def _register_key(self, conn: sqlite3.Connection, key: str) -> int:
+        """Legt neuen Key an (einmalig pro Key, sofortiger Commit)."""
+        with conn:
+            conn.execute("INSERT OR IGNORE INTO keys (name) VALUES (?)", (key,))
+        key_id = int(conn.execute("SELECT id FROM keys WHERE name = ?", (key,)).fetchone()[0])
+        self._key_ids[key] = key_id
+        return key_id
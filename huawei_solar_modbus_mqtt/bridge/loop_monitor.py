@@ -0,0 +1,139 @@
+# bridge/loop_monitor.py
+
+"""
+Event-Loop Lag Messung und Erkennung blockierender Aufrufe.
+
+Problem:
+    Auf ausgelasteten HA-Hosts schwanken die Cycle-Zeiten, ohne dass klar
+    ist warum. Alles läuft in einem asyncio-Loop - jeder synchrone Aufruf
+    (time.sleep() in connect_mqtt(), wait_for_publish(), Logging nach stdout,
+    SQLite-Commit) hält Modbus-Reads, Fast-Reads und Writes gleichermaßen auf.
+
+Lösung (Instrumentierungs-Modus, HUAWEI_LOOP_MONITOR):
+    - Lag: ein Task schläft alle interval Sekunden und misst, wie viel später
+      als geplant er wieder dran ist. Statistik pro Cycle (max, mean, p99)
+      wird auf {topic}/diagnostics/loop publiziert
+    - Blockierende Aufrufe: ein Watchdog-Thread prüft, ob der Loop-Task noch
+      tickt. Bleibt der Tick länger als threshold aus, wird der Stack des
+      Loop-Threads genau in diesem Moment geloggt (WARNING) - er zeigt die
+      Stelle, die den Loop gerade blockiert
+
+Overhead:
+    Ein Timer pro interval im Loop plus ein schlafender Thread - vernachlässigbar,
+    aber standardmäßig aus.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+logger = logging.getLogger("huawei.loop")
+
+# Anzahl Stack-Frames im Log (innerste zuerst abgeschnitten wäre nutzlos)
+STACK_LIMIT = 12
+
+
+class LoopMonitor:
+    """Misst Event-Loop Lag und loggt den Stack bei blockiertem Loop."""
+
+    def __init__(self, threshold: float = 0.1, interval: float = 0.25, max_samples: int = 2000):
+        """
+        Initialisiert den Monitor.
+
+        Args:
+            threshold: Ab dieser Blockade-Dauer (Sekunden) wird der Stack geloggt
+            interval: Mess-Intervall des Lag-Tasks (Sekunden)
+            max_samples: Maximal gespeicherte Lag-Werte pro Statistik-Fenster
+        """
+        self.threshold = threshold
+        self.interval = interval
+        self._samples: Deque[float] = deque(maxlen=max_samples)
+        self._stalls = 0
+        self._last_stall: Optional[Dict[str, Any]] = None
+        self._last_tick = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> "LoopMonitor":
+        """Startet Lag-Task und Watchdog-Thread (im laufenden Loop aufrufen)."""
+        self._loop_thread = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        return self
+
+    def stop(self) -> None:
+        """Beendet Lag-Task und Watchdog-Thread."""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self._last_tick = time.monotonic()
+            self._samples.append(lag)
+            if lag > self.threshold:
+                logger.debug(f"🐢 Event loop lag {lag * 1000:.0f}ms")
+
+    def _watch(self) -> None:
+        """Watchdog-Thread: loggt den Loop-Stack sobald der Tick zu lange ausbleibt."""
+        reported_tick = None
+        while not self._stop.wait(self.threshold / 2):
+            tick = self._last_tick
+            blocked = time.monotonic() - tick - self.interval
+            if blocked <= self.threshold or tick == reported_tick:
+                continue
+
+            # Pro Blockade nur einmal melden (bis der Loop wieder tickt)
+            reported_tick = tick
+            self._stalls += 1
+            stack = self._loop_stack()
+            self._last_stall = {"blocked_ms": round(blocked * 1000), "stack": stack}
+            logger.warning(f"🐢 Event loop blocked for >{blocked * 1000:.0f}ms, loop thread is at:\n{stack}")
+
+    def _loop_stack(self) -> str:
+        frame = sys._current_frames().get(self._loop_thread or 0)
+        if frame is None:
+            return "  <no frame>"
+        return "".join(traceback.format_stack(frame)[-STACK_LIMIT:]).rstrip()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Lag-Statistik seit dem letzten reset_stats().
+
+        Returns:
+            lag_max_ms, lag_mean_ms, lag_p99_ms, samples, stalls (+ last_stall
+            mit blocked_ms und Stack der letzten Blockade)
+        """
+        samples = sorted(self._samples)
+        count = len(samples)
+        result: Dict[str, Any] = {
+            "lag_max_ms": round(samples[-1] * 1000, 1) if count else 0.0,
+            "lag_mean_ms": round(sum(samples) / count * 1000, 1) if count else 0.0,
+            "lag_p99_ms": round(samples[min(count - 1, int(count * 0.99))] * 1000, 1) if count else 0.0,
+            "samples": count,
+            "stalls": self._stalls,
+        }
+        if self._last_stall is not None:
+            result["last_stall"] = self._last_stall
+        return result
+
+    def reset_stats(self) -> None:
+        """Startet ein neues Statistik-Fenster (pro Cycle)."""
+        self._samples.clear()
+        self._stalls = 0
+        self._last_stall = None
@@ -8,7 +8,8 @@ transformiert sie in MQTT-Format und publiziert sie inklusive Home Assistant
 Discovery-Konfiguration.
 
 Architektur:
-    Modbus Read → Transform (mit Filter) → MQTT Publish → Repeat
+    Modbus Read → [Sample-Queue] → Transform (mit Filter) → MQTT Publish
+    (Producer: Main-Loop)            (Consumer: eigener Task)
 
 Features:
     - Asynchroner Modbus-Read für bessere Performance
@@ -17,28 +18,64 @@ Features:
     - Heartbeat-Monitoring mit konfigurierbarem Timeout
     - MQTT Discovery für automatische Home Assistant Integration
     - Performance-Monitoring mit Zeitmessungen
+    - Burst-Modus: schnelle Teil-Reads bei großen Leistungssprüngen
+    - Optionaler Binär-Payload (MessagePack) auf {topic}/binary
+    - Config-Reload ohne Neustart (SIGHUP oder {topic}/command/reload)
+    - Optionale Schreib-Kommandos mit Coalescing, Rate-Limit und Read-Back
+    - Prioritäts-Scheduler für die Modbus-Verbindung (Writes > Fast > Diagnose > Statisch)
+    - Optionaler Event-Loop Monitor (Lag-Metrik, Stack bei blockiertem Loop)
+    - Producer/Consumer Pipeline: Sampling-Kadenz unabhängig vom Broker
+    - Optionale Fenster-Aggregation (schnell samplen, Mittelwert + min/max publizieren)
+    - Optionale Energie-Integration (hochaufgelöste kWh-Zähler aus Leistungs-Samples)
+    - Optionale abgeleitete Metriken (Hauslast, Autarkie, ...) aus config/derived.py
+    - Optionaler Snapshot des letzten Payloads (sofort publiziert beim Start)
+    - Optionale Capability-Discovery (Entities ohne Daten werden zurückgezogen)
+    - Optionales Register-Profil aus bridge.register_scan (unsupported Register überspringen)
 """
 
 import asyncio
 import logging
-import os
+import signal
 import sys
 import time
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from huawei_solar import AsyncHuaweiSolar
 
-from .config.registers import ESSENTIAL_REGISTERS
+from . import binary_payload
+from .aggregator import AGGREGATED_KEYS, WindowAggregator
+from .capability_profile import CapabilityProfile
+from .config.registers import ESSENTIAL_REGISTERS, FAST_REGISTERS, LIVENESS_REGISTERS
+from .config_reload import bind_reload, consume_reload, reload_options, request_reload, wait_reload
+from .derived_metrics import DerivedPlan, compile_plan
+from .energy_integrator import INTEGRATED_KEYS, EnergyIntegrator
 from .error_tracker import ConnectionErrorTracker
+from .history_store import HistoryStore
+from .loop_monitor import LoopMonitor
+from .modbus_scheduler import ModbusClient, ModbusScheduler
 from .mqtt_client import (
-    connect_mqtt,
+    connect_mqtt_async,
     disconnect_mqtt,
+    discovery_keys,
+    publish_binary,
+    publish_binary_schema,
     publish_data,
+    publish_diagnostics,
     publish_discovery_configs,
     publish_status,
+    publish_write_result,
+    set_ha_online_handler,
+    wait_published,
 )
+from .pipeline import Sample, SamplePipeline
+from .poll_scheduler import AdaptivePollScheduler
+from .register_scan import RegisterProfile
+from .serializer import dumps, encoder_name
+from .settings import Settings, get_settings
+from .state_snapshot import StateSnapshot
 from .total_increasing_filter import get_filter, reset_filter
-from .transform import transform_data
+from .transform import transform_filtered, transform_partial
+from .write_queue import WriteQueue, get_write_queue
 
 try:
     from pymodbus.exceptions import ModbusException
@@ -60,6 +97,62 @@ error_tracker = ConnectionErrorTracker(log_interval=60)
 # 0 = noch kein erfolgreicher Read (Startup-Phase)
 LAST_SUCCESS: float = 0
 
+# Zuletzt publizierter Payload (voller Cycle)
+# Fast-Reads mergen ihre wenigen Werte hier hinein, damit HA weiterhin
+# alle Keys im JSON findet
+LAST_PUBLISHED: Dict[str, Any] = {}
+
+# Burst-Modus Scheduler - wird in main() aus ENV erstellt
+# None = Burst-Modus nicht konfiguriert (nur normales poll_interval)
+poll_scheduler: Optional[AdaptivePollScheduler] = None
+
+# Lokaler Zeitreihen-Speicher - wird in main() erstellt wenn HUAWEI_HISTORY_ENABLED
+# None = keine History (Standard)
+history_store: Optional[HistoryStore] = None
+
+# Schreib-Kommandos - wird in main() gesetzt wenn HUAWEI_WRITE_COMMANDS
+# None = nur lesen (Standard)
+write_queue: Optional[WriteQueue] = None
+
+# Event-Loop Monitor - wird in main() gestartet wenn HUAWEI_LOOP_MONITOR
+# None = keine Lag-Messung (Standard)
+loop_monitor: Optional[LoopMonitor] = None
+
+# Sample-Queue zwischen Modbus-Read und Publish - wird in main() erstellt
+# None = Samples werden direkt im Anschluss verarbeitet (Tests, Benchmarks)
+pipeline: Optional[SamplePipeline] = None
+
+# Fenster-Aggregation - wird in main() erstellt wenn HUAWEI_SAMPLE_INTERVAL > 0
+# None = Momentanwerte publizieren (Standard)
+aggregator: Optional[WindowAggregator] = None
+
+# Energie-Integration - wird in main() erstellt wenn HUAWEI_ENERGY_INTEGRATION
+# None = keine integrierten Zähler (Standard)
+energy_integrator: Optional[EnergyIntegrator] = None
+
+# Abgeleitete Metriken - wird in main() kompiliert wenn HUAWEI_DERIVED_METRICS
+# None = keine abgeleiteten Keys (Standard)
+derived_plan: Optional[DerivedPlan] = None
+
+# Snapshot des letzten Payloads - wird in main() erstellt wenn HUAWEI_STATE_SNAPSHOT
+# None = kein Replay beim Start (Standard)
+state_snapshot: Optional[StateSnapshot] = None
+
+# Capability-Profil - wird in main() geladen wenn HUAWEI_CAPABILITY_DISCOVERY
+# None = Discovery kündigt alle Sensoren an (Standard)
+capability_profile: Optional[CapabilityProfile] = None
+
+# Register-Profil (python3 -m bridge.register_scan) - wird in main() geladen
+# wenn HUAWEI_REGISTER_PROFILE, None = alle ESSENTIAL_REGISTERS lesen (Standard)
+register_profile: Optional[RegisterProfile] = None
+
+# Event für erneute Discovery (gleicher Worker wie die HA Birth-Message) -
+# wird in main() gesetzt, None = kein Worker (Tests, vor dem Start)
+rediscovery: Optional[asyncio.Event] = None
+
+# Register deren Werte der Burst/Idle-Scheduler beobachtet (schon im Producer)
+OBSERVED_REGISTERS = list(dict.fromkeys(FAST_REGISTERS + LIVENESS_REGISTERS))
+
 TRACE = 5  # DEBUG ist 10, INFO ist 20, WARNING ist 30
 logging.addLevelName(TRACE, "TRACE")
 
@@ -118,7 +211,7 @@ def _parse_log_level() -> int:
         HUAWEI_LOG_LEVEL=WARNING  → Nur Warnungen und Fehler
         HUAWEI_LOG_LEVEL=ERROR    → Nur Fehler
     """
-    level_str = os.environ.get("HUAWEI_LOG_LEVEL", "INFO").upper()
+    settings = get_settings()
     level_map = {
         "TRACE": TRACE,
         "DEBUG": logging.DEBUG,
@@ -129,10 +222,10 @@ def _parse_log_level() -> int:
 
     # Legacy-Support: HUAWEI_MODBUS_DEBUG=yes aktiviert DEBUG-Modus
     # Wird von älteren Versionen noch verwendet
-    if os.environ.get("HUAWEI_MODBUS_DEBUG") == "yes":
+    if settings.modbus_debug:
         return logging.DEBUG
 
-    return level_map.get(level_str, logging.INFO)
+    return level_map.get(settings.log_level, logging.INFO)
 
 
 def _setup_root_logger(level: int) -> None:
@@ -213,6 +306,69 @@ def _configure_huawei_solar(level: int) -> None:
             hs_logger.setLevel(logging.WARNING)
 
 
+def _apply_log_level() -> None:
+    """Setzt Log-Level neu (Config-Reload) - Handler und Format bleiben."""
+    log_level = _parse_log_level()
+    logging.getLogger().setLevel(log_level)
+    _configure_pymodbus(log_level)
+    _configure_huawei_solar(log_level)
+    logger.info(f"📋 Log level: {logging.getLevelName(log_level)}")
+
+
+def _scheduler_options(settings: Settings) -> Dict[str, float]:
+    """AdaptivePollScheduler-Parameter aus den Settings (Start und Config-Reload)."""
+    return {
+        "poll_interval": settings.poll_interval,
+        "fast_interval": settings.fast_poll_interval,
+        "threshold": settings.fast_poll_threshold,
+        "hold": settings.fast_poll_hold,
+        "idle_interval": settings.idle_poll_interval,
+    }
+
+
+def apply_config_reload(topic: str) -> None:
+    """
+    Liest die Add-on Optionen neu und wendet Änderungen im laufenden Betrieb an.
+
+    Wird vom Main-Loop zwischen zwei Cycles aufgerufen (nach SIGHUP oder
+    {topic}/command/reload). Modbus- und MQTT-Verbindung, Filter-Zustand
+    und Discovery bleiben unverändert - keine der änderbaren Optionen
+    betrifft die Sensor-Definitionen.
+
+    Angewendet werden:
+        - Log-Level (Root, pymodbus, huawei_solar)
+        - Poll-/Burst-/Idle-Intervalle (Scheduler, laufender Burst endet)
+        - Status-Timeout und Binär-Payload über die neu geladenen Settings
+          (Schema wird beim Einschalten publiziert)
+
+    Args:
+        topic: MQTT Basis-Topic
+    """
+    previous = get_settings()
+    try:
+        changed = reload_options()
+    except (OSError, ValueError) as e:
+        logger.error(f"Config reload failed: {e}")
+        return
+
+    if not changed:
+        logger.info("🔄 Config unchanged")
+        return
+
+    settings = get_settings()
+    if "HUAWEI_LOG_LEVEL" in changed:
+        _apply_log_level()
+
+    if poll_scheduler is not None:
+        poll_scheduler.reconfigure(**_scheduler_options(settings))
+
+    if settings.binary_payload and not previous.binary_payload:
+        # Retained, QoS 1 - paho stellt zu, der Loop wartet nicht auf den Broker
+        publish_binary_schema(topic, wait=False)
+
+    logger.info(f"✅ Config reloaded ({len(changed)} changed)")
+
+
 def heartbeat(topic: str) -> None:
     """
     Überwacht erfolgreiche Reads und setzt Status auf offline bei Timeout.
@@ -234,13 +390,18 @@ def heartbeat(topic: str) -> None:
     ENV-Konfiguration:
         HUAWEI_STATUS_TIMEOUT: Sekunden bis Offline-Status (default: 180)
 
+    Im Idle-Modus wird der Timeout auf mindestens idle_interval + poll_interval
+    verlängert, da volle Reads dann absichtlich seltener laufen.
+
     Beispiel:
         STATUS_TIMEOUT=180, LAST_SUCCESS vor 200s
         → Log: "Inverter offline for 200s (timeout: 180s)"
         → MQTT: "huawei-solar/status" = "offline"
         → Home Assistant: binary_sensor.huawei_solar_status = OFF
     """
-    timeout = int(os.environ.get("HUAWEI_STATUS_TIMEOUT", "180"))
+    timeout = get_settings().status_timeout
+    if poll_scheduler is not None:
+        timeout = int(poll_scheduler.status_timeout(timeout))
 
     # Beim ersten Start (noch kein erfolgreicher Read)
     # LAST_SUCCESS ist 0 → kein Timeout-Check möglich
@@ -263,13 +424,206 @@ def heartbeat(topic: str) -> None:
                 f"Error types: {error_status['active_errors']}"
             )
         # Status auf offline setzen (wird zu MQTT publiziert)
-        # Home Assistant Binary Sensor reagiert darauf
-        publish_status("offline", topic)
+        # Home Assistant Binary Sensor reagiert darauf - ohne auf den Broker zu warten
+        publish_status("offline", topic, wait=False)
     else:
         # Alles OK - nur DEBUG-Level für Monitoring
         logger.debug(f"Heartbeat OK: {offline_duration:.1f}s since last success")
 
 
+async def publish_status_async(status: str, topic: str) -> bool:
+    """
+    Publiziert den Status ohne den Event-Loop zu blockieren.
+
+    Wie publish_data(..., wait=False): auf die Broker-Bestätigung wird mit
+    wait_published() im Loop gewartet statt mit wait_for_publish().
+
+    Args:
+        status: "online" oder "offline"
+        topic: MQTT Basis-Topic
+
+    Returns:
+        True wenn vom Broker bestätigt
+    """
+    info = publish_status(status, topic, wait=False)
+    if info is None:
+        return False
+    return await wait_published(info, timeout=1.0)
+
+
+def handle_process_error(sample: Sample, error: Exception) -> None:
+    """
+    Fehler im Consumer (Transform/Publish) wie einen fehlgeschlagenen Cycle behandeln.
+
+    Error-Tracker (gedrosseltes Logging), Status offline, Filter-Reset und
+    Burst-Ende - wie die Fehlerbehandlung im Main-Loop. Der Producer liest
+    weiter, der nächste erfolgreiche Publish setzt den Status wieder online.
+
+    Args:
+        sample: Sample dessen Verarbeitung fehlgeschlagen ist
+        error: Aufgetretene Exception
+    """
+    error_type = type(error).__name__
+    if error_tracker.track_error(f"publish_{error_type}", str(error)) and not isinstance(error, ConnectionError):
+        logger.error(f"Processing {sample.kind} sample failed: {error_type}", exc_info=error)
+    publish_status("offline", get_settings().topic, wait=False)
+    reset_filter()
+    if poll_scheduler is not None:
+        poll_scheduler.reset()
+
+
+async def replay_snapshot(topic: str) -> bool:
+    """
+    Publiziert den gespeicherten letzten Payload sofort nach dem MQTT-Connect.
+
+    Der Payload behält sein ursprüngliches last_update und bekommt
+    "stale": true - der erste volle Cycle überschreibt ihn.
+
+    Liegt der Snapshot innerhalb von status_timeout, gilt die Bridge bis
+    zum ersten Read als online (LAST_SUCCESS = Snapshot-Zeitpunkt), sonst
+    zeigt HA die Werte erst nach dem ersten Read wieder an. Scheitern die
+    ersten Reads, setzt heartbeat() den Status wie gewohnt auf offline.
+
+    Args:
+        topic: MQTT Basis-Topic
+
+    Returns:
+        True wenn der Status auf online gesetzt wurde
+    """
+    global LAST_SUCCESS
+    if state_snapshot is None:
+        return False
+    data = state_snapshot.load()
+    if data is None:
+        return False
+
+    last_update = data.pop("last_update")
+    data["stale"] = True
+    age = time.time() - last_update
+    try:
+        info = publish_data(data, topic, last_update=last_update, wait=False)
+    except Exception as e:
+        logger.warning(f"State snapshot not published: {e}")
+        return False
+    await wait_published(info)
+    logger.info(f"⏪ Last state replayed ({len(data)} keys, {age:.0f}s old)")
+
+    if age > get_settings().status_timeout:
+        return False
+    LAST_SUCCESS = last_update
+    await publish_status_async("online", topic)
+    return True
+
+
+async def publish_discovery(topic: str) -> bool:
+    """
+    Publiziert die Discovery-Configs ohne den Loop zu blockieren.
+
+    Alle Messages gehen sofort raus, auf die Broker-Bestätigungen wird im
+    Loop gewartet (wait_published) - Modbus-Reads laufen derweil weiter.
+    Beim Start als Hintergrund-Task, danach bei jeder HA Birth-Message.
+    Mit Capability- oder Register-Profil werden Sensoren ohne Daten zurückgezogen.
+
+    Args:
+        topic: MQTT Basis-Topic
+
+    Returns:
+        True wenn publiziert, False bei Fehler (nicht fatal)
+    """
+    start = time.monotonic()
+    unsupported = capability_profile.unsupported() if capability_profile is not None else ()
+    if register_profile is not None:
+        unsupported = register_profile.unsupported_keys().union(unsupported)
+    try:
+        infos = publish_discovery_configs(topic, wait=False, unsupported=unsupported)
+        await asyncio.gather(*(wait_published(info, timeout=1.0) for info in infos))
+    except Exception as e:
+        # Discovery-Fehler ist nicht fatal, weitermachen
+        # Sensoren können auch manuell in HA angelegt werden
+        logger.error(f"Discovery failed: {e}")
+        return False
+    logger.info(f"✅ Discovery published ({time.monotonic() - start:.1f}s)")
+    return True
+
+
+async def ha_birth_worker(topic: str, ha_online: asyncio.Event) -> None:
+    """
+    Hintergrund-Task: Discovery und Zustand nach jeder HA Birth-Message (läuft bis er gecancelt wird).
+
+    Home Assistant publiziert nach jedem Start "online" auf homeassistant/status.
+    Ohne retained Discovery (HUAWEI_DISCOVERY_RETAIN=false) oder nach einem
+    Broker-Neustart ohne Persistenz kennt HA die Entities sonst erst nach
+    einem Neustart der Bridge wieder. Ebenso ausgelöst nach der Migration
+    retained Configs eines anderen discovery_mode (mqtt_client._on_legacy_discovery).
+
+    Reihenfolge: Discovery (bestätigt) → letzter Payload → Status, damit
+    die frisch angelegten Entities sofort Werte und Verfügbarkeit haben.
+
+    Args:
+        topic: MQTT Basis-Topic
+        ha_online: Wird aus dem paho-Thread gesetzt (call_soon_threadsafe)
+    """
+    while True:
+        await ha_online.wait()
+        ha_online.clear()
+        logger.info("🏠 Republishing discovery and state")
+        await publish_discovery(topic)
+
+        if LAST_PUBLISHED:
+            # Kopie: publish_data() setzt last_update in-place, LAST_PUBLISHED behält seinen
+            state = dict(LAST_PUBLISHED)
+            info = publish_data(state, topic, last_update=state.get("last_update"), wait=False)
+            await wait_published(info)
+        timeout = get_settings().status_timeout
+        if poll_scheduler is not None:
+            timeout = int(poll_scheduler.status_timeout(timeout))
+        online = LAST_SUCCESS > 0 and time.time() - LAST_SUCCESS <= timeout
+        await publish_status_async("online" if online else "offline", topic)
+
+
+def report_startup(timings: Dict[str, float], topic: str) -> None:
+    """
+    Loggt und publiziert die Start-Zeiten nach dem ersten erfolgreichen Read.
+
+    Topic: {topic}/diagnostics/startup - Sekunden seit Start von main() bis
+    MQTT verbunden, Modbus verbunden, Discovery fertig und erster Read.
+
+    Args:
+        timings: Start-Zeiten aus main() (fehlender Key = noch nicht fertig)
+        topic: MQTT Basis-Topic
+    """
+    stats = {f"{name}_s": round(value, 2) for name, value in timings.items()}
+    publish_diagnostics("startup", stats, topic)
+    parts = ", ".join(
+        f"{label} {timings[name]:.1f}s" if name in timings else f"{label} pending"
+        for name, label in (("mqtt", "MQTT"), ("modbus", "Modbus"), ("discovery", "discovery"))
+    )
+    logger.info(f"⏱️  Startup: first read after {timings['first_read']:.1f}s ({parts})")
+
+
+def publish_loop_stats(topic: str) -> None:
+    """
+    Publiziert die Event-Loop Lag-Statistik seit dem letzten Cycle.
+
+    Topic: {topic}/diagnostics/loop - danach beginnt ein neues Fenster.
+
+    Args:
+        topic: MQTT Basis-Topic
+    """
+    if loop_monitor is None:
+        return
+    stats = loop_monitor.stats()
+    loop_monitor.reset_stats()
+    publish_diagnostics("loop", stats, topic)
+    logger.debug(
+        "🐢 Loop lag: max %.0fms, p99 %.0fms, mean %.1fms, %d stalls",
+        stats["lag_max_ms"],
+        stats["lag_p99_ms"],
+        stats["lag_mean_ms"],
+        stats["stalls"],
+    )
+
+
 def log_cycle_summary(cycle_num: float, timings: Dict[str, float], data: Dict[str, Any]) -> None:
     """
     Loggt Cycle-Zusammenfassung - human-readable oder JSON für Monitoring-Tools.
@@ -293,9 +647,7 @@ def log_cycle_summary(cycle_num: float, timings: Dict[str, float], data: Dict[st
         timings: Dict mit Zeitmessungen {modbus, transform, filter, mqtt, total}
         data: MQTT-Daten (für Power-Werte)
     """
-    if os.environ.get("HUAWEI_LOG_FORMAT") == "json":
-        import json
-
+    if get_settings().log_format == "json":
         summary = {
             "cycle": cycle_num,
             "timestamp": time.time(),
@@ -307,7 +659,7 @@ def log_cycle_summary(cycle_num: float, timings: Dict[str, float], data: Dict[st
                 "battery": data.get("battery_power", 0),
             },
         }
-        logger.info(json.dumps(summary))
+        logger.info(dumps(summary).decode())
     else:
         filter_stats = get_filter().get_stats()
         filter_indicator = ""
@@ -343,7 +695,7 @@ def log_cycle_summary(cycle_num: float, timings: Dict[str, float], data: Dict[st
             logger.debug(f"🔍 Filter details: {dict(filter_stats)}")
 
 
-async def read_registers(client: AsyncHuaweiSolar) -> Dict[str, Any]:
+async def read_registers(client: ModbusClient) -> Dict[str, Any]:
     """
     Liest Essential Registers sequentiell vom Inverter via Modbus TCP.
 
@@ -373,7 +725,9 @@ async def read_registers(client: AsyncHuaweiSolar) -> Dict[str, Any]:
         Einzelne fehlende Register (z.B. Meter bei Systemen ohne) werden
         nur im DEBUG-Log erwähnt, nicht als Fehler behandelt.
     """
-    logger.debug(f"Reading {len(ESSENTIAL_REGISTERS)} essential registers")
+    # Register-Profil: vom Inverter nicht unterstützte Register gar nicht anfragen
+    names = register_profile.plan(ESSENTIAL_REGISTERS) if register_profile is not None else ESSENTIAL_REGISTERS
+    logger.debug(f"Reading {len(names)} essential registers")
 
     start = time.time()
     data = {}
@@ -381,7 +735,7 @@ async def read_registers(client: AsyncHuaweiSolar) -> Dict[str, Any]:
 
     # Sequentieller Read - einzelne Fehler werden gefangen
     # Alternative wäre parallel (gather), aber sequentiell ist robuster
-    for name in ESSENTIAL_REGISTERS:
+    for name in names:
         try:
             # client.get() ist async und gibt RegisterValue-Objekt zurück
             data[name] = await client.get(name)
@@ -399,12 +753,42 @@ async def read_registers(client: AsyncHuaweiSolar) -> Dict[str, Any]:
         "📖 Essential read: %.1fs (%d/%d)",
         duration,
         successful,
-        len(ESSENTIAL_REGISTERS),
+        len(names),
     )
 
     return data
 
 
+async def flush_writes(client: ModbusClient) -> None:
+    """
+    Führt fällige Schreib-Kommandos aus und publiziert die Read-Back Ergebnisse.
+
+    Args:
+        client: AsyncHuaweiSolar Client (muss verbunden sein)
+    """
+    if write_queue is None:
+        return
+    for result in await write_queue.flush(client):
+        publish_write_result(result, get_settings().topic)
+
+
+async def write_worker(client: ModbusClient) -> None:
+    """
+    Hintergrund-Task für Schreib-Kommandos (läuft bis er gecancelt wird).
+
+    Wartet auf fällige Writes und führt sie sofort aus - über den
+    ModbusScheduler mit Priorität CONTROL, also direkt nach dem gerade
+    laufenden Register-Read, egal ob ein voller Cycle läuft oder die
+    Bridge zwischen zwei Cycles wartet.
+
+    Args:
+        client: ModbusScheduler (oder Client)
+    """
+    while write_queue is not None:
+        if await write_queue.wait(60):
+            await flush_writes(client)
+
+
 def is_modbus_exception(exc: Exception) -> bool:
     """
     Prüft ob Exception eine Modbus-spezifische Exception ist.
@@ -443,7 +827,7 @@ def is_modbus_exception(exc: Exception) -> bool:
     return isinstance(exc, MODBUS_EXCEPTIONS)
 
 
-async def main_once(client: AsyncHuaweiSolar, cycle_num: float) -> None:
+async def main_once(client: ModbusClient, cycle_num: float) -> None:
     """
     Führt einen kompletten Read-Transform-Filter-Publish Cycle aus.
 
@@ -455,7 +839,10 @@ async def main_once(client: AsyncHuaweiSolar, cycle_num: float) -> None:
     5. Logging - Timings und Zusammenfassung ausgeben
     6. Performance-Check - Warnung bei zu langsamen Cycles
 
-    Bei Erfolg: LAST_SUCCESS wird aktualisiert (für Heartbeat)
+    Schritt 1 läuft hier (Producer), Schritte 2-6 in process_sample() - mit
+    Pipeline im Consumer-Task, sonst direkt im Anschluss.
+
+    Bei Erfolg: LAST_SUCCESS wird nach bestätigtem Publish aktualisiert (für Heartbeat)
     Bei Fehler: Exception wird durchgereicht zu main() Error-Handler
 
     Args:
@@ -467,8 +854,8 @@ async def main_once(client: AsyncHuaweiSolar, cycle_num: float) -> None:
         Exception: Bei Modbus-Read-Fehler (wird in main() gefangen)
 
     Globale Seiteneffekte:
-        - LAST_SUCCESS wird auf current timestamp gesetzt
         - MQTT-Daten werden publiziert
+        - LAST_SUCCESS/LAST_PUBLISHED erst nach Broker-Bestätigung gesetzt
         - Logs werden ausgegeben
 
     Performance-Beispiel:
@@ -478,9 +865,7 @@ async def main_once(client: AsyncHuaweiSolar, cycle_num: float) -> None:
         MQTT: 0.194s (Publish + Wait)
         Total: 2.3s
     """
-    global LAST_SUCCESS
-    topic = os.environ.get("HUAWEI_MODBUS_MQTT_TOPIC")
-    if not topic:
+    if not get_settings().topic:
         raise RuntimeError("HUAWEI_MODBUS_MQTT_TOPIC not set")
 
     start: float = time.time()
@@ -502,56 +887,195 @@ async def main_once(client: AsyncHuaweiSolar, cycle_num: float) -> None:
             logger.error(f"Read error: {e}")
         raise  # Exception durchreichen zu main() Error-Handler
 
+    # Scheduler-Statistik pro Cycle (Wartezeiten pro Priorität)
+    if isinstance(client, ModbusScheduler):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Modbus queue: {client.stats()}")
+        client.reset_stats()
+
     # Sanity-Check: Mindestens ein Register muss gelesen worden sein
     if not data:
         logger.warning("No data")
         return
 
-    # === PHASE 2: Transform ===
+    # Burst-Modus: Leistungssprung seit letztem Read? Im Producer, damit
+    # wait_next_cycle() sofort Bescheid weiß (nicht erst nach dem Publish)
+    _observe(data)
+
+    await _dispatch(Sample("full", data, start, modbus_duration, cycle_num))
+
+
+async def fast_once(client: ModbusClient, topic: str, deadline: Optional[float] = None) -> None:
+    """
+    Fast-Tier Read: liest nur FAST_REGISTERS und publiziert gemergten Payload.
+
+    Wird im Burst-Modus zwischen zwei vollen Cycles aufgerufen. Die wenigen
+    Leistungswerte werden in LAST_PUBLISHED gemergt, damit der JSON-Payload
+    weiterhin alle Keys enthält (Energie, Spannungen, ... vom letzten vollen Read).
+
+    Ohne vorherigen vollen Cycle (LAST_PUBLISHED leer) wird nichts publiziert.
+    Kommt ein Register über den ModbusScheduler nicht bis zur Deadline dran
+    (z.B. hinter Writes), wird der ganze Fast-Read verworfen statt den
+    nächsten vollen Cycle zu verzögern.
+
+    Args:
+        client: AsyncHuaweiSolar Client (muss verbunden sein)
+        topic: MQTT Basis-Topic
+        deadline: Spätester Start eines Register-Reads (time.monotonic()), None = keine
+
+    Globale Seiteneffekte:
+        - LAST_SUCCESS/LAST_PUBLISHED werden nach bestätigtem Publish des
+          gemergten Payloads aktualisiert
+    """
+    if not LAST_PUBLISHED:
+        return
+
+    start = time.time()
+    data = {}
+    for name in FAST_REGISTERS:
+        try:
+            if isinstance(client, ModbusScheduler):
+                data[name] = await client.get(name, deadline=deadline, consumer="fast")
+            else:
+                data[name] = await client.get(name)
+        except asyncio.TimeoutError:
+            if deadline is not None and time.monotonic() >= deadline:
+                logger.debug(f"Fast read missed its slot at {name}, dropped")
+                return
+            logger.debug(f"Fast read failed {name}")
+        except Exception:
+            logger.debug(f"Fast read failed {name}")
+
+    if not _observe(data):
+        return
+
+    await _dispatch(Sample("fast", data, start, time.time() - start))
+
+
+def _observe(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Füttert den Burst/Idle-Scheduler mit den Leistungswerten eines Reads.
+
+    Args:
+        data: Rohdaten (Register-Name → RegisterValue)
+
+    Returns:
+        Transformierte Leistungswerte (leer wenn keiner gültig war)
+    """
+    values = transform_partial({name: data[name] for name in OBSERVED_REGISTERS if name in data})
+    if values and poll_scheduler is not None:
+        poll_scheduler.observe(values)
+    return values
+
+
+async def _dispatch(sample: Sample) -> None:
+    """Übergibt ein Sample an den Consumer - oder verarbeitet es direkt ohne Pipeline."""
+    if pipeline is None:
+        await process_sample(sample)
+    else:
+        pipeline.put(sample)
+
+
+async def process_sample(sample: Sample) -> None:
+    """
+    Consumer: Transform, Filter und Publish eines Samples.
+
+    Args:
+        sample: Full- oder Fast-Sample aus main_once()/fast_once()
+    """
+    if sample.kind == "fast":
+        await _process_fast(sample)
+    else:
+        await _process_full(sample)
+
+
+async def _process_full(sample: Sample) -> None:
+    """Phasen 2-6 eines vollen Cycles (siehe main_once())."""
+    global LAST_SUCCESS, LAST_PUBLISHED
+    settings = get_settings()
+    topic = settings.topic
+    start = sample.timestamp
+
+    # === PHASE 2+3: Transform + Filter (ein Durchlauf, ein Dict) ===
     # Hier passiert:
     # 1. Register-Namen mappen (activepower → power_active)
-    # 2. RegisterValue-Objekte extrahieren (value-Attribut)
-    # 3. None-Werte entfernen
-    # 4. Timestamp hinzufügen
-    # NICHT MEHR: total_increasing Filter (wird jetzt in Phase 3 gemacht!)
-    transform_start: float = time.time()
-    transformed = transform_data(data)
-    transform_duration: float = time.time() - transform_start
-
-    # === NEU: PHASE 3: Filter ===
-    # total_increasing Filter VOR MQTT Publish anwenden!
-    # Verhindert dass 0-Werte (Modbus-Lesefehler) nach MQTT gelangen
-    # und dort Utility Meter Helper durcheinanderbringen
-    filter_start: float = time.time()
-    filter_instance = get_filter()
-    mqtt_data = filter_instance.filter(transformed)
-    filter_duration = time.time() - filter_start
+    # 2. RegisterValue-Objekte extrahieren, Modbus-Platzhalter verwerfen
+    # 3. Critical Defaults für fehlende Pflicht-Keys
+    # 4. total_increasing Filter VOR MQTT Publish (in-place)
+    #    Verhindert dass 0-Werte (Modbus-Lesefehler) nach MQTT gelangen
+    #    und dort Utility Meter Helper durcheinanderbringen
+    # last_update setzt publish_data() (nur einmal pro Cycle)
+    phase_timings: Dict[str, float] = {}
+    mqtt_data = transform_filtered(sample.data, get_filter(), phase_timings)
+    transform_duration = phase_timings["transform"]
+    filter_duration = phase_timings["filter"]
+
+    # Energie-Integration: mit den Momentanwerten, vor der Aggregation
+    if energy_integrator is not None:
+        energy_integrator.add(mqtt_data, sample.mono)
+        mqtt_data.update(energy_integrator.totals())
+
+    # Fenster-Aggregation: Mittelwert der Samples seit dem letzten Cycle
+    # statt des Momentanwerts (+ {key}_min / {key}_max)
+    if aggregator is not None:
+        aggregator.apply(mqtt_data)
+
+    # Abgeleitete Metriken über die finalen (ggf. gemittelten) Werte
+    if derived_plan is not None:
+        derived_plan.apply(mqtt_data)
 
     # === PHASE 4: MQTT Publish (mit gefilterten Daten!) ===
+    # Auf den Broker wird asynchron gewartet - blockiert den Loop nicht
     mqtt_start: float = time.time()
-    publish_data(mqtt_data, topic)  # ← mqtt_data statt transformed!
+    info = publish_data(mqtt_data, topic, wait=False)
+    if settings.binary_payload:
+        publish_binary(mqtt_data, topic)
+    published = await wait_published(info)
     mqtt_duration = time.time() - mqtt_start
 
-    # Erfolg markieren für Heartbeat
-    LAST_SUCCESS = time.time()
+    # Erst nach bestätigtem Publish: Recovery loggen, Status online und
+    # Erfolg für den Heartbeat markieren - ohne Bestätigung läuft der
+    # Heartbeat weiter ab und setzt nach status_timeout offline
+    if published:
+        error_tracker.mark_success()
+        await publish_status_async("online", topic)
+        LAST_SUCCESS = time.time()
+        LAST_PUBLISHED = mqtt_data
     cycle_duration: float = time.time() - start
 
+    # History: nur RAM-Puffer, Commit gebündelt alle paar Minuten
+    if history_store is not None:
+        history_store.record(mqtt_data, start)
+
+    # Zählerstände und Snapshot gebündelt speichern (save_interval)
+    if energy_integrator is not None:
+        energy_integrator.save_if_due()
+    if state_snapshot is not None:
+        state_snapshot.update(mqtt_data)
+        state_snapshot.save_if_due()
+
+    # Capability-Profil: Änderung (gelernt, Key wieder da) → Discovery erneut
+    if capability_profile is not None:
+        if capability_profile.observe(mqtt_data) and rediscovery is not None:
+            rediscovery.set()
+        capability_profile.save_if_due()
+
     # === PHASE 5: Logging ===
     timings = {
-        "modbus": modbus_duration,
+        "modbus": sample.modbus_duration,
         "transform": transform_duration,
         "filter": filter_duration,  # ← NEU!
         "mqtt": mqtt_duration,
         "total": cycle_duration,
     }
 
-    log_cycle_summary(cycle_num, timings, mqtt_data)
+    log_cycle_summary(sample.cycle_num, timings, mqtt_data)
 
     # Debug-Details nur bei DEBUG-Level (detaillierte Zeitmessungen)
     logger.debug(
         "Cycle: %.1fs (Modbus: %.1fs, Transform: %.3fs, Filter: %.3fs, MQTT: %.2fs)",
         cycle_duration,
-        modbus_duration,
+        sample.modbus_duration,
         transform_duration,
         filter_duration,  # ← NEU!
         mqtt_duration,
@@ -561,11 +1085,188 @@ async def main_once(client: AsyncHuaweiSolar, cycle_num: float) -> None:
     # Warnung wenn Cycle zu lange dauert (> 80% vom poll_interval)
     # Beispiel: poll_interval=30s, cycle=25s → 83% → WARNING
     # Grund: Nächster Cycle wird verzögert, Daten kommen nicht rechtzeitig
-    poll_interval: float = int(os.environ.get("HUAWEI_POLL_INTERVAL", "30"))
+    poll_interval = settings.poll_interval
     if cycle_duration > poll_interval * 0.8:
         logger.warning("Cycle %.1fs > 80%% poll_interval (%ds)", cycle_duration, poll_interval)
 
 
+async def _process_fast(sample: Sample) -> None:
+    """Merged die Leistungswerte eines Fast-Reads in LAST_PUBLISHED und publiziert."""
+    global LAST_SUCCESS, LAST_PUBLISHED
+    values = transform_partial(sample.data)
+    if not values or not LAST_PUBLISHED:
+        return
+
+    if energy_integrator is not None:
+        energy_integrator.add(values, sample.mono)
+
+    # Fenster-Aggregation: nur akkumulieren, publiziert wird pro Fenster
+    if aggregator is not None:
+        aggregator.add(values)
+        LAST_SUCCESS = time.time()
+        return
+
+    settings = get_settings()
+    payload = {**LAST_PUBLISHED, **values}
+    if energy_integrator is not None:
+        payload.update(energy_integrator.totals())
+    if derived_plan is not None:
+        derived_plan.apply(payload)
+    info = publish_data(payload, settings.topic, wait=False)
+    if settings.binary_payload:
+        publish_binary(payload, settings.topic)
+    if not await wait_published(info):
+        logger.debug("Fast read publish not acknowledged, skipped")
+        return
+    LAST_SUCCESS = time.time()
+    LAST_PUBLISHED = payload
+    if state_snapshot is not None:
+        state_snapshot.update(payload)
+
+    logger.debug(
+        "⚡ Fast read: %.2fs (%d/%d) - PV: %sW | Grid: %sW | Battery: %sW",
+        time.time() - sample.timestamp,
+        len(sample.data),
+        len(FAST_REGISTERS),
+        values.get("power_input", "N/A"),
+        values.get("meter_power_active", "N/A"),
+        values.get("battery_power", "N/A"),
+    )
+
+
+def log_pipeline_stats() -> None:
+    """Loggt die Pipeline-Statistik seit dem letzten Cycle (WARNING wenn Samples verworfen wurden)."""
+    if pipeline is None:
+        return
+    stats = pipeline.stats()
+    pipeline.reset_stats()
+    consumer = stats["consumer"]
+    if consumer["dropped"]:
+        logger.warning(
+            "Publishing falls behind sampling: %d sample(s) superseded (lag max %.1fs)",
+            consumer["dropped"],
+            consumer["lag_max_s"],
+        )
+    elif logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Pipeline: {stats}")
+
+
+async def liveness_once(client: ModbusClient) -> bool:
+    """
+    Liveness-Read im Idle-Modus: liest nur LIVENESS_REGISTERS.
+
+    Es wird nichts publiziert (nachts ändern sich die Werte nicht), nur
+    LAST_SUCCESS aktualisiert und der Scheduler mit den Werten gefüttert.
+    Fehler werden nicht abgefangen - der Aufrufer beendet dann den Idle-Modus.
+
+    Args:
+        client: AsyncHuaweiSolar Client (muss verbunden sein)
+
+    Returns:
+        True wenn der Inverter noch idle ist, False bei Aktivität
+    """
+    global LAST_SUCCESS
+    data = {name: await client.get(name) for name in LIVENESS_REGISTERS}
+    values = transform_partial(data)
+    LAST_SUCCESS = time.time()
+
+    if poll_scheduler is None:
+        return False
+    poll_scheduler.observe(values)
+    logger.debug(
+        "🌙 Liveness: %s | PV: %sW | Battery: %sW",
+        values.get("inverter_status", "N/A"),
+        values.get("power_input", "N/A"),
+        values.get("battery_power", "N/A"),
+    )
+    return poll_scheduler.is_idle
+
+
+async def wait_next_cycle(client: ModbusClient, topic: str, poll_interval: float) -> None:
+    """
+    Wartet bis zum nächsten vollen Cycle, im Burst-Modus mit Fast-Reads.
+
+    Ohne aktiven Burst entspricht das asyncio.sleep(poll_interval). Im Burst
+    werden bis zum nächsten vollen Cycle Fast-Reads im Intervall des
+    Schedulers ausgeführt. Fehler im Fast-Read beenden den Burst, der nächste
+    volle Cycle übernimmt das normale Error-Handling.
+
+    Im Idle-Modus wird bis zu idle_interval gewartet, mit Liveness-Reads im
+    normalen poll_interval. Aktivität oder ein Fehler beim Liveness-Read
+    beenden das Warten sofort (nächster voller Cycle läuft direkt).
+
+    Mit Fenster-Aggregation laufen Fast-Reads immer (alle sample_interval
+    Sekunden, im Burst ggf. schneller) - sie werden nur akkumuliert.
+
+    Eine Reload-Anforderung (SIGHUP, MQTT) beendet das Warten sofort.
+
+    Args:
+        client: AsyncHuaweiSolar Client
+        topic: MQTT Basis-Topic
+        poll_interval: Sekunden bis zum nächsten vollen Cycle
+    """
+    if poll_scheduler is not None and poll_scheduler.is_idle:
+        await _wait_idle(client, poll_scheduler, poll_interval)
+        return
+
+    in_burst = poll_scheduler is not None and poll_scheduler.in_burst
+    if not in_burst and aggregator is None:
+        await wait_reload(poll_interval)
+        return
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + poll_interval
+    while True:
+        remaining = deadline - loop.time()
+        interval = _fast_interval()
+        if interval is None or interval >= remaining:
+            await wait_reload(max(0.0, remaining))
+            return
+
+        if await wait_reload(interval):
+            return
+        try:
+            # Fast-Read nur bis zum nächsten vollen Cycle, danach verworfen
+            await fast_once(client, topic, time.monotonic() + max(0.0, deadline - loop.time()))
+        except Exception as e:
+            logger.debug(f"Fast read cycle failed: {e}")
+            if poll_scheduler is not None:
+                poll_scheduler.reset()
+
+
+def _fast_interval() -> Optional[float]:
+    """Abstand bis zum nächsten Fast-Read (Burst und/oder Sampling), None = keiner."""
+    intervals = []
+    if poll_scheduler is not None and poll_scheduler.in_burst:
+        burst = poll_scheduler.next_interval()
+        if burst is not None:
+            intervals.append(burst)
+    if aggregator is not None:
+        intervals.append(get_settings().sample_interval)
+    return min(intervals, default=None)
+
+
+async def _wait_idle(client: ModbusClient, scheduler: AdaptivePollScheduler, poll_interval: float) -> None:
+    """Idle-Wartephase: Liveness-Reads bis idle_interval abgelaufen ist."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + scheduler.idle_interval
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= poll_interval:
+            await wait_reload(max(0.0, remaining))
+            return
+
+        if await wait_reload(poll_interval):
+            return
+        try:
+            if not await liveness_once(client):
+                return
+        except Exception as e:
+            logger.debug(f"Liveness read failed: {e}")
+            scheduler.reset()
+            return
+
+
 async def main() -> None:
     """
     Haupt-Loop mit Error-Handling, automatischer Wiederverbindung und Filter-Reset.
@@ -575,7 +1276,7 @@ async def main() -> None:
     2. ENV-Variablen validieren (Host, Port, Topic)
     3. MQTT verbinden (persistent über gesamte Laufzeit)
     4. Discovery publizieren (erstellt Home Assistant Entities)
-    5. Modbus Client erstellen und verbinden
+    5. Modbus Client erstellen und verbinden (ab Schritt 3 parallel zu MQTT)
     6. Endlos-Loop: Cycle → Sleep → Repeat
 
     Error-Handling-Strategie:
@@ -591,16 +1292,41 @@ async def main() -> None:
     - Alle gespeicherten Werte veraltet sein
     → Sicherer neue Filter-Session zu starten
 
-    ENV-Variablen:
+    ENV-Variablen (einmalig geladen und validiert, siehe settings.py):
         HUAWEI_MODBUS_HOST: IP des Inverters (required)
         HUAWEI_MODBUS_PORT: Modbus Port (default: 502)
         HUAWEI_SLAVE_ID: Modbus Slave ID (default: 1, manchmal 0 oder 16)
         HUAWEI_MODBUS_MQTT_TOPIC: MQTT Basis-Topic (required)
         HUAWEI_POLL_INTERVAL: Sekunden zwischen Cycles (default: 30)
+        HUAWEI_FAST_POLL_THRESHOLD: Leistungssprung in W für Burst-Modus (default: 0 = aus)
+        HUAWEI_FAST_POLL_INTERVAL: Sekunden zwischen Fast-Reads (default: 2)
+        HUAWEI_FAST_POLL_HOLD: Sekunden im Fast-Tier nach letztem Sprung (default: 60)
+        HUAWEI_IDLE_POLL_INTERVAL: Sekunden zwischen vollen Reads im Idle-Modus (default: 0 = aus)
+        HUAWEI_HISTORY_ENABLED: Lokale History in SQLite speichern (default: false)
+        HUAWEI_HISTORY_PATH: Pfad der History-Datenbank (default: /data/history.db)
+        HUAWEI_HISTORY_RETENTION_DAYS: Aufbewahrung der Rohwerte in Tagen (default: 7)
+        HUAWEI_HISTORY_COMMIT_INTERVAL: Sekunden zwischen History-Commits (default: 300)
+        HUAWEI_BINARY_PAYLOAD: Zusätzlich MessagePack auf {topic}/binary (default: false)
+        HUAWEI_OPTIONS_PATH: Optionen für Config-Reload (default: /data/options.json)
+        HUAWEI_WRITE_COMMANDS: Schreib-Kommandos per MQTT annehmen (default: false)
+        HUAWEI_WRITE_MIN_INTERVAL: Sekunden zwischen Writes auf dasselbe Register (default: 10)
+        HUAWEI_LOOP_MONITOR: Event-Loop Lag messen, blockierende Aufrufe loggen (default: false)
+        HUAWEI_LOOP_LAG_THRESHOLD: Blockade in ms ab der der Stack geloggt wird (default: 100)
+        HUAWEI_STATE_SNAPSHOT: Letzten Payload speichern und beim Start publizieren (default: false)
+        HUAWEI_STATE_SNAPSHOT_PATH: Pfad des Snapshots (default: /data/last_state.json)
+        HUAWEI_DISCOVERY_RETAIN: Discovery-Configs retained publizieren (default: true)
 
     MQTT Topics:
         {topic}: JSON mit allen Sensordaten
         {topic}/status: "online" oder "offline"
+        {topic}/binary: MessagePack mit festem Schema (optional)
+        {topic}/binary/schema: Schema-Beschreibung als JSON (retained, optional)
+        {topic}/command/reload: Config-Reload auslösen (subscribed)
+        homeassistant/status: HA Birth-Message → Discovery + Zustand erneut (subscribed)
+        {topic}/command/set/<key>: Register schreiben (subscribed, optional)
+        {topic}/command/set/<key>/result: Ergebnis nach Read-Back (optional)
+        {topic}/diagnostics/loop: Event-Loop Lag pro Cycle (optional)
+        {topic}/diagnostics/startup: Start-Zeiten (einmal nach dem ersten Read)
         homeassistant/sensor/{device}/*/config: Discovery-Configs
 
     Graceful Shutdown:
@@ -608,96 +1334,255 @@ async def main() -> None:
         - Bei Ctrl+C (lokal): Status auf offline, MQTT disconnect
         - Bei Fatal Error: Status auf offline, MQTT disconnect, exit(1)
     """
+    global poll_scheduler, history_store, write_queue, loop_monitor, pipeline, aggregator, energy_integrator
+    global derived_plan, state_snapshot, capability_profile, register_profile, rediscovery
+    write_task: Optional[asyncio.Task] = None
+    pipeline_task: Optional[asyncio.Task] = None
+    startup = time.monotonic()
+
+    # === Konfiguration laden und validieren (einmalig) ===
+    # Ungültige Werte → sofort abbrechen (vor init_logging, das Settings braucht)
+    try:
+        settings = get_settings()
+    except ValueError as e:
+        _setup_root_logger(logging.INFO)
+        logger.error(str(e))
+        sys.exit(1)
+
     init_logging()
 
-    # === ENV-Variablen Validierung ===
     # Pflichtfelder prüfen, sonst sofort abbrechen
-    topic = os.environ.get("HUAWEI_MODBUS_MQTT_TOPIC")
-    if not topic:
-        logger.error("HUAWEI_MODBUS_MQTT_TOPIC missing")
-        sys.exit(1)
-
-    host = os.environ.get("HUAWEI_MODBUS_HOST")
-    if not host:
-        logger.error("HUAWEI_MODBUS_HOST missing")
+    for name in settings.missing():
+        logger.error(f"{name} missing")
         sys.exit(1)
 
-    port = int(os.environ.get("HUAWEI_MODBUS_PORT", "502"))
-    slave_id = int(os.environ.get("HUAWEI_SLAVE_ID", "1"))
+    topic = settings.topic
+    host = settings.modbus_host
+    port = settings.modbus_port
+    slave_id = settings.slave_id
 
     logger.info("🚀 Huawei Solar → MQTT starting")
+
+    # === Event-Loop Monitor (optional) ===
+    # Früh starten, damit auch blockierende Aufrufe beim Start (MQTT-Connect) auffallen
+    if settings.loop_monitor:
+        loop_monitor = LoopMonitor(threshold=settings.loop_lag_threshold / 1000).start()
+        logger.info(f"🐢 Loop monitor: stack logged when blocked >{settings.loop_lag_threshold:.0f}ms")
     logger.debug(f"Host={host}:{port}, Slave={slave_id}, Topic={topic}")
 
+    # === Abgeleitete Metriken (optional) ===
+    # Ungültige Definition in config/derived.py → Start abbrechen (vor dem Connect)
+    if settings.derived_metrics:
+        try:
+            derived_plan = compile_plan()
+        except ValueError as e:
+            logger.error(str(e))
+            sys.exit(1)
+        logger.info(f"🧮 Derived metrics: {', '.join(derived_plan.keys)}")
+
+    # === Start: Modbus und MQTT parallel ===
+    # Abhängigkeiten: Snapshot, Status und Discovery brauchen MQTT, der erste
+    # Read braucht Modbus, sein Publish beides. Der Modbus-Connect (SDongle oft
+    # 5-15s) startet deshalb sofort, MQTT verbindet währenddessen.
+    startup_timings: Dict[str, float] = {}
+    modbus_task = asyncio.create_task(AsyncHuaweiSolar.create(host, port, slave_id))
+    modbus_task.add_done_callback(lambda _: startup_timings.setdefault("modbus", time.monotonic() - startup))
+
     # === MQTT Verbindung (persistent) ===
     # MQTT wird einmal beim Start verbunden und bleibt für gesamte
     # Laufzeit connected. Nur Modbus reconnected bei Fehlern.
     try:
-        connect_mqtt()
-        import time
-
-        # Kurze Wartezeit nach Connect für Stabilität
-        # Verhindert Race-Condition bei schnellem Publish nach Connect
-        time.sleep(1)
+        await connect_mqtt_async()
+        startup_timings["mqtt"] = time.monotonic() - startup
     except Exception as e:
+        modbus_task.cancel()
         logger.error(f"MQTT connect failed: {e}")
         sys.exit(1)
 
+    # === Letzten Zustand sofort publizieren (optional) ===
+    # Daten stehen nach < 1s wieder auf {topic}, noch vor Discovery und Modbus-Connect
+    if settings.state_snapshot:
+        state_snapshot = StateSnapshot(settings.state_snapshot_path)
+
     # Initial Status: offline (wird bei erstem erfolgreichen Read auf online gesetzt)
     # Wichtig für Home Assistant Binary Sensor
-    publish_status("offline", topic)
-
-    # === Discovery publizieren ===
-    # Erstellt einmalig alle MQTT-Sensoren in Home Assistant
-    # Discovery-Configs werden nur beim Start gesendet, nicht bei jedem Cycle
+    # Ausnahme: ein frischer Snapshot wurde gerade als online publiziert
+    # (nicht blockierend - der Modbus-Connect läuft derweil weiter)
+    if not await replay_snapshot(topic):
+        await publish_status_async("offline", topic)
+
+    # === Capability-Profil (optional) ===
+    # Vor der Discovery laden - nicht unterstützte Sensoren gar nicht erst ankündigen
+    if settings.capability_discovery:
+        capability_profile = CapabilityProfile(settings.capability_profile_path, discovery_keys())
+        capability_profile.load()
+
+    # === Register-Profil (optional) ===
+    # Scan-Ergebnis: unsupported Register weder lesen noch ankündigen
+    if settings.register_profile:
+        register_profile = RegisterProfile.load(settings.register_profile_path)
+        if register_profile is not None:
+            skipped = len(ESSENTIAL_REGISTERS) - len(register_profile.plan(ESSENTIAL_REGISTERS))
+            logger.info(f"📋 Register profile: {skipped} unsupported essential registers skipped")
+
+    # === Discovery publizieren (Hintergrund) ===
+    # Erstellt einmalig alle MQTT-Sensoren in Home Assistant - läuft parallel
+    # zum Modbus-Connect und ersten Read
+    discovery_task = asyncio.create_task(publish_discovery(topic))
+    discovery_task.add_done_callback(lambda _: startup_timings.setdefault("discovery", time.monotonic() - startup))
+
+    # === HA Birth-Message ===
+    # Discovery + Zustand erneut, sobald HA (neu) startet (homeassistant/status)
+    # oder retained Configs des anderen discovery_mode migriert wurden
+    # (und nach einer Änderung des Capability-Profils, siehe _process_full)
+    ha_online = rediscovery = asyncio.Event()
+    loop = asyncio.get_running_loop()
+
+    def on_ha_online() -> None:
+        # Läuft im paho-Thread - Event nur über den Loop setzen
+        loop.call_soon_threadsafe(ha_online.set)
+
+    set_ha_online_handler(on_ha_online)
+    birth_task = asyncio.create_task(ha_birth_worker(topic, ha_online))
+
+    # === Binär-Payload (optional) ===
+    # Schema einmal retained publizieren, Daten dann pro Cycle zusätzlich zum JSON
+    if settings.binary_payload:
+        info = publish_binary_schema(topic, wait=False)
+        if info is not None:
+            await wait_published(info)
+        logger.info(f"📦 Binary payload: {topic}/binary (schema {binary_payload.SCHEMA_ID:08x})")
+
+    # === Modbus Client ===
     try:
-        publish_discovery_configs(topic)
-        logger.info("✅ Discovery published")
-    except Exception as e:
-        # Discovery-Fehler ist nicht fatal, weitermachen
-        # Sensoren können auch manuell in HA angelegt werden
-        logger.error(f"Discovery failed: {e}")
-
-    # === Modbus Client erstellen ===
-    try:
-        client = await AsyncHuaweiSolar.create(host, port, slave_id)
+        client = await modbus_task
         logger.info(f"🔌 Connected (Slave ID: {slave_id})")
-        publish_status("online", topic)
+        await publish_status_async("online", topic)
     except Exception as e:
         logger.error(f"❌ Connection failed: {e}")
+        await discovery_task
+        birth_task.cancel()
+        set_ha_online_handler(None)
         disconnect_mqtt()
         return
 
+    # Alle Modbus-Requests (Cycle, Fast-Reads, Writes) laufen über den Scheduler,
+    # der die eine Verbindung nach Priorität vergibt
+    modbus = ModbusScheduler(client)
+
     # Wichtig: Filter muss existieren BEVOR erste Daten publiziert werden
     # Sonst gibt es beim Restart einen kurzen ungeschützten Moment
     get_filter()
     logger.info("🔍 TotalIncreasingFilter initialized (simplified)")
+    logger.debug(f"Payload encoder: {encoder_name()}")
 
     # === Main Loop ===
-    poll_interval = int(os.environ.get("HUAWEI_POLL_INTERVAL", "30"))
+    poll_interval = settings.poll_interval
     logger.info(f"⏱️  Poll interval: {poll_interval}s")
 
+    poll_scheduler = AdaptivePollScheduler(**_scheduler_options(settings))
+    if poll_scheduler.enabled:
+        logger.info(
+            f"⚡ Burst mode: >{poll_scheduler.threshold:.0f}W change → "
+            f"{poll_scheduler.fast_interval:.0f}s fast reads ({len(FAST_REGISTERS)} registers)"
+        )
+    if poll_scheduler.idle_enabled:
+        logger.info(
+            f"🌙 Idle mode: full read every {poll_scheduler.idle_interval:.0f}s when idle, "
+            f"liveness read ({len(LIVENESS_REGISTERS)} registers) every {poll_interval}s"
+        )
+
+    # === Fenster-Aggregation (optional) ===
+    if settings.sample_interval > 0:
+        aggregator = WindowAggregator()
+        logger.info(
+            f"📐 Aggregation: {len(AGGREGATED_KEYS)} power values sampled every {settings.sample_interval:g}s, "
+            f"mean/min/max published every {poll_interval}s"
+        )
+
+    # === Energie-Integration (optional) ===
+    # Lücken länger als 3 erwartete Read-Abstände werden nicht überbrückt
+    if settings.energy_integration:
+        max_gap = 3 * max(poll_interval, settings.idle_poll_interval)
+        energy_integrator = EnergyIntegrator(settings.energy_state_path, max_gap=max_gap).load()
+        logger.info(
+            f"🔋 Energy integration: {len(INTEGRATED_KEYS)} counters, state in {settings.energy_state_path} "
+            f"(gaps >{max_gap:.0f}s skipped)"
+        )
+
+    # === History Store (optional) ===
+    # Fehler beim Öffnen sind nicht fatal - Bridge läuft ohne History weiter
+    if settings.history_enabled:
+        try:
+            history_store = HistoryStore(
+                settings.history_path,
+                commit_interval=settings.history_commit_interval,
+                retention_days=settings.history_retention_days,
+            ).open()
+            logger.info(
+                f"💾 History: {history_store.path} (commit every {history_store.commit_interval:.0f}s, "
+                f"{history_store.retention_days:.0f} days raw)"
+            )
+        except Exception as e:
+            logger.error(f"History store disabled: {e}")
+            history_store = None
+
+    # === Schreib-Kommandos (optional) ===
+    # Eigener Task: Writes laufen mit Priorität CONTROL zwischen den Register-Reads
+    if settings.write_commands:
+        write_queue = get_write_queue()
+        write_queue.bind(asyncio.get_running_loop())
+        write_task = asyncio.create_task(write_worker(modbus))
+        logger.info(
+            f"✏️ Write commands: {topic}/command/set/<key> "
+            f"(max. one write per register every {write_queue.min_interval:.0f}s)"
+        )
+
+    # === Pipeline ===
+    # Consumer-Task publiziert, der Main-Loop liest weiter im eigenen Takt
+    pipeline = SamplePipeline(process_sample, on_error=handle_process_error)
+    pipeline_task = asyncio.create_task(pipeline.run())
+
+    # === Config-Reload per SIGHUP ===
+    # (zusätzlich per MQTT: {topic}/command/reload, siehe mqtt_client.py)
+    # Anforderung weckt laufende Wartephasen (wait_next_cycle, Idle)
+    bind_reload(asyncio.get_running_loop())
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, request_reload, "SIGHUP")
+    except (NotImplementedError, AttributeError):
+        # Windows: kein SIGHUP / keine Signal-Handler im Event-Loop
+        logger.debug("SIGHUP reload not available on this platform")
+
     cycle_count: float = 0
     try:
         while True:
+            if consume_reload():
+                apply_config_reload(topic)
+                poll_interval = int(poll_scheduler.poll_interval)
+
             cycle_count += 1
             logger.debug(f"Cycle #{cycle_count}")
 
             try:
-                await main_once(client, cycle_count)
-                error_tracker.mark_success()
-                publish_status("online", topic)
+                # Status online und Recovery setzt der Consumer nach dem Publish (_process_full)
+                await main_once(modbus, cycle_count)
+                if "first_read" not in startup_timings:
+                    startup_timings["first_read"] = time.monotonic() - startup
+                    report_startup(startup_timings, topic)
 
             except asyncio.TimeoutError as e:
                 error_tracker.track_error("timeout", str(e))
-                publish_status("offline", topic)
+                publish_status("offline", topic, wait=False)
                 reset_filter()
+                poll_scheduler.reset()
                 logger.debug("🔄 Filter reset due to timeout")
                 await asyncio.sleep(10)
 
             except ConnectionRefusedError as e:
                 error_tracker.track_error("connection_refused", f"Errno {e.errno}")
-                publish_status("offline", topic)
+                publish_status("offline", topic, wait=False)
                 reset_filter()
+                poll_scheduler.reset()
                 logger.debug("🔄 Filter reset due to connection error")
                 await asyncio.sleep(10)
 
@@ -711,13 +1596,16 @@ async def main() -> None:
                     if error_tracker.track_error(error_type, str(e)):
                         logger.error(f"Unexpected: {error_type}", exc_info=True)
 
-                publish_status("offline", topic)
+                publish_status("offline", topic, wait=False)
                 reset_filter()
+                poll_scheduler.reset()
                 logger.debug("🔄 Filter reset")
                 await asyncio.sleep(10)
 
             heartbeat(topic)
-            await asyncio.sleep(poll_interval)
+            publish_loop_stats(topic)
+            log_pipeline_stats()
+            await wait_next_cycle(modbus, topic, poll_interval)
 
     except (KeyboardInterrupt, asyncio.CancelledError):
         logger.info("🛑 Shutdown")
@@ -730,6 +1618,28 @@ async def main() -> None:
         disconnect_mqtt()
         sys.exit(1)
 
+    finally:
+        if not discovery_task.done():
+            discovery_task.cancel()
+        birth_task.cancel()
+        set_ha_online_handler(None)
+        rediscovery = None
+        if write_task is not None:
+            write_task.cancel()
+        if pipeline_task is not None:
+            pipeline_task.cancel()
+        if loop_monitor is not None:
+            loop_monitor.stop()
+        if energy_integrator is not None:
+            energy_integrator.save()
+        if state_snapshot is not None:
+            state_snapshot.save()
+        if capability_profile is not None:
+            capability_profile.save()
+        # Offene History-Daten schreiben (max. commit_interval sonst verloren)
+        if history_store is not None:
+            history_store.close()
+
 
 if __name__ == "__main__":
     """
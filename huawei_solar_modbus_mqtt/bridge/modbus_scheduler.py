@@ -0,0 +1,225 @@
+# bridge/modbus_scheduler.py
+
+"""
+Prioritäts-Scheduler für die eine Modbus-Verbindung.
+
+Problem:
+    Der SDongle erlaubt genau eine Modbus-Verbindung, alle Requests laufen
+    nacheinander. Bisher entschied die Reihenfolge im Code (for-Schleife über
+    ESSENTIAL_REGISTERS), wer dran ist - ein Schreib-Kommando oder ein
+    Fast-Read musste warten, bis der Code zufällig wieder vorbeikam.
+
+Lösung:
+    ModbusScheduler besitzt den AsyncHuaweiSolar Client und vergibt die
+    Verbindung Request für Request:
+
+    - Priorität: CONTROL (Writes) > FAST (Leistungswerte) > DIAGNOSTIC > STATIC
+      (Modell, Seriennummer, ...). Nach jedem Request bekommt der wartende
+      Request mit der höchsten Priorität die Verbindung (Preemption zwischen
+      Requests, ein laufender Modbus-Request wird nie abgebrochen)
+    - Fairness: bei gleicher Priorität kommt der Consumer mit den wenigsten
+      bisher bedienten Requests zuerst (mehrere Geräte / Consumer teilen sich
+      die Verbindung ohne dass einer die anderen aushungert)
+    - Deadline: ein Request der bis zu seiner Deadline nicht dran war, wird
+      mit asyncio.TimeoutError abgebrochen statt veraltet ausgeführt
+
+    Der Scheduler hat dieselbe get()/set() Schnittstelle wie der Client und
+    wird überall statt des Clients übergeben. Ohne Priorität wird sie aus
+    dem Register-Namen abgeleitet (config/registers.py).
+
+Beispiel:
+    Full-Read (DIAGNOSTIC) läuft, EMS schickt einen Write (CONTROL):
+    der Write läuft direkt nach dem aktuellen Register-Read (~50-100ms),
+    danach geht der Full-Read weiter.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+from huawei_solar import AsyncHuaweiSolar
+
+from .config.registers import FAST_REGISTERS, STATIC_REGISTERS, WRITABLE_REGISTERS
+
+logger = logging.getLogger("huawei.modbus")
+
+
+class Priority(IntEnum):
+    """Request-Priorität (kleiner = wichtiger)."""
+
+    CONTROL = 0
+    FAST = 1
+    DIAGNOSTIC = 2
+    STATIC = 3
+
+
+_CONTROL = frozenset(register for register, _, _ in WRITABLE_REGISTERS.values())
+_FAST = frozenset(FAST_REGISTERS)
+_STATIC = frozenset(STATIC_REGISTERS)
+
+
+def register_priority(name: str) -> Priority:
+    """Standard-Priorität eines Register-Reads (Read-Back > Fast-Tier > Diagnose > statische Infos)."""
+    if name in _CONTROL:
+        # Read-Back nach einem Write gehört zum Write
+        return Priority.CONTROL
+    if name in _FAST:
+        return Priority.FAST
+    if name in _STATIC:
+        return Priority.STATIC
+    return Priority.DIAGNOSTIC
+
+
+@dataclass
+class _Waiter:
+    priority: int
+    consumer: str
+    deadline: Optional[float]
+    seq: int
+    future: "asyncio.Future[None]"
+    enqueued: float = field(default_factory=time.monotonic)
+
+
+class ModbusScheduler:
+    """Vergibt die Modbus-Verbindung nach Priorität, Fairness und Deadline."""
+
+    def __init__(self, client: AsyncHuaweiSolar):
+        """
+        Initialisiert den Scheduler.
+
+        Args:
+            client: Verbundener AsyncHuaweiSolar Client (wird exklusiv genutzt)
+        """
+        self.client = client
+        self._busy = False
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        # Bediente Requests pro Consumer (Fairness bei gleicher Priorität)
+        self._served: Dict[str, int] = {}
+        # Statistik pro Priorität: Anzahl, max. Wartezeit, abgelaufene Deadlines
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    async def get(
+        self,
+        name: str,
+        slave_id: Optional[int] = None,
+        *,
+        priority: Optional[Priority] = None,
+        deadline: Optional[float] = None,
+        consumer: str = "main",
+    ) -> Any:
+        """
+        Liest ein Register (wie AsyncHuaweiSolar.get()).
+
+        Args:
+            name: Register-Name
+            slave_id: Optionale Slave ID (mehrere Geräte an einer Verbindung)
+            priority: Priorität (default: register_priority(name))
+            deadline: Spätester Start (time.monotonic()), None = keine
+            consumer: Name des Aufrufers für die Fairness
+
+        Raises:
+            asyncio.TimeoutError: Deadline abgelaufen bevor der Request dran war
+        """
+        if priority is None:
+            priority = register_priority(name)
+        return await self._run(lambda: self.client.get(name, slave_id), priority, deadline, consumer)
+
+    async def set(
+        self,
+        name: str,
+        value: Any,
+        slave_id: Optional[int] = None,
+        *,
+        priority: Priority = Priority.CONTROL,
+        deadline: Optional[float] = None,
+        consumer: str = "write",
+    ) -> bool:
+        """Schreibt ein Register (wie AsyncHuaweiSolar.set()), default mit höchster Priorität."""
+        return bool(await self._run(lambda: self.client.set(name, value, slave_id), priority, deadline, consumer))
+
+    async def _run(
+        self,
+        call: Callable[[], Awaitable[Any]],
+        priority: Priority,
+        deadline: Optional[float],
+        consumer: str,
+    ) -> Any:
+        await self._acquire(int(priority), deadline, consumer)
+        try:
+            return await call()
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: int, deadline: Optional[float], consumer: str) -> None:
+        stats = self._stats.setdefault(Priority(priority).name, {"requests": 0, "max_wait": 0.0, "expired": 0})
+        stats["requests"] += 1
+
+        # Verbindung frei und niemand wartet → sofort
+        if not self._busy and not self._waiters:
+            self._busy = True
+            self._served[consumer] = self._served.get(consumer, 0) + 1
+            return
+
+        waiter = _Waiter(priority, consumer, deadline, next(self._seq), asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except BaseException:
+            if waiter.future.done() and not waiter.future.cancelled() and waiter.future.exception() is None:
+                # Verbindung wurde schon übergeben - weiterreichen statt sie zu verlieren
+                self._release()
+            else:
+                waiter.future.cancel()
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+            if deadline is not None and time.monotonic() >= deadline:
+                stats["expired"] += 1
+            raise
+        stats["max_wait"] = max(stats["max_wait"], time.monotonic() - waiter.enqueued)
+
+    def _release(self) -> None:
+        """Gibt die Verbindung an den nächsten wartenden Request (oder frei)."""
+        now = time.monotonic()
+        while self._waiters:
+            waiter = min(
+                self._waiters,
+                key=lambda w: (
+                    w.priority,
+                    self._served.get(w.consumer, 0),
+                    w.deadline if w.deadline is not None else float("inf"),
+                    w.seq,
+                ),
+            )
+            self._waiters.remove(waiter)
+            if waiter.future.done():
+                continue
+            if waiter.deadline is not None and waiter.deadline <= now:
+                waiter.future.set_exception(asyncio.TimeoutError("Modbus request deadline expired"))
+                continue
+            self._served[waiter.consumer] = self._served.get(waiter.consumer, 0) + 1
+            waiter.future.set_result(None)
+            return  # _busy bleibt True - Verbindung direkt übergeben
+        self._busy = False
+
+    @property
+    def queue_depth(self) -> int:
+        """Anzahl wartender Requests."""
+        return len(self._waiters)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Statistik pro Priorität: requests, max_wait (s), expired."""
+        return {name: dict(values) for name, values in self._stats.items()}
+
+    def reset_stats(self) -> None:
+        """Setzt die Statistik zurück (z.B. pro Log-Intervall)."""
+        self._stats.clear()
+
+
+# Alles was get()/set() wie AsyncHuaweiSolar anbietet (Client direkt oder über den Scheduler)
+ModbusClient = Union[AsyncHuaweiSolar, ModbusScheduler]
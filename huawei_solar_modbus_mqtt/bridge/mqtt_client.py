@@ -4,9 +4,15 @@
 MQTT Client Manager für Home Assistant Integration.
 
 Verwaltet die persistente MQTT-Verbindung zum Broker und implementiert:
-- Home Assistant MQTT Discovery (automatische Entity-Erstellung)
+- Home Assistant MQTT Discovery (automatische Entity-Erstellung,
+  pro Entity oder als eine Device-Message)
 - Sensor-Daten Publishing (JSON-Payload mit allen Messwerten)
 - Status Publishing (online/offline für Binary Sensor)
+- Optionaler Binär-Payload (MessagePack) für Nicht-HA Consumer
+- Config-Reload Kommando ({topic}/command/reload)
+- Discovery erneut bei HA Birth-Message (homeassistant/status = online)
+- Schreib-Kommandos ({topic}/command/set/<key>, optional)
+- Diagnose-Metriken ({topic}/diagnostics/<name>, optional)
 - Last Will Testament (LWT) für automatisches offline bei Verbindungsabbruch
 - Connection State Tracking zur Vermeidung von "not connected" Errors
 
@@ -14,15 +20,24 @@ Die Verbindung wird einmalig beim Start erstellt und bleibt für die gesamte
 Laufzeit bestehen (persistent), nur Modbus reconnected bei Fehlern.
 """
 
+import asyncio
 import json
 import logging
-import os
+import threading
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Collection, Dict, List, Optional, Set, Tuple
 
 import paho.mqtt.client as mqtt
 
-from .config.sensors_mqtt import NUMERIC_SENSORS, TEXT_SENSORS
+from . import binary_payload
+from .__version__ import __version__
+from .aggregator import companion_sensors
+from .config.sensors_mqtt import INTEGRATED_ENERGY_SENSORS, NUMERIC_SENSORS, TEXT_SENSORS
+from .config_reload import request_reload
+from .derived_metrics import derived_sensors
+from .serializer import dumps
+from .settings import get_settings
+from .write_queue import get_write_queue
 
 logger = logging.getLogger("huawei.mqtt")
 
@@ -34,6 +49,35 @@ _mqtt_client: Optional[mqtt.Client] = None
 # Wird von Callbacks (_on_connect, _on_disconnect) aktualisiert
 _is_connected = False
 
+# Gleicher Zustand als Event - connect_mqtt() / connect_mqtt_async() warten
+# darauf statt in einer Sleep-Schleife
+_connected = threading.Event()
+
+# Birth/Will-Topic von Home Assistant ("online" nach jedem HA-Start)
+HA_STATUS_TOPIC = "homeassistant/status"
+
+# Wird bei HA Birth-Message und nach einer Discovery-Migration im paho-Thread
+# aufgerufen (gesetzt von main())
+_ha_online_handler: Optional[Callable[[], None]] = None
+
+# Device-Discovery: eine Message mit allen Komponenten (discovery_mode=device)
+DEVICE_DISCOVERY_TOPIC = "homeassistant/device/huawei_solar/config"
+
+# Per-Entity Discovery (discovery_mode=entity), als Wildcards für die Migration
+ENTITY_DISCOVERY_TOPICS = (
+    "homeassistant/sensor/huawei_solar/+/config",
+    "homeassistant/binary_sensor/huawei_solar/+/config",
+)
+
+# HA Migration zwischen den Modi: Entity wird entladen, bleibt aber in der
+# Registry (Entity-ID und History bleiben erhalten)
+MIGRATE_PAYLOAD = '{"migrate_discovery": true}'
+
+# Topics des anderen Modus mit Migrations-Payload - werden nach der nächsten
+# Discovery geleert (Zugriff aus paho-Thread und asyncio-Loop)
+_migrated_topics: Set[str] = set()
+_migrated_lock = threading.Lock()
+
 
 def _on_connect(client, userdata, flags, rc, properties=None):
     """
@@ -61,7 +105,19 @@ def _on_connect(client, userdata, flags, rc, properties=None):
     global _is_connected
     if rc == 0:
         _is_connected = True
+        _connected.set()
         logger.info("📡 MQTT connected")
+        # Bei jedem (Re-)Connect neu abonnieren - ohne persistente Session
+        # vergisst der Broker Subscriptions beim Disconnect
+        settings = get_settings()
+        topic = settings.topic
+        if topic:
+            client.subscribe(f"{topic}/command/reload", qos=1)
+            if settings.write_commands:
+                client.subscribe(f"{topic}/command/set/+", qos=1)
+            client.subscribe(HA_STATUS_TOPIC, qos=1)
+            for legacy_topic in _legacy_discovery_topics(settings.discovery_mode):
+                client.subscribe(legacy_topic, qos=1)
     else:
         logger.error(f"MQTT connection failed: {rc}")
 
@@ -87,11 +143,96 @@ def _on_disconnect(client, userdata, flags, rc=0, properties=None):
     """
     global _is_connected
     _is_connected = False
+    _connected.clear()
     if rc != 0:
         # Unerwarteter Disconnect (nicht vom Client initiiert)
         logger.warning(f"MQTT unexpected disconnect: {rc}")
 
 
+def _on_reload_command(client, userdata, message):
+    """
+    Callback für {topic}/command/reload (beliebiger Payload).
+
+    Läuft im paho-Thread - setzt nur das Reload-Event, angewendet wird
+    im asyncio-Loop von main().
+    """
+    request_reload("mqtt")
+
+
+def _on_ha_status(client, userdata, message):
+    """
+    Callback für homeassistant/status (Birth "online" / Will "offline").
+
+    Läuft im paho-Thread - ruft nur den Handler aus set_ha_online_handler()
+    auf, Discovery und Zustand publiziert main() im asyncio-Loop.
+    """
+    status = message.payload.decode("utf-8", errors="replace").strip()
+    logger.debug(f"Home Assistant status: {status}")
+    if status == "online" and _ha_online_handler is not None:
+        _ha_online_handler()
+
+
+def set_ha_online_handler(handler: Optional[Callable[[], None]]) -> None:
+    """
+    Setzt den Handler für die HA Birth-Message (None = ignorieren).
+
+    Args:
+        handler: Thread-sicherer Aufruf (läuft im paho-Thread)
+    """
+    global _ha_online_handler
+    _ha_online_handler = handler
+
+
+def _legacy_discovery_topics(mode: str) -> Tuple[str, ...]:
+    """Discovery-Topics des jeweils anderen Modus (retained Altbestand)."""
+    return ENTITY_DISCOVERY_TOPICS if mode == "device" else (DEVICE_DISCOVERY_TOPIC,)
+
+
+def _on_legacy_discovery(client, userdata, message):
+    """
+    Callback für retained Discovery-Configs des anderen discovery_mode.
+
+    Gleiche unique_ids in beiden Formaten würden in HA kollidieren - nach
+    HAs Migrationsablauf wird der Altbestand mit {"migrate_discovery": true}
+    überschrieben, die Discovery im aktuellen Modus erneut gesendet (Handler
+    wie bei der Birth-Message) und das alte Topic danach geleert.
+
+    Läuft im paho-Thread.
+    """
+    payload = message.payload.decode("utf-8", errors="replace").strip()
+    # Leere Payloads und eigene Migrations-Messages kommen hier ebenfalls an
+    if not message.retain or not payload or "migrate_discovery" in payload:
+        return
+    logger.info(f"🔀 Migrating discovery config {message.topic}")
+    client.publish(message.topic, MIGRATE_PAYLOAD, qos=1, retain=True)
+    with _migrated_lock:
+        _migrated_topics.add(message.topic)
+    if _ha_online_handler is not None:
+        _ha_online_handler()
+
+
+def _clear_migrated_topics(client: mqtt.Client) -> List[Any]:
+    """Leert die migrierten Topics (nach der Discovery im aktuellen Modus)."""
+    with _migrated_lock:
+        topics = sorted(_migrated_topics)
+        _migrated_topics.clear()
+    return [client.publish(topic, "", qos=1, retain=True) for topic in topics]
+
+
+def _on_write_command(client, userdata, message):
+    """
+    Callback für {topic}/command/set/<key> (Payload: Sollwert).
+
+    Läuft im paho-Thread - legt den Write nur in die Queue, geschrieben
+    wird im asyncio-Loop von main() (siehe write_queue.py).
+    """
+    key = message.topic.rsplit("/", 1)[-1]
+    try:
+        get_write_queue().submit(key, message.payload.decode("utf-8", errors="replace").strip())
+    except ValueError as e:
+        logger.warning(f"Write command rejected: {e}")
+
+
 def _get_mqtt_client() -> mqtt.Client:
     """
     Erstellt oder gibt existierenden MQTT Client zurück (Singleton-Pattern).
@@ -133,8 +274,9 @@ def _get_mqtt_client() -> mqtt.Client:
     client.on_disconnect = _on_disconnect
 
     # Optionale Authentifizierung konfigurieren
-    user = os.environ.get("HUAWEI_MODBUS_MQTT_USER")
-    password = os.environ.get("HUAWEI_MODBUS_MQTT_PASSWORD")
+    settings = get_settings()
+    user = settings.mqtt_user
+    password = settings.mqtt_password
 
     if user and password:
         client.username_pw_set(user, password)
@@ -142,19 +284,28 @@ def _get_mqtt_client() -> mqtt.Client:
 
     # Last Will Testament (LWT) konfigurieren
     # Wird vom Broker automatisch publiziert bei unerwartetem Disconnect
-    topic = os.environ.get("HUAWEI_MODBUS_MQTT_TOPIC")
+    topic = settings.topic
     if topic:
         # QoS=1: Mindestens einmal zugestellt
         # retain=True: Letzter Wert bleibt gespeichert (wichtig für Status)
         client.will_set(f"{topic}/status", "offline", qos=1, retain=True)
         logger.debug(f"LWT set: {topic}/status")
+        # Config-Reload per MQTT (Subscribe passiert in _on_connect)
+        client.message_callback_add(f"{topic}/command/reload", _on_reload_command)
+        if settings.write_commands:
+            client.message_callback_add(f"{topic}/command/set/+", _on_write_command)
+        # HA Birth-Message → Discovery + Zustand erneut (Subscribe in _on_connect)
+        client.message_callback_add(HA_STATUS_TOPIC, _on_ha_status)
+        # Discovery-Configs im anderen Modus → Migration (Subscribe in _on_connect)
+        for legacy_topic in _legacy_discovery_topics(settings.discovery_mode):
+            client.message_callback_add(legacy_topic, _on_legacy_discovery)
 
     # Client speichern für Wiederverwendung (Singleton)
     _mqtt_client = client
     return client
 
 
-def connect_mqtt() -> None:
+def connect_mqtt(timeout: float = 10.0) -> None:
     """
     Verbindet MQTT Client einmalig beim Start (persistent).
 
@@ -162,15 +313,18 @@ def connect_mqtt() -> None:
     1. Client holen/erstellen (_get_mqtt_client)
     2. Zu Broker verbinden (client.connect)
     3. Background-Loop starten (client.loop_start)
-    4. Warten bis _is_connected True ist (max 10s)
-    5. Zusätzliche 300ms Stabilisierung
+    4. Warten bis _on_connect das Connected-Event setzt (max timeout)
 
     Die Verbindung bleibt für die gesamte Laufzeit bestehen.
     Bei Netzwerkproblemen reconnected paho-mqtt automatisch.
+    Im asyncio-Loop connect_mqtt_async() verwenden (blockiert nicht).
+
+    Args:
+        timeout: Maximale Wartezeit auf die CONNACK in Sekunden
 
     Raises:
         RuntimeError: Wenn MQTT Broker nicht konfiguriert
-        ConnectionError: Wenn Verbindung nach 10s Timeout nicht steht
+        ConnectionError: Wenn Verbindung nach timeout nicht steht
 
     ENV-Konfiguration:
         HUAWEI_MODBUS_MQTT_BROKER: IP/Hostname des MQTT Brokers (required)
@@ -180,16 +334,42 @@ def connect_mqtt() -> None:
         >>> connect_mqtt()
         # Log: "Connecting MQTT to 192.168.1.2:1883"
         # Log: "MQTT connected"
-        # Log: "MQTT connection stable"
 
     Hinweis:
         client.loop_start() startet Background-Thread für MQTT-Kommunikation.
         Dieser läuft parallel zu asyncio Event-Loop (kein Konflikt).
     """
+    client = _start_connect(blocking=True)
+    _check_connected(client, _connected.wait(timeout), timeout)
+
+
+async def connect_mqtt_async(timeout: float = 10.0) -> None:
+    """
+    Wie connect_mqtt(), ohne den Event-Loop zu blockieren.
+
+    Der TCP-Connect läuft im paho-Thread (connect_async), gewartet wird auf
+    das Connected-Event in einem Executor-Thread - Modbus-Connect und
+    andere Start-Tasks laufen in der Zwischenzeit weiter.
+
+    Args:
+        timeout: Maximale Wartezeit auf die CONNACK in Sekunden
+
+    Raises:
+        RuntimeError: Wenn MQTT Broker nicht konfiguriert
+        ConnectionError: Wenn Verbindung nach timeout nicht steht
+    """
+    client = _start_connect(blocking=False)
+    connected = await asyncio.get_running_loop().run_in_executor(None, _connected.wait, timeout)
+    _check_connected(client, connected, timeout)
+
+
+def _start_connect(blocking: bool) -> mqtt.Client:
+    """Startet Connect + Background-Loop (blocking=False: TCP-Connect im paho-Thread)."""
     client = _get_mqtt_client()
 
-    broker = os.environ.get("HUAWEI_MODBUS_MQTT_BROKER")
-    port = int(os.environ.get("HUAWEI_MODBUS_MQTT_PORT", "1883"))
+    settings = get_settings()
+    broker = settings.mqtt_broker
+    port = settings.mqtt_port
 
     if not broker:
         logger.error("MQTT broker not configured")
@@ -197,26 +377,21 @@ def connect_mqtt() -> None:
 
     logger.debug(f"Connecting MQTT to {broker}:{port}")
     # Keepalive: 60s (Broker erwartet Ping alle 60s)
-    client.connect(broker, port, 60)
+    if blocking:
+        client.connect(broker, port, 60)
+    else:
+        client.connect_async(broker, port, 60)
     # Background-Loop starten (eigener Thread für MQTT-Kommunikation)
     client.loop_start()
+    return client
 
-    # Warte bis _is_connected True ist (wird von _on_connect gesetzt)
-    # Polling alle 100ms, max 10 Sekunden
-    timeout: float = 10
-    waited: float = 0
-    while not _is_connected and waited < timeout:
-        time.sleep(0.1)
-        waited += 0.1
 
-    if not _is_connected:
+def _check_connected(client: mqtt.Client, connected: bool, timeout: float) -> None:
+    """Stoppt den Background-Loop und wirft ConnectionError wenn die CONNACK ausblieb."""
+    if not connected:
         # Timeout - Verbindung steht nicht
         client.loop_stop()
-        raise ConnectionError(f"MQTT connection timeout after {timeout}s")
-
-    # Zusätzliche Stabilisierungszeit (verhindert Race-Conditions)
-    # 300ms geben dem Broker Zeit für interne Initialisierung
-    time.sleep(0.3)
+        raise ConnectionError(f"MQTT connection timeout after {timeout:g}s")
     logger.debug("MQTT connection stable")
 
 
@@ -246,7 +421,7 @@ def disconnect_mqtt() -> None:
 
     try:
         # Abschiedsgruß: Status auf offline setzen
-        topic = os.environ.get("HUAWEI_MODBUS_MQTT_TOPIC")
+        topic = get_settings().topic
         if topic and _is_connected:
             result = _mqtt_client.publish(f"{topic}/status", "offline", qos=1, retain=True)
             # Warten bis publiziert (max 1s)
@@ -263,6 +438,7 @@ def disconnect_mqtt() -> None:
         # Globals zurücksetzen für sauberen State
         _mqtt_client = None
         _is_connected = False
+        _connected.clear()
 
 
 def _build_sensor_config(sensor: Dict[str, Any], base_topic: str, device_config: Dict[str, Any]) -> Dict[str, Any]:
@@ -346,6 +522,71 @@ def _build_sensor_config(sensor: Dict[str, Any], base_topic: str, device_config:
     return config
 
 
+# Abkürzungen aus der HA Discovery-Doku - die Device-Message enthält alle
+# Komponenten, kurze Keys halten sie deutlich unter der Broker-Grenze
+_DEVICE_ABBREVIATIONS = {
+    "unique_id": "uniq_id",
+    "value_template": "val_tpl",
+    "unit_of_measurement": "unit_of_meas",
+    "device_class": "dev_cla",
+    "state_class": "stat_cla",
+    "icon": "ic",
+    "entity_category": "ent_cat",
+    "enabled_by_default": "en",
+}
+
+
+def _build_device_config(
+    sensors: List[Dict[str, Any]], base_topic: str, device_config: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Erstellt die Device-Discovery-Config (alle Komponenten in einer Message).
+
+    Gleiche Sensor-Definitionen wie _build_sensor_config(), aber device und
+    origin stehen nur einmal auf oberster Ebene und das gemeinsame state_topic
+    wird geteilt statt pro Entity wiederholt. Die Availability bleibt pro
+    Komponente - der Status-Binary-Sensor soll bei offline "off" zeigen,
+    nicht "unavailable".
+
+    Discovery-Topic:
+        homeassistant/device/huawei_solar/config (ab HA 2024.11)
+
+    Args:
+        sensors: Sensor-Definitionen (numerisch + Text + Extras)
+        base_topic: MQTT Basis-Topic (z.B. "huawei-solar")
+        device_config: Device-Informationen für Gruppierung in HA
+
+    Returns:
+        Dict mit dev, o, stat_t und cmps (eine Komponente pro Sensor + Status)
+    """
+    components: Dict[str, Dict[str, Any]] = {}
+    for sensor in sensors:
+        config = _build_sensor_config(sensor, base_topic, device_config)
+        # Geteilte Felder stehen auf Device-Ebene, online/offline sind HAs Default-Payloads
+        for shared in ("device", "state_topic", "payload_available", "payload_not_available"):
+            config.pop(shared)
+        component = {"p": "sensor", "avty_t": config.pop("availability_topic")}
+        component.update({_DEVICE_ABBREVIATIONS.get(key, key): value for key, value in config.items()})
+        components[sensor["key"]] = component
+
+    components["status"] = {
+        "p": "binary_sensor",
+        "name": "Huawei Solar Status",
+        "uniq_id": "huawei_solar_status",
+        "stat_t": f"{base_topic}/status",
+        "pl_on": "online",
+        "pl_off": "offline",
+        "dev_cla": "connectivity",
+    }
+
+    return {
+        "dev": device_config,
+        "o": {"name": "huABus", "sw": __version__, "url": "https://github.com/arboeh/huABus"},
+        "stat_t": base_topic,
+        "cmps": components,
+    }
+
+
 def _load_numeric_sensors() -> List[Dict[str, Any]]:
     """
     Lädt numerische Sensor-Definitionen aus sensors_mqtt.py.
@@ -378,31 +619,57 @@ def _load_text_sensors() -> List[Dict[str, Any]]:
     return TEXT_SENSORS
 
 
+def _numeric_discovery_sensors() -> List[Dict[str, Any]]:
+    """Numerische Sensoren inkl. der Extras der aktiven Optionen (Aggregation, Integration, Metriken)."""
+    sensors = _load_numeric_sensors()
+    settings = get_settings()
+    if settings.sample_interval > 0:
+        # Fenster-Aggregation: {key}_min / {key}_max als optionale Entities
+        sensors = sensors + companion_sensors(sensors)
+    if settings.energy_integration:
+        sensors = sensors + INTEGRATED_ENERGY_SENSORS
+    if settings.derived_metrics:
+        sensors = sensors + derived_sensors()
+    return sensors
+
+
+def discovery_keys() -> List[str]:
+    """Payload-Keys aller Discovery-Sensoren (ohne Status), z.B. für das Capability-Profil."""
+    return [sensor["key"] for sensor in _numeric_discovery_sensors() + _load_text_sensors()]
+
+
 def _publish_sensor_configs(
     client: mqtt.Client,
     base_topic: str,
     sensors: List[Dict[str, Any]],
     device_config: Dict[str, Any],
-) -> int:
+    retain: bool = True,
+) -> List[Any]:
     """
     Publiziert MQTT Discovery Configs für Liste von Sensoren.
 
     Für jeden Sensor:
     1. Discovery-Config erstellen (_build_sensor_config)
     2. Zu Discovery-Topic publizieren (mit QoS=1, retain=True)
-    3. Auf Publish-Bestätigung warten (max 1s)
+
+    Gewartet wird hier nicht - publish_discovery_configs() wartet danach auf
+    alle Bestätigungen zusammen (alle Messages gleichzeitig unterwegs statt
+    einer Round-Trip pro Sensor).
 
     QoS=1: Mindestens einmal zugestellt (wichtig für Discovery)
     retain=True: Config bleibt gespeichert, auch nach Broker-Neustart
+    retain=False: HUAWEI_DISCOVERY_RETAIN=false - HA bekommt die Configs
+                  über die Birth-Message (siehe main.ha_birth_worker)
 
     Args:
         client: MQTT Client Instanz
         base_topic: MQTT Basis-Topic (z.B. "huawei-solar")
         sensors: Liste mit Sensor-Definitionen
         device_config: Device-Info für HA Gruppierung
+        retain: Retain-Flag der Config-Messages
 
     Returns:
-        Anzahl publizierter Sensoren
+        MQTTMessageInfo pro Sensor
 
     Discovery-Topic-Format:
         homeassistant/sensor/huawei_solar/{sensor_key}/config
@@ -411,21 +678,18 @@ def _publish_sensor_configs(
         homeassistant/sensor/huawei_solar/power_input/config
         → Erstellt sensor.solar_power in Home Assistant
     """
-    count = 0
+    results = []
     for sensor in sensors:
         # Config für diesen Sensor erstellen
         config = _build_sensor_config(sensor, base_topic, device_config)
         # Discovery-Topic: homeassistant/sensor/{device}/{entity}/config
         topic = f"homeassistant/sensor/huawei_solar/{sensor['key']}/config"
         # Config als JSON publizieren (QoS=1, retain=True)
-        result = client.publish(topic, json.dumps(config), qos=1, retain=True)
-        # Auf Publish-Bestätigung warten (verhindert Race-Conditions)
-        result.wait_for_publish(timeout=1.0)
-        count += 1
-    return count
+        results.append(client.publish(topic, json.dumps(config), qos=1, retain=retain))
+    return results
 
 
-def publish_discovery_configs(base_topic: str) -> None:
+def publish_discovery_configs(base_topic: str, wait: bool = True, unsupported: Collection[str] = ()) -> List[Any]:
     """
     Publiziert alle MQTT Discovery Configs (einmalig beim Start).
 
@@ -434,15 +698,31 @@ def publish_discovery_configs(base_topic: str) -> None:
     - Alle Text-Sensoren (Modellname, Status, ...)
     - Binary Sensor für Connectivity-Status (online/offline)
 
-    Die Discovery-Configs werden nur beim Start publiziert, nicht
-    bei jedem Cycle. Home Assistant speichert sie in der Entity Registry.
+    Die Discovery-Configs werden beim Start und nach jeder HA
+    Birth-Message publiziert, nicht bei jedem Cycle. Home Assistant
+    speichert sie in der Entity Registry.
 
     Device-Gruppierung:
         Alle Sensoren werden in HA unter einem Device gruppiert:
         "Huawei Solar Inverter" mit Identifier "huawei_solar_modbus"
 
+    discovery_mode:
+        entity: eine Message pro Entity (~70, Standard, jede HA-Version)
+        device: eine Message homeassistant/device/huawei_solar/config mit
+                allen Komponenten (HA 2024.11+, siehe _build_device_config)
+
+    Capability-Profil (unsupported):
+        Sensoren ohne Daten auf dieser Anlage werden zurückgezogen - entity:
+        leere retained Config auf ihrem Topic, device: Komponente nur mit "p"
+
     Args:
         base_topic: MQTT Basis-Topic (z.B. "huawei-solar")
+        wait: Blockierend auf die Broker-Bestätigungen warten (max 1s je Message).
+              False: sofort zurück, der Aufrufer wartet mit wait_published()
+        unsupported: Keys der zurückzuziehenden Sensoren (capability_profile.py)
+
+    Returns:
+        MQTTMessageInfo aller Discovery-Messages (leer wenn nicht verbunden)
 
     Beispiel:
         >>> publish_discovery_configs("huawei-solar")
@@ -458,7 +738,7 @@ def publish_discovery_configs(base_topic: str) -> None:
     """
     if not _is_connected:
         logger.warning("MQTT not connected, skipping discovery")
-        return
+        return []
 
     logger.info("🔍 Publishing MQTT Discovery")
     client = _get_mqtt_client()
@@ -472,23 +752,56 @@ def publish_discovery_configs(base_topic: str) -> None:
         "manufacturer": "Huawei",  # Hersteller
     }
 
-    # Numerische Sensoren publizieren (Leistung, Energie, ...)
-    sensors = _load_numeric_sensors()
-    count = _publish_sensor_configs(client, base_topic, sensors, device_config)
-    logger.debug(f"Published {count} numeric sensors")
-
-    # Text-Sensoren publizieren (Modellname, Status, ...)
+    # Numerische Sensoren (Leistung, Energie, ... + Extras) und Text-Sensoren
+    sensors = _numeric_discovery_sensors()
     text_sensors = _load_text_sensors()
-    text_count = _publish_sensor_configs(client, base_topic, text_sensors, device_config)
-    logger.debug(f"Published {text_count} text sensors")
+    retain = get_settings().discovery_retain
+
+    # Capability-Profil: Sensoren ohne Daten auf dieser Anlage zurückziehen
+    retracted = [sensor["key"] for sensor in sensors + text_sensors if sensor["key"] in unsupported]
+    if retracted:
+        sensors = [sensor for sensor in sensors if sensor["key"] not in unsupported]
+        text_sensors = [sensor for sensor in text_sensors if sensor["key"] not in unsupported]
+
+    if get_settings().discovery_mode == "device":
+        # Eine Message für alle Komponenten (device/origin nur einmal)
+        config = _build_device_config(sensors + text_sensors, base_topic, device_config)
+        entities = len(config["cmps"])
+        # Komponente nur mit Plattform = in HA entfernen
+        config["cmps"].update({key: {"p": "sensor"} for key in retracted})
+        results = [client.publish(DEVICE_DISCOVERY_TOPIC, json.dumps(config), qos=1, retain=retain)]
+    else:
+        results = _publish_sensor_configs(client, base_topic, sensors, device_config, retain)
+        logger.debug(f"Published {len(results)} numeric sensors")
+
+        # Text-Sensoren publizieren (Modellname, Status, ...)
+        text_results = _publish_sensor_configs(client, base_topic, text_sensors, device_config, retain)
+        logger.debug(f"Published {len(text_results)} text sensors")
 
-    # Binary Sensor für Connectivity-Status
-    _publish_status_sensor(client, base_topic, device_config)
+        # Binary Sensor für Connectivity-Status
+        results += text_results
+        results.append(_publish_status_sensor(client, base_topic, device_config, retain))
+        entities = len(results)
 
-    logger.info(f"✅ Discovery complete: {count + text_count + 1} entities")
+        # Leere Config = Entity in HA entfernen (immer retained, löscht auch Altbestand)
+        for key in retracted:
+            results.append(client.publish(f"homeassistant/sensor/huawei_solar/{key}/config", "", qos=1, retain=True))
 
+    # Migrierte Configs des anderen Modus erst nach der neuen Discovery leeren
+    results += _clear_migrated_topics(client)
+
+    # Auf Publish-Bestätigungen warten (verhindert Race-Conditions)
+    if wait:
+        for result in results:
+            result.wait_for_publish(timeout=1.0)
+    retracted_info = f", {len(retracted)} retracted" if retracted else ""
+    logger.info(f"✅ Discovery complete: {entities} entities in {len(results)} messages{retracted_info}")
+    return results
 
-def _publish_status_sensor(client: mqtt.Client, base_topic: str, device_config: Dict[str, Any]) -> None:
+
+def _publish_status_sensor(
+    client: mqtt.Client, base_topic: str, device_config: Dict[str, Any], retain: bool = True
+) -> Any:
     """
     Publiziert Binary Sensor für Connectivity-Status (online/offline).
 
@@ -505,6 +818,10 @@ def _publish_status_sensor(client: mqtt.Client, base_topic: str, device_config:
         client: MQTT Client Instanz
         base_topic: MQTT Basis-Topic (z.B. "huawei-solar")
         device_config: Device-Info für HA Gruppierung
+        retain: Retain-Flag der Config-Message
+
+    Returns:
+        MQTTMessageInfo (gewartet wird in publish_discovery_configs())
 
     Discovery-Topic:
         homeassistant/binary_sensor/huawei_solar/status/config
@@ -531,12 +848,18 @@ def _publish_status_sensor(client: mqtt.Client, base_topic: str, device_config:
         "homeassistant/binary_sensor/huawei_solar/status/config",
         json.dumps(config),
         qos=1,
-        retain=True,
+        retain=retain,
     )
-    result.wait_for_publish(timeout=1.0)
+    return result
 
 
-def publish_data(data: Dict[str, Any], topic: str) -> None:
+def publish_data(
+    data: Dict[str, Any],
+    topic: str,
+    last_update: Optional[float] = None,
+    retain: bool = True,
+    wait: bool = True,
+) -> Any:
     """
     Publiziert Sensor-Daten zu MQTT (wird jeden Cycle aufgerufen).
 
@@ -561,6 +884,14 @@ def publish_data(data: Dict[str, Any], topic: str) -> None:
     Args:
         data: Dict mit allen Sensor-Werten (aus transform.py)
         topic: MQTT Topic (z.B. "huawei-solar")
+        last_update: Timestamp für last_update (default: jetzt, replay.py
+                     übergibt den ursprünglichen Read-Zeitpunkt)
+        retain: Retain-Flag (replay.py publiziert ohne Retain)
+        wait: Blockierend auf die Broker-Bestätigung warten (max 2s).
+              False: sofort zurück, der Aufrufer wartet mit wait_published()
+
+    Returns:
+        MQTTMessageInfo des Publish
 
     Raises:
         ConnectionError: Wenn MQTT nicht verbunden
@@ -579,7 +910,7 @@ def publish_data(data: Dict[str, Any], topic: str) -> None:
 
     client = _get_mqtt_client()
     # Timestamp hinzufügen (Unix-Zeit in Sekunden)
-    data["last_update"] = int(time.time())
+    data["last_update"] = int(time.time() if last_update is None else last_update)
 
     # DEBUG: Zeige wichtigste Werte im Log
     if logger.isEnabledFor(logging.DEBUG):
@@ -591,18 +922,46 @@ def publish_data(data: Dict[str, Any], topic: str) -> None:
 
     try:
         # JSON-Payload publizieren (QoS=1, retain=True)
-        result = client.publish(topic, json.dumps(data), qos=1, retain=True)
+        # serializer: orjson wenn installiert, sonst stdlib json (kompakt)
+        result = client.publish(topic, dumps(data), qos=1, retain=retain)
         # Auf Publish-Bestätigung warten (max 2s)
         # Verhindert dass Daten verloren gehen bei schnellen Cycles
-        result.wait_for_publish(timeout=2.0)
+        if wait:
+            result.wait_for_publish(timeout=2.0)
         logger.debug(f"Data published: {len(data)} keys")
     except Exception as e:
         # Publish-Fehler durchreichen zu main.py (dort Error-Handling)
         logger.error(f"MQTT publish failed: {e}")
         raise
+    return result
+
+
+async def wait_published(info: Any, timeout: float = 2.0, poll: float = 0.01) -> bool:
+    """
+    Wartet auf die Broker-Bestätigung eines Publish ohne den Event-Loop zu blockieren.
+
+    Gegenstück zu wait_for_publish(): der paho-Thread setzt das Flag, hier
+    wird es im Loop abgefragt - Modbus-Reads laufen in der Zwischenzeit weiter.
+
+    Args:
+        info: MQTTMessageInfo aus publish_data(..., wait=False)
+        timeout: Maximale Wartezeit in Sekunden
+        poll: Abfrage-Intervall in Sekunden
+
+    Returns:
+        True wenn bestätigt, False bei Timeout (wie wait_for_publish kein Fehler)
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not info.is_published():
+        if loop.time() >= deadline:
+            logger.debug(f"Publish not acknowledged within {timeout:.1f}s")
+            return False
+        await asyncio.sleep(poll)
+    return True
 
 
-def publish_status(status: str, topic: str) -> None:
+def publish_status(status: str, topic: str, wait: bool = True) -> Any:
     """
     Publiziert online/offline Status zu MQTT.
 
@@ -624,6 +983,11 @@ def publish_status(status: str, topic: str) -> None:
     Args:
         status: "online" oder "offline"
         topic: MQTT Basis-Topic (z.B. "huawei-solar")
+        wait: Auf Broker-Bestätigung warten (blockiert bis 1s). Im asyncio-Loop
+              wait=False und await wait_published(info) verwenden
+
+    Returns:
+        MQTTMessageInfo des Publish, None wenn nicht verbunden oder fehlgeschlagen
 
     Beispiel:
         >>> publish_status("online", "huawei-solar")
@@ -643,7 +1007,7 @@ def publish_status(status: str, topic: str) -> None:
     if not _is_connected:
         # Nicht verbunden - Status-Update übersprungen (nicht fatal)
         logger.debug(f"MQTT not connected, cannot publish status '{status}'")
-        return
+        return None
 
     client = _get_mqtt_client()
     status_topic = f"{topic}/status"
@@ -652,8 +1016,110 @@ def publish_status(status: str, topic: str) -> None:
         # Status publizieren (QoS=1, retain=True)
         # retain=True wichtig damit Status nach Broker-Restart noch da ist
         result = client.publish(status_topic, status, qos=1, retain=True)
-        result.wait_for_publish(timeout=1.0)
+        if wait:
+            result.wait_for_publish(timeout=1.0)
         logger.debug(f"Status: '{status}' → {status_topic}")
+        return result
     except Exception as e:
         # Status-Publish-Fehler nicht fatal (wird weiter versucht)
         logger.error(f"Status publish failed: {e}")
+        return None
+
+
+def publish_binary_schema(topic: str, wait: bool = True) -> Any:
+    """
+    Publiziert die Schema-Beschreibung des Binär-Payloads (retained).
+
+    Topic: {base_topic}/binary/schema (JSON, siehe binary_payload.py)
+    Wird beim Start einmal publiziert - Consumer bekommen sie retained
+    auch später noch und ordnen Werte über schema_id zu.
+
+    Args:
+        topic: MQTT Basis-Topic (z.B. "huawei-solar")
+        wait: Auf Broker-Bestätigung warten (blockiert bis 2s). Im asyncio-Loop
+              wait=False und await wait_published(info) verwenden
+
+    Returns:
+        MQTTMessageInfo des Publish, None wenn nicht verbunden oder fehlgeschlagen
+    """
+    if not _is_connected:
+        logger.debug("MQTT not connected, cannot publish binary schema")
+        return None
+
+    client = _get_mqtt_client()
+    schema_topic = f"{topic}/binary/schema"
+    try:
+        result = client.publish(schema_topic, dumps(binary_payload.schema_description()), qos=1, retain=True)
+        if wait:
+            result.wait_for_publish(timeout=2.0)
+        logger.debug(f"Binary schema {binary_payload.SCHEMA_ID:08x} → {schema_topic}")
+        return result
+    except Exception as e:
+        logger.error(f"Binary schema publish failed: {e}")
+        return None
+
+
+def publish_binary(data: Dict[str, Any], topic: str) -> None:
+    """
+    Publiziert den Payload zusätzlich im kompakten Binärformat.
+
+    Topic: {base_topic}/binary (MessagePack, festes Schema, nicht retained)
+    Aufruf nach publish_data() - data enthält dann bereits last_update.
+
+    Kein wait_for_publish(): Der Binär-Publish ist ein Zusatz-Ziel und
+    soll den Cycle nicht verlängern. Fehler werden nur geloggt, das HA
+    JSON-Topic ist davon nicht betroffen.
+
+    Args:
+        data: Gefilterter Payload (wie an publish_data() übergeben)
+        topic: MQTT Basis-Topic (z.B. "huawei-solar")
+    """
+    if not _is_connected:
+        return
+
+    try:
+        _get_mqtt_client().publish(f"{topic}/binary", binary_payload.encode(data), qos=1, retain=False)
+    except Exception as e:
+        logger.error(f"Binary publish failed: {e}")
+
+
+def publish_write_result(result: Dict[str, Any], topic: str) -> None:
+    """
+    Publiziert das Ergebnis eines Schreib-Kommandos (nach Read-Back).
+
+    Topic: {base_topic}/command/set/<key>/result (JSON, nicht retained)
+    Payload: key, register, value, readback, ok (+ error bei Fehlschlag)
+
+    Args:
+        result: Ergebnis aus WriteQueue.flush()
+        topic: MQTT Basis-Topic (z.B. "huawei-solar")
+    """
+    if not _is_connected:
+        logger.debug("MQTT not connected, cannot publish write result")
+        return
+
+    try:
+        _get_mqtt_client().publish(f"{topic}/command/set/{result['key']}/result", dumps(result), qos=1, retain=False)
+    except Exception as e:
+        logger.error(f"Write result publish failed: {e}")
+
+
+def publish_diagnostics(name: str, data: Dict[str, Any], topic: str) -> None:
+    """
+    Publiziert Diagnose-Metriken (z.B. Event-Loop Lag).
+
+    Topic: {base_topic}/diagnostics/<name> (JSON, QoS 0, nicht retained)
+    Kein wait_for_publish() - Diagnose soll den Loop nicht selbst blockieren.
+
+    Args:
+        name: Metrik-Gruppe (z.B. "loop")
+        data: JSON-serialisierbare Werte
+        topic: MQTT Basis-Topic (z.B. "huawei-solar")
+    """
+    if not _is_connected:
+        return
+
+    try:
+        _get_mqtt_client().publish(f"{topic}/diagnostics/{name}", dumps(data), qos=0, retain=False)
+    except Exception as e:
+        logger.error(f"Diagnostics publish failed: {e}")
@@ -0,0 +1,164 @@
+# bridge/pipeline.py
+
+"""
+Producer/Consumer Pipeline zwischen Modbus-Sampling und MQTT-Publish.
+
+Problem:
+    main_once() lief strikt sequentiell: Read → Transform → Filter → Publish.
+    Ein langsamer Broker (wait_for_publish bis 2s) verschob den nächsten
+    Modbus-Read, ein langsamer Dongle verzögerte das Publish - die
+    Sampling-Kadenz hing vom Broker ab.
+
+Lösung:
+    - Producer (main_once/fast_once im Main-Loop): liest Register und legt
+      ein Sample (Rohdaten + Zeitstempel) in die Queue
+    - Consumer (SamplePipeline.run() als eigener Task): Transform, Filter,
+      Publish, History - wartet auf den Broker ohne den Producer aufzuhalten
+    - Queue: begrenzt, latest wins - kommt der Consumer nicht nach, werden
+      ältere Samples verworfen statt sich aufzustauen:
+        * ein Full-Sample ersetzt alle wartenden Samples (enthält alle Werte)
+        * bei voller Queue wird zuerst das älteste Fast-Sample verworfen
+
+Statistik (pro Cycle, siehe stats()):
+    producer: Samples, Read-Dauer (max/mean)
+    consumer: verarbeitet, verworfen, Lag Sample → publiziert (max/mean)
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger("huawei.pipeline")
+
+
+@dataclass
+class Sample:
+    """Ein Modbus-Read (Rohdaten), noch nicht transformiert."""
+
+    kind: str  # "full" (ESSENTIAL_REGISTERS) oder "fast" (FAST_REGISTERS)
+    data: Dict[str, Any]
+    timestamp: float  # time.time() beim Start des Reads
+    modbus_duration: float = 0.0
+    cycle_num: float = 0
+    mono: float = field(default_factory=time.monotonic)  # Zeitstempel für Integration (dt)
+
+
+class _StageStats:
+    """Anzahl und Dauer-Verteilung einer Pipeline-Stufe (Fenster bis reset())."""
+
+    def __init__(self):
+        self.count = 0
+        self.durations: List[float] = []
+
+    def record(self, duration: float) -> None:
+        self.count += 1
+        self.durations.append(duration)
+
+    def snapshot(self, prefix: str) -> Dict[str, float]:
+        durations = self.durations
+        return {
+            "count": self.count,
+            f"{prefix}_max_s": round(max(durations), 3) if durations else 0.0,
+            f"{prefix}_mean_s": round(sum(durations) / len(durations), 3) if durations else 0.0,
+        }
+
+    def reset(self) -> None:
+        self.count = 0
+        self.durations = []
+
+
+class SamplePipeline:
+    """Begrenzte latest-wins Queue zwischen Sampling (Producer) und Publish (Consumer)."""
+
+    def __init__(
+        self,
+        process: Callable[[Sample], Awaitable[None]],
+        maxsize: int = 2,
+        on_error: Optional[Callable[[Sample, Exception], None]] = None,
+    ):
+        """
+        Initialisiert die Pipeline.
+
+        Args:
+            process: Consumer-Funktion pro Sample (Transform, Filter, Publish)
+            maxsize: Maximal wartende Samples (>= 2, damit ein Full-Sample
+                     nicht von einem Fast-Sample verdrängt wird)
+            on_error: Fehlerbehandlung pro fehlgeschlagenem Sample (z.B.
+                      Error-Tracker, Offline-Status) - ohne wird nur geloggt
+        """
+        self.process = process
+        self.on_error = on_error
+        self.maxsize = max(2, maxsize)
+        self._queue: Deque[Sample] = deque()
+        self._ready = asyncio.Event()
+        self._producer = _StageStats()
+        self._consumer = _StageStats()
+        self._dropped = 0
+
+    def put(self, sample: Sample) -> None:
+        """
+        Legt ein Sample in die Queue (Producer, blockiert nie).
+
+        Args:
+            sample: Frisch gelesenes Sample
+        """
+        self._producer.record(sample.modbus_duration)
+        if sample.kind == "full" and self._queue:
+            # Full-Read enthält alle Werte - ältere Samples sind überholt
+            self._drop(len(self._queue))
+        elif len(self._queue) >= self.maxsize:
+            fast = next((s for s in self._queue if s.kind == "fast"), None)
+            if fast is not None:
+                self._queue.remove(fast)
+                self._dropped += 1
+            else:
+                self._drop(1)
+        self._queue.append(sample)
+        self._ready.set()
+
+    def _drop(self, count: int) -> None:
+        for _ in range(count):
+            self._queue.popleft()
+        self._dropped += count
+        logger.debug(f"Consumer behind, {count} sample(s) superseded")
+
+    @property
+    def depth(self) -> int:
+        """Anzahl wartender Samples."""
+        return len(self._queue)
+
+    async def run(self) -> None:
+        """Consumer-Loop (als Task starten, läuft bis er gecancelt wird)."""
+        while True:
+            while not self._queue:
+                self._ready.clear()
+                await self._ready.wait()
+            sample = self._queue.popleft()
+            try:
+                await self.process(sample)
+            except Exception as e:
+                # Publish-Fehler betreffen nur dieses Sample - Sampling läuft weiter
+                if self.on_error is not None:
+                    self.on_error(sample, e)
+                else:
+                    logger.error(f"Processing {sample.kind} sample failed: {e}")
+            self._consumer.record(time.time() - sample.timestamp)
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistik seit dem letzten reset_stats() (Read-Dauer, Lag bis publiziert)."""
+        consumer = self._consumer.snapshot("lag")
+        consumer["dropped"] = self._dropped
+        return {
+            "producer": self._producer.snapshot("read"),
+            "consumer": consumer,
+            "queue_depth": self.depth,
+        }
+
+    def reset_stats(self) -> None:
+        """Startet ein neues Statistik-Fenster (pro Cycle)."""
+        self._producer.reset()
+        self._consumer.reset()
+        self._dropped = 0
@@ -0,0 +1,246 @@
+# bridge/poll_scheduler.py
+
+"""
+Adaptives Poll-Intervall mit Fast-Response Burst-Modus.
+
+Problem:
+    Bei HUAWEI_POLL_INTERVAL=30s sind Lastsprünge (Wallbox startet, Wolke
+    zieht durch) bis zu 30s unsichtbar - zu langsam für Überschussladen.
+    Ein dauerhaft kurzes Intervall würde aber Dongle und MQTT unnötig belasten.
+
+Lösung:
+    Nach jedem Read werden power_input, meter_power_active und battery_power
+    mit dem vorherigen Wert verglichen. Ändert sich einer um mehr als den
+    Schwellwert, wechselt die Bridge in den Fast-Tier: nur FAST_REGISTERS
+    (config/registers.py) werden alle fast_interval Sekunden gelesen und in
+    den zuletzt publizierten Payload gemergt. Der volle Read läuft unverändert
+    im normalen poll_interval weiter.
+
+Decay:
+    Solange innerhalb von hold Sekunden erneut ein Sprung erkannt wird, bleibt
+    der Fast-Tier aktiv. Danach verdoppelt sich das Intervall pro Fast-Read
+    (2s → 4s → 8s → ...) bis es das normale poll_interval erreicht.
+
+Idle-Modus (Nacht):
+    Ohne PV-Leistung (power_input == 0 oder inverter_status Standby/Shutdown)
+    und mit ruhender oder fehlender Batterie ändern sich die Werte stundenlang
+    nicht. Nach IDLE_ENTER_READS aufeinanderfolgenden Idle-Reads läuft der
+    volle Read nur noch alle idle_interval Sekunden. Dazwischen prüft ein
+    Liveness-Read (LIVENESS_REGISTERS) im normalen poll_interval, ob der
+    Inverter noch erreichbar ist. Beim ersten Anzeichen von Aktivität (PV > 0,
+    Batterie lädt/entlädt) geht es sofort zurück zum normalen Intervall.
+
+Beispiel-Log:
+    INFO - ⚡ Burst mode: meter_power_active changed by 3400W (threshold 500W)
+    INFO - ⚡ Burst mode ended, back to 30s interval
+    INFO - 🌙 Idle mode: no PV, battery idle → full read every 600s
+    INFO - ☀️ Activity detected, back to 30s interval
+"""
+
+import logging
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("huawei.scheduler")
+
+# inverter_status Präfixe (device_status Texte der huawei_solar Library)
+IDLE_STATUS_PREFIXES = ("Standby", "Shutdown")
+
+# battery_status (StorageStatus): 0 = offline, 1 = standby, 4 = sleep
+BATTERY_IDLE_STATES = (0, 1, 4)
+
+
+def is_idle_state(data: Dict[str, Any]) -> bool:
+    """
+    Prüft ob Daten auf einen ruhenden Inverter hindeuten.
+
+    Idle = keine PV-Leistung UND Batterie ruht oder ist nicht vorhanden.
+    Fehlende Keys zählen nicht als Aktivität (Liveness-/Fast-Reads liefern
+    nur eine Teilmenge).
+
+    Args:
+        data: Transformierte MQTT-Daten (voll oder Teilmenge)
+
+    Returns:
+        True wenn weder PV noch Batterie aktiv sind
+    """
+    status = data.get("inverter_status")
+    power_input = data.get("power_input")
+    pv_idle = power_input == 0 or (isinstance(status, str) and status.startswith(IDLE_STATUS_PREFIXES))
+    if not pv_idle or (isinstance(power_input, (int, float)) and power_input > 0):
+        return False
+
+    battery_status = data.get("battery_status")
+    if battery_status is not None:
+        return battery_status in BATTERY_IDLE_STATES
+    return not data.get("battery_power")
+
+
+class AdaptivePollScheduler:
+    """Entscheidet ob und wie oft zwischen zwei vollen Reads Fast-Reads laufen."""
+
+    # Keys deren Sprung den Burst-Modus auslöst
+    WATCHED_KEYS = ("power_input", "meter_power_active", "battery_power")
+
+    # Aufeinanderfolgende Idle-Reads bevor der Idle-Modus startet
+    # (verhindert Flattern in der Dämmerung)
+    IDLE_ENTER_READS = 3
+
+    def __init__(
+        self,
+        poll_interval: float,
+        fast_interval: float = 2.0,
+        threshold: float = 0,
+        hold: float = 60.0,
+        idle_interval: float = 0,
+    ):
+        """
+        Initialisiert den Scheduler.
+
+        Args:
+            poll_interval: Normales Intervall zwischen vollen Reads (Sekunden)
+            fast_interval: Intervall im Fast-Tier (Sekunden)
+            threshold: Leistungsänderung in W die den Burst auslöst (0 = deaktiviert)
+            hold: Sekunden ohne neuen Sprung bis der Decay beginnt
+            idle_interval: Intervall zwischen vollen Reads im Idle-Modus (0 = deaktiviert)
+        """
+        self.poll_interval = poll_interval
+        self.fast_interval = fast_interval
+        self.threshold = threshold
+        self.hold = hold
+        self.idle_interval = idle_interval
+
+        self._last_values: Dict[str, float] = {}
+        self._burst_until: float = 0.0
+        self._interval: Optional[float] = None  # None = kein Burst aktiv
+        self._idle_reads = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Burst-Modus ist nur mit Schwellwert > 0 aktiv."""
+        return self.threshold > 0 and self.fast_interval < self.poll_interval
+
+    @property
+    def in_burst(self) -> bool:
+        """True solange Fast-Reads geplant sind (inkl. Decay-Phase)."""
+        return self._interval is not None
+
+    @property
+    def idle_enabled(self) -> bool:
+        """Idle-Modus nur wenn idle_interval länger als poll_interval ist."""
+        return self.idle_interval > self.poll_interval
+
+    @property
+    def is_idle(self) -> bool:
+        """True wenn volle Reads nur noch im idle_interval laufen."""
+        return self.idle_enabled and not self.in_burst and self._idle_reads >= self.IDLE_ENTER_READS
+
+    def status_timeout(self, timeout: float) -> float:
+        """
+        Effektiver Heartbeat-Timeout.
+
+        Im Idle-Modus liegt zwischen zwei vollen Reads absichtlich bis zu
+        idle_interval - das darf nicht als Ausfall gewertet werden.
+        """
+        if self.is_idle:
+            return max(timeout, self.idle_interval + self.poll_interval)
+        return timeout
+
+    def observe(self, data: Dict[str, Any], now: Optional[float] = None) -> bool:
+        """
+        Vergleicht überwachte Werte mit dem letzten Read.
+
+        Args:
+            data: Transformierte MQTT-Daten (voller oder Fast-Read)
+            now: Monotonic Timestamp (nur für Tests)
+
+        Returns:
+            True wenn ein Sprung > threshold erkannt wurde
+        """
+        self._observe_idle(data)
+        if not self.enabled:
+            return False
+
+        now = time.monotonic() if now is None else now
+        triggered_by = None
+        delta = 0.0
+
+        for key in self.WATCHED_KEYS:
+            value = data.get(key)
+            if not isinstance(value, (int, float)):
+                continue
+            last = self._last_values.get(key)
+            self._last_values[key] = value
+            if last is not None and triggered_by is None and abs(value - last) >= self.threshold:
+                triggered_by, delta = key, value - last
+
+        if triggered_by is None:
+            return False
+
+        if not self.in_burst:
+            logger.info(f"⚡ Burst mode: {triggered_by} changed by {delta:+.0f}W (threshold {self.threshold:.0f}W)")
+        self._burst_until = now + self.hold
+        self._interval = self.fast_interval
+        return True
+
+    def next_interval(self, now: Optional[float] = None) -> Optional[float]:
+        """
+        Liefert Wartezeit bis zum nächsten Fast-Read oder None (kein Burst).
+
+        Nach Ablauf von hold wird das Intervall bei jedem Aufruf verdoppelt,
+        bis es poll_interval erreicht - dann endet der Burst-Modus.
+        """
+        if self._interval is None:
+            return None
+
+        now = time.monotonic() if now is None else now
+        if now > self._burst_until:
+            self._interval *= 2
+            if self._interval >= self.poll_interval:
+                self.reset()
+                logger.info(f"⚡ Burst mode ended, back to {self.poll_interval:.0f}s interval")
+                return None
+
+        return self._interval
+
+    def _observe_idle(self, data: Dict[str, Any]) -> None:
+        """Zählt aufeinanderfolgende Idle-Reads, beendet Idle bei Aktivität."""
+        if not self.idle_enabled:
+            return
+
+        if is_idle_state(data):
+            self._idle_reads += 1
+            if self._idle_reads == self.IDLE_ENTER_READS:
+                logger.info(f"🌙 Idle mode: no PV, battery idle → full read every {self.idle_interval:.0f}s")
+            return
+
+        if self.is_idle:
+            logger.info(f"☀️ Activity detected, back to {self.poll_interval:.0f}s interval")
+        self._idle_reads = 0
+
+    def reconfigure(
+        self,
+        poll_interval: float,
+        fast_interval: float,
+        threshold: float,
+        hold: float,
+        idle_interval: float,
+    ) -> None:
+        """
+        Übernimmt neue Intervalle/Schwellwerte zur Laufzeit (Config-Reload).
+
+        Laufender Burst oder Idle-Modus wird beendet, die letzten Leistungswerte
+        bleiben erhalten (der nächste Read kann direkt wieder triggern).
+        """
+        self.poll_interval = poll_interval
+        self.fast_interval = fast_interval
+        self.threshold = threshold
+        self.hold = hold
+        self.idle_interval = idle_interval
+        self.reset()
+
+    def reset(self) -> None:
+        """Beendet Burst und Idle sofort (z.B. nach Verbindungsfehler)."""
+        self._interval = None
+        self._burst_until = 0.0
+        self._idle_reads = 0
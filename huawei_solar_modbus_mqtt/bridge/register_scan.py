@@ -0,0 +1,325 @@
+# bridge/register_scan.py
+
+"""
+Register-Scan: welche Register der huawei_solar Register-Map liefert dieser Inverter.
+
+Neue Inverter-Modelle bedeuten bisher Ausprobieren mit ESSENTIAL_REGISTERS
+und Timeouts Register für Register. Der Scan liest stattdessen die ganze
+Map in großen Adress-Blöcken (ein Request pro Block):
+
+1. Register nach Adresse sortieren und zu Blöcken zusammenfassen
+   (max. block_size Register pro Request, Lücken max. 16 Register)
+2. Jeden Block mit get_multiple() lesen und die Dauer messen
+3. Nur fehlgeschlagene Blöcke halbieren (Bisektion) bis zum einzelnen
+   Register - ein unsupported Register kostet ~2·log2(n) statt n Requests
+
+Ergebnis ist ein Register-Profil (JSON, oder YAML mit PyYAML):
+    registers: pro Register Adresse, Status und Latenz des Requests
+               (supported | sentinel | unsupported | failed), bei
+               sentinel der Platzhalter-Wert, bei Fehlern die Meldung
+    ranges:    jeder Request mit Startadresse, Länge, Dauer und Ergebnis
+    summary:   Anzahl Register pro Status
+
+Die Bridge nutzt das Profil mit HUAWEI_REGISTER_PROFILE: unsupported
+Register werden nicht mehr gelesen und ihre Sensoren nicht angekündigt.
+
+Aufruf (im Add-on Container, /app - Add-on vorher stoppen, der Inverter
+erlaubt nur eine Modbus-Verbindung):
+    python3 -m bridge.register_scan
+    python3 -m bridge.register_scan --output /share/sun2000_registers.yaml
+    python3 -m bridge.register_scan --registers active_power,input_power --block-size 120
+
+ENV-Variablen (wie bridge.main):
+    HUAWEI_MODBUS_HOST / _PORT, HUAWEI_SLAVE_ID: Inverter
+    HUAWEI_REGISTER_PROFILE_PATH: Ziel (default: /data/register_profile.json)
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Iterable, List, Optional
+
+from huawei_solar import AsyncHuaweiSolar
+from huawei_solar.const import MAX_BATCHED_REGISTERS_COUNT, MAX_BATCHED_REGISTERS_GAP
+from huawei_solar.exceptions import ReadException
+from huawei_solar.registers import REGISTERS, TargetDevice
+
+from .__version__ import __version__
+from .config.mappings import CRITICAL_DEFAULTS, REGISTER_MAPPING
+from .settings import get_settings
+from .transform import get_value
+
+try:
+    import yaml  # type: ignore[import-untyped]
+except ImportError:
+    yaml = None  # type: ignore[assignment]
+
+logger = logging.getLogger("huawei.scan")
+
+# Format der Profil-Datei - bei inkompatibler Änderung erhöhen
+PROFILE_VERSION = 1
+
+# Modbus erlaubt max. 125 Register pro Read-Request
+MAX_BLOCK_SIZE = 125
+
+# get_multiple(names) → Results in gleicher Reihenfolge
+ReadMultiple = Callable[[List[str]], Awaitable[List[Any]]]
+
+
+def plan_blocks(names: Iterable[str], block_size: int = MAX_BATCHED_REGISTERS_COUNT) -> List[List[str]]:
+    """
+    Fasst Register zu Blöcken zusammen, die mit einem Request lesbar sind.
+
+    Neuer Block bei Überlappung (Aliase auf gleicher Adresse), Lücke
+    > MAX_BATCHED_REGISTERS_GAP oder wenn der Block block_size übersteigt.
+
+    Args:
+        names: Register-Namen aus der huawei_solar Map
+        block_size: Max. Register (16-bit Worte) pro Request
+
+    Returns:
+        Blöcke in Adress-Reihenfolge
+    """
+    registers = sorted((REGISTERS[name].register, name) for name in names)
+    blocks: List[List[str]] = []
+    start = end = 0
+    for address, name in registers:
+        length = REGISTERS[name].length
+        fits = address >= end and address - end <= MAX_BATCHED_REGISTERS_GAP and address + length - start <= block_size
+        if blocks and fits:
+            blocks[-1].append(name)
+        else:
+            blocks.append([name])
+            start = address
+        end = address + length
+    return blocks
+
+
+def default_registers() -> List[str]:
+    """Alle lesbaren SUN2000-Register der huawei_solar Map."""
+    return [
+        name
+        for name, register in REGISTERS.items()
+        if register.readable and TargetDevice.SUN2000 in register.target_device
+    ]
+
+
+async def scan_registers(read_multiple: ReadMultiple, blocks: List[List[str]]) -> Dict[str, Any]:
+    """
+    Liest alle Blöcke, halbiert nur die fehlgeschlagenen.
+
+    Args:
+        read_multiple: client.get_multiple (gebunden)
+        blocks: Ergebnis von plan_blocks()
+
+    Returns:
+        Profil-Dict (siehe Modul-Docstring), ohne Metadaten
+    """
+    registers: Dict[str, Dict[str, Any]] = {}
+    ranges: List[Dict[str, Any]] = []
+
+    async def probe(names: List[str]) -> None:
+        first, last = REGISTERS[names[0]], REGISTERS[names[-1]]
+        count = last.register + last.length - first.register
+        start = time.perf_counter()
+        try:
+            results = await read_multiple(names)
+            error = None
+        except Exception as e:
+            results = None
+            error = e
+        ms = round((time.perf_counter() - start) * 1000, 1)
+        ranges.append({"start": first.register, "count": count, "registers": len(names), "ok": error is None, "ms": ms})
+
+        if error is not None and len(names) > 1:
+            # Bisektion: nur der fehlerhafte Teil wird weiter zerlegt
+            middle = len(names) // 2
+            await probe(names[:middle])
+            await probe(names[middle:])
+            return
+
+        for index, name in enumerate(names):
+            entry: Dict[str, Any] = {"address": REGISTERS[name].register, "ms": ms}
+            if error is not None:
+                # Modbus-Exception (meist 02 Illegal Data Address) = Register gibt es nicht
+                code = getattr(error, "modbus_exception_code", None)
+                entry["status"] = "unsupported" if isinstance(error, ReadException) and code else "failed"
+                entry["error"] = str(error) or type(error).__name__
+            elif results is not None:
+                raw = getattr(results[index], "value", results[index])
+                if get_value(raw) is None:
+                    # Gelesen, aber Platzhalter (65535, 0x7FFF..., invalid_value der Library)
+                    entry["status"] = "sentinel"
+                    entry["value"] = raw
+                else:
+                    entry["status"] = "supported"
+            registers[name] = entry
+
+    for block in blocks:
+        await probe(block)
+
+    return {"registers": dict(sorted(registers.items(), key=lambda item: item[1]["address"])), "ranges": ranges}
+
+
+def write_profile(profile: Dict[str, Any], path: str) -> None:
+    """
+    Schreibt das Profil atomar (tmp-Datei + os.replace), YAML bei .yaml/.yml.
+
+    Raises:
+        RuntimeError: YAML gewünscht, PyYAML nicht installiert
+    """
+    as_yaml = path.endswith((".yaml", ".yml"))
+    if as_yaml and yaml is None:
+        raise RuntimeError("PyYAML not installed - use a .json output file")
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        if as_yaml:
+            yaml.safe_dump(profile, f, sort_keys=False)
+        else:
+            json.dump(profile, f, indent=2)
+    os.replace(tmp, path)
+
+
+class RegisterProfile:
+    """Geladenes Scan-Ergebnis - Read-Plan und Discovery der Bridge."""
+
+    def __init__(self, data: Dict[str, Any]):
+        """
+        Args:
+            data: Profil-Dict (aus load() oder dem Scan)
+        """
+        self.data = data
+        self.unsupported: FrozenSet[str] = frozenset(
+            name for name, entry in data["registers"].items() if entry.get("status") == "unsupported"
+        )
+
+    @classmethod
+    def load(cls, path: str) -> Optional["RegisterProfile"]:
+        """
+        Lädt ein Profil (JSON oder YAML).
+
+        Returns:
+            Profil oder None wenn nicht vorhanden/ungültig (Bridge liest dann alles)
+        """
+        if not path or not os.path.exists(path):
+            logger.warning(f"Register profile not found: {path} (run python3 -m bridge.register_scan)")
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                if path.endswith((".yaml", ".yml")):
+                    if yaml is None:
+                        raise ValueError("PyYAML not installed")
+                    data = yaml.safe_load(f)
+                else:
+                    data = json.load(f)
+            if data.get("version") != PROFILE_VERSION:
+                raise ValueError(f"version {data.get('version')} != {PROFILE_VERSION}")
+            return cls(data)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Register profile not loaded ({path}): {e}")
+            return None
+
+    def plan(self, names: List[str]) -> List[str]:
+        """Register aus names ohne die unsupported (Reihenfolge bleibt)."""
+        return [name for name in names if name not in self.unsupported]
+
+    def unsupported_keys(self) -> FrozenSet[str]:
+        """MQTT-Keys der unsupported Register (ohne Critical Defaults - die stehen immer im Payload)."""
+        keys = {REGISTER_MAPPING[name] for name in self.unsupported if name in REGISTER_MAPPING}
+        return frozenset(keys - CRITICAL_DEFAULTS.keys())
+
+
+def _summary(registers: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+    counts = {"supported": 0, "sentinel": 0, "unsupported": 0, "failed": 0}
+    for entry in registers.values():
+        counts[entry["status"]] += 1
+    return counts
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        prog="python3 -m bridge.register_scan",
+        description="Scan which huawei_solar registers the inverter supports",
+    )
+    parser.add_argument("--host", default=settings.modbus_host, help="Inverter host (default: HUAWEI_MODBUS_HOST)")
+    parser.add_argument("--port", type=int, default=settings.modbus_port)
+    parser.add_argument("--slave-id", type=int, default=settings.slave_id)
+    parser.add_argument("--output", default=settings.register_profile_path, help="Profile file (.json or .yaml)")
+    parser.add_argument("--registers", type=lambda s: s.split(","), help="Comma-separated names (default: all)")
+    parser.add_argument(
+        "--block-size",
+        type=int,
+        default=MAX_BATCHED_REGISTERS_COUNT,
+        help=f"Registers per request (max {MAX_BLOCK_SIZE})",
+    )
+    return parser.parse_args(argv)
+
+
+async def _scan(args: argparse.Namespace) -> Dict[str, Any]:
+    names = args.registers or default_registers()
+    blocks = plan_blocks(names, args.block_size)
+    logger.info(f"🔎 Scanning {len(names)} registers in {len(blocks)} blocks on {args.host}:{args.port}")
+
+    client = await AsyncHuaweiSolar.create(args.host, args.port, args.slave_id)
+    start = time.perf_counter()
+    try:
+        result = await scan_registers(client.get_multiple, blocks)
+    finally:
+        await client.stop()
+    duration = time.perf_counter() - start
+
+    return {
+        "version": PROFILE_VERSION,
+        "bridge_version": __version__,
+        "scanned_at": int(time.time()),
+        "host": args.host,
+        "slave_id": args.slave_id,
+        "duration_s": round(duration, 2),
+        "requests": len(result["ranges"]),
+        "summary": _summary(result["registers"]),
+        **result,
+    }
+
+
+def main(argv=None) -> int:
+    """CLI Entry-Point: Scan ausführen und Profil schreiben."""
+    from .main import init_logging
+
+    init_logging()
+    args = _parse_args(argv)
+    if not args.host:
+        logger.error("HUAWEI_MODBUS_HOST missing (or --host)")
+        return 1
+    if not 0 < args.block_size <= MAX_BLOCK_SIZE:
+        logger.error(f"--block-size must be 1-{MAX_BLOCK_SIZE}")
+        return 1
+    unknown = [name for name in args.registers or () if name not in REGISTERS]
+    if unknown:
+        logger.error(f"Unknown registers: {', '.join(unknown)}")
+        return 1
+
+    try:
+        profile = asyncio.run(_scan(args))
+        write_profile(profile, args.output)
+    except Exception as e:
+        logger.error(f"Scan failed: {e}")
+        return 1
+
+    summary = profile["summary"]
+    logger.info(
+        f"✅ {summary['supported']} supported, {summary['sentinel']} sentinel, {summary['unsupported']} unsupported, "
+        f"{summary['failed']} failed - {profile['requests']} requests in {profile['duration_s']:.1f}s → {args.output}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+# bridge/replay.py
+
+"""
+Backfill/Replay aus der lokalen History (history_store.py).
+
+Nach einem HA-Ausfall zeigen Energie-Dashboards Lücken, obwohl der Inverter
+durchgehend gezählt hat. Dieses Tool liest einen Zeitraum aus der lokalen
+History und
+
+1. publiziert die Rohwerte erneut zu einem MQTT-Topic (gedrosselt), oder
+2. schreibt eine Langzeit-Statistik Importdatei für Home Assistant
+   (stündlich, Format der "Import Statistics" Integration:
+   statistic_id, unit, start, state, sum bzw. min, max, mean).
+
+Beide Wege streamen über den SQLite-Cursor - konstanter Speicher, auch
+für Monate an Daten.
+
+Aufruf (im Add-on Container, /app):
+    python3 -m bridge.replay --start 2026-10-01 --end 2026-10-03 --rate 20
+    python3 -m bridge.replay --start 2026-10-01 --statistics /share/huawei_counters.tsv
+    python3 -m bridge.replay --start 2026-10-01 --statistics /share/c.tsv --measurements /share/m.tsv
+    python3 -m bridge.replay --start 2026-10-01 --statistics /share/c.tsv --sum-offset energy_yield_accumulated=4321.5
+
+ENV-Variablen (wie bridge.main):
+    HUAWEI_HISTORY_PATH: History-Datenbank (default: /data/history.db)
+    HUAWEI_MODBUS_MQTT_BROKER / _PORT / _USER / _PASSWORD: MQTT Broker
+    HUAWEI_MODBUS_MQTT_TOPIC: Basis-Topic (Ziel default: {topic}/replay)
+"""
+
+import argparse
+import csv
+import logging
+import os
+import re
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from .config.sensors_mqtt import NUMERIC_SENSORS
+from .history_store import RESOLUTION_HOUR, TOTAL_INCREASING_KEYS, HistoryStore
+from .serializer import dumps
+from .settings import get_settings
+
+logger = logging.getLogger("huawei.replay")
+
+# Zeitformat der HA "Import Statistics" Integration
+STATISTICS_TIME_FORMAT = "%d.%m.%Y %H:%M"
+
+SENSORS_BY_KEY = {sensor["key"]: sensor for sensor in NUMERIC_SENSORS}
+
+
+def statistic_id(key: str) -> str:
+    """
+    Leitet die HA Entity-ID aus dem Sensor-Namen ab.
+
+    HA bildet die Entity-ID bei MQTT Discovery aus dem Namen
+    ("Solar Total Yield" → sensor.solar_total_yield). Wurde die Entity in
+    HA umbenannt, muss die Spalte in der Datei angepasst werden.
+    """
+    name = SENSORS_BY_KEY.get(key, {}).get("name", key)
+    return "sensor." + re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+def replay_to_mqtt(
+    store: HistoryStore,
+    start: float,
+    end: float,
+    topic: str,
+    rate: float,
+    publish=None,
+) -> int:
+    """
+    Publiziert Rohwerte aus der History zu MQTT.
+
+    Jeder Cycle wird als ein JSON-Payload mit dem ursprünglichen
+    last_update Timestamp publiziert (ohne Retain, damit der Replay-Topic
+    nach dem Lauf keinen veralteten Zustand festhält).
+
+    Args:
+        store: Geöffnete HistoryStore
+        start: Unix-Timestamp Beginn (inklusive)
+        end: Unix-Timestamp Ende (exklusive)
+        topic: Ziel-Topic
+        rate: Maximale Nachrichten pro Sekunde (0 = ungedrosselt)
+        publish: Publish-Funktion (default: mqtt_client.publish_data)
+
+    Returns:
+        Anzahl publizierter Nachrichten
+    """
+    if publish is None:
+        from .mqtt_client import publish_data as publish
+
+    interval = 1.0 / rate if rate > 0 else 0.0
+    next_send = time.monotonic()
+    count = 0
+
+    for ts, values in store.iter_samples(start, end):
+        if interval:
+            delay = next_send - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            next_send = max(next_send, time.monotonic()) + interval
+
+        publish(values, topic, last_update=ts, retain=False)
+        count += 1
+        if count % 1000 == 0:
+            logger.info(f"📤 Replayed {count} cycles (up to {datetime.fromtimestamp(ts).isoformat()})")
+
+    return count
+
+
+def _connect_replay_client() -> Any:
+    """
+    Eigener, schlichter paho-Client für den Replay.
+
+    Bewusst nicht mqtt_client.connect_mqtt(): der Bridge-Client abonniert
+    Reload-, HA-Status- und Legacy-Discovery-Topics und würde nebenbei
+    Migrations-Payloads publizieren. Der Replay verbindet nur, publiziert
+    und trennt - ohne Subscriptions, Callbacks oder LWT.
+
+    Raises:
+        RuntimeError: Wenn kein Broker konfiguriert ist
+    """
+    import paho.mqtt.client as mqtt
+
+    settings = get_settings()
+    if not settings.mqtt_broker:
+        raise RuntimeError("MQTT broker not configured")
+
+    client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)  # type: ignore[attr-defined]
+    if settings.mqtt_user and settings.mqtt_password:
+        client.username_pw_set(settings.mqtt_user, settings.mqtt_password)
+    client.connect(settings.mqtt_broker, settings.mqtt_port, 60)
+    client.loop_start()
+    return client
+
+
+def _client_publisher(client: Any) -> Callable[..., None]:
+    """Publish-Funktion für replay_to_mqtt() auf einem eigenen Client (QoS=1)."""
+
+    def publish(values: Dict[str, Any], topic: str, last_update: float, retain: bool = False) -> None:
+        payload = dict(values, last_update=int(last_update))
+        client.publish(topic, dumps(payload), qos=1, retain=retain).wait_for_publish(timeout=2.0)
+
+    return publish
+
+
+def _hourly(store: HistoryStore, start: float, end: float, keys: List[str]) -> Iterator[Dict]:
+    """Stündliche Aggregate gefiltert auf keys (Streaming)."""
+    wanted = set(keys)
+    for row in store.iter_aggregates(RESOLUTION_HOUR, start, end):
+        if row["key"] in wanted:
+            yield row
+
+
+def export_statistics(
+    store: HistoryStore,
+    start: float,
+    end: float,
+    out: TextIO,
+    keys: Optional[List[str]] = None,
+    sum_offsets: Optional[Dict[str, float]] = None,
+) -> int:
+    """
+    Schreibt Counter-Statistiken (state/sum) als HA Importdatei.
+
+    sum ist die laufende Summe der stündlichen Deltas, state der letzte
+    Zählerstand der Stunde. Ohne Offset beginnt sum bei 0 - beim Füllen
+    einer Lücke zwischen vorhandenen HA-Statistiken muss sum an der letzten
+    HA-Stunde vor start anschließen, sonst springt das Energie-Dashboard.
+
+    Args:
+        store: Geöffnete HistoryStore
+        start: Unix-Timestamp Beginn
+        end: Unix-Timestamp Ende
+        out: Ziel-Datei (Text)
+        keys: total_increasing Keys (default: alle)
+        sum_offsets: Start-sum pro Key (sum der letzten HA-Statistik vor start)
+
+    Returns:
+        Anzahl geschriebener Zeilen
+    """
+    keys = keys or sorted(TOTAL_INCREASING_KEYS)
+    writer = csv.writer(out, delimiter="\t", lineterminator="\n")
+    writer.writerow(["statistic_id", "unit", "start", "state", "sum"])
+
+    sums: Dict[str, float] = dict(sum_offsets or {})
+    rows = 0
+    for row in _hourly(store, start, end, keys):
+        key = row["key"]
+        sums[key] = sums.get(key, 0.0) + (row["delta"] or 0.0)
+        writer.writerow(
+            [
+                statistic_id(key),
+                SENSORS_BY_KEY.get(key, {}).get("unit_of_measurement", ""),
+                datetime.fromtimestamp(row["bucket"]).strftime(STATISTICS_TIME_FORMAT),
+                round(row["last"], 3),
+                round(sums[key], 3),
+            ]
+        )
+        rows += 1
+    return rows
+
+
+def export_measurements(
+    store: HistoryStore,
+    start: float,
+    end: float,
+    out: TextIO,
+    keys: Optional[List[str]] = None,
+) -> int:
+    """
+    Schreibt Messwert-Statistiken (min/max/mean) als HA Importdatei.
+
+    Args:
+        store: Geöffnete HistoryStore
+        start: Unix-Timestamp Beginn
+        end: Unix-Timestamp Ende
+        out: Ziel-Datei (Text)
+        keys: Keys mit state_class measurement (default: alle)
+
+    Returns:
+        Anzahl geschriebener Zeilen
+    """
+    keys = keys or sorted(s["key"] for s in NUMERIC_SENSORS if s.get("state_class") == "measurement")
+    writer = csv.writer(out, delimiter="\t", lineterminator="\n")
+    writer.writerow(["statistic_id", "unit", "start", "min", "max", "mean"])
+
+    rows = 0
+    for row in _hourly(store, start, end, keys):
+        key = row["key"]
+        writer.writerow(
+            [
+                statistic_id(key),
+                SENSORS_BY_KEY.get(key, {}).get("unit_of_measurement", ""),
+                datetime.fromtimestamp(row["bucket"]).strftime(STATISTICS_TIME_FORMAT),
+                round(row["min"], 3),
+                round(row["max"], 3),
+                round(row["mean"], 3),
+            ]
+        )
+        rows += 1
+    return rows
+
+
+def _parse_time(value: str) -> float:
+    """ISO-Datum/Zeit (lokale Zeit) → Unix-Timestamp."""
+    return datetime.fromisoformat(value).timestamp()
+
+
+def _parse_sum_offset(value: str) -> Tuple[str, float]:
+    """KEY=SUM → (key, sum)."""
+    key, sep, number = value.partition("=")
+    if not sep or not key:
+        raise argparse.ArgumentTypeError(f"expected KEY=SUM, got {value!r}")
+    try:
+        return key, float(number)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid sum {number!r}") from None
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m bridge.replay",
+        description="Replay/backfill from the local huABus history",
+    )
+    parser.add_argument("--db", default=get_settings().history_path)
+    parser.add_argument("--start", required=True, type=_parse_time, help="ISO date/time, e.g. 2026-10-01T06:00")
+    parser.add_argument("--end", type=_parse_time, default=None, help="ISO date/time (default: now)")
+    parser.add_argument("--topic", help="Target topic (default: {HUAWEI_MODBUS_MQTT_TOPIC}/replay)")
+    parser.add_argument("--rate", type=float, default=10.0, help="Messages per second (0 = unthrottled)")
+    parser.add_argument("--keys", type=lambda s: s.split(","), help="Comma-separated keys for the exports")
+    parser.add_argument("--statistics", help="Write counter statistics (state/sum) to this file")
+    parser.add_argument("--measurements", help="Write measurement statistics (min/max/mean) to this file")
+    parser.add_argument(
+        "--sum-offset",
+        type=_parse_sum_offset,
+        action="append",
+        default=[],
+        metavar="KEY=SUM",
+        help="Continue the counter sum from the last HA statistic before --start (repeatable)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """CLI Entry-Point: Export(s) oder MQTT-Replay."""
+    from .main import init_logging
+
+    init_logging()
+    args = _parse_args(argv)
+    end = args.end if args.end is not None else time.time()
+
+    if not os.path.exists(args.db):
+        logger.error(f"History database not found: {args.db} (history_enabled?)")
+        return 1
+
+    store = HistoryStore(args.db).open()
+    try:
+        if args.statistics or args.measurements:
+            if args.statistics:
+                with open(args.statistics, "w", encoding="utf-8", newline="") as out:
+                    rows = export_statistics(store, args.start, end, out, args.keys, dict(args.sum_offset))
+                logger.info(f"📊 {rows} counter rows → {args.statistics}")
+            if args.measurements:
+                with open(args.measurements, "w", encoding="utf-8", newline="") as out:
+                    rows = export_measurements(store, args.start, end, out, args.keys)
+                logger.info(f"📊 {rows} measurement rows → {args.measurements}")
+            return 0
+
+        base_topic = get_settings().topic or "huawei-solar"
+        topic = args.topic or f"{base_topic}/replay"
+        if topic == base_topic:
+            logger.error("Replay topic must differ from the live topic")
+            return 1
+
+        client = _connect_replay_client()
+        try:
+            count = replay_to_mqtt(store, args.start, end, topic, args.rate, _client_publisher(client))
+        finally:
+            client.disconnect()
+            client.loop_stop()
+        logger.info(f"✅ Replayed {count} cycles → {topic}")
+        return 0
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
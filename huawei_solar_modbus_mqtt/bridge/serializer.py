@@ -0,0 +1,108 @@
+# bridge/serializer.py
+
+"""
+JSON-Serialisierung für den Cycle-Payload.
+
+Jeder Cycle wird der komplette Payload (~70 Keys, ~2 KB) zu JSON kodiert,
+im JSON-Log-Modus zusätzlich die Cycle-Zusammenfassung. Auf armhf (Pi 2/3
+32-bit) ist CPU knapp - der Encoder ist deshalb austauschbar:
+
+    orjson  Nativer Encoder (Rust), wenn installiert (optional, siehe Dockerfile)
+            ~6x schneller als json.dumps für den Cycle-Payload
+    json    Stdlib json.dumps mit kompakten Separatoren, immer verfügbar
+
+Auswahl über HUAWEI_PAYLOAD_ENCODER (auto|orjson|json).
+auto = orjson wenn installiert, sonst json.
+
+Beide Encoder liefern semantisch identisches, kompaktes JSON. Einziger
+Unterschied: NaN/Infinity werden von orjson als null kodiert (json.dumps
+erzeugt das ungültige NaN) - Modbus-Werte sind nie NaN.
+
+Benchmark: python -m tests.benchmarks.bench_serializer
+"""
+
+import json
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from .settings import get_settings
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+    HAS_ORJSON = False
+
+logger = logging.getLogger("huawei.serializer")
+
+ENCODERS = ("auto", "orjson", "json")
+
+
+def _json_dumps(data: Dict[str, Any]) -> bytes:
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def _orjson_dumps(data: Dict[str, Any]) -> bytes:
+    return orjson.dumps(data)  # type: ignore[union-attr]
+
+
+_encoder: Optional[Callable[[Dict[str, Any]], bytes]] = None
+_encoder_name = ""
+
+
+def get_encoder() -> Callable[[Dict[str, Any]], bytes]:
+    """
+    Gibt den konfigurierten Payload-Encoder zurück (Singleton).
+
+    ENV-Konfiguration:
+        HUAWEI_PAYLOAD_ENCODER: auto|orjson|json (default: auto)
+
+    Returns:
+        Funktion dict → JSON-Bytes
+    """
+    global _encoder, _encoder_name
+    if _encoder is not None:
+        return _encoder
+
+    name = get_settings().payload_encoder
+    if name not in ENCODERS:
+        logger.warning(f"Unknown payload encoder '{name}', using auto")
+        name = "auto"
+    if name == "orjson" and not HAS_ORJSON:
+        logger.warning("orjson not installed, using stdlib json")
+        name = "json"
+    if name == "auto":
+        name = "orjson" if HAS_ORJSON else "json"
+
+    _encoder = _orjson_dumps if name == "orjson" else _json_dumps
+    _encoder_name = name
+    logger.debug(f"Payload encoder: {name}")
+    return _encoder
+
+
+def encoder_name() -> str:
+    """Name des aktiven Encoders (für Logs/Benchmarks)."""
+    get_encoder()
+    return _encoder_name
+
+
+def reset_encoder() -> None:
+    """Setzt den Encoder zurück (Settings werden beim nächsten Aufruf neu gelesen)."""
+    global _encoder, _encoder_name
+    _encoder = None
+    _encoder_name = ""
+
+
+def dumps(data: Dict[str, Any]) -> bytes:
+    """
+    Kodiert data mit dem konfigurierten Encoder.
+
+    Args:
+        data: JSON-serialisierbares Dict (Payload, Log-Summary)
+
+    Returns:
+        UTF-8 JSON-Bytes (paho publish() akzeptiert bytes direkt)
+    """
+    return get_encoder()(data)
@@ -0,0 +1,371 @@
+# bridge/settings.py
+
+"""
+Typisierte Laufzeit-Konfiguration (einmal geladen und validiert).
+
+Problem:
+    Konfiguration war über main.py, mqtt_client.py und serializer.py verteilt
+    und wurde teils pro Cycle aus os.environ gelesen und mit int() geparst
+    (Topic, Poll-Intervall, Status-Timeout, Log-Format).
+
+Lösung:
+    Ein Settings-Objekt (frozen dataclass), einmal aus ENV geladen und
+    validiert, als Singleton über get_settings() verfügbar. Pro Cycle ist
+    das nur noch ein Attribut-Zugriff.
+
+Quellen:
+    - ENV (HUAWEI_*, gesetzt von run.sh oder .env) - Standard
+    - Optional /data/options.json (Add-on Optionen, siehe from_options())
+      für Betrieb ohne run.sh und als Basis für den Config-Reload
+
+Reload:
+    config_reload.py übernimmt geänderte Optionen nach os.environ,
+    reset_settings() verwirft den Cache, der nächste get_settings()-Aufruf
+    lädt neu. Frozen: Ein Cycle sieht nie halb geänderte Werte.
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass, fields
+from typing import Any, Dict, List, Mapping, Optional
+
+logger = logging.getLogger("huawei.settings")
+
+# Add-on Option → ENV-Variable (wie in run.sh)
+OPTION_ENV: Dict[str, str] = {
+    "modbus_host": "HUAWEI_MODBUS_HOST",
+    "modbus_port": "HUAWEI_MODBUS_PORT",
+    "slave_id": "HUAWEI_SLAVE_ID",
+    "mqtt_host": "HUAWEI_MODBUS_MQTT_BROKER",
+    "mqtt_port": "HUAWEI_MODBUS_MQTT_PORT",
+    "mqtt_user": "HUAWEI_MODBUS_MQTT_USER",
+    "mqtt_password": "HUAWEI_MODBUS_MQTT_PASSWORD",
+    "mqtt_topic": "HUAWEI_MODBUS_MQTT_TOPIC",
+    "discovery_retain": "HUAWEI_DISCOVERY_RETAIN",
+    "discovery_mode": "HUAWEI_DISCOVERY_MODE",
+    "log_level": "HUAWEI_LOG_LEVEL",
+    "status_timeout": "HUAWEI_STATUS_TIMEOUT",
+    "poll_interval": "HUAWEI_POLL_INTERVAL",
+    "fast_poll_threshold": "HUAWEI_FAST_POLL_THRESHOLD",
+    "fast_poll_interval": "HUAWEI_FAST_POLL_INTERVAL",
+    "fast_poll_hold": "HUAWEI_FAST_POLL_HOLD",
+    "idle_poll_interval": "HUAWEI_IDLE_POLL_INTERVAL",
+    "sample_interval": "HUAWEI_SAMPLE_INTERVAL",
+    "energy_integration": "HUAWEI_ENERGY_INTEGRATION",
+    "derived_metrics": "HUAWEI_DERIVED_METRICS",
+    "state_snapshot": "HUAWEI_STATE_SNAPSHOT",
+    "capability_discovery": "HUAWEI_CAPABILITY_DISCOVERY",
+    "register_profile": "HUAWEI_REGISTER_PROFILE",
+    "history_enabled": "HUAWEI_HISTORY_ENABLED",
+    "history_retention_days": "HUAWEI_HISTORY_RETENTION_DAYS",
+    "history_commit_interval": "HUAWEI_HISTORY_COMMIT_INTERVAL",
+    "binary_payload": "HUAWEI_BINARY_PAYLOAD",
+    "write_commands": "HUAWEI_WRITE_COMMANDS",
+    "write_min_interval": "HUAWEI_WRITE_MIN_INTERVAL",
+    "loop_monitor": "HUAWEI_LOOP_MONITOR",
+    "loop_lag_threshold": "HUAWEI_LOOP_LAG_THRESHOLD",
+}
+
+LOG_LEVELS = ("TRACE", "DEBUG", "INFO", "WARNING", "ERROR")
+
+# entity: eine Discovery-Message pro Entity, device: eine Message pro Gerät (HA 2024.11+)
+DISCOVERY_MODES = ("entity", "device")
+
+# Supervisor schreibt die Add-on Optionen hierhin (lokal: HUAWEI_OPTIONS_PATH)
+DEFAULT_OPTIONS_PATH = "/data/options.json"
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Alle Laufzeit-Optionen der Bridge (ENV-Name in Klammern)."""
+
+    # Modbus
+    modbus_host: str = ""  # HUAWEI_MODBUS_HOST (required)
+    modbus_port: int = 502  # HUAWEI_MODBUS_PORT
+    slave_id: int = 1  # HUAWEI_SLAVE_ID
+
+    # MQTT
+    mqtt_broker: str = ""  # HUAWEI_MODBUS_MQTT_BROKER (required)
+    mqtt_port: int = 1883  # HUAWEI_MODBUS_MQTT_PORT
+    mqtt_user: str = ""  # HUAWEI_MODBUS_MQTT_USER
+    mqtt_password: str = ""  # HUAWEI_MODBUS_MQTT_PASSWORD
+    topic: str = ""  # HUAWEI_MODBUS_MQTT_TOPIC (required)
+    discovery_retain: bool = True  # HUAWEI_DISCOVERY_RETAIN
+    discovery_mode: str = "entity"  # HUAWEI_DISCOVERY_MODE (entity|device)
+
+    # Logging
+    log_level: str = "INFO"  # HUAWEI_LOG_LEVEL
+    modbus_debug: bool = False  # HUAWEI_MODBUS_DEBUG=yes (Legacy)
+    log_format: str = "text"  # HUAWEI_LOG_FORMAT (text|json)
+
+    # Polling
+    status_timeout: int = 180  # HUAWEI_STATUS_TIMEOUT
+    poll_interval: int = 30  # HUAWEI_POLL_INTERVAL
+    fast_poll_threshold: float = 0  # HUAWEI_FAST_POLL_THRESHOLD
+    fast_poll_interval: float = 2  # HUAWEI_FAST_POLL_INTERVAL
+    fast_poll_hold: float = 60  # HUAWEI_FAST_POLL_HOLD
+    idle_poll_interval: float = 0  # HUAWEI_IDLE_POLL_INTERVAL
+    sample_interval: float = 0  # HUAWEI_SAMPLE_INTERVAL (0 = keine Fenster-Aggregation)
+
+    # Energie-Integration
+    energy_integration: bool = False  # HUAWEI_ENERGY_INTEGRATION
+    energy_state_path: str = "/data/energy.json"  # HUAWEI_ENERGY_STATE_PATH
+
+    # Abgeleitete Metriken
+    derived_metrics: bool = False  # HUAWEI_DERIVED_METRICS
+
+    # Snapshot des letzten Payloads
+    state_snapshot: bool = False  # HUAWEI_STATE_SNAPSHOT
+    state_snapshot_path: str = "/data/last_state.json"  # HUAWEI_STATE_SNAPSHOT_PATH
+
+    # Capability-Profil (Discovery nur für Sensoren mit Daten)
+    capability_discovery: bool = False  # HUAWEI_CAPABILITY_DISCOVERY
+    capability_profile_path: str = "/data/capabilities.json"  # HUAWEI_CAPABILITY_PROFILE_PATH
+
+    # Register-Profil aus python3 -m bridge.register_scan
+    register_profile: bool = False  # HUAWEI_REGISTER_PROFILE
+    register_profile_path: str = "/data/register_profile.json"  # HUAWEI_REGISTER_PROFILE_PATH
+
+    # History
+    history_enabled: bool = False  # HUAWEI_HISTORY_ENABLED
+    history_path: str = "/data/history.db"  # HUAWEI_HISTORY_PATH
+    history_retention_days: float = 7  # HUAWEI_HISTORY_RETENTION_DAYS
+    history_commit_interval: float = 300  # HUAWEI_HISTORY_COMMIT_INTERVAL
+
+    # Payload
+    binary_payload: bool = False  # HUAWEI_BINARY_PAYLOAD
+    payload_encoder: str = "auto"  # HUAWEI_PAYLOAD_ENCODER
+
+    # Schreib-Kommandos
+    write_commands: bool = False  # HUAWEI_WRITE_COMMANDS
+    write_min_interval: float = 10  # HUAWEI_WRITE_MIN_INTERVAL
+
+    # Diagnose
+    loop_monitor: bool = False  # HUAWEI_LOOP_MONITOR
+    loop_lag_threshold: float = 100  # HUAWEI_LOOP_LAG_THRESHOLD (ms)
+
+    # Config-Reload
+    options_path: str = DEFAULT_OPTIONS_PATH  # HUAWEI_OPTIONS_PATH
+
+    @classmethod
+    def from_env(cls, env: Optional[Mapping[str, str]] = None) -> "Settings":
+        """
+        Lädt und validiert Settings aus ENV-Variablen.
+
+        Args:
+            env: ENV-Mapping (default: os.environ)
+
+        Returns:
+            Validierte Settings
+
+        Raises:
+            ValueError: Wert nicht parsebar oder außerhalb des gültigen Bereichs
+        """
+        env = os.environ if env is None else env
+        default = cls()
+        settings = cls(
+            modbus_host=env.get("HUAWEI_MODBUS_HOST", default.modbus_host),
+            modbus_port=_int(env, "HUAWEI_MODBUS_PORT", default.modbus_port),
+            slave_id=_int(env, "HUAWEI_SLAVE_ID", default.slave_id),
+            mqtt_broker=env.get("HUAWEI_MODBUS_MQTT_BROKER", default.mqtt_broker),
+            mqtt_port=_int(env, "HUAWEI_MODBUS_MQTT_PORT", default.mqtt_port),
+            mqtt_user=env.get("HUAWEI_MODBUS_MQTT_USER", default.mqtt_user),
+            mqtt_password=env.get("HUAWEI_MODBUS_MQTT_PASSWORD", default.mqtt_password),
+            topic=env.get("HUAWEI_MODBUS_MQTT_TOPIC", default.topic),
+            discovery_retain=_bool(env, "HUAWEI_DISCOVERY_RETAIN", default.discovery_retain),
+            discovery_mode=env.get("HUAWEI_DISCOVERY_MODE", default.discovery_mode).lower() or default.discovery_mode,
+            log_level=_log_level(env.get("HUAWEI_LOG_LEVEL", default.log_level)),
+            modbus_debug=env.get("HUAWEI_MODBUS_DEBUG") == "yes",
+            log_format=env.get("HUAWEI_LOG_FORMAT", default.log_format).lower() or default.log_format,
+            status_timeout=_int(env, "HUAWEI_STATUS_TIMEOUT", default.status_timeout),
+            poll_interval=_int(env, "HUAWEI_POLL_INTERVAL", default.poll_interval),
+            fast_poll_threshold=_float(env, "HUAWEI_FAST_POLL_THRESHOLD", default.fast_poll_threshold),
+            fast_poll_interval=_float(env, "HUAWEI_FAST_POLL_INTERVAL", default.fast_poll_interval),
+            fast_poll_hold=_float(env, "HUAWEI_FAST_POLL_HOLD", default.fast_poll_hold),
+            idle_poll_interval=_float(env, "HUAWEI_IDLE_POLL_INTERVAL", default.idle_poll_interval),
+            sample_interval=_float(env, "HUAWEI_SAMPLE_INTERVAL", default.sample_interval),
+            energy_integration=_bool(env, "HUAWEI_ENERGY_INTEGRATION", default.energy_integration),
+            energy_state_path=env.get("HUAWEI_ENERGY_STATE_PATH", default.energy_state_path),
+            derived_metrics=_bool(env, "HUAWEI_DERIVED_METRICS", default.derived_metrics),
+            state_snapshot=_bool(env, "HUAWEI_STATE_SNAPSHOT", default.state_snapshot),
+            state_snapshot_path=env.get("HUAWEI_STATE_SNAPSHOT_PATH", default.state_snapshot_path),
+            capability_discovery=_bool(env, "HUAWEI_CAPABILITY_DISCOVERY", default.capability_discovery),
+            capability_profile_path=env.get("HUAWEI_CAPABILITY_PROFILE_PATH", default.capability_profile_path),
+            register_profile=_bool(env, "HUAWEI_REGISTER_PROFILE", default.register_profile),
+            register_profile_path=env.get("HUAWEI_REGISTER_PROFILE_PATH", default.register_profile_path),
+            history_enabled=_bool(env, "HUAWEI_HISTORY_ENABLED", default.history_enabled),
+            history_path=env.get("HUAWEI_HISTORY_PATH", default.history_path),
+            history_retention_days=_float(env, "HUAWEI_HISTORY_RETENTION_DAYS", default.history_retention_days),
+            history_commit_interval=_float(env, "HUAWEI_HISTORY_COMMIT_INTERVAL", default.history_commit_interval),
+            binary_payload=_bool(env, "HUAWEI_BINARY_PAYLOAD", default.binary_payload),
+            payload_encoder=env.get("HUAWEI_PAYLOAD_ENCODER", default.payload_encoder).lower(),
+            write_commands=_bool(env, "HUAWEI_WRITE_COMMANDS", default.write_commands),
+            write_min_interval=_float(env, "HUAWEI_WRITE_MIN_INTERVAL", default.write_min_interval),
+            loop_monitor=_bool(env, "HUAWEI_LOOP_MONITOR", default.loop_monitor),
+            loop_lag_threshold=_float(env, "HUAWEI_LOOP_LAG_THRESHOLD", default.loop_lag_threshold),
+            options_path=env.get("HUAWEI_OPTIONS_PATH", default.options_path),
+        )
+        settings.validate()
+        return settings
+
+    @classmethod
+    def from_options(cls, path: str, env: Optional[Mapping[str, str]] = None) -> "Settings":
+        """
+        Lädt Settings aus der Add-on options.json, ENV liefert fehlende Werte.
+
+        Args:
+            path: Pfad zur options.json (Supervisor: /data/options.json)
+            env: Basis-ENV (default: os.environ)
+
+        Raises:
+            OSError: Datei nicht lesbar
+            ValueError: Kein gültiges JSON oder ungültige Werte
+        """
+        with open(path, encoding="utf-8") as f:
+            options = json.load(f)
+        merged = dict(os.environ if env is None else env)
+        merged.update(options_to_env(options))
+        return cls.from_env(merged)
+
+    def validate(self) -> None:
+        """
+        Prüft Wertebereiche (Pflichtfelder prüft missing()).
+
+        Raises:
+            ValueError: Mit allen gefundenen Problemen in einer Meldung
+        """
+        errors = []
+        for name in ("modbus_port", "mqtt_port"):
+            if not 0 < getattr(self, name) < 65536:
+                errors.append(f"{name} must be 1-65535")
+        if not 0 <= self.slave_id <= 247:
+            errors.append("slave_id must be 0-247")
+        for name in (
+            "status_timeout",
+            "poll_interval",
+            "fast_poll_interval",
+            "history_commit_interval",
+            "loop_lag_threshold",
+        ):
+            if getattr(self, name) <= 0:
+                errors.append(f"{name} must be > 0")
+        for name in (
+            "fast_poll_threshold",
+            "fast_poll_hold",
+            "idle_poll_interval",
+            "sample_interval",
+            "history_retention_days",
+            "write_min_interval",
+        ):
+            if getattr(self, name) < 0:
+                errors.append(f"{name} must be >= 0")
+        if self.discovery_mode not in DISCOVERY_MODES:
+            errors.append(f"discovery_mode must be one of {', '.join(DISCOVERY_MODES)}")
+        if 0 < self.poll_interval <= self.sample_interval:
+            errors.append("sample_interval must be < poll_interval")
+        if errors:
+            raise ValueError("Invalid configuration: " + ", ".join(errors))
+
+    def missing(self) -> List[str]:
+        """ENV-Namen der fehlenden Pflichtfelder (leer = vollständig)."""
+        required = {
+            "HUAWEI_MODBUS_MQTT_TOPIC": self.topic,
+            "HUAWEI_MODBUS_HOST": self.modbus_host,
+        }
+        return [env for env, value in required.items() if not value]
+
+    def changed_fields(self, other: "Settings") -> List[str]:
+        """Namen der Felder die sich gegenüber other unterscheiden."""
+        return [f.name for f in fields(self) if getattr(self, f.name) != getattr(other, f.name)]
+
+
+def options_to_env(options: Mapping[str, Any]) -> Dict[str, str]:
+    """
+    Übersetzt Add-on Optionen in ENV-Werte (wie run.sh / bashio::config).
+
+    Unbekannte und leere Optionen werden ignoriert, Booleans klein geschrieben.
+    """
+    env = {}
+    for option, value in options.items():
+        name = OPTION_ENV.get(option)
+        # Leere Optionen (z.B. mqtt_host) → ENV-Wert bleibt (run.sh nutzt dann MQTT-Service)
+        if name is None or value is None or value == "":
+            continue
+        env[name] = ("true" if value else "false") if isinstance(value, bool) else str(value)
+    return env
+
+
+def _log_level(raw: str) -> str:
+    # Unbekanntes Level ist kein Startabbruch - wie bisher Fallback auf INFO
+    level = raw.upper()
+    if level not in LOG_LEVELS:
+        logger.warning(f"Unknown log level '{raw}', using INFO")
+        return "INFO"
+    return level
+
+
+def _int(env: Mapping[str, str], name: str, default: int) -> int:
+    raw = env.get(name, "")
+    if raw == "":
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got '{raw}'") from None
+
+
+def _float(env: Mapping[str, str], name: str, default: float) -> float:
+    raw = env.get(name, "")
+    if raw == "":
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be a number, got '{raw}'") from None
+
+
+def _bool(env: Mapping[str, str], name: str, default: bool) -> bool:
+    raw = env.get(name, "")
+    if raw == "":
+        return default
+    return raw.lower() in ("true", "1", "yes", "on")
+
+
+_settings: Optional[Settings] = None
+
+
+def load_settings() -> Settings:
+    """
+    Lädt Settings aus ENV oder - ohne run.sh - direkt aus der options.json.
+
+    Ist HUAWEI_MODBUS_HOST nicht gesetzt (Start ohne run.sh) und existiert
+    die options.json, werden die Add-on Optionen gelesen.
+
+    Raises:
+        ValueError: Ungültige Werte (Meldung nennt alle Probleme)
+    """
+    path = os.environ.get("HUAWEI_OPTIONS_PATH", DEFAULT_OPTIONS_PATH)
+    if "HUAWEI_MODBUS_HOST" not in os.environ and os.path.exists(path):
+        logger.debug(f"Loading options from {path}")
+        return Settings.from_options(path)
+    return Settings.from_env()
+
+
+def get_settings() -> Settings:
+    """
+    Gibt die Settings zurück (Singleton, beim ersten Aufruf geladen).
+
+    Raises:
+        ValueError: Beim ersten Aufruf, wenn die Konfiguration ungültig ist
+    """
+    global _settings
+    if _settings is None:
+        _settings = load_settings()
+    return _settings
+
+
+def reset_settings() -> None:
+    """Verwirft den Cache - nächster get_settings()-Aufruf liest ENV neu."""
+    global _settings
+    _settings = None
@@ -0,0 +1,92 @@
+# bridge/state_snapshot.py
+
+"""
+Letzter publizierter Zustand als Snapshot in /data (sofortige Daten nach Neustart).
+
+Problem:
+    Nach einem Neustart vergehen Discovery, AsyncHuaweiSolar.create (auf dem
+    SDongle oft 5-15s) und ein voller erster Cycle, bevor wieder Daten auf
+    {topic} stehen. Ohne Broker-Persistenz (Broker-Neustart) ist der
+    retained Payload in dieser Zeit ganz weg.
+
+Lösung (HUAWEI_STATE_SNAPSHOT):
+    - Der zuletzt publizierte Payload wird als JSON in /data geschrieben
+      (atomar via os.replace), alle save_interval Sekunden und beim Beenden
+    - Beim Start wird er direkt nach dem MQTT-Connect erneut publiziert -
+      mit dem ursprünglichen last_update und "stale": true, damit Consumer
+      ihn vom ersten echten Cycle unterscheiden können
+    - Der erste volle Cycle überschreibt ihn (ohne "stale")
+
+Keine zusätzlichen Modbus-Reads - nur der bereits publizierte Payload.
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("huawei.snapshot")
+
+
+class StateSnapshot:
+    """Persistiert den letzten publizierten Payload für den Replay beim Start."""
+
+    def __init__(self, path: str, save_interval: float = 300.0):
+        """
+        Initialisiert den Snapshot.
+
+        Args:
+            path: JSON-Datei für den Payload
+            save_interval: Mindestabstand zwischen zwei Speichervorgängen (s)
+        """
+        self.path = path
+        self.save_interval = save_interval
+        self._data: Optional[Dict[str, Any]] = None
+        self._last_save = time.monotonic()
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Lädt den gespeicherten Payload.
+
+        Returns:
+            Payload inkl. last_update, None ohne (gültigen) Snapshot
+        """
+        if not self.path or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+            data = saved["data"]
+            if not isinstance(data, dict) or not isinstance(data.get("last_update"), (int, float)):
+                raise ValueError("no last_update")
+            return data
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"State snapshot not loaded ({self.path}): {e}")
+            return None
+
+    def update(self, data: Dict[str, Any]) -> None:
+        """Merkt sich den zuletzt publizierten Payload (Referenz, keine Kopie)."""
+        self._data = data
+
+    def save_if_due(self) -> None:
+        """Speichert wenn save_interval seit dem letzten Speichern vergangen ist."""
+        if time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
+
+    def save(self) -> None:
+        """Schreibt den Payload atomar (tmp-Datei + os.replace)."""
+        self._last_save = time.monotonic()
+        if not self.path or self._data is None:
+            return
+        tmp = f"{self.path}.tmp"
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"saved_at": int(time.time()), "data": self._data}, f, default=str)
+            os.replace(tmp, self.path)
+            self._data = None
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"State snapshot not saved ({self.path}): {e}")
@@ -41,16 +41,30 @@ class TotalIncreasingFilter:
             data: Sensor-Daten aus transform.py
 
         Returns:
-            Gefiltertes Dictionary
+            Gefiltertes Dictionary (Kopie, data bleibt unverändert)
+        """
+        return self.apply(data.copy())
+
+    def apply(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Wie filter(), aber direkt auf result (ohne Kopie).
+
+        Für transform_filtered(): Das frisch gebaute Publish-Dict wird
+        in-place korrigiert, statt ein weiteres Dict anzulegen.
+
+        Args:
+            result: Sensor-Daten, werden verändert
+
+        Returns:
+            result (dasselbe Objekt)
         """
-        result = data.copy()
         filtered_count = 0
         missing_count = 0
 
         # ALLE total_increasing Keys prüfen (auch fehlende!)
         for key in self.TOTAL_INCREASING_KEYS:
             # 1. Key fehlt komplett? → Auffüllen mit letztem Wert
-            if key not in data:
+            if key not in result:
                 last = self._last_values.get(key)
                 if last is not None:
                     result[key] = last
@@ -59,7 +73,7 @@ class TotalIncreasingFilter:
                 continue  # Nächster Key
 
             # 2. Key ist da → Prüfen ob filtern
-            value = data[key]
+            value = result[key]
 
             if not isinstance(value, (int, float)):
                 continue
@@ -30,9 +30,10 @@ werden kann und von Home Assistant verstanden wird.
 
 import logging
 import time
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from .config.mappings import CRITICAL_DEFAULTS, REGISTER_MAPPING
+from .total_increasing_filter import TotalIncreasingFilter
 
 logger = logging.getLogger("huawei.transform")
 
@@ -108,6 +109,86 @@ def transform_data(data: Dict[str, Any]) -> Dict[str, Any]:
     return result
 
 
+def transform_filtered(
+    data: Dict[str, Any],
+    filter_instance: TotalIncreasingFilter,
+    timings: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """
+    Transform + total_increasing Filter in einem Durchlauf (Cycle-Pfad).
+
+    Liefert dasselbe Ergebnis wie filter_instance.filter(transform_data(data)),
+    baut aber nur EIN Dict:
+    - Register werden einmal durchlaufen (Mapping + Modbus-Platzhalter),
+      None-Werte gar nicht erst eingetragen (kein _cleanup_result()-Kopie)
+    - Critical Defaults nur für fehlende Keys
+    - Counter-Schutz in-place via filter_instance.apply() (keine Kopie)
+    - Kein last_update - das setzt publish_data() genau einmal
+
+    Args:
+        data: Dict mit Modbus-Register-Daten aus read_registers()
+        filter_instance: TotalIncreasingFilter (meist get_filter())
+        timings: Optional - erhält "transform" und "filter" Dauer in Sekunden,
+                 damit log_cycle_summary() weiter pro Phase berichtet
+
+    Returns:
+        Publish-fertiges Dict (ohne last_update)
+    """
+    start = time.perf_counter()
+
+    result: Dict[str, Any] = {}
+    for register_key, mqtt_key in REGISTER_MAPPING.items():
+        raw = data.get(register_key)
+        if raw is None:
+            continue
+        value = get_value(raw)
+        if value is not None:
+            result[mqtt_key] = value
+
+    for key, default in CRITICAL_DEFAULTS.items():
+        if key not in result:
+            logger.warning(f"Critical '{key}' missing, using {default}")
+            result[key] = default
+
+    filter_start = time.perf_counter()
+    filter_instance.apply(result)
+
+    if timings is not None:
+        timings["transform"] = filter_start - start
+        timings["filter"] = time.perf_counter() - filter_start
+
+    return result
+
+
+def transform_partial(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Transformiert nur die tatsächlich gelesenen Register (Fast-Tier).
+
+    Im Gegensatz zu transform_data() werden keine Critical Defaults gesetzt
+    und kein Timestamp hinzugefügt: Das Ergebnis wird in den zuletzt
+    publizierten Payload gemergt, fehlende Keys behalten dort ihren Wert.
+
+    Args:
+        data: Dict mit Modbus-Register-Daten (Teilmenge, z.B. FAST_REGISTERS)
+
+    Returns:
+        Dict mit MQTT-Keys nur für gültige Werte
+
+    Beispiel:
+        >>> transform_partial({"input_power": RegisterValue(value=4800)})
+        {"power_input": 4800}
+    """
+    result = {}
+    for register_key, value in data.items():
+        mqtt_key = REGISTER_MAPPING.get(register_key)
+        if mqtt_key is None:
+            continue
+        value = get_value(value)
+        if value is not None:
+            result[mqtt_key] = value
+    return result
+
+
 def get_value(value):
     """
     Extrahiert Wert aus Register-Result und filtert spezielle Fälle.
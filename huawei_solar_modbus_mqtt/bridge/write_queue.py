@@ -0,0 +1,209 @@
+# bridge/write_queue.py
+
+"""
+Kontrollierter Schreibpfad für Inverter-Register (MQTT-Kommandos).
+
+Problem:
+    Ein EMS soll Batterie-Lade-/Entladelimits steuern, die Bridge konnte
+    bisher nur lesen. Der SDongle erlaubt genau eine Modbus-Verbindung -
+    Writes müssen über den Client der Bridge laufen, ohne den Poll-Cycle
+    zu stören und ohne den Inverter mit Writes zu fluten (EMS-Regler
+    schicken gern jede Sekunde einen neuen Sollwert).
+
+Lösung:
+    {topic}/command/set/<key> (Payload: Zahl) legt einen Write in die Queue,
+    erlaubt sind nur die Keys aus WRITABLE_REGISTERS (config/registers.py).
+
+    - Coalescing: pro Register zählt nur der letzte Wert - ein noch nicht
+      geschriebener Sollwert wird vom neueren ersetzt
+    - Rate-Limit: pro Register höchstens ein Write alle min_interval Sekunden,
+      spätere Werte warten (und werden weiter gecoalesced)
+    - Priorität: main.write_worker() wartet auf fällige Writes und schreibt
+      über den ModbusScheduler mit Priorität CONTROL - die Latenz ist damit
+      auch mitten im vollen Read auf einen Register-Read begrenzt
+    - Read-Back: nach jedem Write wird das Register sofort zurückgelesen,
+      das Ergebnis geht auf {topic}/command/set/<key>/result
+
+Thread-Sicherheit:
+    submit() läuft im paho-Thread (Lock + call_soon_threadsafe),
+    wait()/flush() im asyncio-Loop (write_worker-Task).
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .config.registers import WRITABLE_REGISTERS
+from .settings import get_settings
+
+logger = logging.getLogger("huawei.write")
+
+
+class WriteQueue:
+    """Gecoalescte, rate-limitierte Register-Writes mit Read-Back."""
+
+    def __init__(self, min_interval: float = 10.0):
+        """
+        Initialisiert die Queue.
+
+        Args:
+            min_interval: Mindestabstand zwischen zwei Writes auf dasselbe Register (Sekunden)
+        """
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._pending: Dict[str, int] = {}
+        # Register-Key → frühester nächster Write (time.monotonic())
+        self._next_allowed: Dict[str, float] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup = asyncio.Event()
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Verknüpft die Queue mit dem asyncio-Loop (für das Wecken aus dem paho-Thread)."""
+        self._loop = loop
+
+    def submit(self, key: str, payload: str) -> int:
+        """
+        Legt einen Write in die Queue (neuerer Wert ersetzt einen wartenden).
+
+        Args:
+            key: Key aus WRITABLE_REGISTERS (z.B. "battery_max_charging_power")
+            payload: Sollwert als Text, ganzzahlig in der Register-Einheit
+                     ("2500" oder "2500.0"; "2500.4" wird abgelehnt statt gerundet)
+
+        Returns:
+            Der gequeute Wert
+
+        Raises:
+            ValueError: Unbekannter Key, keine ganze Zahl oder außerhalb des Bereichs
+        """
+        if key not in WRITABLE_REGISTERS:
+            raise ValueError(f"'{key}' is not writable")
+        _, low, high = WRITABLE_REGISTERS[key]
+        try:
+            number = float(payload)
+        except (TypeError, ValueError):
+            raise ValueError(f"{key}: '{payload}' is not a number") from None
+        # Kein stilles Runden: ein EMS soll merken, wenn sein Sollwert nicht passt
+        if not number.is_integer():
+            raise ValueError(f"{key}: '{payload}' is not a whole number")
+        value = int(number)
+        if not low <= value <= high:
+            raise ValueError(f"{key}: {value} out of range {low}-{high}")
+
+        with self._lock:
+            replaced = self._pending.get(key)
+            self._pending[key] = value
+        if replaced is not None:
+            logger.debug(f"✏️ {key}: {replaced} → {value} (coalesced)")
+        else:
+            logger.info(f"✏️ {key} = {value} queued")
+
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        return value
+
+    @property
+    def pending(self) -> Dict[str, int]:
+        """Kopie der wartenden Writes (key → Wert)."""
+        with self._lock:
+            return dict(self._pending)
+
+    def next_due(self, now: Optional[float] = None) -> Optional[float]:
+        """
+        Sekunden bis der nächste wartende Write erlaubt ist.
+
+        Returns:
+            0 = sofort fällig, None = nichts in der Queue
+        """
+        if not self._pending:
+            return None
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            keys = list(self._pending)
+        return max(0.0, min(self._next_allowed.get(key, 0.0) for key in keys) - now)
+
+    def is_due(self) -> bool:
+        """True wenn mindestens ein Write jetzt geschrieben werden darf (billig, pro Register-Read)."""
+        return self.next_due() == 0
+
+    async def wait(self, timeout: float) -> bool:
+        """
+        Wartet bis ein Write fällig ist, höchstens timeout Sekunden.
+
+        Returns:
+            True wenn jetzt ein Write fällig ist
+        """
+        # Erst clear, dann prüfen: ein submit() danach weckt zuverlässig
+        self._wakeup.clear()
+        delay = self.next_due()
+        if delay == 0:
+            return True
+        if delay is not None:
+            timeout = min(timeout, delay)
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.is_due()
+
+    async def flush(self, client: Any) -> List[Dict[str, Any]]:
+        """
+        Schreibt alle fälligen Writes und liest sie zurück.
+
+        Fehler einzelner Writes werden im Ergebnis gemeldet, nicht geworfen -
+        der laufende Read soll weiterlaufen. Ein fehlgeschlagener Write wird
+        nicht wiederholt (das EMS schickt ohnehin den nächsten Sollwert).
+
+        Args:
+            client: AsyncHuaweiSolar Client (muss verbunden sein)
+
+        Returns:
+            Ein Ergebnis pro Write: key, register, value, readback, ok, error
+        """
+        now = time.monotonic()
+        with self._lock:
+            due = {key: value for key, value in self._pending.items() if self._next_allowed.get(key, 0.0) <= now}
+            for key in due:
+                del self._pending[key]
+
+        results = []
+        for key, value in due.items():
+            register = WRITABLE_REGISTERS[key][0]
+            self._next_allowed[key] = now + self.min_interval
+            result: Dict[str, Any] = {"key": key, "register": register, "value": value, "readback": None, "ok": False}
+            start = time.time()
+            try:
+                await client.set(register, value)
+                result["readback"] = (await client.get(register)).value
+                result["ok"] = result["readback"] == value
+                if not result["ok"]:
+                    result["error"] = "read-back mismatch"
+            except Exception as e:
+                result["error"] = str(e) or type(e).__name__
+
+            if result["ok"]:
+                logger.info(f"✏️ {key} = {value} written ({time.time() - start:.2f}s, confirmed)")
+            else:
+                logger.warning(f"✏️ {key} = {value} failed: {result['error']} (read-back: {result['readback']})")
+            results.append(result)
+        return results
+
+
+# Singleton-Instanz
+_write_queue: Optional[WriteQueue] = None
+
+
+def get_write_queue() -> WriteQueue:
+    """Gibt Singleton-Instanz zurück (Rate-Limit aus den Settings)."""
+    global _write_queue
+    if _write_queue is None:
+        _write_queue = WriteQueue(min_interval=get_settings().write_min_interval)
+    return _write_queue
+
+
+def reset_write_queue() -> None:
+    """Setzt Singleton zurück (wartende Writes gehen verloren)."""
+    global _write_queue
+    _write_queue = None
@@ -17,9 +17,56 @@ export HUAWEI_SLAVE_ID=$(bashio::config 'slave_id')
 
 # MQTT Topic & Intervals
 export HUAWEI_MODBUS_MQTT_TOPIC=$(bashio::config 'mqtt_topic')
+export HUAWEI_DISCOVERY_RETAIN=$(bashio::config 'discovery_retain')
+export HUAWEI_DISCOVERY_MODE=$(bashio::config 'discovery_mode')
 export HUAWEI_STATUS_TIMEOUT=$(bashio::config 'status_timeout')
 export HUAWEI_POLL_INTERVAL=$(bashio::config 'poll_interval')
 
+# Burst Mode (fast reads on large power changes, 0 = disabled)
+export HUAWEI_FAST_POLL_THRESHOLD=$(bashio::config 'fast_poll_threshold')
+export HUAWEI_FAST_POLL_INTERVAL=$(bashio::config 'fast_poll_interval')
+export HUAWEI_FAST_POLL_HOLD=$(bashio::config 'fast_poll_hold')
+export HUAWEI_IDLE_POLL_INTERVAL=$(bashio::config 'idle_poll_interval')
+
+# Window Aggregation (sample power every N seconds, publish mean/min/max per poll interval, 0 = disabled)
+export HUAWEI_SAMPLE_INTERVAL=$(bashio::config 'sample_interval')
+
+# Energy Integration (kWh counters integrated from power samples, state survives restarts)
+export HUAWEI_ENERGY_INTEGRATION=$(bashio::config 'energy_integration')
+export HUAWEI_ENERGY_STATE_PATH=/data/energy.json
+
+# Derived Metrics (house load, self-consumption, autarky, PV string power, phase imbalance)
+export HUAWEI_DERIVED_METRICS=$(bashio::config 'derived_metrics')
+
+# Last State Snapshot (re-published immediately at startup)
+export HUAWEI_STATE_SNAPSHOT=$(bashio::config 'state_snapshot')
+export HUAWEI_STATE_SNAPSHOT_PATH=/data/last_state.json
+
+# Capability Discovery (only sensors that delivered data are announced, profile in /data)
+export HUAWEI_CAPABILITY_DISCOVERY=$(bashio::config 'capability_discovery')
+export HUAWEI_CAPABILITY_PROFILE_PATH=/data/capabilities.json
+
+# Register Profile (result of python3 -m bridge.register_scan, unsupported registers are skipped)
+export HUAWEI_REGISTER_PROFILE=$(bashio::config 'register_profile')
+export HUAWEI_REGISTER_PROFILE_PATH=/data/register_profile.json
+
+# Local History (SQLite in /data, survives add-on updates)
+export HUAWEI_HISTORY_ENABLED=$(bashio::config 'history_enabled')
+export HUAWEI_HISTORY_PATH=/data/history.db
+export HUAWEI_HISTORY_RETENTION_DAYS=$(bashio::config 'history_retention_days')
+export HUAWEI_HISTORY_COMMIT_INTERVAL=$(bashio::config 'history_commit_interval')
+
+# Binary Payload (MessagePack on {topic}/binary for non-HA consumers)
+export HUAWEI_BINARY_PAYLOAD=$(bashio::config 'binary_payload')
+
+# Write Commands (MQTT → Modbus register writes, coalesced and rate-limited)
+export HUAWEI_WRITE_COMMANDS=$(bashio::config 'write_commands')
+export HUAWEI_WRITE_MIN_INTERVAL=$(bashio::config 'write_min_interval')
+
+# Event-Loop Monitor (lag metric on {topic}/diagnostics/loop, stack of blocking calls in the log)
+export HUAWEI_LOOP_MONITOR=$(bashio::config 'loop_monitor')
+export HUAWEI_LOOP_LAG_THRESHOLD=$(bashio::config 'loop_lag_threshold')
+
 # Log Level Configuration
 export HUAWEI_LOG_LEVEL=$(bashio::config 'log_level')
 
@@ -84,7 +131,49 @@ else
 fi
 
 echo "[$(date +'%T')] INFO:  📍 Topic: ${HUAWEI_MODBUS_MQTT_TOPIC}"
+if [ "${HUAWEI_DISCOVERY_RETAIN}" = "false" ]; then
+	echo "[$(date +'%T')] INFO:  🔍 Discovery: not retained (sent on Home Assistant birth message)"
+fi
+if [ "${HUAWEI_DISCOVERY_MODE}" = "device" ]; then
+	echo "[$(date +'%T')] INFO:  🔍 Discovery: one device message (homeassistant/device/huawei_solar/config)"
+fi
 echo "[$(date +'%T')] INFO:  ⏱️  Poll: ${HUAWEI_POLL_INTERVAL}s | Timeout: ${HUAWEI_STATUS_TIMEOUT}s"
+if [ "${HUAWEI_FAST_POLL_THRESHOLD:-0}" != "0" ]; then
+	echo "[$(date +'%T')] INFO:  ⚡ Burst: >${HUAWEI_FAST_POLL_THRESHOLD}W → ${HUAWEI_FAST_POLL_INTERVAL}s for ${HUAWEI_FAST_POLL_HOLD}s"
+fi
+if [ "${HUAWEI_IDLE_POLL_INTERVAL:-0}" != "0" ]; then
+	echo "[$(date +'%T')] INFO:  🌙 Idle: full read every ${HUAWEI_IDLE_POLL_INTERVAL}s at night"
+fi
+if [ "${HUAWEI_SAMPLE_INTERVAL:-0}" != "0" ]; then
+	echo "[$(date +'%T')] INFO:  📐 Aggregation: power sampled every ${HUAWEI_SAMPLE_INTERVAL}s, mean/min/max every ${HUAWEI_POLL_INTERVAL}s"
+fi
+if [ "${HUAWEI_ENERGY_INTEGRATION}" = "true" ]; then
+	echo "[$(date +'%T')] INFO:  🔋 Energy integration: ${HUAWEI_ENERGY_STATE_PATH}"
+fi
+if [ "${HUAWEI_DERIVED_METRICS}" = "true" ]; then
+	echo "[$(date +'%T')] INFO:  🧮 Derived metrics: enabled"
+fi
+if [ "${HUAWEI_STATE_SNAPSHOT}" = "true" ]; then
+	echo "[$(date +'%T')] INFO:  ⏪ State snapshot: ${HUAWEI_STATE_SNAPSHOT_PATH}"
+fi
+if [ "${HUAWEI_CAPABILITY_DISCOVERY}" = "true" ]; then
+	echo "[$(date +'%T')] INFO:  🧩 Capability discovery: ${HUAWEI_CAPABILITY_PROFILE_PATH}"
+fi
+if [ "${HUAWEI_REGISTER_PROFILE}" = "true" ]; then
+	echo "[$(date +'%T')] INFO:  📋 Register profile: ${HUAWEI_REGISTER_PROFILE_PATH}"
+fi
+if [ "${HUAWEI_HISTORY_ENABLED}" = "true" ]; then
+	echo "[$(date +'%T')] INFO:  💾 History: ${HUAWEI_HISTORY_PATH} (${HUAWEI_HISTORY_RETENTION_DAYS} days raw)"
+fi
+if [ "${HUAWEI_BINARY_PAYLOAD}" = "true" ]; then
+	echo "[$(date +'%T')] INFO:  📦 Binary: ${HUAWEI_MODBUS_MQTT_TOPIC}/binary (MessagePack)"
+fi
+if [ "${HUAWEI_WRITE_COMMANDS}" = "true" ]; then
+	echo "[$(date +'%T')] INFO:  ✏️ Writes: ${HUAWEI_MODBUS_MQTT_TOPIC}/command/set/<key> (every ${HUAWEI_WRITE_MIN_INTERVAL}s max.)"
+fi
+if [ "${HUAWEI_LOOP_MONITOR}" = "true" ]; then
+	echo "[$(date +'%T')] INFO:  🐢 Loop monitor: ${HUAWEI_MODBUS_MQTT_TOPIC}/diagnostics/loop (stack when blocked >${HUAWEI_LOOP_LAG_THRESHOLD}ms)"
+fi
 
 # Registerzähler
 REGISTER_COUNT=58
@@ -0,0 +1,3 @@
+# tests\benchmarks\__init__.py
+
+"""Benchmarks - werden nicht von pytest gesammelt (bench_*.py statt test_*.py)."""
@@ -0,0 +1,152 @@
+# tests\benchmarks\bench_cycle.py
+
+"""Cycle-Benchmark: echter main_once()-Pipeline gegen latenz-modellierten Inverter.
+
+Misst Durchsatz, p50/p99 Cycle-Latenz und CPU-Zeit pro Cycle für
+Read → Transform → Filter → Publish. Modbus kommt aus SimulatedHuaweiSolar
+(RTT, Jitter, Timeouts), MQTT aus MockPahoClient (kein Broker nötig).
+
+Aufruf (aus Repo-Root):
+    python -m tests.benchmarks.bench_cycle --cycles 50 --rtt-ms 40 --jitter-ms 10
+    python -m tests.benchmarks.bench_cycle --rtt-ms 0 --cycles 2000 --output base.json
+    python -m tests.benchmarks.bench_cycle --rtt-ms 0 --cycles 2000 --compare base.json
+
+Mit --rtt-ms 0 misst der Benchmark reinen Python-Overhead (CPU-bound),
+mit realistischer RTT (30-80ms beim SDongle) das Scheduling-Verhalten.
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Any, Dict, List
+
+from tests.benchmarks.common import (
+    compare_reports,
+    environment_info,
+    latency_summary,
+    quiet_logging,
+    write_report,
+)
+from tests.fixtures.mock_mqtt_broker import MockPahoClient
+from tests.fixtures.simulated_inverter import LatencyModel, SimulatedHuaweiSolar, SimulatorStats
+
+COMPARE_METRICS = [
+    "throughput.cycles_per_s",
+    "latency.p50_ms",
+    "latency.p99_ms",
+    "cpu.per_cycle_ms",
+]
+
+
+async def run_benchmark(
+    cycles: int,
+    latency: LatencyModel,
+    seed: int = 42,
+    warmup: int = 3,
+    topic: str = "bench/huawei",
+) -> Dict[str, Any]:
+    """Führt main_once() `cycles` mal aus und liefert den Report."""
+    import bridge.mqtt_client as mqtt_module
+    from bridge.main import main_once
+    from bridge.settings import reset_settings
+    from bridge.total_increasing_filter import reset_filter
+
+    os.environ["HUAWEI_MODBUS_MQTT_TOPIC"] = topic
+    os.environ.setdefault("HUAWEI_POLL_INTERVAL", "30")
+    reset_settings()
+
+    paho = MockPahoClient()
+    mqtt_module._mqtt_client = paho  # type: ignore[assignment]
+    mqtt_module._is_connected = True
+    reset_filter()
+
+    client = SimulatedHuaweiSolar(latency=latency, seed=seed)
+    await client.connect()
+
+    try:
+        for n in range(warmup):
+            await main_once(client, n + 1)  # type: ignore[arg-type]
+        client.stats = SimulatorStats()
+        paho.broker.clear()
+
+        samples: List[float] = []
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        for n in range(cycles):
+            start = time.perf_counter()
+            await main_once(client, warmup + n + 1)  # type: ignore[arg-type]
+            samples.append(time.perf_counter() - start)
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+    finally:
+        await client.stop()
+        mqtt_module._mqtt_client = None
+        mqtt_module._is_connected = False
+        reset_filter()
+
+    published = len(paho.broker.get_messages(topic))
+    return {
+        "benchmark": "cycle",
+        "env": environment_info(),
+        "params": {
+            "cycles": cycles,
+            "warmup": warmup,
+            "seed": seed,
+            "rtt_ms": latency.rtt * 1000,
+            "jitter_ms": latency.jitter * 1000,
+            "timeout_probability": latency.timeout_probability,
+            "timeout_ms": latency.timeout * 1000,
+        },
+        "throughput": {
+            "cycles_per_s": cycles / wall if wall else 0.0,
+            "requests_per_s": client.stats.requests / wall if wall else 0.0,
+            "published": published,
+        },
+        "latency": latency_summary(samples),
+        "cpu": {
+            "total_s": cpu,
+            "per_cycle_ms": cpu / cycles * 1000 if cycles else 0.0,
+            "utilization": cpu / wall if wall else 0.0,
+        },
+        "modbus": {
+            "requests": client.stats.requests,
+            "timeouts": client.stats.timeouts,
+            "unsupported": client.stats.unsupported,
+            "busy_s": client.stats.busy_time,
+        },
+    }
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--rtt-ms", type=float, default=40.0, help="Simulierte RTT pro Register-Read")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="± Jitter (gleichverteilt)")
+    parser.add_argument("--timeout-prob", type=float, default=0.0, help="Timeout-Wahrscheinlichkeit pro Request")
+    parser.add_argument("--timeout-ms", type=float, default=1000.0, help="Dauer eines simulierten Timeouts")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", help="Report als JSON speichern (sonst stdout)")
+    parser.add_argument("--compare", help="Baseline-Report zum Vergleich")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = _parse_args(argv)
+    quiet_logging(args.log_level)
+    latency = LatencyModel(
+        rtt=args.rtt_ms / 1000,
+        jitter=args.jitter_ms / 1000,
+        timeout_probability=args.timeout_prob,
+        timeout=args.timeout_ms / 1000,
+    )
+    report = asyncio.run(run_benchmark(args.cycles, latency, seed=args.seed, warmup=args.warmup))
+    write_report(report, args.output)
+    if args.compare:
+        compare_reports(report, args.compare, COMPARE_METRICS)
+
+
+if __name__ == "__main__":
+    main()
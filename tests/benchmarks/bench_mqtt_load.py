@@ -0,0 +1,325 @@
+# tests\benchmarks\bench_mqtt_load.py
+
+"""Lastgenerator für den MQTT-Publish-Pfad mit N synthetischen Invertern.
+
+Pro Gerät und Tick läuft transform_filtered() (Transform + TotalIncreasingFilter)
+→ publish_data() auf "{topic}/{device}". Gemessen wird:
+
+- messages/s (angeboten vs. erreicht)
+- End-to-End-Latenz: Read-Timestamp → Empfang beim Broker
+- CPU-Zeit und Speicherwachstum (tracemalloc) pro Laststufe
+
+Die Laststufen erhöhen die Publish-Rate (kürzeres Tick-Intervall), bis der
+Sättigungspunkt erreicht ist: erreichte Rate < 95% der angebotenen oder
+p99-Latenz > Tick-Intervall.
+
+Modi:
+    sync      publish_data() sequentiell im Event-Loop (heutiges Design,
+              blockiert in wait_for_publish pro Nachricht)
+    threaded  publish_data() pro Gerät via asyncio.to_thread parallel
+
+Broker:
+    Standard ist ein In-Process-Fake (MockPahoClient) mit --ack-ms PUBACK-Latenz.
+    Mit --broker host:port wird ein echter Broker (z.B. lokaler mosquitto)
+    verwendet; Empfangszeit misst dann ein zusätzlicher Subscriber.
+
+Aufruf (aus Repo-Root):
+    python -m tests.benchmarks.bench_mqtt_load --devices 200 --ack-ms 2
+    python -m tests.benchmarks.bench_mqtt_load --devices 200 --ack-ms 2 --mode threaded
+    python -m tests.benchmarks.bench_mqtt_load --devices 50 --broker localhost:1883
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from tests.benchmarks.common import (
+    compare_reports,
+    environment_info,
+    latency_summary,
+    quiet_logging,
+    write_report,
+)
+from tests.fixtures.mock_inverter import MockRegisterValue
+from tests.fixtures.mock_mqtt_broker import MockPahoClient
+from tests.fixtures.simulated_inverter import DEFAULT_REGISTER_VALUES, NOISY_REGISTERS
+
+COMPARE_METRICS = [
+    "saturation.messages_per_s",
+    "steps.0.latency.p99_ms",
+    "steps.0.cpu_per_message_ms",
+]
+
+# Tick-Intervalle der Laststufen in Sekunden (absteigend = steigende Last)
+DEFAULT_INTERVALS = [2.0, 1.0, 0.5, 0.25, 0.1]
+
+
+class SyntheticInverter:
+    """Erzeugt Register-Reads für ein Gerät (ohne Modbus-Latenz)."""
+
+    def __init__(self, device_id: int, seed: int):
+        from bridge.total_increasing_filter import TotalIncreasingFilter
+
+        self.topic_suffix = f"inv{device_id:04d}"
+        self.filter = TotalIncreasingFilter()
+        self._rng = random.Random(seed + device_id)
+        self._values = dict(DEFAULT_REGISTER_VALUES)
+
+    def read(self) -> Dict[str, Any]:
+        data = {}
+        for name, value in self._values.items():
+            if name in NOISY_REGISTERS:
+                value = int(value * (1 + self._rng.uniform(-0.05, 0.05)))
+            data[name] = MockRegisterValue(value)
+        return data
+
+
+class BrokerReceiver:
+    """Sammelt Empfangszeitpunkte (Fake-Broker oder echter Subscriber)."""
+
+    def __init__(self) -> None:
+        self.latencies: List[float] = []
+        self.received = 0
+        self._lock = threading.Lock()
+
+    def record(self, payload: Any, received_at: float) -> None:
+        try:
+            read_ts = json.loads(payload)["bench_read_ts"]
+        except (ValueError, KeyError, TypeError):
+            return
+        with self._lock:
+            self.received += 1
+            self.latencies.append(received_at - read_ts)
+
+    def drain(self) -> Tuple[int, List[float]]:
+        with self._lock:
+            received, latencies = self.received, self.latencies
+            self.received, self.latencies = 0, []
+        return received, latencies
+
+
+def _install_fake_broker(ack_delay: float, receiver: BrokerReceiver) -> Callable[[], None]:
+    """Setzt MockPahoClient als globalen MQTT-Client und leitet Empfang an receiver."""
+    import bridge.mqtt_client as mqtt_module
+
+    paho = MockPahoClient(ack_delay=ack_delay)
+    original_publish = paho.broker.publish
+
+    def publish(topic, payload, qos=0, retain=False):
+        result = original_publish(topic, payload, qos, retain)
+        receiver.record(payload, paho.broker.messages[-1].received_at)
+        # Fake-Broker soll nicht selbst zum Speicher-Leck werden
+        paho.broker.messages.clear()
+        return result
+
+    paho.broker.publish = publish  # type: ignore[method-assign]
+    mqtt_module._mqtt_client = paho  # type: ignore[assignment]
+    mqtt_module._is_connected = True
+
+    def teardown() -> None:
+        mqtt_module._mqtt_client = None
+        mqtt_module._is_connected = False
+
+    return teardown
+
+
+def _install_real_broker(broker: str, base_topic: str, receiver: BrokerReceiver) -> Callable[[], None]:
+    """Verbindet bridge.mqtt_client mit echtem Broker plus Mess-Subscriber."""
+    import bridge.mqtt_client as mqtt_module
+    import paho.mqtt.client as mqtt
+    from bridge.settings import reset_settings
+
+    host, _, port = broker.partition(":")
+    os.environ["HUAWEI_MODBUS_MQTT_BROKER"] = host
+    os.environ["HUAWEI_MODBUS_MQTT_PORT"] = port or "1883"
+    reset_settings()
+    mqtt_module.connect_mqtt()
+
+    subscriber = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)  # type: ignore[attr-defined]
+    subscriber.on_message = lambda _c, _u, msg: receiver.record(msg.payload, time.time())
+    subscriber.connect(host, int(port or "1883"), 60)
+    subscriber.subscribe(f"{base_topic}/#", qos=1)
+    subscriber.loop_start()
+    time.sleep(0.5)
+
+    def teardown() -> None:
+        subscriber.loop_stop()
+        subscriber.disconnect()
+        mqtt_module.disconnect_mqtt()
+
+    return teardown
+
+
+def _publish_device(device: SyntheticInverter, base_topic: str) -> None:
+    from bridge.mqtt_client import publish_data
+    from bridge.transform import transform_filtered
+
+    read_ts = time.time()
+    raw = device.read()
+    data = transform_filtered(raw, device.filter)
+    data["bench_read_ts"] = read_ts
+    publish_data(data, f"{base_topic}/{device.topic_suffix}")
+
+
+async def _run_step(
+    devices: List[SyntheticInverter],
+    base_topic: str,
+    interval: float,
+    duration: float,
+    mode: str,
+    receiver: BrokerReceiver,
+    settle: float,
+) -> Dict[str, Any]:
+    """Eine Laststufe: alle `interval` Sekunden publiziert jedes Gerät einmal."""
+    ticks = max(1, int(duration / interval))
+    offered = len(devices) / interval
+    receiver.drain()
+
+    mem_start, _ = tracemalloc.get_traced_memory()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    overruns = 0
+
+    for tick in range(ticks):
+        tick_start = time.perf_counter()
+        if mode == "threaded":
+            await asyncio.gather(*(asyncio.to_thread(_publish_device, d, base_topic) for d in devices))
+        else:
+            for device in devices:
+                _publish_device(device, base_topic)
+
+        elapsed = time.perf_counter() - tick_start
+        if elapsed > interval:
+            overruns += 1
+        else:
+            await asyncio.sleep(interval - elapsed)
+
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    if settle:
+        await asyncio.sleep(settle)
+    mem_end, mem_peak = tracemalloc.get_traced_memory()
+    received, latencies = receiver.drain()
+    sent = ticks * len(devices)
+    achieved = received / wall if wall else 0.0
+    lat = latency_summary(latencies)
+
+    return {
+        "interval_s": interval,
+        "offered_per_s": offered,
+        "achieved_per_s": achieved,
+        "sent": sent,
+        "received": received,
+        "tick_overruns": overruns,
+        "latency": lat,
+        "cpu_per_message_ms": cpu / sent * 1000 if sent else 0.0,
+        "cpu_utilization": cpu / wall if wall else 0.0,
+        "memory": {
+            "growth_kb": (mem_end - mem_start) / 1024,
+            "peak_kb": mem_peak / 1024,
+        },
+        "saturated": achieved < offered * 0.95 or lat["p99_ms"] > interval * 1000,
+    }
+
+
+async def run_load(
+    devices: int,
+    intervals: List[float],
+    duration: float = 5.0,
+    mode: str = "sync",
+    ack_delay: float = 0.0,
+    broker: Optional[str] = None,
+    seed: int = 42,
+    base_topic: str = "bench/fleet",
+) -> Dict[str, Any]:
+    """Fährt alle Laststufen bis zur Sättigung und liefert den Report."""
+    receiver = BrokerReceiver()
+    fleet = [SyntheticInverter(i, seed) for i in range(devices)]
+    if broker:
+        teardown = _install_real_broker(broker, base_topic, receiver)
+        settle = 1.0
+    else:
+        teardown = _install_fake_broker(ack_delay, receiver)
+        settle = 0.0
+
+    tracemalloc.start()
+    steps: List[Dict[str, Any]] = []
+    try:
+        for interval in intervals:
+            step = await _run_step(fleet, base_topic, interval, duration, mode, receiver, settle)
+            steps.append(step)
+            if step["saturated"]:
+                break
+    finally:
+        tracemalloc.stop()
+        teardown()
+
+    unsaturated = [s for s in steps if not s["saturated"]]
+    best = max(unsaturated, key=lambda s: s["achieved_per_s"]) if unsaturated else None
+    return {
+        "benchmark": "mqtt_load",
+        "env": environment_info(),
+        "params": {
+            "devices": devices,
+            "mode": mode,
+            "duration_s": duration,
+            "ack_ms": ack_delay * 1000,
+            "broker": broker or "in-process",
+            "seed": seed,
+        },
+        "steps": {str(i): step for i, step in enumerate(steps)},
+        "saturation": {
+            "reached": bool(steps and steps[-1]["saturated"]),
+            "messages_per_s": best["achieved_per_s"] if best else 0.0,
+            "interval_s": best["interval_s"] if best else None,
+        },
+    }
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--mode", choices=["sync", "threaded"], default="sync")
+    parser.add_argument("--duration", type=float, default=5.0, help="Sekunden pro Laststufe")
+    parser.add_argument(
+        "--intervals",
+        type=lambda s: [float(x) for x in s.split(",")],
+        default=DEFAULT_INTERVALS,
+        help="Tick-Intervalle in Sekunden, kommagetrennt (z.B. 2,1,0.5)",
+    )
+    parser.add_argument("--ack-ms", type=float, default=1.0, help="PUBACK-Latenz des Fake-Brokers")
+    parser.add_argument("--broker", help="Echter Broker host[:port] statt In-Process-Fake")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", help="Report als JSON speichern (sonst stdout)")
+    parser.add_argument("--compare", help="Baseline-Report zum Vergleich")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = _parse_args(argv)
+    quiet_logging(args.log_level)
+    report = asyncio.run(
+        run_load(
+            args.devices,
+            args.intervals,
+            duration=args.duration,
+            mode=args.mode,
+            ack_delay=args.ack_ms / 1000,
+            broker=args.broker,
+            seed=args.seed,
+        )
+    )
+    write_report(report, args.output)
+    if args.compare:
+        compare_reports(report, args.compare, COMPARE_METRICS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# tests\benchmarks\bench_serializer.py
+
+"""Encoder-Benchmark für den Cycle-Payload (bridge/serializer.py).
+
+Kodiert den realistischen Payload (transform_data() der Simulator-Defaults,
+inkl. Strings wie inverter_status) mit jedem verfügbaren Encoder und misst
+CPU-µs pro Payload und Payload-Größe.
+
+Gedacht für die Zielhardware (armhf/armv7/aarch64) - platform.machine()
+steht im Report, Ergebnisse verschiedener Geräte sind so vergleichbar:
+
+    python -m tests.benchmarks.bench_serializer --output armhf.json
+    python -m tests.benchmarks.bench_serializer --compare armhf.json
+"""
+
+import argparse
+import json
+import time
+from typing import Any, Dict
+
+from tests.benchmarks.common import compare_reports, environment_info, write_report
+from tests.fixtures.mock_inverter import MockRegisterValue
+from tests.fixtures.simulated_inverter import DEFAULT_REGISTER_VALUES
+
+COMPARE_METRICS = ["encoders.json.us_per_payload", "encoders.orjson.us_per_payload"]
+
+
+def build_payload() -> Dict[str, Any]:
+    """Payload wie er in main_once() zu publish_data() geht."""
+    from bridge.transform import transform_data
+
+    data = transform_data({name: MockRegisterValue(value) for name, value in DEFAULT_REGISTER_VALUES.items()})
+    data.setdefault("inverter_status", "On-grid")
+    return data
+
+
+def run_benchmark(iterations: int = 20000, repeats: int = 5) -> Dict[str, Any]:
+    """Misst jeden verfügbaren Encoder (bester von `repeats` Durchläufen)."""
+    from bridge import serializer
+
+    payload = build_payload()
+    encoders = {"json": serializer._json_dumps}
+    if serializer.HAS_ORJSON:
+        encoders["orjson"] = serializer._orjson_dumps
+
+    reference = json.loads(serializer._json_dumps(payload))
+    results: Dict[str, Any] = {}
+    for name, encode in encoders.items():
+        assert json.loads(encode(payload)) == reference, f"{name} output differs"
+        runs = []
+        for _ in range(repeats):
+            start = time.process_time()
+            for _ in range(iterations):
+                encode(payload)
+            runs.append((time.process_time() - start) / iterations)
+        results[name] = {
+            "us_per_payload": min(runs) * 1e6,
+            "bytes": len(encode(payload)),
+        }
+
+    return {
+        "benchmark": "serializer",
+        "env": environment_info(),
+        "params": {"iterations": iterations, "repeats": repeats, "keys": len(payload)},
+        "default": serializer.encoder_name(),
+        "encoders": results,
+    }
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", help="Report als JSON speichern (sonst stdout)")
+    parser.add_argument("--compare", help="Baseline-Report zum Vergleich")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = _parse_args(argv)
+    report = run_benchmark(args.iterations, args.repeats)
+    write_report(report, args.output)
+    if args.compare:
+        compare_reports(report, args.compare, COMPARE_METRICS)
+
+
+if __name__ == "__main__":
+    main()
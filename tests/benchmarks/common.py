@@ -0,0 +1,114 @@
+# tests\benchmarks\common.py
+
+"""Gemeinsame Helfer für Benchmarks: Pfade, Statistik, Report-Ausgabe.
+
+Reports sind JSON mit Metadaten (Commit, Python, Plattform, Parameter),
+damit Ergebnisse über Commits hinweg verglichen werden können:
+
+    python -m tests.benchmarks.bench_cycle --output before.json
+    git checkout feature/xyz
+    python -m tests.benchmarks.bench_cycle --compare before.json
+"""
+
+import json
+import logging
+import math
+import platform
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+# Wie tests/conftest.py: Add-on Ordner in sys.path, damit "bridge" importierbar ist
+REPO_ROOT = Path(__file__).parent.parent.parent
+ADDON_PATH = REPO_ROOT / "huawei_solar_modbus_mqtt"
+if str(ADDON_PATH) not in sys.path:
+    sys.path.insert(0, str(ADDON_PATH))
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-Rank Perzentil (0-100), 0.0 bei leerer Liste."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    """Fasst Latenzen (Sekunden) als Millisekunden-Kennzahlen zusammen."""
+    return {
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p90_ms": percentile(samples, 90) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "max_ms": (max(samples) if samples else 0.0) * 1000,
+        "mean_ms": (sum(samples) / len(samples) if samples else 0.0) * 1000,
+    }
+
+
+def git_revision() -> str:
+    """Aktueller Commit (kurz) oder "unknown" außerhalb eines Git-Repos."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def environment_info() -> Dict[str, str]:
+    """Metadaten die beim Vergleich von Reports relevant sind."""
+    return {
+        "commit": git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+    }
+
+
+def quiet_logging(level: str = "WARNING") -> None:
+    """Dämpft huawei.* Logs, damit Logging nicht die Messung dominiert."""
+    logging.basicConfig(level=level, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    logging.getLogger().setLevel(level)
+
+
+def write_report(report: Dict[str, Any], output: Optional[str]) -> None:
+    """Schreibt Report als JSON in Datei oder stdout."""
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if output:
+        Path(output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+
+def compare_reports(current: Dict[str, Any], baseline_file: str, metrics: Sequence[str]) -> None:
+    """Gibt relative Abweichungen ausgewählter Metriken gegenüber Baseline aus.
+
+    Args:
+        current: Aktueller Report
+        baseline_file: Pfad zum Baseline-Report (JSON)
+        metrics: Punkt-Pfade in den Report, z.B. "latency.p99_ms"
+    """
+    baseline = json.loads(Path(baseline_file).read_text(encoding="utf-8"))
+    print(f"Compare {baseline.get('env', {}).get('commit', '?')} → {current.get('env', {}).get('commit', '?')}")
+    for metric in metrics:
+        old = _lookup(baseline, metric)
+        new = _lookup(current, metric)
+        if old is None or new is None:
+            print(f"  {metric:<28} n/a")
+            continue
+        delta = ((new - old) / old * 100) if old else 0.0
+        print(f"  {metric:<28} {old:12.3f} → {new:12.3f} ({delta:+.1f}%)")
+
+
+def _lookup(report: Dict[str, Any], path: str) -> Optional[float]:
+    node: Any = report
+    for part in path.split("."):
+        if not isinstance(node, dict) or part not in node:
+            return None
+        node = node[part]
+    return float(node) if isinstance(node, (int, float)) else None
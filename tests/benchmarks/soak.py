@@ -0,0 +1,331 @@
+# tests\benchmarks\soak.py
+
+"""Soak-Test: Millionen Cycles in beschleunigter Zeit mit Speicher-Tracking.
+
+Das Add-on läuft monatelang auf kleinen HA-Boxen (armhf/i386). Alles was
+unbegrenzt wächst (ConnectionErrorTracker.errors, Filter-State, Log-Formatierung,
+paho In-Flight-Queue) fällt erst nach Wochen auf. Dieser Test fährt die echte
+Pipeline gegen SimulatedHuaweiSolar ohne RTT und mit virtueller Uhr:
+
+- time.time() wird durch eine virtuelle Uhr ersetzt, die pro Cycle um
+  poll_interval weiterläuft (1 Mio. Cycles à 30s ≈ 1 Jahr Betrieb)
+- Ausfälle werden periodisch injiziert (Timeout, Connection Refused, Modbus)
+  und laufen durch dasselbe Error-Handling wie main()
+- Logs werden formatiert und nach /dev/null geschrieben (Formatierung zählt mit)
+
+Pro Epoche (--epoch Cycles) werden tracemalloc-Speicher und RSS gemessen.
+Nach der Warmup-Phase wird per linearer Regression die Steigung bestimmt;
+überschreitet sie --max-growth-kb pro Epoche, gilt das als anhaltendes
+Wachstum → Exit-Code 1. Der Report enthält die Top-Allokationsstellen
+(Snapshot-Diff) und das Wachstum gruppiert nach Pipeline-Phase (Modul).
+
+Aufruf (aus Repo-Root):
+    python -m tests.benchmarks.soak --cycles 1000000
+    python -m tests.benchmarks.soak --cycles 200000 --compare tests/benchmarks/soak_baseline.json
+    python -m tests.benchmarks.soak --cycles 50000 --broker localhost:1883   # echte paho-Queue
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+from unittest.mock import patch
+
+from tests.benchmarks.common import REPO_ROOT, compare_reports, environment_info, write_report
+from tests.fixtures.mock_inverter import ModbusException
+from tests.fixtures.mock_mqtt_broker import MockPahoClient
+from tests.fixtures.simulated_inverter import LatencyModel, SimulatedHuaweiSolar
+
+COMPARE_METRICS = [
+    "growth.slope_kb_per_epoch",
+    "growth.total_kb",
+    "memory.final_traced_kb",
+    "memory.final_rss_kb",
+    "throughput.cycles_per_s",
+]
+
+# Module → Pipeline-Phase für die Wachstums-Aufschlüsselung
+PHASE_MODULES = {
+    "read": ("simulated_inverter.py", "bridge/main.py"),
+    "transform": ("bridge/transform.py",),
+    "filter": ("bridge/total_increasing_filter.py",),
+    "publish": ("bridge/mqtt_client.py", "mock_mqtt_broker.py", "paho/"),
+    "errors": ("bridge/error_tracker.py",),
+    "logging": ("logging/",),
+}
+
+
+class VirtualClock:
+    """Ersatz für time.time(), läuft nur wenn advance() aufgerufen wird."""
+
+    def __init__(self, start: float = 1_767_225_600.0):  # 2026-01-01
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def current_rss_kb() -> float:
+    """Aktueller RSS in KB (Linux /proc, sonst Peak via getrusage)."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024
+    except (OSError, ValueError, IndexError):
+        return float(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def slope(values: List[float]) -> float:
+    """Steigung der Regressionsgeraden (Einheit pro Sample)."""
+    n = len(values)
+    if n < 2:
+        return 0.0
+    mean_x = (n - 1) / 2
+    mean_y = sum(values) / n
+    num = sum((i - mean_x) * (v - mean_y) for i, v in enumerate(values))
+    den = sum((i - mean_x) ** 2 for i in range(n))
+    return num / den
+
+
+def _short_path(filename: str) -> str:
+    """Kürzt Pfade relativ zu Repo bzw. site-packages (Reports bleiben vergleichbar)."""
+    normalized = filename.replace("\\", "/")
+    root = str(REPO_ROOT).replace("\\", "/") + "/"
+    if normalized.startswith(root):
+        return normalized[len(root) :]
+    for marker in ("site-packages/", "/lib/python"):
+        if marker in normalized:
+            return normalized.split(marker, 1)[1]
+    return normalized
+
+
+def _phase_of(filename: str) -> str:
+    normalized = filename.replace("\\", "/")
+    for phase, markers in PHASE_MODULES.items():
+        if any(marker in normalized for marker in markers):
+            return phase
+    return "other"
+
+
+async def run_soak(
+    cycles: int,
+    epoch: int = 10_000,
+    warmup_epochs: int = 2,
+    poll_interval: float = 30.0,
+    outage_every: int = 5_000,
+    outage_length: int = 20,
+    seed: int = 42,
+    broker: Optional[str] = None,
+    top: int = 10,
+) -> Dict[str, Any]:
+    """Fährt die Pipeline `cycles` mal und liefert den Report."""
+    import bridge.main as main_module
+    import bridge.mqtt_client as mqtt_module
+    from bridge.settings import reset_settings
+    from bridge.total_increasing_filter import reset_filter
+
+    topic = "soak/huawei"
+    os.environ["HUAWEI_MODBUS_MQTT_TOPIC"] = topic
+    os.environ["HUAWEI_POLL_INTERVAL"] = str(int(poll_interval))
+    os.environ.setdefault("HUAWEI_STATUS_TIMEOUT", "180")
+
+    # Logs komplett formatieren lassen, aber nach /dev/null schreiben
+    devnull = open(os.devnull, "w", encoding="utf-8")  # noqa: SIM115
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    root.handlers = [logging.StreamHandler(devnull)]
+    root.handlers[0].setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    root.setLevel(logging.INFO)
+
+    if broker:
+        host, _, port = broker.partition(":")
+        os.environ["HUAWEI_MODBUS_MQTT_BROKER"] = host
+        os.environ["HUAWEI_MODBUS_MQTT_PORT"] = port or "1883"
+        reset_settings()
+        mqtt_module.connect_mqtt()
+    else:
+        reset_settings()
+        paho = MockPahoClient()
+        # Fake-Broker behält nur die letzte Nachricht (wie retained)
+        paho.broker.messages = _BoundedList()  # type: ignore[assignment]
+        mqtt_module._mqtt_client = paho  # type: ignore[assignment]
+        mqtt_module._is_connected = True
+
+    rng = random.Random(seed)
+    clock = VirtualClock()
+    client = SimulatedHuaweiSolar(latency=LatencyModel(rtt=0), seed=seed)
+    await client.connect()
+    # Factories statt Instanzen: ein erneut geworfenes Exception-Objekt
+    # verlängert seinen __traceback__ bei jedem raise (künstliches Leck)
+    outage_errors = [
+        lambda: asyncio.TimeoutError("Simulated outage"),
+        lambda: ConnectionRefusedError(111, "Connection refused"),
+        lambda: ModbusException("Simulated modbus failure"),
+    ]
+
+    samples: List[Dict[str, float]] = []
+    snapshot_start = None
+    tracemalloc.start(1)
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+
+    try:
+        with patch("time.time", clock):
+            main_module.LAST_SUCCESS = 0
+            for n in range(1, cycles + 1):
+                in_outage = outage_every and (n % outage_every) < outage_length and n > outage_length
+                try:
+                    if in_outage:
+                        raise rng.choice(outage_errors)()
+                    # Status online + mark_success im Consumer (_process_full)
+                    await main_module.main_once(client, n)  # type: ignore[arg-type]
+                except asyncio.TimeoutError as e:
+                    main_module.error_tracker.track_error("timeout", str(e))
+                    mqtt_module.publish_status("offline", topic)
+                    reset_filter()
+                except ConnectionRefusedError as e:
+                    main_module.error_tracker.track_error("connection_refused", f"Errno {e.errno}")
+                    mqtt_module.publish_status("offline", topic)
+                    reset_filter()
+                except Exception as e:
+                    main_module.error_tracker.track_error(type(e).__name__, str(e))
+                    mqtt_module.publish_status("offline", topic)
+                    reset_filter()
+
+                main_module.heartbeat(topic)
+                clock.advance(poll_interval)
+
+                if n % epoch == 0:
+                    traced, _ = tracemalloc.get_traced_memory()
+                    samples.append({"cycle": n, "traced_kb": traced / 1024, "rss_kb": current_rss_kb()})
+                    if len(samples) == warmup_epochs:
+                        snapshot_start = tracemalloc.take_snapshot()
+
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        snapshot_end = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+        await client.stop()
+        if broker:
+            mqtt_module.disconnect_mqtt()
+        else:
+            mqtt_module._mqtt_client = None
+            mqtt_module._is_connected = False
+        reset_filter()
+        root.handlers, root.level = saved_handlers, saved_level
+        devnull.close()
+
+    steady = [s["traced_kb"] for s in samples[warmup_epochs - 1 :]] if len(samples) >= warmup_epochs else []
+    top_sites: List[Dict[str, Any]] = []
+    by_phase: Dict[str, float] = {}
+    if snapshot_start is not None:
+        stats = snapshot_end.compare_to(snapshot_start, "lineno")
+        for stat in stats:
+            frame = stat.traceback[0]
+            by_phase[_phase_of(frame.filename)] = by_phase.get(_phase_of(frame.filename), 0.0) + stat.size_diff / 1024
+        for stat in stats[:top]:
+            frame = stat.traceback[0]
+            top_sites.append(
+                {
+                    "site": f"{_short_path(frame.filename)}:{frame.lineno}",
+                    "size_diff_kb": stat.size_diff / 1024,
+                    "count_diff": stat.count_diff,
+                }
+            )
+
+    return {
+        "benchmark": "soak",
+        "env": environment_info(),
+        "params": {
+            "cycles": cycles,
+            "epoch": epoch,
+            "warmup_epochs": warmup_epochs,
+            "poll_interval_s": poll_interval,
+            "outage_every": outage_every,
+            "outage_length": outage_length,
+            "seed": seed,
+            "broker": broker or "in-process",
+        },
+        "throughput": {
+            "cycles_per_s": cycles / wall if wall else 0.0,
+            "cpu_per_cycle_ms": cpu / cycles * 1000 if cycles else 0.0,
+            "virtual_days": cycles * poll_interval / 86400,
+        },
+        "memory": {
+            "final_traced_kb": samples[-1]["traced_kb"] if samples else 0.0,
+            "final_rss_kb": samples[-1]["rss_kb"] if samples else current_rss_kb(),
+            "samples": samples,
+        },
+        "growth": {
+            "slope_kb_per_epoch": slope(steady),
+            "total_kb": (steady[-1] - steady[0]) if len(steady) >= 2 else 0.0,
+            "rss_slope_kb_per_epoch": slope([s["rss_kb"] for s in samples[warmup_epochs - 1 :]]),
+            "by_phase_kb": {k: round(v, 3) for k, v in sorted(by_phase.items())},
+        },
+        "top_allocations": top_sites,
+    }
+
+
+class _BoundedList(list):
+    """Liste die nur das letzte Element behält (Fake-Broker ohne Wachstum)."""
+
+    def append(self, item) -> None:  # type: ignore[override]
+        self.clear()
+        super().append(item)
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=100_000)
+    parser.add_argument("--epoch", type=int, default=10_000, help="Cycles pro Messpunkt")
+    parser.add_argument("--warmup-epochs", type=int, default=2)
+    parser.add_argument("--poll-interval", type=float, default=30.0, help="Virtuelle Sekunden pro Cycle")
+    parser.add_argument("--outage-every", type=int, default=5_000, help="Alle N Cycles einen Ausfall injizieren")
+    parser.add_argument("--outage-length", type=int, default=20, help="Länge eines Ausfalls in Cycles")
+    parser.add_argument("--max-growth-kb", type=float, default=16.0, help="Erlaubte Steigung (KB/Epoche)")
+    parser.add_argument("--broker", help="Echter Broker host[:port] (misst paho In-Flight-Queue mit)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--top", type=int, default=10, help="Anzahl Top-Allokationsstellen im Report")
+    parser.add_argument("--output", help="Report als JSON speichern (sonst stdout)")
+    parser.add_argument("--compare", help="Baseline-Report zum Vergleich")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    report = asyncio.run(
+        run_soak(
+            args.cycles,
+            epoch=args.epoch,
+            warmup_epochs=args.warmup_epochs,
+            poll_interval=args.poll_interval,
+            outage_every=args.outage_every,
+            outage_length=args.outage_length,
+            seed=args.seed,
+            broker=args.broker,
+            top=args.top,
+        )
+    )
+    growth = report["growth"]["slope_kb_per_epoch"]
+    report["result"] = "fail" if growth > args.max_growth_kb else "pass"
+    write_report(report, args.output)
+    if args.compare:
+        compare_reports(report, args.compare, COMPARE_METRICS)
+    if report["result"] == "fail":
+        print(f"❌ Sustained memory growth: {growth:.2f} KB/epoch > {args.max_growth_kb} KB", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
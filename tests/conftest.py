@@ -5,8 +5,20 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 # Füge den huawei_solar_modbus_mqtt Ordner hinzu
 addon_path = Path(__file__).parent.parent / "huawei_solar_modbus_mqtt"
 sys.path.insert(0, str(addon_path))
 
 print(f"✅ conftest.py loaded! Added to sys.path: {addon_path}")
+
+
+@pytest.fixture(autouse=True)
+def fresh_settings():
+    """Settings-Cache pro Test verwerfen - Tests setzen ENV individuell."""
+    from bridge.settings import reset_settings
+
+    reset_settings()
+    yield
+    reset_settings()
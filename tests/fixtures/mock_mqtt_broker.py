@@ -3,6 +3,7 @@
 """Mock MQTT-Broker für End-to-End-Tests"""
 
 import json
+import time
 from typing import Dict, List, Optional
 
 
@@ -14,6 +15,7 @@ class MockMQTTMessage:
         self.payload = payload
         self.qos = qos
         self.retain = retain
+        self.received_at = time.time()
 
     def as_dict(self):
         try:
@@ -77,3 +79,42 @@ class MockMQTTBroker:
     def clear(self):
         """Lösche alle gespeicherten Messages"""
         self.messages.clear()
+
+
+class MockMessageInfo:
+    """Simuliert paho MQTTMessageInfo inkl. PUBACK-Latenz"""
+
+    def __init__(self, ack_delay: float = 0.0):
+        self.ack_delay = ack_delay
+        self.rc = 0
+
+    def wait_for_publish(self, timeout: Optional[float] = None):
+        """Blockiert wie paho bis zum (simulierten) PUBACK"""
+        if self.ack_delay:
+            time.sleep(self.ack_delay if timeout is None else min(self.ack_delay, timeout))
+
+    def is_published(self) -> bool:
+        return True
+
+
+class MockPahoClient:
+    """paho.mqtt.Client-Ersatz der direkt in einen MockMQTTBroker publiziert.
+
+    Kann als bridge.mqtt_client._mqtt_client eingesetzt werden, damit der
+    echte publish_data()/publish_status()-Code ohne Broker läuft.
+    """
+
+    def __init__(self, broker: Optional[MockMQTTBroker] = None, ack_delay: float = 0.0):
+        self.broker = broker or MockMQTTBroker()
+        self.broker.connected = True
+        self.ack_delay = ack_delay
+
+    def publish(self, topic: str, payload=None, qos: int = 0, retain: bool = False):
+        self.broker.publish(topic, payload, qos, retain)
+        return MockMessageInfo(self.ack_delay)
+
+    def loop_stop(self):
+        pass
+
+    def disconnect(self):
+        self.broker.disconnect()
@@ -0,0 +1,230 @@
+# tests\fixtures\simulated_inverter.py
+
+"""Latenz-modellierter Inverter-Simulator für Benchmarks und Soak-Tests.
+
+Im Gegensatz zu MockHuaweiSolar (sofortige Antworten aus YAML-Szenarien)
+simuliert dieser Mock das Zeitverhalten eines echten SDongle/Inverters:
+
+- RTT pro Request (konfigurierbar) plus Jitter
+- Timeout-Wahrscheinlichkeit pro Request (Request hängt, dann TimeoutError)
+- Single-Connection: nur eine offene Verbindung pro Host, Requests werden
+  wie in huawei_solar über einen Lock serialisiert
+
+Alle Zufallswerte kommen aus einem geseedeten random.Random, damit Läufe
+über Commits hinweg vergleichbar bleiben.
+"""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Set
+
+from tests.fixtures.mock_inverter import MockRegisterValue, ModbusException
+
+# Realistische Werte für alle ESSENTIAL_REGISTERS (Sommer-Mittag, 3-Phasen,
+# LUNA2000 + DDSU666). Leistungswerte bekommen zusätzlich Rauschen.
+DEFAULT_REGISTER_VALUES: Dict[str, Any] = {
+    "active_power": 4200,
+    "input_power": 4500,
+    "power_meter_active_power": -1200,
+    "storage_charge_discharge_power": 800,
+    "storage_state_of_capacity": 65.5,
+    "daily_yield_energy": 18.42,
+    "accumulated_yield_energy": 15420.51,
+    "grid_exported_energy": 5432.1,
+    "grid_accumulated_energy": 2310.7,
+    "storage_current_day_charge_capacity": 4.1,
+    "storage_current_day_discharge_capacity": 2.3,
+    "storage_total_charge": 4804.5,
+    "storage_total_discharge": 4521.9,
+    "pv_01_voltage": 412.3,
+    "pv_01_current": 5.61,
+    "pv_02_voltage": 398.7,
+    "pv_02_current": 5.43,
+    "pv_03_voltage": 0,
+    "pv_03_current": 0,
+    "pv_04_voltage": 0,
+    "pv_04_current": 0,
+    "storage_bus_voltage": 452.1,
+    "storage_bus_current": 1.8,
+    "storage_running_status": 2,
+    "grid_A_voltage": 231.2,
+    "grid_B_voltage": 230.8,
+    "grid_C_voltage": 232.0,
+    "line_voltage_A_B": 400.1,
+    "line_voltage_B_C": 399.6,
+    "line_voltage_C_A": 401.2,
+    "grid_frequency": 50.01,
+    "meter_status": 1,
+    "power_meter_reactive_power": 120,
+    "active_grid_A_current": 1.7,
+    "active_grid_B_current": 1.9,
+    "active_grid_C_current": 1.6,
+    "active_grid_A_B_voltage": 400.3,
+    "active_grid_B_C_voltage": 399.9,
+    "active_grid_C_A_voltage": 401.0,
+    "active_grid_A_power": -400,
+    "active_grid_B_power": -420,
+    "active_grid_C_power": -380,
+    "active_grid_frequency": 50.0,
+    "active_grid_power_factor": 0.98,
+    "internal_temperature": 41.3,
+    "day_active_power_peak": 7210,
+    "power_factor": 0.99,
+    "efficiency": 98.1,
+    "reactive_power": 35,
+    "insulation_resistance": 3.2,
+    "device_status": "On-grid",
+    "state_1": 6,
+    "state_2": 7,
+    "model_name": "SUN2000-10KTL-M1",
+    "serial_number": "SIM0000000001",
+    "rated_power": 10000,
+    "startup_time": datetime(2026, 1, 1, 7, 30, tzinfo=timezone.utc),
+    "alarm_1": 0,
+    "alarm_2": 0,
+    "alarm_3": 0,
+    "nb_optimizers": 0,
+    "nb_online_optimizers": 0,
+    "storage_maximum_charge_power": 5000,
+    "storage_maximum_discharge_power": 5000,
+    "storage_unit_1_soc": 65.5,
+    "storage_unit_2_soc": 65.0,
+    "storage_unit_3_soc": 66.1,
+}
+
+# Register deren Wert pro Request leicht schwankt (± noise_ratio)
+NOISY_REGISTERS = {
+    "active_power",
+    "input_power",
+    "power_meter_active_power",
+    "storage_charge_discharge_power",
+    "active_grid_A_power",
+    "active_grid_B_power",
+    "active_grid_C_power",
+}
+
+# Energie-Counter die pro Request minimal steigen (total_increasing)
+COUNTER_REGISTERS = {
+    "accumulated_yield_energy",
+    "grid_exported_energy",
+    "grid_accumulated_energy",
+    "storage_total_charge",
+    "storage_total_discharge",
+}
+
+# Offene Verbindungen pro Host (Single-Connection-Enforcement wie beim SDongle)
+_open_connections: Set[str] = set()
+
+
+@dataclass
+class LatencyModel:
+    """Zeitverhalten eines Modbus-Requests."""
+
+    rtt: float = 0.05  # Sekunden pro Request
+    jitter: float = 0.0  # ± Sekunden (gleichverteilt)
+    timeout_probability: float = 0.0  # 0.0-1.0
+    timeout: float = 1.0  # Sekunden bis TimeoutError bei "hängendem" Request
+    connect_delay: float = 0.0  # Sekunden für create()
+
+    def request_delay(self, rng: random.Random) -> float:
+        """Berechnet Verzögerung für einen Request (nie negativ)."""
+        if self.jitter:
+            return max(0.0, self.rtt + rng.uniform(-self.jitter, self.jitter))
+        return self.rtt
+
+
+@dataclass
+class SimulatorStats:
+    """Zähler für Auswertung im Benchmark-Report."""
+
+    requests: int = 0
+    timeouts: int = 0
+    unsupported: int = 0
+    lock_wait: float = 0.0  # Summe Wartezeit auf die Verbindung
+    busy_time: float = 0.0  # Summe simulierter Request-Zeit
+    per_register: Dict[str, int] = field(default_factory=dict)
+
+
+class SimulatedHuaweiSolar:
+    """In-Process-Simulator mit AsyncHuaweiSolar-kompatibler get()-API."""
+
+    def __init__(
+        self,
+        latency: Optional[LatencyModel] = None,
+        values: Optional[Dict[str, Any]] = None,
+        unsupported: Iterable[str] = (),
+        seed: int = 42,
+        noise_ratio: float = 0.05,
+        host: str = "simulator",
+    ):
+        self.latency = latency or LatencyModel()
+        self.values = dict(DEFAULT_REGISTER_VALUES if values is None else values)
+        self.unsupported = set(unsupported)
+        self.noise_ratio = noise_ratio
+        self.host = host
+        self.stats = SimulatorStats()
+        self._rng = random.Random(seed)
+        self._lock = asyncio.Lock()
+        self._connected = False
+
+    @classmethod
+    async def create(cls, host: str = "simulator", *args, **kwargs) -> "SimulatedHuaweiSolar":
+        """Simuliert AsyncHuaweiSolar.create() inkl. Single-Connection-Check."""
+        client = cls(host=host, **kwargs)
+        await client.connect()
+        return client
+
+    async def connect(self) -> None:
+        """Öffnet die (einzige) Verbindung zum simulierten Dongle."""
+        if self.host in _open_connections:
+            raise ConnectionRefusedError(f"{self.host}: only one Modbus connection allowed")
+        if self.latency.connect_delay:
+            await asyncio.sleep(self.latency.connect_delay)
+        _open_connections.add(self.host)
+        self._connected = True
+
+    async def stop(self) -> None:
+        """Schließt die Verbindung und gibt den Host wieder frei."""
+        if self._connected:
+            _open_connections.discard(self.host)
+            self._connected = False
+
+    async def get(self, name: str, slave_id: Optional[int] = None) -> MockRegisterValue:
+        """Liest ein Register mit simulierter Latenz."""
+        wait_start = time.perf_counter()
+        async with self._lock:
+            self.stats.lock_wait += time.perf_counter() - wait_start
+            return await self._do_request(name)
+
+    async def _do_request(self, name: str) -> MockRegisterValue:
+        self.stats.requests += 1
+        self.stats.per_register[name] = self.stats.per_register.get(name, 0) + 1
+
+        if self.latency.timeout_probability and self._rng.random() < self.latency.timeout_probability:
+            self.stats.timeouts += 1
+            self.stats.busy_time += self.latency.timeout
+            if self.latency.timeout:
+                await asyncio.sleep(self.latency.timeout)
+            raise asyncio.TimeoutError(f"Simulated timeout for {name}")
+
+        delay = self.latency.request_delay(self._rng)
+        self.stats.busy_time += delay
+        if delay:
+            await asyncio.sleep(delay)
+
+        if name in self.unsupported or name not in self.values:
+            self.stats.unsupported += 1
+            raise ModbusException(f"Illegal data address for {name}")
+
+        return MockRegisterValue(self._next_value(name))
+
+    def _next_value(self, name: str) -> Any:
+        value = self.values[name]
+        if name in NOISY_REGISTERS and self.noise_ratio:
+            return int(value * (1 + self._rng.uniform(-self.noise_ratio, self.noise_ratio)))
+        if name in COUNTER_REGISTERS:
+            self.values[name] = round(value + 0.01, 2)
+        return value
@@ -0,0 +1,60 @@
+# tests\test_aggregator.py
+
+"""Tests für die Fenster-Aggregation (min/max/mean pro Publish-Fenster)."""
+
+from bridge.aggregator import AGGREGATED_KEYS, WindowAggregator, companion_sensors
+from bridge.config.sensors_mqtt import NUMERIC_SENSORS
+
+
+def test_aggregated_keys_are_fast_tier_power_values():
+    assert AGGREGATED_KEYS == ("power_input", "power_active", "meter_power_active", "battery_power")
+
+
+def test_apply_replaces_value_with_window_mean():
+    aggregator = WindowAggregator()
+    aggregator.add({"power_input": 1000, "battery_power": -500})
+    aggregator.add({"power_input": 3000, "battery_status": "running"})
+
+    data = aggregator.apply({"power_input": 2600, "energy_yield_day": 12.5})
+
+    assert data["power_input"] == 2200.0
+    assert data["power_input_min"] == 1000
+    assert data["power_input_max"] == 3000
+    assert data["battery_power"] == -500.0
+    assert data["battery_power_min"] == data["battery_power_max"] == -500
+    # Nicht aggregierte Keys bleiben unverändert
+    assert data["energy_yield_day"] == 12.5
+    assert "power_active" not in data
+
+
+def test_apply_starts_new_window():
+    aggregator = WindowAggregator()
+    aggregator.add({"power_input": 5000})
+    aggregator.apply({})
+
+    data = aggregator.apply({"power_input": 100})
+
+    assert data == {"power_input": 100.0, "power_input_min": 100, "power_input_max": 100}
+    assert aggregator.samples == 0
+
+
+def test_snapshot_and_non_numeric_values():
+    aggregator = WindowAggregator(companions=False)
+    aggregator.add({"power_active": 10, "meter_power_active": None})
+    aggregator.add({"power_active": 30, "meter_power_active": True})
+
+    assert aggregator.snapshot("power_active") == {"min": 10, "max": 30, "mean": 20, "last": 30, "count": 2}
+    assert aggregator.snapshot("meter_power_active") is None
+    assert aggregator.apply({}) == {"power_active": 20.0}
+
+
+def test_companion_sensors_disabled_by_default():
+    sensors = companion_sensors(NUMERIC_SENSORS)
+
+    assert [s["key"] for s in sensors[:2]] == ["power_active_min", "power_active_max"]
+    assert len(sensors) == 2 * len(AGGREGATED_KEYS)
+    assert all(s["enabled"] is False and s["state_class"] == "measurement" for s in sensors)
+    # Eigenes value_template des Basis-Sensors gilt nicht für den Companion-Key
+    battery_min = next(s for s in sensors if s["key"] == "battery_power_min")
+    assert "value_template" not in battery_min
+    assert battery_min["name"] == "Battery Power Min"
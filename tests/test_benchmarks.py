@@ -0,0 +1,71 @@
+# tests\test_benchmarks.py
+
+"""Smoke-Tests für die Benchmark-Tools (kurze Läufe, keine Performance-Asserts)."""
+
+import pytest
+
+from tests.benchmarks.bench_cycle import run_benchmark
+from tests.benchmarks.bench_mqtt_load import run_load
+from tests.benchmarks.bench_serializer import run_benchmark as run_serializer_benchmark
+from tests.benchmarks.common import percentile
+from tests.benchmarks.soak import run_soak, slope
+from tests.fixtures.simulated_inverter import LatencyModel
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 99) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_cycle_benchmark_smoke(monkeypatch):
+    monkeypatch.setenv("HUAWEI_MODBUS_MQTT_TOPIC", "bench/huawei")
+    monkeypatch.setenv("HUAWEI_POLL_INTERVAL", "30")
+    report = await run_benchmark(cycles=3, latency=LatencyModel(rtt=0), warmup=1)
+
+    assert report["throughput"]["published"] == 3
+    assert report["latency"]["p99_ms"] >= report["latency"]["p50_ms"]
+    assert report["modbus"]["requests"] > 0
+    assert "commit" in report["env"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["sync", "threaded"])
+async def test_mqtt_load_smoke(mode):
+    report = await run_load(devices=3, intervals=[0.05], duration=0.1, mode=mode)
+
+    step = report["steps"]["0"]
+    assert step["sent"] == step["received"] == 6
+    assert step["latency"]["max_ms"] >= 0
+    assert report["params"]["mode"] == mode
+
+
+@pytest.mark.asyncio
+async def test_soak_smoke(monkeypatch):
+    import bridge.main as main_module
+
+    # run_soak setzt ENV und LAST_SUCCESS - über monkeypatch wiederherstellen
+    for name in ("HUAWEI_MODBUS_MQTT_TOPIC", "HUAWEI_POLL_INTERVAL", "HUAWEI_STATUS_TIMEOUT"):
+        monkeypatch.setenv(name, "soak/huawei" if name == "HUAWEI_MODBUS_MQTT_TOPIC" else "30")
+    monkeypatch.setattr(main_module, "LAST_SUCCESS", 0)
+    report = await run_soak(cycles=300, epoch=100, warmup_epochs=1, outage_every=100, outage_length=5)
+
+    assert len(report["memory"]["samples"]) == 3
+    assert report["throughput"]["virtual_days"] == pytest.approx(300 * 30 / 86400)
+    assert "by_phase_kb" in report["growth"]
+    assert isinstance(report["top_allocations"], list)
+
+
+def test_soak_slope():
+    assert slope([1.0, 2.0, 3.0, 4.0]) == pytest.approx(1.0)
+    assert slope([5.0, 5.0, 5.0]) == 0.0
+    assert slope([1.0]) == 0.0
+
+
+def test_serializer_benchmark_smoke():
+    report = run_serializer_benchmark(iterations=10, repeats=1)
+
+    assert report["encoders"]["json"]["bytes"] > 1000
+    assert report["encoders"]["json"]["us_per_payload"] > 0
@@ -0,0 +1,66 @@
+# tests\test_binary_payload.py
+
+"""Tests für den kompakten Binär-Payload (MessagePack, festes Schema)."""
+
+import json
+
+import pytest
+from bridge import binary_payload
+from bridge.binary_payload import FIELDS, SCHEMA_ID, _pack, encode, schema_description
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        (None, b"\xc0"),
+        (True, b"\xc3"),
+        (0, b"\x00"),
+        (127, b"\x7f"),
+        (-1, b"\xff"),
+        (200, b"\xcc\xc8"),
+        (4500, b"\xcd\x11\x94"),
+        (-200, b"\xd1\xff\x38"),
+        (85.5, b"\xcb\x40\x55\x60\x00\x00\x00\x00\x00"),
+        ("On-grid", b"\xa7On-grid"),
+        ([1, None], b"\x92\x01\xc0"),
+    ],
+)
+def test_pack_matches_msgpack_spec(value, expected):
+    assert _pack(value) == expected
+
+
+def test_encode_uses_fixed_field_order(monkeypatch):
+    monkeypatch.setattr(binary_payload, "HAS_MSGPACK", False)
+    data = {FIELDS[1]: 42, "last_update": 1700000000, "unknown_key": 1}
+    encoded = encode(data)
+
+    # array16 mit schema_id + last_update + alle Felder, beides als uint32
+    header = b"\xdc" + (len(FIELDS) + 2).to_bytes(2, "big")
+    header += b"\xce" + SCHEMA_ID.to_bytes(4, "big") + b"\xce" + (1700000000).to_bytes(4, "big")
+    # Feld 0 fehlt → nil, Feld 1 = 42, Rest nil, unknown_key ignoriert
+    assert encoded == header + b"\xc0\x2a" + b"\xc0" * (len(FIELDS) - 2)
+
+
+def test_binary_is_much_smaller_than_json():
+    data = {key: 1234.5 if i % 3 == 0 else 230 for i, key in enumerate(FIELDS)}
+    data["last_update"] = 1700000000
+
+    assert len(encode(data)) * 3 < len(json.dumps(data))
+
+
+def test_schema_description():
+    schema = schema_description()
+
+    assert schema["schema_id"] == SCHEMA_ID
+    assert [f["key"] for f in schema["fields"]] == FIELDS
+    by_key = {f["key"]: f for f in schema["fields"]}
+    assert by_key["power_active"] == {"key": "power_active", "type": "number", "unit": "W"}
+    json.dumps(schema)
+
+
+@pytest.mark.skipif(not binary_payload.HAS_MSGPACK, reason="msgpack not installed")
+def test_fallback_matches_msgpack():
+    import msgpack
+
+    row = [SCHEMA_ID, 1700000000, 4500, -200, 85.5, "On-grid", None, -70000, 2**40]
+    assert _pack(row) == msgpack.packb(row)
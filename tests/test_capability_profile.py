@@ -0,0 +1,65 @@
+# tests\test_capability_profile.py
+
+"""Tests für das beobachtete Capability-Profil."""
+
+import json
+
+from bridge.capability_profile import PROFILE_VERSION, CapabilityProfile
+
+CANDIDATES = ["power_input", "battery_soc", "voltage_PV3"]
+
+
+def test_unsupported_only_after_learning():
+    profile = CapabilityProfile("", CANDIDATES, min_cycles=3)
+
+    assert profile.observe({"power_input": 1, "battery_soc": 50}) is False
+    assert profile.observe({"power_input": 1}) is False
+    assert profile.unsupported() == frozenset()
+
+    # Dritter Cycle: Profil komplett, voltage_PV3 hatte nie Daten
+    assert profile.observe({"power_input": 1}) is True
+    assert profile.unsupported() == {"voltage_PV3"}
+    assert profile.observe({"power_input": 1}) is False
+
+
+def test_key_with_data_is_announced_again():
+    profile = CapabilityProfile("", CANDIDATES, min_cycles=1)
+    profile.observe({"power_input": 1})
+    assert profile.unsupported() == {"battery_soc", "voltage_PV3"}
+
+    assert profile.observe({"power_input": 1, "battery_soc": 80}) is True
+    assert profile.unsupported() == {"voltage_PV3"}
+
+
+def test_new_serial_number_relearns():
+    profile = CapabilityProfile("", CANDIDATES, min_cycles=1)
+    profile.observe({"power_input": 1, "serial_number": "A"})
+    assert profile.unsupported()
+
+    assert profile.observe({"power_input": 1, "battery_soc": 1, "voltage_PV3": 1, "serial_number": "B"}) is True
+    assert profile.unsupported() == frozenset()
+    assert profile.serial_number == "B"
+
+
+def test_profile_survives_restart(tmp_path):
+    path = tmp_path / "capabilities.json"
+    profile = CapabilityProfile(str(path), CANDIDATES, min_cycles=1)
+    profile.observe({"power_input": 1, "serial_number": "A"})  # komplett → sofort gespeichert
+
+    saved = json.loads(path.read_text())
+    assert saved["version"] == PROFILE_VERSION
+    assert saved["unsupported"] == ["battery_soc", "voltage_PV3"]
+
+    restored = CapabilityProfile(str(path), CANDIDATES, min_cycles=1)
+    assert restored.load() is True
+    assert restored.unsupported() == {"battery_soc", "voltage_PV3"}
+    assert restored.serial_number == "A"
+
+
+def test_other_version_is_relearned(tmp_path):
+    path = tmp_path / "capabilities.json"
+    path.write_text(json.dumps({"version": PROFILE_VERSION + 1, "cycles": 10, "supported": [], "unsupported": []}))
+
+    profile = CapabilityProfile(str(path), CANDIDATES)
+    assert profile.load() is False
+    assert profile.cycles == 0
@@ -0,0 +1,89 @@
+# tests\test_config_reload.py
+
+"""Tests für den Config-Reload ohne Neustart."""
+
+import json
+import logging
+
+import pytest
+from bridge import config_reload
+from bridge.config_reload import consume_reload, reload_options, request_reload
+
+
+@pytest.fixture
+def options_file(tmp_path, monkeypatch):
+    monkeypatch.setenv("HUAWEI_POLL_INTERVAL", "30")
+    monkeypatch.setenv("HUAWEI_BINARY_PAYLOAD", "false")
+    monkeypatch.setenv("HUAWEI_MODBUS_HOST", "192.168.1.100")
+    path = tmp_path / "options.json"
+
+    def write(**options):
+        path.write_text(json.dumps(options))
+        return str(path)
+
+    return write
+
+
+def test_reload_request_is_consumed_once():
+    request_reload("test")
+
+    assert consume_reload()
+    assert not consume_reload()
+
+
+def test_changed_options_are_applied_to_env(options_file, monkeypatch):
+    import os
+
+    path = options_file(poll_interval=15, binary_payload=True, log_level="INFO")
+    monkeypatch.setenv("HUAWEI_LOG_LEVEL", "INFO")
+
+    changed = reload_options(path)
+
+    assert changed == ["HUAWEI_POLL_INTERVAL", "HUAWEI_BINARY_PAYLOAD"]
+    assert os.environ["HUAWEI_POLL_INTERVAL"] == "15"
+    assert os.environ["HUAWEI_BINARY_PAYLOAD"] == "true"
+
+
+def test_unchanged_options_return_empty(options_file):
+    assert reload_options(options_file(poll_interval=30, binary_payload=False)) == []
+
+
+def test_restart_options_are_not_applied(options_file, caplog):
+    import os
+
+    with caplog.at_level(logging.WARNING, logger="huawei.reload"):
+        changed = reload_options(options_file(modbus_host="10.0.0.5"))
+
+    assert changed == []
+    assert os.environ["HUAWEI_MODBUS_HOST"] == "192.168.1.100"
+    assert "modbus_host" in caplog.text
+
+
+def test_missing_file_raises(tmp_path):
+    with pytest.raises(OSError):
+        reload_options(str(tmp_path / "missing.json"))
+
+
+def test_default_path_from_env(options_file, monkeypatch):
+    monkeypatch.setenv("HUAWEI_OPTIONS_PATH", options_file(poll_interval=60))
+
+    assert reload_options() == ["HUAWEI_POLL_INTERVAL"]
+    assert config_reload.DEFAULT_OPTIONS_PATH == "/data/options.json"
+
+
+@pytest.mark.asyncio
+async def test_reload_request_wakes_wait():
+    import asyncio
+    import threading
+
+    loop = asyncio.get_running_loop()
+    config_reload.bind_reload(loop)
+    threading.Timer(0.01, request_reload, ("test",)).start()
+
+    start = loop.time()
+    assert await config_reload.wait_reload(5.0) is True
+    assert loop.time() - start < 1.0
+    assert consume_reload()
+
+    # Nach dem Abholen wartet wait_reload wieder die volle Zeit
+    assert await config_reload.wait_reload(0.01) is False
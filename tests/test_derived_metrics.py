@@ -0,0 +1,94 @@
+# tests\test_derived_metrics.py
+
+"""Tests für die abgeleiteten Metriken (config/derived.py → Auswertungsplan)."""
+
+import pytest
+from bridge.config.derived import DERIVED_METRICS
+from bridge.derived_metrics import compile_plan, derived_sensors
+
+
+def test_builtin_definitions_compile_in_dependency_order():
+    plan = compile_plan()
+    order = [step.key for step in plan.steps]
+
+    assert order.index("power_house") < order.index("autarky")
+    assert order.index("current_meter_avg") < order.index("phase_imbalance_meter")
+    assert "current_meter_avg" not in plan.keys
+
+
+def test_energy_flow_metrics():
+    data = {"power_input": 5000, "power_active": 4800, "meter_power_active": -1800, "voltage_PV1": 400.0}
+
+    compile_plan().apply(data)
+
+    assert data["power_house"] == 3000
+    assert data["self_consumption_ratio"] == 64.0
+    assert data["autarky"] == 100.0
+    # current_PV1 fehlt → kein power_PV1
+    assert "power_PV1" not in data
+
+
+def test_night_values_clamped_or_skipped():
+    data = {"power_input": 0, "power_active": 0, "meter_power_active": 400}
+
+    compile_plan().apply(data)
+
+    assert data["power_house"] == 400
+    assert data["autarky"] == 0.0
+    assert "self_consumption_ratio" not in data
+
+
+def test_pv_string_power_and_phase_imbalance():
+    data = {
+        "voltage_PV1": 410.5,
+        "current_PV1": 8.2,
+        "current_meter_A": 10.0,
+        "current_meter_B": -8.0,
+        "current_meter_C": 6.0,
+    }
+
+    compile_plan().apply(data)
+
+    assert data["power_PV1"] == 3366
+    assert data["phase_imbalance_meter"] == 25.0
+    assert "current_meter_avg" not in data
+
+
+def test_stale_value_is_not_kept():
+    data = {"power_house": 999, "power_active": None, "meter_power_active": 0}
+
+    compile_plan().apply(data)
+
+    assert "power_house" not in data
+
+
+@pytest.mark.parametrize(
+    "definitions, message",
+    [
+        ([{"key": "x", "expr": "__import__('os')"}], "only abs, min, max, round"),
+        ([{"key": "x", "expr": "power_input.real"}], "Attribute not allowed"),
+        ([{"key": "x", "expr": "power_input +"}], "invalid expression"),
+        ([{"key": "power_input", "expr": "1"}], "collides with a register key"),
+        ([{"key": "x", "expr": "1"}, {"key": "x", "expr": "2"}], "defined twice"),
+        ([{"key": "a", "expr": "b + 1"}, {"key": "b", "expr": "a + 1"}], "cycle: a -> b -> a"),
+    ],
+)
+def test_invalid_definitions_are_rejected(definitions, message):
+    with pytest.raises(ValueError, match=message):
+        compile_plan(definitions)
+
+
+def test_discovery_generated_from_definitions():
+    sensors = derived_sensors()
+    house = next(s for s in sensors if s["key"] == "power_house")
+
+    assert len(sensors) == sum(1 for d in DERIVED_METRICS if d.get("publish", True))
+    assert house == {
+        "key": "power_house",
+        "name": "House Load",
+        "unit_of_measurement": "W",
+        "device_class": "power",
+        "state_class": "measurement",
+        "icon": "mdi:home-lightning-bolt",
+        "enabled": True,
+    }
@@ -0,0 +1,94 @@
+# tests\test_energy_integrator.py
+
+"""Tests für die Energie-Integration aus Leistungs-Samples."""
+
+import json
+
+import pytest
+from bridge.config.sensors_mqtt import INTEGRATED_ENERGY_SENSORS
+from bridge.energy_integrator import INTEGRATED_KEYS, EnergyIntegrator
+
+
+def test_trapezoid_over_samples():
+    integrator = EnergyIntegrator(max_gap=3600)
+    integrator.add({"power_input": 1000}, 0.0)
+    integrator.add({"power_input": 3000}, 1800.0)  # 0.5h, Mittel 2000W → 1 kWh
+
+    assert integrator.totals()["energy_pv_integrated"] == pytest.approx(1.0)
+
+
+def test_directions_split_at_zero_crossing():
+    integrator = EnergyIntegrator(max_gap=7200)
+    # Batterie: 1h von +1000W (Laden) auf -1000W (Entladen), Nulldurchgang nach 30min
+    integrator.add({"battery_power": 1000}, 0.0)
+    integrator.add({"battery_power": -1000}, 3600.0)
+
+    totals = integrator.totals()
+    assert totals["energy_battery_charge_integrated"] == pytest.approx(0.25)
+    assert totals["energy_battery_discharge_integrated"] == pytest.approx(0.25)
+
+
+def test_grid_house_and_phases():
+    integrator = EnergyIntegrator(max_gap=7200)
+    sample = {"power_active": 2000, "meter_power_active": -500, "power_meter_A": 300, "power_meter_B": -800}
+    integrator.add(sample, 0.0)
+    integrator.add(sample, 3600.0)
+
+    totals = integrator.totals()
+    assert totals["energy_grid_export_integrated"] == pytest.approx(0.5)
+    assert totals["energy_grid_import_integrated"] == 0
+    assert totals["energy_house_integrated"] == pytest.approx(1.5)
+    assert totals["energy_meter_A_import_integrated"] == pytest.approx(0.3)
+    assert totals["energy_meter_B_export_integrated"] == pytest.approx(0.8)
+    assert totals["energy_meter_C_import_integrated"] == 0
+
+
+def test_gap_is_not_integrated():
+    integrator = EnergyIntegrator(max_gap=90)
+    integrator.add({"power_input": 5000}, 0.0)
+    integrator.add({"power_input": 5000}, 600.0)  # 10min Ausfall
+    integrator.add({"power_input": 5000}, 636.0)
+
+    assert integrator.gaps == 1
+    assert integrator.totals()["energy_pv_integrated"] == pytest.approx(0.05)
+
+
+def test_out_of_order_sample_is_ignored():
+    integrator = EnergyIntegrator()
+    integrator.add({"power_input": 1000}, 10.0)
+    integrator.add({"power_input": 9000}, 5.0)
+    integrator.add({"power_input": 1000}, 46.0)
+
+    assert integrator.totals()["energy_pv_integrated"] == pytest.approx(0.01)
+
+
+def test_counters_survive_restart(tmp_path):
+    path = str(tmp_path / "energy.json")
+    integrator = EnergyIntegrator(path)
+    integrator.add({"power_input": 3600}, 0.0)
+    integrator.add({"power_input": 3600}, 60.0)
+    integrator.save()
+
+    restored = EnergyIntegrator(path).load()
+    assert restored.totals()["energy_pv_integrated"] == pytest.approx(0.06)
+    # Erstes Sample nach Neustart ist nur Startpunkt (keine Lücke überbrücken)
+    restored.add({"power_input": 3600}, 1000.0)
+    assert restored.totals()["energy_pv_integrated"] == pytest.approx(0.06)
+
+
+def test_corrupt_state_file_starts_at_zero(tmp_path):
+    path = tmp_path / "energy.json"
+    path.write_text("{not json")
+
+    integrator = EnergyIntegrator(str(path)).load()
+
+    assert set(integrator.totals().values()) == {0}
+    integrator.add({"power_input": 1000}, 0.0)
+    integrator.add({"power_input": 1000}, 36.0)
+    integrator.save()
+    assert json.loads(path.read_text())["totals"]["energy_pv_integrated"] == pytest.approx(0.01)
+
+
+def test_every_counter_has_a_discovery_sensor():
+    assert [s["key"] for s in INTEGRATED_ENERGY_SENSORS] == list(INTEGRATED_KEYS)
+    assert all(s["state_class"] == "total_increasing" for s in INTEGRATED_ENERGY_SENSORS)
@@ -0,0 +1,133 @@
+# tests\test_history_store.py
+
+"""Tests für den lokalen History-Speicher (SQLite)."""
+
+import sqlite3
+
+import pytest
+from bridge.history_store import RESOLUTION_HOUR, RESOLUTION_MINUTE, HistoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    history = HistoryStore(str(tmp_path / "history.db"), commit_interval=3600).open()
+    yield history
+    history.close()
+
+
+def _count(store, table):
+    return sqlite3.connect(store.path).execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_wal_mode_enabled(store):
+    mode = sqlite3.connect(store.path).execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+
+def test_record_buffers_until_flush(store):
+    store.record({"power_input": 4500, "inverter_status": "On-grid", "last_update": 1.0}, ts=1000)
+    assert _count(store, "samples") == 0
+
+    store.flush()
+    assert _count(store, "samples") == 1  # nur numerische Keys, ohne last_update
+
+
+def test_commit_interval_triggers_flush(tmp_path):
+    history = HistoryStore(str(tmp_path / "h.db"), commit_interval=0).open()
+    history.record({"power_input": 100}, ts=1000)
+    assert _count(history, "samples") == 1
+    history.close()
+
+
+def test_minute_aggregate_measurement(store):
+    for ts, value in [(60, 100), (70, 300), (80, 200)]:
+        store.record({"power_input": value}, ts=ts)
+    store.flush()
+
+    (agg,) = list(store.iter_aggregates(RESOLUTION_MINUTE, 0, 3600))
+    assert agg["bucket"] == 60
+    assert (agg["min"], agg["max"], agg["mean"], agg["last"]) == (100, 300, 200, 200)
+    assert agg["delta"] is None
+    assert agg["samples"] == 3
+
+
+def test_aggregates_merge_across_flushes(store):
+    store.record({"power_input": 100}, ts=3600)
+    store.flush()
+    store.record({"power_input": 500}, ts=3660)
+    store.flush()
+
+    (agg,) = list(store.iter_aggregates(RESOLUTION_HOUR, 0, 7200))
+    assert (agg["min"], agg["max"], agg["mean"], agg["last"], agg["samples"]) == (100, 500, 300, 500, 2)
+
+
+def test_total_increasing_delta_with_daily_reset(store):
+    # energy_yield_day: 5.0 → 5.5 → Reset auf 0.2
+    for ts, value in [(0, 5.0), (30, 5.5), (60, 0.2)]:
+        store.record({"energy_yield_day": value}, ts=ts)
+    store.flush()
+
+    minutes = {a["bucket"]: a for a in store.iter_aggregates(RESOLUTION_MINUTE, 0, 3600)}
+    assert minutes[0]["delta"] == pytest.approx(0.5)
+    assert minutes[60]["delta"] == pytest.approx(0.2)
+    (hour,) = list(store.iter_aggregates(RESOLUTION_HOUR, 0, 3600))
+    assert hour["delta"] == pytest.approx(0.7)
+
+
+def test_iter_samples_groups_by_timestamp(store):
+    store.record({"power_input": 1, "battery_soc": 50}, ts=10)
+    store.record({"power_input": 2, "battery_soc": 51}, ts=20)
+    store.flush()
+
+    assert list(store.iter_samples(0, 100)) == [
+        (10, {"power_input": 1, "battery_soc": 50}),
+        (20, {"power_input": 2, "battery_soc": 51}),
+    ]
+    assert list(store.iter_samples(15, 100)) == [(20, {"power_input": 2, "battery_soc": 51})]
+
+
+def test_prune_removes_old_rows(store):
+    store.retention_days = 1
+    store.record({"power_input": 1}, ts=0)
+    store.record({"power_input": 2}, ts=86400 * 2)
+    store.flush()
+
+    store.prune(now=86400 * 2)
+    assert [ts for ts, _ in store.iter_samples(0, 86400 * 3)] == [86400 * 2]
+
+
+def test_keys_persist_across_reopen(tmp_path):
+    path = str(tmp_path / "h.db")
+    first = HistoryStore(path).open()
+    first.record({"power_input": 1}, ts=10)
+    first.close()
+
+    second = HistoryStore(path).open()
+    second.record({"power_input": 2}, ts=20)
+    second.close()
+
+    assert _count(second, "keys") == 1
+    assert _count(second, "samples") == 2
+
+
+def test_record_without_open_is_noop(tmp_path):
+    history = HistoryStore(str(tmp_path / "h.db"))
+    history.record({"power_input": 1})
+    history.flush()
+    assert not (tmp_path / "h.db").exists()
+
+
+def test_counter_delta_continues_after_restart(tmp_path):
+    path = str(tmp_path / "h.db")
+    first = HistoryStore(path).open()
+    first.record({"energy_yield_accumulated": 100.0}, ts=0)
+    first.close()
+
+    # Während der Downtime weitergezählt: 100.0 → 102.5
+    second = HistoryStore(path).open()
+    second.record({"energy_yield_accumulated": 102.5}, ts=7200)
+    second.close()
+
+    (hour,) = list(second.open().iter_aggregates(RESOLUTION_HOUR, 7200, 10800))
+    assert hour["delta"] == pytest.approx(2.5)
+    second.close()
@@ -0,0 +1,70 @@
+# tests\test_loop_monitor.py
+
+"""Tests für den Event-Loop Monitor."""
+
+import asyncio
+import logging
+import time
+
+import pytest
+from bridge.loop_monitor import LoopMonitor
+
+
+def _blocking_section(seconds):
+    time.sleep(seconds)  # blockiert den Loop absichtlich
+
+
+@pytest.mark.asyncio
+async def test_measures_lag_of_blocking_call():
+    monitor = LoopMonitor(threshold=0.05, interval=0.01).start()
+    try:
+        await asyncio.sleep(0.03)
+        _blocking_section(0.1)
+        await asyncio.sleep(0.03)
+    finally:
+        monitor.stop()
+
+    stats = monitor.stats()
+    assert stats["samples"] >= 2
+    assert stats["lag_max_ms"] >= 80
+    assert stats["lag_max_ms"] >= stats["lag_p99_ms"] >= stats["lag_mean_ms"]
+
+
+@pytest.mark.asyncio
+async def test_logs_stack_of_blocking_section(caplog):
+    caplog.set_level(logging.WARNING, logger="huawei.loop")
+    monitor = LoopMonitor(threshold=0.03, interval=0.01).start()
+    try:
+        await asyncio.sleep(0.02)
+        _blocking_section(0.15)
+        await asyncio.sleep(0.02)
+    finally:
+        monitor.stop()
+
+    stats = monitor.stats()
+    assert stats["stalls"] == 1
+    assert "_blocking_section" in stats["last_stall"]["stack"]
+    assert "Event loop blocked" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_no_stalls_on_idle_loop():
+    monitor = LoopMonitor(threshold=0.05, interval=0.01).start()
+    try:
+        await asyncio.sleep(0.1)
+    finally:
+        monitor.stop()
+
+    stats = monitor.stats()
+    assert stats["stalls"] == 0
+    assert "last_stall" not in stats
+
+
+def test_reset_stats_starts_new_window():
+    monitor = LoopMonitor()
+    monitor._samples.extend([0.001, 0.2])
+    monitor._stalls = 1
+
+    monitor.reset_stats()
+
+    assert monitor.stats() == {"lag_max_ms": 0.0, "lag_mean_ms": 0.0, "lag_p99_ms": 0.0, "samples": 0, "stalls": 0}
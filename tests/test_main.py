@@ -1,27 +1,72 @@
 # tests\test_main.py
 
+import asyncio
 import os
 import time
 from unittest.mock import AsyncMock, Mock, patch
 
 import bridge.main as main_module
 import pytest
+from bridge.aggregator import WindowAggregator
+from bridge.capability_profile import CapabilityProfile
+from bridge.config.registers import ESSENTIAL_REGISTERS
+from bridge.derived_metrics import compile_plan
+from bridge.energy_integrator import EnergyIntegrator
+from bridge.error_tracker import ConnectionErrorTracker
 from bridge.main import (
+    apply_config_reload,
+    fast_once,
     heartbeat,
     init_logging,
     is_modbus_exception,
+    liveness_once,
     main,
     main_once,
+    read_registers,
+    replay_snapshot,
+    wait_next_cycle,
+    write_worker,
 )
+from bridge.modbus_scheduler import ModbusScheduler
+from bridge.pipeline import Sample, SamplePipeline
+from bridge.poll_scheduler import AdaptivePollScheduler
+from bridge.register_scan import RegisterProfile
+from bridge.settings import get_settings
+from bridge.state_snapshot import StateSnapshot
 from bridge.total_increasing_filter import reset_filter
+from bridge.write_queue import WriteQueue
 
 
 @pytest.fixture(autouse=True)
 def reset_singletons():
     """Reset singleton instances before each test."""
     reset_filter()
+    main_module.LAST_PUBLISHED = {}
+    main_module.poll_scheduler = None
+    main_module.history_store = None
+    main_module.write_queue = None
+    main_module.pipeline = None
+    main_module.aggregator = None
+    main_module.energy_integrator = None
+    main_module.derived_plan = None
+    main_module.state_snapshot = None
+    main_module.capability_profile = None
+    main_module.register_profile = None
+    main_module.rediscovery = None
     yield
     reset_filter()
+    main_module.LAST_PUBLISHED = {}
+    main_module.poll_scheduler = None
+    main_module.history_store = None
+    main_module.write_queue = None
+    main_module.pipeline = None
+    main_module.aggregator = None
+    main_module.energy_integrator = None
+    main_module.derived_plan = None
+    main_module.state_snapshot = None
+    main_module.capability_profile = None
+    main_module.register_profile = None
+    main_module.rediscovery = None
 
 
 @pytest.fixture
@@ -45,7 +90,7 @@ async def test_main_connection_retry_on_failure(mock_env):
     """Test that main() handles connection failures gracefully."""
     with (
         patch("bridge.main.AsyncHuaweiSolar.create") as mock_create,
-        patch("bridge.main.connect_mqtt"),
+        patch("bridge.main.connect_mqtt_async"),
         patch("bridge.main.disconnect_mqtt"),
         patch("bridge.main.publish_status"),
         patch("bridge.main.publish_discovery_configs"),
@@ -62,12 +107,52 @@ async def test_main_connection_retry_on_failure(mock_env):
         assert mock_create.call_count == 1
 
 
+@pytest.mark.asyncio
+async def test_main_connects_modbus_while_mqtt_connects(mock_env):
+    """Modbus connect starts before the MQTT connect has finished, discovery runs in the background."""
+    order = []
+
+    async def connect_mqtt():
+        order.append("mqtt started")
+        await asyncio.sleep(0.02)
+        order.append("mqtt connected")
+
+    async def create(*args):
+        order.append("modbus started")
+        return AsyncMock()
+
+    async def first_read(*args):
+        await asyncio.sleep(0.01)
+
+    with (
+        patch("bridge.main.AsyncHuaweiSolar.create", side_effect=create),
+        patch("bridge.main.connect_mqtt_async", side_effect=connect_mqtt),
+        patch("bridge.main.disconnect_mqtt"),
+        patch("bridge.main.publish_status"),
+        patch("bridge.main.publish_discovery_configs") as mock_discovery,
+        patch("bridge.main.publish_diagnostics") as mock_diagnostics,
+        patch("bridge.main.main_once", side_effect=first_read) as mock_once,
+        patch("bridge.main.wait_next_cycle", side_effect=KeyboardInterrupt()),
+    ):
+        try:
+            await main()
+        except KeyboardInterrupt:
+            pass
+
+    assert order == ["mqtt started", "modbus started", "mqtt connected"]
+    mock_discovery.assert_called_once_with("test-topic", wait=False, unsupported=())
+    mock_once.assert_called_once()
+    name, stats, _ = mock_diagnostics.call_args[0]
+    assert name == "startup"
+    assert {"mqtt_s", "modbus_s", "discovery_s", "first_read_s"} <= set(stats)
+
+
 @pytest.mark.asyncio
 async def test_main_graceful_shutdown(mock_env):
     """Test graceful shutdown on KeyboardInterrupt."""
     with (
         patch("bridge.main.AsyncHuaweiSolar.create") as mock_create,
-        patch("bridge.main.connect_mqtt"),
+        patch("bridge.main.connect_mqtt_async"),
         patch("bridge.main.disconnect_mqtt") as mock_disconnect,
         patch("bridge.main.publish_status") as mock_status,
         patch("bridge.main.publish_discovery_configs"),
@@ -97,7 +182,7 @@ async def test_main_timeout_exception_triggers_reconnect(mock_env):
     """Test that timeout exception triggers filter reset and continues."""
     with (
         patch("bridge.main.AsyncHuaweiSolar.create") as mock_create,
-        patch("bridge.main.connect_mqtt"),
+        patch("bridge.main.connect_mqtt_async"),
         patch("bridge.main.publish_status") as mock_status,
         patch("bridge.main.publish_discovery_configs"),
         patch("bridge.main.main_once") as mock_once,
@@ -136,7 +221,7 @@ async def test_main_modbus_exception_handling(mock_env):
 
     with (
         patch("bridge.main.AsyncHuaweiSolar.create") as mock_create,
-        patch("bridge.main.connect_mqtt"),
+        patch("bridge.main.connect_mqtt_async"),
         patch("bridge.main.publish_status") as mock_status,
         patch("bridge.main.publish_discovery_configs"),
         patch("bridge.main.main_once") as mock_once,
@@ -179,7 +264,7 @@ async def test_main_missing_modbus_host():
     env = {"HUAWEI_MODBUS_MQTT_TOPIC": "test"}
     with patch.dict("os.environ", env, clear=True):
         with (
-            patch("bridge.main.connect_mqtt"),
+            patch("bridge.main.connect_mqtt_async"),
             pytest.raises(SystemExit),
         ):
             await main()
@@ -189,7 +274,7 @@ async def test_main_missing_modbus_host():
 async def test_main_mqtt_connection_failure(mock_env):
     """Test main() handles MQTT connection failure."""
     with (
-        patch("bridge.main.connect_mqtt") as mock_mqtt,
+        patch("bridge.main.connect_mqtt_async") as mock_mqtt,
         pytest.raises(SystemExit),
     ):
         mock_mqtt.side_effect = Exception("MQTT connection failed")
@@ -232,8 +317,77 @@ def test_heartbeat_offline_timeout_exceeded():
         patch.dict("os.environ", {"HUAWEI_STATUS_TIMEOUT": "180"}),
     ):
         heartbeat("test-topic")
-        # Should publish offline status
-        mock_status.assert_called_with("offline", "test-topic")
+        # Should publish offline status (without waiting for the broker)
+        mock_status.assert_called_with("offline", "test-topic", wait=False)
+
+
+@pytest.mark.asyncio
+async def test_replay_snapshot_publishes_stale_payload(tmp_path):
+    """Fresh snapshot is republished with its original timestamp and counts as online."""
+    saved_at = int(time.time()) - 60
+    snapshot = StateSnapshot(str(tmp_path / "last_state.json"))
+    snapshot.update({"power_input": 4500, "last_update": saved_at})
+    snapshot.save()
+    main_module.state_snapshot = snapshot
+    main_module.LAST_SUCCESS = 0
+
+    with (
+        patch("bridge.main.publish_data") as mock_publish,
+        patch("bridge.main.publish_status") as mock_status,
+        patch.dict("os.environ", {"HUAWEI_STATUS_TIMEOUT": "180"}),
+    ):
+        assert await replay_snapshot("test-topic") is True
+
+    mock_publish.assert_called_once_with(
+        {"power_input": 4500, "stale": True}, "test-topic", last_update=saved_at, wait=False
+    )
+    mock_status.assert_called_once_with("online", "test-topic", wait=False)
+    assert main_module.LAST_SUCCESS == saved_at
+    main_module.LAST_SUCCESS = 0
+
+
+@pytest.mark.asyncio
+async def test_replay_snapshot_older_than_timeout_stays_offline(tmp_path):
+    snapshot = StateSnapshot(str(tmp_path / "last_state.json"))
+    snapshot.update({"power_input": 4500, "last_update": int(time.time()) - 3600})
+    snapshot.save()
+    main_module.state_snapshot = snapshot
+
+    with (
+        patch("bridge.main.publish_data") as mock_publish,
+        patch("bridge.main.publish_status") as mock_status,
+        patch.dict("os.environ", {"HUAWEI_STATUS_TIMEOUT": "180"}),
+    ):
+        assert await replay_snapshot("test-topic") is False
+
+    mock_publish.assert_called_once()
+    mock_status.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_ha_birth_republishes_discovery_and_last_state():
+    """HA birth message: discovery first, then the last payload with its timestamp, then the status."""
+    main_module.LAST_PUBLISHED = {"power_input": 4500, "last_update": 1706184000}
+    main_module.LAST_SUCCESS = time.time()
+    ha_online = asyncio.Event()
+    calls = []
+
+    with (
+        patch("bridge.main.publish_discovery", side_effect=lambda topic: calls.append("discovery")) as mock_discovery,
+        patch("bridge.main.publish_data", side_effect=lambda *a, **k: calls.append("state")) as mock_publish,
+        patch("bridge.main.wait_published"),
+        patch("bridge.main.publish_status", side_effect=lambda *a, **k: calls.append(a[0])),
+        patch.dict("os.environ", {"HUAWEI_STATUS_TIMEOUT": "180"}),
+    ):
+        task = asyncio.create_task(main_module.ha_birth_worker("test", ha_online))
+        ha_online.set()
+        await asyncio.sleep(0.01)
+        task.cancel()
+
+    mock_discovery.assert_called_once_with("test")
+    assert mock_publish.call_args.kwargs["last_update"] == 1706184000
+    assert calls == ["discovery", "state", "online"]
+    main_module.LAST_SUCCESS = 0
 
 
 def test_is_modbus_exception_true():
@@ -255,6 +409,17 @@ def test_is_modbus_exception_false_for_timeout():
     assert not is_modbus_exception(asyncio.TimeoutError())
 
 
+def _fake_transform(result):
+    """side_effect für transform_filtered: füllt timings wie das Original."""
+
+    def fused(data, filter_instance, timings=None):
+        if timings is not None:
+            timings.update(transform=0.0, filter=0.0)
+        return dict(result)
+
+    return fused
+
+
 @pytest.mark.asyncio
 async def test_main_once_successful_cycle():
     """Test main_once executes complete cycle successfully."""
@@ -262,7 +427,7 @@ async def test_main_once_successful_cycle():
 
     with (
         patch("bridge.main.read_registers") as mock_read,
-        patch("bridge.main.transform_data") as mock_transform,
+        patch("bridge.main.transform_filtered") as mock_transform,
         patch("bridge.main.publish_data") as mock_publish,
         patch("bridge.main.get_filter") as mock_filter,
         patch("bridge.main.log_cycle_summary"),
@@ -270,17 +435,14 @@ async def test_main_once_successful_cycle():
     ):
         # Setup mocks
         mock_read.return_value = {"power_active": 4500}
-        mock_transform.return_value = {"power_active": 4500}
-        mock_filter_instance = Mock()
-        mock_filter_instance.filter.return_value = {"power_active": 4500}
-        mock_filter.return_value = mock_filter_instance
+        mock_transform.side_effect = _fake_transform({"power_active": 4500})
 
         await main_once(mock_client, 1)
 
         # Verify complete pipeline executed
         assert mock_read.call_count == 1
         assert mock_transform.call_count == 1
-        assert mock_filter_instance.filter.call_count == 1
+        assert mock_transform.call_args[0][1] is mock_filter.return_value
         assert mock_publish.call_count == 1
 
 
@@ -314,17 +476,14 @@ async def test_main_once_updates_last_success():
 
     with (
         patch("bridge.main.read_registers") as mock_read,
-        patch("bridge.main.transform_data") as mock_transform,
+        patch("bridge.main.transform_filtered") as mock_transform,
         patch("bridge.main.publish_data"),
         patch("bridge.main.log_cycle_summary"),
-        patch("bridge.main.get_filter") as mock_filter,
+        patch("bridge.main.get_filter"),
         patch.dict("os.environ", {"HUAWEI_MODBUS_MQTT_TOPIC": "test"}),
     ):
         mock_read.return_value = {"power_active": 4500}
-        mock_transform.return_value = {"power_active": 4500}
-        mock_filter_instance = Mock()
-        mock_filter_instance.filter.return_value = {"power_active": 4500}
-        mock_filter.return_value = mock_filter_instance
+        mock_transform.side_effect = _fake_transform({"power_active": 4500})
 
         await main_once(mock_client, 1)
 
@@ -332,6 +491,437 @@ async def test_main_once_updates_last_success():
         assert main_module.LAST_SUCCESS > before
 
 
+@pytest.mark.asyncio
+async def test_main_once_records_history():
+    """main_once passes the filtered data to the history store."""
+    main_module.history_store = Mock()
+
+    with (
+        patch("bridge.main.read_registers") as mock_read,
+        patch("bridge.main.transform_filtered") as mock_transform,
+        patch("bridge.main.publish_data"),
+        patch("bridge.main.log_cycle_summary"),
+        patch.dict("os.environ", {"HUAWEI_MODBUS_MQTT_TOPIC": "test"}),
+    ):
+        mock_read.return_value = {"input_power": 4500}
+        mock_transform.side_effect = _fake_transform({"power_input": 4500})
+
+        await main_once(AsyncMock(), 1)
+
+    recorded = main_module.history_store.record.call_args[0][0]
+    assert recorded["power_input"] == 4500
+
+
+@pytest.mark.asyncio
+async def test_fast_once_merges_into_last_published():
+    """Fast read only replaces power values, other keys stay from last full cycle."""
+    mock_client = AsyncMock()
+    mock_client.get.side_effect = lambda name: Mock(value={"input_power": 5200}.get(name, 0))
+    main_module.LAST_PUBLISHED = {"power_input": 1000, "energy_yield_accumulated": 1234.5}
+
+    with patch("bridge.main.publish_data") as mock_publish:
+        await fast_once(mock_client, "test")
+
+    payload = mock_publish.call_args[0][0]
+    assert payload["power_input"] == 5200
+    assert payload["energy_yield_accumulated"] == 1234.5
+    assert main_module.LAST_PUBLISHED is payload
+
+
+@pytest.mark.asyncio
+async def test_fast_once_drops_read_that_missed_its_slot():
+    """A fast read still queued behind the connection at its deadline is dropped."""
+
+    async def get(name, slave_id=None):
+        await asyncio.sleep(0.05)
+        return Mock(value=5200)
+
+    mock_client = AsyncMock()
+    mock_client.get.side_effect = get
+    modbus = ModbusScheduler(mock_client)
+    main_module.LAST_PUBLISHED = {"power_input": 1000}
+
+    # Laufender Read hält die Verbindung länger als der Fast-Slot
+    busy = asyncio.create_task(modbus.get("model_name"))
+    await asyncio.sleep(0)
+    with patch("bridge.main._dispatch", new_callable=AsyncMock) as mock_dispatch:
+        await fast_once(modbus, "test", time.monotonic() + 0.01)
+    await busy
+
+    mock_dispatch.assert_not_awaited()
+    assert mock_client.get.await_count == 1
+    assert modbus.stats()["FAST"]["expired"] == 1
+
+
+@pytest.mark.asyncio
+async def test_aggregation_publishes_window_mean():
+    """Fast samples are only accumulated, the full cycle publishes mean/min/max."""
+    main_module.aggregator = WindowAggregator()
+    main_module.LAST_PUBLISHED = {"power_input": 1000}
+    mock_client = AsyncMock()
+
+    with (
+        patch("bridge.main.publish_data") as mock_publish,
+        patch("bridge.main.read_registers") as mock_read,
+        patch("bridge.main.log_cycle_summary"),
+        patch.dict("os.environ", {"HUAWEI_MODBUS_MQTT_TOPIC": "test"}),
+    ):
+        for value in (2000, 6000):
+            mock_client.get.side_effect = lambda name, v=value: Mock(value=v if name == "input_power" else None)
+            await fast_once(mock_client, "test")
+        assert mock_publish.call_count == 0
+
+        mock_read.return_value = {"input_power": Mock(value=4000)}
+        await main_once(mock_client, 1)
+
+    payload = mock_publish.call_args[0][0]
+    assert payload["power_input"] == 4000.0
+    assert payload["power_input_min"] == 2000
+    assert payload["power_input_max"] == 6000
+
+
+@pytest.mark.asyncio
+async def test_energy_integration_uses_producer_timestamps():
+    """Counters are integrated from the read time, not from when the consumer runs."""
+    main_module.energy_integrator = EnergyIntegrator()
+
+    with (
+        patch("bridge.main.publish_data") as mock_publish,
+        patch("bridge.main.log_cycle_summary"),
+        patch.dict("os.environ", {"HUAWEI_MODBUS_MQTT_TOPIC": "test"}),
+    ):
+        for mono in (100.0, 136.0):
+            sample = Sample("full", {"input_power": Mock(value=1000)}, time.time(), mono=mono)
+            await main_module.process_sample(sample)
+
+    payload = mock_publish.call_args[0][0]
+    assert payload["energy_pv_integrated"] == pytest.approx(0.01)
+
+
+@pytest.mark.asyncio
+async def test_learned_capabilities_trigger_rediscovery():
+    """Once the profile is learned, the discovery worker is woken up to retract unsupported sensors."""
+    main_module.capability_profile = CapabilityProfile("", ["power_input", "battery_unit3_soc"], min_cycles=2)
+    main_module.rediscovery = asyncio.Event()
+
+    with (
+        patch("bridge.main.publish_data"),
+        patch("bridge.main.log_cycle_summary"),
+        patch.dict("os.environ", {"HUAWEI_MODBUS_MQTT_TOPIC": "test"}),
+    ):
+        await main_module.process_sample(Sample("full", {"input_power": Mock(value=1000)}, time.time()))
+        assert not main_module.rediscovery.is_set()
+        await main_module.process_sample(Sample("full", {"input_power": Mock(value=1000)}, time.time()))
+
+    assert main_module.rediscovery.is_set()
+    assert main_module.capability_profile.unsupported() == {"battery_unit3_soc"}
+
+
+@pytest.mark.asyncio
+async def test_full_sample_publishes_online_after_ack():
+    """Status goes online in the consumer, only once the payload was acknowledged."""
+    tracker = ConnectionErrorTracker()
+    tracker.track_error("timeout", "first read")
+
+    with (
+        patch("bridge.main.error_tracker", tracker),
+        patch("bridge.main.publish_data") as mock_publish,
+        patch("bridge.main.publish_status") as mock_status,
+        patch("bridge.main.log_cycle_summary"),
+        patch.dict("os.environ", {"HUAWEI_MODBUS_MQTT_TOPIC": "test"}),
+    ):
+        with patch("bridge.main.wait_published", AsyncMock(return_value=False)):
+            await main_module.process_sample(Sample("full", {"input_power": Mock(value=1000)}, time.time()))
+        mock_status.assert_not_called()
+        assert tracker.errors
+
+        mock_publish.return_value.is_published.return_value = True
+        await main_module.process_sample(Sample("full", {"input_power": Mock(value=1000)}, time.time()))
+
+    mock_status.assert_called_once_with("online", "test", wait=False)
+    assert not tracker.errors
+
+
+@pytest.mark.asyncio
+async def test_unacknowledged_publish_does_not_count_as_success():
+    """Without broker ack neither LAST_SUCCESS nor LAST_PUBLISHED move (full and fast)."""
+    main_module.LAST_SUCCESS = 0
+    main_module.LAST_PUBLISHED = {}
+
+    with (
+        patch("bridge.main.publish_data"),
+        patch("bridge.main.publish_status"),
+        patch("bridge.main.log_cycle_summary"),
+        patch("bridge.main.wait_published", AsyncMock(return_value=False)),
+        patch.dict("os.environ", {"HUAWEI_MODBUS_MQTT_TOPIC": "test"}),
+    ):
+        await main_module.process_sample(Sample("full", {"input_power": Mock(value=1000)}, time.time()))
+        assert main_module.LAST_SUCCESS == 0
+        assert main_module.LAST_PUBLISHED == {}
+
+        main_module.LAST_PUBLISHED = last = {"power_input": 1000}
+        await main_module.process_sample(Sample("fast", {"input_power": Mock(value=5200)}, time.time()))
+
+    assert main_module.LAST_SUCCESS == 0
+    assert main_module.LAST_PUBLISHED is last
+
+
+def test_process_error_is_tracked_and_goes_offline():
+    """Publish failures in the consumer are throttled by the error tracker, status offline, filter reset."""
+    tracker = ConnectionErrorTracker()
+    sample = Sample("fast", {}, time.time())
+
+    with (
+        patch("bridge.main.error_tracker", tracker),
+        patch("bridge.main.publish_status") as mock_status,
+        patch("bridge.main.reset_filter") as mock_reset_filter,
+        patch.dict("os.environ", {"HUAWEI_MODBUS_MQTT_TOPIC": "test"}),
+    ):
+        main_module.handle_process_error(sample, ConnectionError("MQTT not connected"))
+        main_module.handle_process_error(sample, ConnectionError("MQTT not connected"))
+
+    assert tracker.errors["publish_ConnectionError"]["count"] == 2
+    mock_status.assert_called_with("offline", "test", wait=False)
+    assert mock_reset_filter.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_register_profile_skips_unsupported_registers():
+    """Registers the scan found unsupported are neither read nor announced."""
+    main_module.register_profile = RegisterProfile(
+        {
+            "registers": {
+                "storage_state_of_capacity": {"status": "unsupported"},
+                "storage_bus_voltage": {"status": "unsupported"},
+                "input_power": {"status": "sentinel"},
+            }
+        }
+    )
+    mock_client = AsyncMock()
+    mock_client.get.return_value = Mock(value=1000)
+
+    data = await read_registers(ModbusScheduler(mock_client))
+
+    requested = [call.args[0] for call in mock_client.get.call_args_list]
+    assert "storage_state_of_capacity" not in requested
+    assert "storage_bus_voltage" not in requested
+    assert "input_power" in requested
+    assert len(data) == len(ESSENTIAL_REGISTERS) - 2
+
+    with patch("bridge.main.publish_discovery_configs", return_value=[]) as mock_discovery:
+        await main_module.publish_discovery("test-topic")
+    # battery_soc ist Critical Default und bleibt angekündigt
+    assert mock_discovery.call_args.kwargs["unsupported"] == {"battery_bus_voltage"}
+
+
+@pytest.mark.asyncio
+async def test_fast_read_recomputes_derived_metrics():
+    """Merged fast payload gets derived metrics from the new power values."""
+    main_module.derived_plan = compile_plan()
+    main_module.LAST_PUBLISHED = {"power_active": 1000, "meter_power_active": 0, "power_house": 1000}
+    mock_client = AsyncMock()
+    values = {"active_power": 3000, "power_meter_active_power": 500}
+    mock_client.get.side_effect = lambda name: Mock(value=values.get(name))
+
+    with patch("bridge.main.publish_data") as mock_publish:
+        await fast_once(mock_client, "test")
+
+    assert mock_publish.call_args[0][0]["power_house"] == 3500
+
+
+@pytest.mark.asyncio
+async def test_main_once_with_pipeline_queues_sample():
+    """With a pipeline the read returns before publishing, burst detection runs in the producer."""
+    main_module.pipeline = SamplePipeline(main_module.process_sample)
+    main_module.poll_scheduler = AdaptivePollScheduler(poll_interval=30, fast_interval=5, threshold=1000)
+    main_module.poll_scheduler.observe({"power_input": 500})
+
+    with (
+        patch("bridge.main.read_registers") as mock_read,
+        patch("bridge.main.publish_data") as mock_publish,
+        patch.dict("os.environ", {"HUAWEI_MODBUS_MQTT_TOPIC": "test"}),
+    ):
+        mock_read.return_value = {"input_power": Mock(value=4500)}
+        await main_once(AsyncMock(), 1)
+
+        assert mock_publish.call_count == 0
+        assert main_module.pipeline.depth == 1
+        assert main_module.poll_scheduler.in_burst
+
+        # Consumer verarbeitet das Sample unabhängig vom Read
+        await main_module.process_sample(main_module.pipeline._queue.popleft())
+        assert mock_publish.call_args[0][0]["power_input"] == 4500
+
+
+@pytest.mark.asyncio
+async def test_fast_once_skipped_without_full_cycle():
+    """Without a previous full cycle nothing is read or published."""
+    mock_client = AsyncMock()
+
+    with patch("bridge.main.publish_data") as mock_publish:
+        await fast_once(mock_client, "test")
+
+    assert mock_client.get.call_count == 0
+    assert mock_publish.call_count == 0
+
+
+@pytest.mark.asyncio
+async def test_wait_next_cycle_plain_sleep_without_burst():
+    """Without burst wait_next_cycle sleeps exactly poll_interval."""
+    with (
+        patch("asyncio.sleep", new_callable=AsyncMock) as mock_sleep,
+        patch("bridge.main.fast_once") as mock_fast,
+    ):
+        await wait_next_cycle(AsyncMock(), "test", 30)
+
+    mock_sleep.assert_awaited_once_with(30)
+    assert mock_fast.call_count == 0
+
+
+@pytest.mark.asyncio
+async def test_write_worker_preempts_full_read():
+    """A write command arriving mid-cycle runs right after the current register read."""
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    queue = WriteQueue()
+    queue.bind(loop)
+    main_module.write_queue = queue
+    calls = []
+
+    async def get(name, slave_id=None):
+        calls.append(name)
+        await asyncio.sleep(0.001)
+        return Mock(value=2500)
+
+    async def set_register(name, value, slave_id=None):
+        calls.append(("set", name))
+        return True
+
+    mock_client = AsyncMock()
+    mock_client.get.side_effect = get
+    mock_client.set.side_effect = set_register
+    modbus = ModbusScheduler(mock_client)
+
+    with patch("bridge.main.publish_write_result") as mock_result:
+        worker = asyncio.create_task(write_worker(modbus))
+        loop.call_later(0.005, queue.submit, "battery_max_charging_power", "2500")
+        await read_registers(modbus)
+        worker.cancel()
+
+    set_index = calls.index(("set", "storage_maximum_charging_power"))
+    assert 0 < set_index < len(ESSENTIAL_REGISTERS)
+    assert "storage_maximum_charging_power" in calls[set_index + 1 : set_index + 3]
+    assert mock_result.call_args[0][0]["ok"] is True
+
+
+@pytest.mark.asyncio
+async def test_wait_next_cycle_runs_fast_reads_in_burst():
+    """During burst fast reads run until the next full cycle is due."""
+    scheduler = AdaptivePollScheduler(poll_interval=0.2, fast_interval=0.05, threshold=500, hold=60)
+    scheduler.observe({"power_input": 0})
+    scheduler.observe({"power_input": 1000})
+    main_module.poll_scheduler = scheduler
+
+    with patch("bridge.main.fast_once", new_callable=AsyncMock) as mock_fast:
+        await wait_next_cycle(AsyncMock(), "test", 0.2)
+
+    assert 2 <= mock_fast.await_count <= 3
+
+
+@pytest.mark.asyncio
+async def test_wait_next_cycle_fast_error_ends_burst():
+    """A failing fast read resets the scheduler instead of raising."""
+    scheduler = AdaptivePollScheduler(poll_interval=0.2, fast_interval=0.05, threshold=500, hold=60)
+    scheduler.observe({"power_input": 0})
+    scheduler.observe({"power_input": 1000})
+    main_module.poll_scheduler = scheduler
+
+    with patch("bridge.main.fast_once", new_callable=AsyncMock) as mock_fast:
+        mock_fast.side_effect = TimeoutError()
+        await wait_next_cycle(AsyncMock(), "test", 0.2)
+
+    assert mock_fast.await_count == 1
+    assert not scheduler.in_burst
+
+
+def _idle_scheduler(poll_interval=0.05, idle_interval=0.2):
+    scheduler = AdaptivePollScheduler(poll_interval=poll_interval, idle_interval=idle_interval)
+    for _ in range(AdaptivePollScheduler.IDLE_ENTER_READS):
+        scheduler.observe({"power_input": 0, "battery_power": 0})
+    return scheduler
+
+
+@pytest.mark.asyncio
+async def test_liveness_once_detects_activity():
+    """Liveness read with PV power ends idle mode and updates LAST_SUCCESS."""
+    main_module.poll_scheduler = _idle_scheduler()
+    main_module.LAST_SUCCESS = 0
+    mock_client = AsyncMock()
+    mock_client.get.side_effect = lambda name: Mock(value={"input_power": 300}.get(name, 0))
+
+    with patch("bridge.main.publish_data") as mock_publish:
+        assert not await liveness_once(mock_client)
+
+    assert main_module.LAST_SUCCESS > 0
+    assert mock_publish.call_count == 0
+
+
+@pytest.mark.asyncio
+async def test_wait_next_cycle_idle_waits_idle_interval():
+    """While idle, liveness reads run every poll_interval until idle_interval is over."""
+    main_module.poll_scheduler = _idle_scheduler()
+
+    with patch("bridge.main.liveness_once", new_callable=AsyncMock) as mock_liveness:
+        mock_liveness.return_value = True
+        start = time.monotonic()
+        await wait_next_cycle(AsyncMock(), "test", 0.05)
+
+    assert time.monotonic() - start >= 0.19
+    assert 2 <= mock_liveness.await_count <= 3
+
+
+@pytest.mark.asyncio
+async def test_wait_next_cycle_idle_snaps_back_on_activity():
+    """Activity in a liveness read returns immediately for a full cycle."""
+    main_module.poll_scheduler = _idle_scheduler()
+
+    with patch("bridge.main.liveness_once", new_callable=AsyncMock) as mock_liveness:
+        mock_liveness.return_value = False
+        start = time.monotonic()
+        await wait_next_cycle(AsyncMock(), "test", 0.05)
+
+    assert time.monotonic() - start < 0.15
+    assert mock_liveness.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_wait_next_cycle_idle_liveness_error_ends_idle():
+    """A failing liveness read ends idle mode so the full cycle handles the error."""
+    scheduler = _idle_scheduler()
+    main_module.poll_scheduler = scheduler
+
+    with patch("bridge.main.liveness_once", new_callable=AsyncMock) as mock_liveness:
+        mock_liveness.side_effect = TimeoutError()
+        await wait_next_cycle(AsyncMock(), "test", 0.05)
+
+    assert not scheduler.is_idle
+
+
+def test_heartbeat_idle_extends_timeout():
+    """No offline status while idle even if the last read is older than STATUS_TIMEOUT."""
+    main_module.poll_scheduler = _idle_scheduler(poll_interval=30, idle_interval=600)
+    main_module.LAST_SUCCESS = time.time() - 300
+
+    with (
+        patch.dict("os.environ", {"HUAWEI_STATUS_TIMEOUT": "180"}),
+        patch("bridge.main.publish_status") as mock_status,
+    ):
+        heartbeat("test")
+
+    assert mock_status.call_count == 0
+
+
 def test_init_logging_debug_level():
     """Test init_logging sets DEBUG level correctly."""
     import logging
@@ -367,3 +957,33 @@ def test_init_logging_legacy_debug_env():
     with patch.dict("os.environ", {"HUAWEI_MODBUS_DEBUG": "yes"}):
         init_logging()
         assert logging.getLogger().level == logging.DEBUG
+
+
+def test_apply_config_reload_updates_scheduler_and_binary(tmp_path, monkeypatch):
+    """Reload applies new intervals and enables the binary payload in place."""
+    options = tmp_path / "options.json"
+    options.write_text('{"poll_interval": 10, "fast_poll_threshold": 800, "binary_payload": true}')
+    monkeypatch.setenv("HUAWEI_OPTIONS_PATH", str(options))
+    monkeypatch.setenv("HUAWEI_POLL_INTERVAL", "30")
+    monkeypatch.setenv("HUAWEI_FAST_POLL_THRESHOLD", "0")
+    monkeypatch.setenv("HUAWEI_BINARY_PAYLOAD", "false")
+    monkeypatch.setenv("HUAWEI_MODBUS_HOST", "192.168.1.100")  # Start via run.sh (ENV)
+    main_module.poll_scheduler = AdaptivePollScheduler(poll_interval=30)
+
+    with patch("bridge.main.publish_binary_schema") as mock_schema:
+        apply_config_reload("test")
+
+    assert main_module.poll_scheduler.poll_interval == 10
+    assert main_module.poll_scheduler.threshold == 800
+    assert get_settings().binary_payload
+    mock_schema.assert_called_once_with("test", wait=False)
+
+
+def test_apply_config_reload_missing_options_keeps_config(tmp_path, monkeypatch):
+    """A missing options file is logged, nothing changes."""
+    monkeypatch.setenv("HUAWEI_OPTIONS_PATH", str(tmp_path / "missing.json"))
+    main_module.poll_scheduler = AdaptivePollScheduler(poll_interval=30)
+
+    apply_config_reload("test")
+
+    assert main_module.poll_scheduler.poll_interval == 30
@@ -0,0 +1,138 @@
+# tests\test_modbus_scheduler.py
+
+"""Tests für den Prioritäts-Scheduler der Modbus-Verbindung."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from bridge.modbus_scheduler import ModbusScheduler, Priority, register_priority
+
+
+def _client(order, delay=0.005):
+    """Mock-Client der die Reihenfolge der ausgeführten Requests protokolliert."""
+    client = AsyncMock()
+
+    async def get(name, slave_id=None):
+        order.append(name)
+        await asyncio.sleep(delay)
+        return Mock(value=name)
+
+    async def set_register(name, value, slave_id=None):
+        order.append(f"set:{name}")
+        await asyncio.sleep(delay)
+        return True
+
+    client.get.side_effect = get
+    client.set.side_effect = set_register
+    return client
+
+
+def test_register_priority_from_config():
+    assert register_priority("storage_maximum_charging_power") is Priority.CONTROL
+    assert register_priority("input_power") is Priority.FAST
+    assert register_priority("grid_A_voltage") is Priority.DIAGNOSTIC
+    assert register_priority("model_name") is Priority.STATIC
+
+
+@pytest.mark.asyncio
+async def test_passes_through_to_client():
+    order = []
+    scheduler = ModbusScheduler(_client(order, delay=0))
+
+    result = await scheduler.get("input_power")
+    await scheduler.set("storage_maximum_charging_power", 2500)
+
+    assert result.value == "input_power"
+    assert order == ["input_power", "set:storage_maximum_charging_power"]
+
+
+@pytest.mark.asyncio
+async def test_higher_priority_runs_first():
+    order = []
+    scheduler = ModbusScheduler(_client(order))
+
+    # Erster Request belegt die Verbindung, die übrigen warten
+    await asyncio.gather(
+        scheduler.get("model_name"),
+        scheduler.get("serial_number"),
+        scheduler.get("grid_A_voltage"),
+        scheduler.get("input_power"),
+        scheduler.set("storage_maximum_charging_power", 2500),
+    )
+
+    assert order == [
+        "model_name",
+        "set:storage_maximum_charging_power",
+        "input_power",
+        "grid_A_voltage",
+        "serial_number",
+    ]
+    assert scheduler.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_fair_share_between_consumers():
+    order = []
+    scheduler = ModbusScheduler(_client(order, delay=0.001))
+
+    async def consumer(name, registers):
+        for register in registers:
+            await scheduler.get(register, priority=Priority.DIAGNOSTIC, consumer=name)
+
+    # Gleiche Priorität: "b" kommt dazwischen statt zu warten bis "a" fertig ist
+    await asyncio.gather(
+        asyncio.gather(*(scheduler.get(f"a{i}", priority=Priority.DIAGNOSTIC, consumer="a") for i in range(4))),
+        consumer("b", ["b0", "b1"]),
+    )
+
+    assert order.index("b0") < order.index("a2")
+    assert order.index("b1") < order.index("a3")
+
+
+@pytest.mark.asyncio
+async def test_expired_deadline_raises_timeout():
+    order = []
+    scheduler = ModbusScheduler(_client(order, delay=0.05))
+
+    running = asyncio.create_task(scheduler.get("grid_A_voltage"))
+    await asyncio.sleep(0)
+    with pytest.raises(asyncio.TimeoutError):
+        await scheduler.get("input_power", deadline=time.monotonic() + 0.01)
+    await running
+
+    assert order == ["grid_A_voltage"]
+    assert scheduler.stats()["FAST"]["expired"] == 1
+    # Verbindung ist danach wieder frei
+    await scheduler.get("input_power")
+    assert order[-1] == "input_power"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_block_connection():
+    order = []
+    scheduler = ModbusScheduler(_client(order, delay=0.02))
+
+    running = asyncio.create_task(scheduler.get("grid_A_voltage"))
+    await asyncio.sleep(0)
+    waiting = asyncio.create_task(scheduler.get("input_power"))
+    await asyncio.sleep(0)
+    waiting.cancel()
+    await running
+
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    await asyncio.wait_for(scheduler.get("grid_B_voltage"), 1)
+    assert order == ["grid_A_voltage", "grid_B_voltage"]
+
+
+@pytest.mark.asyncio
+async def test_failed_request_releases_connection():
+    scheduler = ModbusScheduler(AsyncMock())
+    scheduler.client.get.side_effect = [RuntimeError("no response"), Mock(value=1)]
+
+    with pytest.raises(RuntimeError):
+        await scheduler.get("input_power")
+
+    assert (await asyncio.wait_for(scheduler.get("input_power"), 1)).value == 1
@@ -2,6 +2,7 @@
 
 """Tests für MQTT Client Manager."""
 
+import asyncio
 import json
 import logging
 from unittest.mock import MagicMock, patch
@@ -13,10 +14,14 @@ from bridge.mqtt_client import (
     _on_connect,
     _on_disconnect,
     connect_mqtt,
+    connect_mqtt_async,
     disconnect_mqtt,
+    publish_binary,
+    publish_binary_schema,
     publish_data,
     publish_discovery_configs,
     publish_status,
+    wait_published,
 )
 
 
@@ -50,9 +55,11 @@ def reset_mqtt_globals():
 
     mqtt_module._mqtt_client = None
     mqtt_module._is_connected = False
+    mqtt_module._connected.clear()
     yield
     mqtt_module._mqtt_client = None
     mqtt_module._is_connected = False
+    mqtt_module._connected.clear()
 
 
 class TestCallbacks:
@@ -65,6 +72,77 @@ class TestCallbacks:
         _on_connect(None, None, None, 0)
         assert mqtt_module._is_connected is True
 
+    def test_on_connect_subscribes_reload_command(self, monkeypatch):
+        """Connect-Callback abonniert Reload, HA Birth-Message und Discovery des anderen Modus (auch nach Reconnect)."""
+        monkeypatch.setenv("HUAWEI_MODBUS_MQTT_TOPIC", "test/topic")
+        client = MagicMock()
+
+        _on_connect(client, None, None, 0)
+
+        assert [c.args[0] for c in client.subscribe.call_args_list] == [
+            "test/topic/command/reload",
+            "homeassistant/status",
+            "homeassistant/device/huawei_solar/config",
+        ]
+
+    def test_ha_birth_message_calls_handler(self):
+        """Nur "online" auf homeassistant/status löst den Handler aus."""
+        from bridge.mqtt_client import _on_ha_status, set_ha_online_handler
+
+        handler = MagicMock()
+        set_ha_online_handler(handler)
+        try:
+            _on_ha_status(None, None, MagicMock(payload=b"offline"))
+            handler.assert_not_called()
+            _on_ha_status(None, None, MagicMock(payload=b"online"))
+            handler.assert_called_once()
+        finally:
+            set_ha_online_handler(None)
+
+    def test_reload_command_requests_reload(self):
+        """Nachricht auf dem Kommando-Topic setzt das Reload-Event."""
+        from bridge.config_reload import consume_reload
+        from bridge.mqtt_client import _on_reload_command
+
+        _on_reload_command(None, None, MagicMock())
+
+        assert consume_reload()
+
+    def test_on_connect_subscribes_write_commands_when_enabled(self, monkeypatch):
+        """Mit write_commands wird zusätzlich {topic}/command/set/+ abonniert."""
+        monkeypatch.setenv("HUAWEI_MODBUS_MQTT_TOPIC", "test/topic")
+        monkeypatch.setenv("HUAWEI_WRITE_COMMANDS", "true")
+        client = MagicMock()
+
+        _on_connect(client, None, None, 0)
+
+        client.subscribe.assert_any_call("test/topic/command/set/+", qos=1)
+
+    def test_write_command_is_queued(self):
+        """Nachricht auf {topic}/command/set/<key> landet in der Write-Queue."""
+        from bridge.mqtt_client import _on_write_command
+        from bridge.write_queue import get_write_queue, reset_write_queue
+
+        reset_write_queue()
+        message = MagicMock(topic="test/topic/command/set/battery_max_charging_power", payload=b"2500")
+        _on_write_command(None, None, message)
+
+        assert get_write_queue().pending == {"battery_max_charging_power": 2500}
+        reset_write_queue()
+
+    def test_invalid_write_command_is_rejected(self, caplog):
+        """Ungültige Kommandos werden nur geloggt, nicht gequeued."""
+        from bridge.mqtt_client import _on_write_command
+        from bridge.write_queue import get_write_queue, reset_write_queue
+
+        reset_write_queue()
+        message = MagicMock(topic="test/topic/command/set/power_active", payload=b"100")
+        _on_write_command(None, None, message)
+
+        assert get_write_queue().pending == {}
+        assert "Write command rejected" in caplog.text
+        reset_write_queue()
+
     def test_on_connect_failure(self):
         """Test fehlerhaften Connect-Callback."""
         import bridge.mqtt_client as mqtt_module
@@ -139,16 +217,11 @@ class TestConnect:
 
     def test_connect_mqtt_success(self, mock_mqtt_client, mqtt_env_vars):
         """Test erfolgreiche MQTT Verbindung."""
-        import bridge.mqtt_client as mqtt_module
-
         with patch("bridge.mqtt_client.mqtt.Client") as mock_client:
             mock_client.return_value = mock_mqtt_client
 
-            # Simuliere erfolgreichen Connect
-            def set_connected(*args):
-                mqtt_module._is_connected = True
-
-            mock_mqtt_client.connect.side_effect = set_connected
+            # Simuliere erfolgreichen Connect (CONNACK → Callback setzt das Event)
+            mock_mqtt_client.connect.side_effect = lambda *args: _on_connect(mock_mqtt_client, None, None, 0)
 
             connect_mqtt()
 
@@ -164,16 +237,39 @@ class TestConnect:
 
     def test_connect_mqtt_timeout(self, mock_mqtt_client, mqtt_env_vars):
         """Test Connect-Timeout."""
-        import bridge.mqtt_client as mqtt_module
+        with patch("bridge.mqtt_client.mqtt.Client") as mock_client:
+            mock_client.return_value = mock_mqtt_client
+            # Keine CONNACK (simuliert Timeout)
 
+            with pytest.raises(ConnectionError, match="MQTT connection timeout"):
+                connect_mqtt(timeout=0.01)
+            mock_mqtt_client.loop_stop.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_connect_mqtt_async_waits_for_connack(self, mock_mqtt_client, mqtt_env_vars):
+        """Async-Connect blockiert den Loop nicht und kehrt mit der CONNACK zurück."""
         with patch("bridge.mqtt_client.mqtt.Client") as mock_client:
             mock_client.return_value = mock_mqtt_client
-            # _is_connected bleibt False (simuliert Timeout)
-            mqtt_module._is_connected = False
+            loop = asyncio.get_running_loop()
+            # CONNACK kommt verzögert aus dem paho-Thread
+            mock_mqtt_client.loop_start.side_effect = lambda: loop.call_later(
+                0.05, _on_connect, mock_mqtt_client, None, None, 0
+            )
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.005)
+
+            task = asyncio.create_task(ticker())
+            await connect_mqtt_async(timeout=1.0)
+            task.cancel()
 
-            with patch("bridge.mqtt_client.time.sleep"):
-                with pytest.raises(ConnectionError, match="MQTT connection timeout"):
-                    connect_mqtt()
+        mock_mqtt_client.connect_async.assert_called_once_with("localhost", 1883, 60)
+        mock_mqtt_client.connect.assert_not_called()
+        assert ticks > 3  # Loop lief während des Wartens weiter
 
 
 class TestDisconnect:
@@ -279,6 +375,86 @@ class TestPublishing:
         with pytest.raises(ConnectionError, match="MQTT not connected"):
             publish_data({"test": 123}, "test/topic")
 
+    def test_publish_data_without_wait(self, mock_mqtt_client, mqtt_env_vars):
+        """Test Publishing ohne blockierendes wait_for_publish."""
+        import bridge.mqtt_client as mqtt_module
+
+        mqtt_module._mqtt_client = mock_mqtt_client
+        mqtt_module._is_connected = True
+
+        info = publish_data({"test": 123}, "test/topic", wait=False)
+
+        assert info is mock_mqtt_client.publish.return_value
+        info.wait_for_publish.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_wait_published(self):
+        """Test asynchrones Warten auf die Broker-Bestätigung."""
+        info = MagicMock()
+        info.is_published.side_effect = [False, False, True]
+
+        assert await wait_published(info, poll=0.001) is True
+        assert info.is_published.call_count == 3
+
+        info = MagicMock()
+        info.is_published.return_value = False
+        assert await wait_published(info, timeout=0.01, poll=0.001) is False
+
+    def test_publish_binary(self, mock_mqtt_client, mqtt_env_vars):
+        """Test Binär-Publishing auf {topic}/binary (nicht retained)."""
+        import bridge.mqtt_client as mqtt_module
+        from bridge.binary_payload import encode
+
+        mqtt_module._mqtt_client = mock_mqtt_client
+        mqtt_module._is_connected = True
+
+        data = {"power_input": 4500, "last_update": 1700000000}
+        publish_binary(data, "test/topic")
+
+        mock_mqtt_client.publish.assert_called_once_with("test/topic/binary", encode(data), qos=1, retain=False)
+
+    def test_publish_binary_schema_retained(self, mock_mqtt_client, mqtt_env_vars):
+        """Test Schema-Publishing auf {topic}/binary/schema (retained)."""
+        import bridge.mqtt_client as mqtt_module
+        from bridge.binary_payload import SCHEMA_ID
+
+        mqtt_module._mqtt_client = mock_mqtt_client
+        mqtt_module._is_connected = True
+
+        publish_binary_schema("test/topic")
+
+        call_args = mock_mqtt_client.publish.call_args
+        assert call_args[0][0] == "test/topic/binary/schema"
+        assert json.loads(call_args[0][1])["schema_id"] == SCHEMA_ID
+        assert call_args[1]["retain"] is True
+
+    def test_publish_write_result(self, mock_mqtt_client, mqtt_env_vars):
+        """Write-Ergebnis geht als JSON auf {topic}/command/set/<key>/result."""
+        import bridge.mqtt_client as mqtt_module
+        from bridge.mqtt_client import publish_write_result
+
+        mqtt_module._is_connected = True
+        publish_write_result({"key": "battery_max_charging_power", "value": 2500, "ok": True}, "test/huawei")
+
+        args, kwargs = mock_mqtt_client.publish.call_args
+        assert args[0] == "test/huawei/command/set/battery_max_charging_power/result"
+        assert json.loads(args[1])["ok"] is True
+        assert kwargs["retain"] is False
+
+    def test_publish_diagnostics(self, mock_mqtt_client, mqtt_env_vars):
+        """Diagnose-Metriken gehen ohne Warten auf {topic}/diagnostics/<name>."""
+        import bridge.mqtt_client as mqtt_module
+        from bridge.mqtt_client import publish_diagnostics
+
+        mqtt_module._is_connected = True
+        publish_diagnostics("loop", {"lag_max_ms": 12.5}, "test/huawei")
+
+        args, kwargs = mock_mqtt_client.publish.call_args
+        assert args[0] == "test/huawei/diagnostics/loop"
+        assert json.loads(args[1]) == {"lag_max_ms": 12.5}
+        assert kwargs == {"qos": 0, "retain": False}
+        assert mock_mqtt_client.publish.return_value.wait_for_publish.call_count == 0
+
     def test_publish_status_online(self, mock_mqtt_client, mqtt_env_vars):
         """Test Status-Publishing (online)."""
         import bridge.mqtt_client as mqtt_module
@@ -290,6 +466,17 @@ class TestPublishing:
 
         mock_mqtt_client.publish.assert_called_once_with("test/topic/status", "online", qos=1, retain=True)
 
+    def test_publish_status_and_schema_without_wait(self, mock_mqtt_client, mqtt_env_vars):
+        """wait=False: Info zurück, kein blockierendes wait_for_publish (Aufrufer nutzt wait_published)."""
+        import bridge.mqtt_client as mqtt_module
+
+        mqtt_module._mqtt_client = mock_mqtt_client
+        mqtt_module._is_connected = True
+
+        assert publish_status("online", "test/topic", wait=False) is mock_mqtt_client.publish.return_value
+        assert publish_binary_schema("test/topic", wait=False) is mock_mqtt_client.publish.return_value
+        assert mock_mqtt_client.publish.return_value.wait_for_publish.call_count == 0
+
     def test_publish_status_not_connected(self, mock_mqtt_client):
         """Test Status-Publishing wenn nicht verbunden."""
         import bridge.mqtt_client as mqtt_module
@@ -368,6 +555,111 @@ class TestDiscovery:
                 # Mindestens 2 Publishes: 1 Sensor + 1 Binary Sensor
                 assert mock_mqtt_client.publish.call_count >= 2
 
+    def test_publish_discovery_not_retained(self, mock_mqtt_client, mqtt_env_vars, monkeypatch):
+        """discovery_retain=false: Configs ohne Retain, gewartet wird nur mit wait=True."""
+        import bridge.mqtt_client as mqtt_module
+
+        monkeypatch.setenv("HUAWEI_DISCOVERY_RETAIN", "false")
+        mqtt_module._mqtt_client = mock_mqtt_client
+        mqtt_module._is_connected = True
+
+        infos = publish_discovery_configs("test/topic", wait=False)
+
+        assert len(infos) == mock_mqtt_client.publish.call_count
+        assert all(c.kwargs["retain"] is False for c in mock_mqtt_client.publish.call_args_list)
+        mock_mqtt_client.publish.return_value.wait_for_publish.assert_not_called()
+
+    def test_publish_discovery_device_mode(self, mock_mqtt_client, mqtt_env_vars, monkeypatch):
+        """discovery_mode=device: eine Message mit allen Komponenten statt einer pro Entity."""
+        import bridge.mqtt_client as mqtt_module
+        from bridge.settings import reset_settings
+
+        mqtt_module._mqtt_client = mock_mqtt_client
+        mqtt_module._is_connected = True
+        publish_discovery_configs("test/topic", wait=False)
+        entity_calls = mock_mqtt_client.publish.call_args_list
+        entity_bytes = sum(len(c.args[1]) for c in entity_calls)
+
+        mock_mqtt_client.publish.reset_mock()
+        monkeypatch.setenv("HUAWEI_DISCOVERY_MODE", "device")
+        reset_settings()
+        infos = publish_discovery_configs("test/topic", wait=False)
+
+        assert len(infos) == 1
+        topic, payload = mock_mqtt_client.publish.call_args.args
+        assert topic == "homeassistant/device/huawei_solar/config"
+        config = json.loads(payload)
+        assert config["stat_t"] == "test/topic"
+        assert config["dev"]["identifiers"] == ["huawei_solar_modbus"]
+        # Gleiche Entities (gleiche unique_ids) wie im Per-Entity Modus
+        assert sorted(c["uniq_id"] for c in config["cmps"].values()) == sorted(
+            json.loads(c.args[1])["unique_id"] for c in entity_calls
+        )
+        power = config["cmps"]["power_input"]
+        assert power["p"] == "sensor" and power["avty_t"] == "test/topic/status"
+        assert "dev" not in power and "stat_t" not in power
+        assert config["cmps"]["status"]["stat_t"] == "test/topic/status"
+        assert len(payload) * 1.5 < entity_bytes
+
+    def test_unsupported_sensors_are_retracted(self, mock_mqtt_client, mqtt_env_vars, monkeypatch):
+        """Capability-Profil: unsupported Sensoren bekommen eine leere retained Config (device: nur "p")."""
+        import bridge.mqtt_client as mqtt_module
+        from bridge.settings import reset_settings
+
+        mqtt_module._mqtt_client = mock_mqtt_client
+        mqtt_module._is_connected = True
+        publish_discovery_configs("test/topic", wait=False, unsupported={"battery_soc", "voltage_PV3"})
+
+        calls = {c.args[0]: c for c in mock_mqtt_client.publish.call_args_list}
+        retracted = calls["homeassistant/sensor/huawei_solar/battery_soc/config"]
+        assert retracted.args[1] == "" and retracted.kwargs["retain"] is True
+        assert calls["homeassistant/sensor/huawei_solar/voltage_PV3/config"].args[1] == ""
+        assert json.loads(calls["homeassistant/sensor/huawei_solar/power_input/config"].args[1])
+
+        mock_mqtt_client.publish.reset_mock()
+        monkeypatch.setenv("HUAWEI_DISCOVERY_MODE", "device")
+        reset_settings()
+        publish_discovery_configs("test/topic", wait=False, unsupported={"battery_soc"})
+
+        components = json.loads(mock_mqtt_client.publish.call_args.args[1])["cmps"]
+        assert components["battery_soc"] == {"p": "sensor"}
+        assert components["power_input"]["uniq_id"] == "huawei_solar_power_input"
+
+    def test_legacy_discovery_is_migrated(self, mock_mqtt_client, mqtt_env_vars, monkeypatch):
+        """Retained Per-Entity Config im device-Modus: Migrations-Payload, neue Discovery, dann leeren."""
+        import bridge.mqtt_client as mqtt_module
+        from bridge.mqtt_client import MIGRATE_PAYLOAD, _on_legacy_discovery, set_ha_online_handler
+
+        monkeypatch.setenv("HUAWEI_DISCOVERY_MODE", "device")
+        mqtt_module._mqtt_client = mock_mqtt_client
+        mqtt_module._is_connected = True
+        topic = "homeassistant/sensor/huawei_solar/power_input/config"
+        handler = MagicMock()
+        set_ha_online_handler(handler)
+        try:
+            # Eigene Migrations-/Lösch-Messages und nicht-retained Configs ignorieren
+            for payload, retain in ((MIGRATE_PAYLOAD.encode(), True), (b"", True), (b'{"name": "x"}', False)):
+                _on_legacy_discovery(mock_mqtt_client, None, MagicMock(topic=topic, payload=payload, retain=retain))
+            mock_mqtt_client.publish.assert_not_called()
+
+            _on_legacy_discovery(mock_mqtt_client, None, MagicMock(topic=topic, payload=b'{"name": "x"}', retain=True))
+            mock_mqtt_client.publish.assert_called_once_with(topic, MIGRATE_PAYLOAD, qos=1, retain=True)
+            handler.assert_called_once()
+
+            mock_mqtt_client.publish.reset_mock()
+            publish_discovery_configs("test/topic", wait=False)
+            publish_discovery_configs("test/topic", wait=False)
+        finally:
+            set_ha_online_handler(None)
+
+        topics = [c.args[0] for c in mock_mqtt_client.publish.call_args_list]
+        assert topics == [
+            "homeassistant/device/huawei_solar/config",
+            topic,
+            "homeassistant/device/huawei_solar/config",
+        ]
+        assert mock_mqtt_client.publish.call_args_list[1].args[1] == ""
+
     def test_publish_discovery_not_connected(self, mock_mqtt_client):
         """Test Discovery wenn nicht verbunden."""
         import bridge.mqtt_client as mqtt_module
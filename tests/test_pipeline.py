@@ -0,0 +1,131 @@
+# tests\test_pipeline.py
+
+"""Tests für die Producer/Consumer Pipeline zwischen Sampling und Publish."""
+
+import asyncio
+import time
+
+import pytest
+from bridge.pipeline import Sample, SamplePipeline
+
+
+def _sample(kind, n, duration=0.0):
+    return Sample(kind, {"n": n}, time.time(), duration)
+
+
+async def _noop(sample):
+    pass
+
+
+def _kinds(pipeline):
+    return [(s.kind, s.data["n"]) for s in pipeline._queue]
+
+
+def test_full_sample_supersedes_waiting_samples():
+    pipeline = SamplePipeline(_noop)
+    pipeline.put(_sample("full", 1))
+    pipeline.put(_sample("fast", 2))
+
+    pipeline.put(_sample("full", 3))
+
+    assert _kinds(pipeline) == [("full", 3)]
+    assert pipeline.stats()["consumer"]["dropped"] == 2
+
+
+def test_full_queue_drops_oldest_fast_sample_first():
+    pipeline = SamplePipeline(_noop)
+    pipeline.put(_sample("full", 1))
+    pipeline.put(_sample("fast", 2))
+
+    pipeline.put(_sample("fast", 3))
+
+    # Full-Sample bleibt erhalten, nur der ältere Fast-Read wird verworfen
+    assert _kinds(pipeline) == [("full", 1), ("fast", 3)]
+    assert pipeline.stats()["consumer"]["dropped"] == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_does_not_block_producer():
+    processed = []
+
+    async def slow_publish(sample):
+        await asyncio.sleep(0.05)
+        processed.append(sample.data["n"])
+
+    pipeline = SamplePipeline(slow_publish)
+    task = asyncio.create_task(pipeline.run())
+    try:
+        start = time.monotonic()
+        for n in range(5):
+            pipeline.put(_sample("fast", n))
+            await asyncio.sleep(0.005)
+        produced = time.monotonic() - start
+        await asyncio.sleep(0.15)
+    finally:
+        task.cancel()
+
+    # Producer lief im eigenen Takt, Consumer hat das neueste Sample publiziert
+    assert produced < 0.05
+    assert processed[0] == 0
+    assert processed[-1] == 4
+    stats = pipeline.stats()
+    assert stats["producer"]["count"] == 5
+    assert stats["consumer"]["count"] == len(processed)
+    assert stats["consumer"]["dropped"] == 5 - len(processed)
+    assert stats["consumer"]["lag_max_s"] >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_consumer_error_does_not_stop_pipeline(caplog):
+    processed = []
+
+    async def publish(sample):
+        if sample.data["n"] == 1:
+            raise ConnectionError("MQTT not connected")
+        processed.append(sample.data["n"])
+
+    pipeline = SamplePipeline(publish)
+    task = asyncio.create_task(pipeline.run())
+    try:
+        pipeline.put(_sample("full", 1))
+        await asyncio.sleep(0.01)
+        pipeline.put(_sample("full", 2))
+        await asyncio.sleep(0.01)
+    finally:
+        task.cancel()
+
+    assert processed == [2]
+    assert "Processing full sample failed" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_consumer_error_goes_to_error_handler(caplog):
+    errors = []
+
+    async def publish(sample):
+        raise ConnectionError("MQTT not connected")
+
+    pipeline = SamplePipeline(publish, on_error=lambda sample, e: errors.append((sample.data["n"], str(e))))
+    task = asyncio.create_task(pipeline.run())
+    try:
+        pipeline.put(_sample("full", 1))
+        await asyncio.sleep(0.01)
+    finally:
+        task.cancel()
+
+    assert errors == [(1, "MQTT not connected")]
+    assert "Processing full sample failed" not in caplog.text
+
+
+def test_reset_stats_starts_new_window():
+    pipeline = SamplePipeline(_noop)
+    pipeline.put(_sample("full", 1, duration=2.5))
+    assert pipeline.stats()["producer"] == {"count": 1, "read_max_s": 2.5, "read_mean_s": 2.5}
+
+    pipeline.reset_stats()
+
+    assert pipeline.stats() == {
+        "producer": {"count": 0, "read_max_s": 0.0, "read_mean_s": 0.0},
+        "consumer": {"count": 0, "lag_max_s": 0.0, "lag_mean_s": 0.0, "dropped": 0},
+        "queue_depth": 1,
+    }
@@ -0,0 +1,137 @@
+# tests\test_poll_scheduler.py
+
+"""Tests für den adaptiven Poll-Scheduler (Burst-Modus)."""
+
+from bridge.poll_scheduler import AdaptivePollScheduler, is_idle_state
+
+NIGHT = {"inverter_status": "Standby: no irradiation", "power_input": 0, "battery_status": 1, "battery_power": 0}
+
+
+def test_disabled_with_zero_threshold():
+    scheduler = AdaptivePollScheduler(poll_interval=30, threshold=0)
+    assert not scheduler.enabled
+    scheduler.observe({"power_input": 0}, now=0)
+    assert not scheduler.observe({"power_input": 9000}, now=1)
+    assert scheduler.next_interval(now=1) is None
+
+
+def test_disabled_when_fast_interval_not_shorter():
+    scheduler = AdaptivePollScheduler(poll_interval=10, fast_interval=10, threshold=500)
+    assert not scheduler.enabled
+
+
+def test_first_read_never_triggers():
+    scheduler = AdaptivePollScheduler(poll_interval=30, threshold=500)
+    assert not scheduler.observe({"meter_power_active": 5000}, now=0)
+    assert not scheduler.in_burst
+
+
+def test_large_change_triggers_burst():
+    scheduler = AdaptivePollScheduler(poll_interval=30, fast_interval=2, threshold=500)
+    scheduler.observe({"meter_power_active": -200}, now=0)
+    assert scheduler.observe({"meter_power_active": 3200}, now=30)
+    assert scheduler.in_burst
+    assert scheduler.next_interval(now=31) == 2
+
+
+def test_small_change_does_not_trigger():
+    scheduler = AdaptivePollScheduler(poll_interval=30, threshold=500)
+    scheduler.observe({"power_input": 4000, "battery_power": 100}, now=0)
+    assert not scheduler.observe({"power_input": 4300, "battery_power": 50}, now=30)
+    assert not scheduler.in_burst
+
+
+def test_non_numeric_values_ignored():
+    scheduler = AdaptivePollScheduler(poll_interval=30, threshold=500)
+    scheduler.observe({"power_input": None}, now=0)
+    assert not scheduler.observe({"power_input": "N/A"}, now=1)
+
+
+def test_hold_extended_by_new_change():
+    scheduler = AdaptivePollScheduler(poll_interval=30, fast_interval=2, threshold=500, hold=60)
+    scheduler.observe({"power_input": 0}, now=0)
+    scheduler.observe({"power_input": 1000}, now=10)
+    scheduler.observe({"power_input": 2000}, now=60)
+    # Hold läuft bis 120, nicht 70
+    assert scheduler.next_interval(now=100) == 2
+
+
+def test_decay_doubles_until_poll_interval():
+    scheduler = AdaptivePollScheduler(poll_interval=30, fast_interval=2, threshold=500, hold=10)
+    scheduler.observe({"power_input": 0}, now=0)
+    scheduler.observe({"power_input": 1000}, now=1)
+
+    assert scheduler.next_interval(now=5) == 2
+    assert [scheduler.next_interval(now=20) for _ in range(3)] == [4, 8, 16]
+    assert scheduler.next_interval(now=20) is None
+    assert not scheduler.in_burst
+
+
+def test_reset_ends_burst():
+    scheduler = AdaptivePollScheduler(poll_interval=30, threshold=500)
+    scheduler.observe({"battery_power": 0}, now=0)
+    scheduler.observe({"battery_power": -2500}, now=1)
+    scheduler.reset()
+    assert scheduler.next_interval(now=2) is None
+
+
+def test_is_idle_state_night_without_battery():
+    assert is_idle_state({"power_input": 0, "battery_power": 0})
+    assert is_idle_state({"inverter_status": "Shutdown: end of grid", "power_input": 0})
+
+
+def test_is_idle_state_active_cases():
+    # PV produziert
+    assert not is_idle_state({"inverter_status": "On-grid", "power_input": 1200})
+    # Nacht, aber Batterie entlädt
+    assert not is_idle_state({**NIGHT, "battery_status": 2, "battery_power": -800})
+    # Ohne Batteriestatus zählt die Batterieleistung
+    assert not is_idle_state({"power_input": 0, "battery_power": -300})
+    # Keine Information über PV → nicht idle
+    assert not is_idle_state({"battery_power": 0})
+
+
+def test_idle_mode_after_consecutive_reads():
+    scheduler = AdaptivePollScheduler(poll_interval=30, idle_interval=600)
+    for _ in range(AdaptivePollScheduler.IDLE_ENTER_READS - 1):
+        scheduler.observe(NIGHT)
+    assert not scheduler.is_idle
+    scheduler.observe(NIGHT)
+    assert scheduler.is_idle
+
+
+def test_idle_mode_ends_on_activity():
+    scheduler = AdaptivePollScheduler(poll_interval=30, idle_interval=600)
+    for _ in range(AdaptivePollScheduler.IDLE_ENTER_READS):
+        scheduler.observe(NIGHT)
+    scheduler.observe({**NIGHT, "inverter_status": "On-grid", "power_input": 15})
+    assert not scheduler.is_idle
+
+
+def test_idle_mode_disabled_by_default():
+    scheduler = AdaptivePollScheduler(poll_interval=30)
+    for _ in range(10):
+        scheduler.observe(NIGHT)
+    assert not scheduler.is_idle
+
+
+def test_status_timeout_extended_while_idle():
+    scheduler = AdaptivePollScheduler(poll_interval=30, idle_interval=600)
+    assert scheduler.status_timeout(180) == 180
+    for _ in range(AdaptivePollScheduler.IDLE_ENTER_READS):
+        scheduler.observe(NIGHT)
+    assert scheduler.status_timeout(180) == 630
+    assert scheduler.status_timeout(900) == 900
+
+
+def test_reconfigure_applies_new_intervals_and_ends_burst():
+    scheduler = AdaptivePollScheduler(poll_interval=30, fast_interval=2, threshold=500)
+    scheduler.observe({"power_input": 0}, now=0)
+    scheduler.observe({"power_input": 2000}, now=1)
+    assert scheduler.in_burst
+
+    scheduler.reconfigure(poll_interval=10, fast_interval=1, threshold=0, hold=30, idle_interval=0)
+
+    assert scheduler.poll_interval == 10
+    assert not scheduler.in_burst
+    assert not scheduler.enabled
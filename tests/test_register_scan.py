@@ -0,0 +1,118 @@
+# tests\test_register_scan.py
+
+"""Tests für den Register-Scanner und das Register-Profil."""
+
+import json
+
+import pytest
+from bridge.register_scan import (
+    PROFILE_VERSION,
+    RegisterProfile,
+    main,
+    plan_blocks,
+    scan_registers,
+    write_profile,
+)
+from huawei_solar.exceptions import ReadException
+from huawei_solar.huawei_solar import Result
+from huawei_solar.registers import REGISTERS
+
+NAMES = [
+    "input_power",
+    "line_voltage_A_B",
+    "line_voltage_B_C",
+    "line_voltage_C_A",
+    "phase_A_voltage",
+    "phase_B_voltage",
+    "phase_C_voltage",
+    "phase_A_current",
+]
+
+
+def fake_inverter(unsupported=(), sentinel=(), requests=None):
+    """get_multiple-Ersatz: Modbus-Exception 02 sobald ein unsupported Register im Block liegt."""
+
+    async def get_multiple(names):
+        if requests is not None:
+            requests.append(list(names))
+        if any(name in unsupported for name in names):
+            raise ReadException("Illegal data address", modbus_exception_code=2)
+        return [Result(65535 if name in sentinel else 230, None) for name in names]
+
+    return get_multiple
+
+
+def test_plan_blocks_respects_size_and_order():
+    blocks = plan_blocks(reversed(NAMES), block_size=8)
+
+    flat = [name for block in blocks for name in block]
+    assert flat == sorted(NAMES, key=lambda name: REGISTERS[name].register)
+    for block in blocks:
+        first, last = REGISTERS[block[0]], REGISTERS[block[-1]]
+        assert last.register + last.length - first.register <= 8
+    assert len(plan_blocks(NAMES, block_size=64)) == 1
+
+
+@pytest.mark.asyncio
+async def test_only_failing_blocks_are_bisected():
+    requests = []
+    result = await scan_registers(fake_inverter(requests=requests), [NAMES])
+    assert len(requests) == 1
+    assert {entry["status"] for entry in result["registers"].values()} == {"supported"}
+
+    requests.clear()
+    result = await scan_registers(fake_inverter(unsupported={"phase_B_voltage"}, requests=requests), [NAMES])
+
+    # 8 Register: 1 + 2·log2(8) Requests statt 8 einzelne
+    assert len(requests) == 7
+    assert result["registers"]["phase_B_voltage"]["status"] == "unsupported"
+    assert result["registers"]["phase_B_voltage"]["error"]
+    assert [entry["status"] for entry in result["registers"].values()].count("supported") == 7
+    assert len(result["ranges"]) == 7
+    assert result["ranges"][0] == {**result["ranges"][0], "start": 32064, "registers": 8, "ok": False}
+
+
+@pytest.mark.asyncio
+async def test_sentinel_and_failed_registers():
+    async def timeout(names):
+        raise TimeoutError()
+
+    result = await scan_registers(fake_inverter(sentinel={"phase_A_current"}), [NAMES])
+    assert result["registers"]["phase_A_current"] == {
+        **result["registers"]["phase_A_current"],
+        "status": "sentinel",
+        "value": 65535,
+    }
+
+    result = await scan_registers(timeout, [["input_power"]])
+    assert result["registers"]["input_power"]["status"] == "failed"
+    assert result["registers"]["input_power"]["error"] == "TimeoutError"
+
+
+@pytest.mark.asyncio
+async def test_profile_roundtrip(tmp_path):
+    result = await scan_registers(fake_inverter(unsupported={"input_power", "line_voltage_C_A"}), [NAMES])
+    path = tmp_path / "profile.json"
+    write_profile({"version": PROFILE_VERSION, **result}, str(path))
+
+    assert json.loads(path.read_text())["registers"]["input_power"]["status"] == "unsupported"
+    profile = RegisterProfile.load(str(path))
+    assert profile.unsupported == {"input_power", "line_voltage_C_A"}
+    assert profile.plan(["active_power", "line_voltage_C_A", "phase_A_voltage"]) == ["active_power", "phase_A_voltage"]
+    # power_input ist Critical Default und bleibt angekündigt
+    assert profile.unsupported_keys() == {"voltage_line_CA"}
+
+
+def test_invalid_profile_is_ignored(tmp_path):
+    path = tmp_path / "profile.json"
+    assert RegisterProfile.load(str(path)) is None
+
+    path.write_text(json.dumps({"version": PROFILE_VERSION + 1, "registers": {}}))
+    assert RegisterProfile.load(str(path)) is None
+
+
+def test_main_rejects_invalid_arguments(monkeypatch):
+    monkeypatch.setenv("HUAWEI_MODBUS_HOST", "192.0.2.1")
+
+    assert main(["--block-size", "200"]) == 1
+    assert main(["--registers", "no_such_register"]) == 1
@@ -0,0 +1,121 @@
+# tests\test_replay.py
+
+"""Tests für das Replay/Backfill-Tool."""
+
+import io
+import time
+
+import pytest
+from bridge.history_store import HistoryStore
+from bridge.replay import export_measurements, export_statistics, main, replay_to_mqtt, statistic_id
+
+# Gestern 00:00 UTC - innerhalb der Retention (prune() beim ersten flush)
+BASE = int(time.time() // 86400 - 1) * 86400
+
+
+@pytest.fixture
+def store(tmp_path):
+    history = HistoryStore(str(tmp_path / "history.db")).open()
+    # Zwei Stunden, Zählerstand steigt um 0.5 pro Stunde
+    for ts, total, power in [(0, 10.0, 100), (1800, 10.2, 300), (3600, 10.5, 200), (5400, 11.0, 400)]:
+        history.record({"energy_yield_accumulated": total, "power_input": power}, ts=BASE + ts)
+    history.flush()
+    yield history
+    history.close()
+
+
+def test_statistic_id_from_sensor_name():
+    assert statistic_id("energy_yield_accumulated") == "sensor.solar_total_yield"
+    assert statistic_id("unknown_key") == "sensor.unknown_key"
+
+
+def test_replay_publishes_each_cycle_with_original_timestamp(store):
+    published = []
+
+    def publish(data, topic, last_update=None, retain=True):
+        published.append((dict(data), topic, last_update, retain))
+
+    count = replay_to_mqtt(store, BASE, BASE + 3600, "huawei-solar/replay", rate=0, publish=publish)
+
+    assert count == 2
+    assert [p[2] for p in published] == [BASE, BASE + 1800]
+    assert published[0][0] == {"energy_yield_accumulated": 10.0, "power_input": 100}
+    assert all(p[1] == "huawei-solar/replay" and p[3] is False for p in published)
+
+
+def test_replay_rate_limit(store):
+    start = time.monotonic()
+    replay_to_mqtt(store, BASE, BASE + 7200, "t", rate=50, publish=lambda *a, **k: None)
+    # 4 Nachrichten bei 50/s → mindestens 3 Intervalle à 20ms
+    assert time.monotonic() - start >= 0.055
+
+
+def test_export_statistics_running_sum(store):
+    out = io.StringIO()
+    rows = export_statistics(store, BASE, BASE + 7200, out, ["energy_yield_accumulated"])
+
+    lines = out.getvalue().splitlines()
+    assert rows == 2
+    assert lines[0] == "statistic_id\tunit\tstart\tstate\tsum"
+    first, second = (line.split("\t") for line in lines[1:])
+    assert first[0] == "sensor.solar_total_yield" and first[1] == "kWh"
+    assert (float(first[3]), float(first[4])) == (10.2, 0.2)
+    assert (float(second[3]), float(second[4])) == (11.0, 1.0)
+
+
+def test_export_statistics_continues_sum_offset(store):
+    out = io.StringIO()
+    export_statistics(store, BASE, BASE + 7200, out, ["energy_yield_accumulated"], {"energy_yield_accumulated": 500.0})
+
+    sums = [float(line.split("\t")[4]) for line in out.getvalue().splitlines()[1:]]
+    assert sums == [500.2, 501.0]
+
+
+def test_main_rejects_invalid_sum_offset(store, tmp_path):
+    target = str(tmp_path / "counters.tsv")
+    with pytest.raises(SystemExit):
+        main(["--db", store.path, "--start", "1970-01-01", "--statistics", target, "--sum-offset", "x"])
+
+
+def test_export_measurements(store):
+    out = io.StringIO()
+    rows = export_measurements(store, BASE, BASE + 3600, out, ["power_input"])
+
+    header, line = out.getvalue().splitlines()
+    assert rows == 1
+    assert header == "statistic_id\tunit\tstart\tmin\tmax\tmean"
+    assert line.split("\t")[3:] == ["100.0", "300.0", "200.0"]
+
+
+def test_main_missing_database(tmp_path):
+    assert main(["--db", str(tmp_path / "missing.db"), "--start", "2026-01-01"]) == 1
+
+
+def test_main_writes_statistics_file(store, tmp_path):
+    target = tmp_path / "counters.tsv"
+    assert main(["--db", store.path, "--start", "1970-01-01", "--statistics", str(target)]) == 0
+    assert target.read_text().startswith("statistic_id\t")
+
+
+def test_main_replay_uses_plain_client(store, monkeypatch):
+    """MQTT-Replay: eigener Client ohne Subscriptions/Callbacks, ENV bleibt unverändert."""
+    import os
+    from unittest.mock import MagicMock, patch
+
+    monkeypatch.setenv("HUAWEI_MODBUS_MQTT_BROKER", "broker.local")
+    monkeypatch.setenv("HUAWEI_MODBUS_MQTT_TOPIC", "huawei-solar")
+    client = MagicMock()
+
+    with patch("paho.mqtt.client.Client", return_value=client):
+        assert main(["--db", store.path, "--start", "1970-01-01", "--rate", "0"]) == 0
+
+    client.connect.assert_called_once_with("broker.local", 1883, 60)
+    assert client.publish.call_count == 4
+    for call in client.publish.call_args_list:
+        assert call.args[0] == "huawei-solar/replay"
+        assert call.kwargs == {"qos": 1, "retain": False}
+    client.subscribe.assert_not_called()
+    client.message_callback_add.assert_not_called()
+    client.will_set.assert_not_called()
+    client.disconnect.assert_called_once()
+    assert os.environ["HUAWEI_MODBUS_MQTT_TOPIC"] == "huawei-solar"
@@ -0,0 +1,59 @@
+# tests\test_serializer.py
+
+"""Tests für den austauschbaren Payload-Encoder."""
+
+import json
+
+import pytest
+from bridge import serializer
+
+
+@pytest.fixture(autouse=True)
+def fresh_encoder():
+    serializer.reset_encoder()
+    yield
+    serializer.reset_encoder()
+
+
+PAYLOAD = {
+    "power_input": 4500,
+    "battery_soc": 85.5,
+    "inverter_status": "Standby: no irradiation",
+    "model_name": "SUN2000-10KTL-M1",
+    "meter_power_active": -200,
+}
+
+
+def test_json_encoder_is_compact(monkeypatch):
+    monkeypatch.setenv("HUAWEI_PAYLOAD_ENCODER", "json")
+    encoded = serializer.dumps(PAYLOAD)
+
+    assert serializer.encoder_name() == "json"
+    assert b", " not in encoded
+    assert json.loads(encoded) == PAYLOAD
+
+
+def test_auto_prefers_orjson_when_available(monkeypatch):
+    monkeypatch.setattr(serializer, "HAS_ORJSON", True)
+    assert serializer.encoder_name() == "orjson"
+
+
+def test_auto_falls_back_to_json(monkeypatch):
+    monkeypatch.setattr(serializer, "HAS_ORJSON", False)
+    assert serializer.encoder_name() == "json"
+
+
+def test_forced_orjson_without_install_falls_back(monkeypatch):
+    monkeypatch.setattr(serializer, "HAS_ORJSON", False)
+    monkeypatch.setenv("HUAWEI_PAYLOAD_ENCODER", "orjson")
+    assert serializer.encoder_name() == "json"
+
+
+def test_unknown_encoder_uses_auto(monkeypatch):
+    monkeypatch.setenv("HUAWEI_PAYLOAD_ENCODER", "msgpack")
+    assert serializer.encoder_name() in ("orjson", "json")
+
+
+@pytest.mark.skipif(not serializer.HAS_ORJSON, reason="orjson not installed")
+def test_orjson_output_matches_json():
+    assert json.loads(serializer._orjson_dumps(PAYLOAD)) == json.loads(serializer._json_dumps(PAYLOAD))
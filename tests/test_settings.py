@@ -0,0 +1,101 @@
+# tests\test_settings.py
+
+"""Tests für das typisierte Settings-Objekt."""
+
+import json
+
+import pytest
+from bridge.settings import Settings, get_settings, load_settings, options_to_env, reset_settings
+
+
+def test_defaults_from_empty_env():
+    settings = Settings.from_env({})
+
+    assert settings.modbus_port == 502
+    assert settings.poll_interval == 30
+    assert settings.log_level == "INFO"
+    assert settings.binary_payload is False
+    assert settings.missing() == ["HUAWEI_MODBUS_MQTT_TOPIC", "HUAWEI_MODBUS_HOST"]
+
+
+def test_values_are_parsed_once():
+    settings = Settings.from_env(
+        {
+            "HUAWEI_MODBUS_HOST": "192.168.1.100",
+            "HUAWEI_MODBUS_MQTT_TOPIC": "huawei-solar",
+            "HUAWEI_POLL_INTERVAL": "15",
+            "HUAWEI_FAST_POLL_THRESHOLD": "800.5",
+            "HUAWEI_LOG_LEVEL": "debug",
+            "HUAWEI_BINARY_PAYLOAD": "true",
+            "HUAWEI_MODBUS_DEBUG": "yes",
+        }
+    )
+
+    assert settings.poll_interval == 15
+    assert settings.fast_poll_threshold == 800.5
+    assert settings.log_level == "DEBUG"
+    assert settings.binary_payload is True
+    assert settings.modbus_debug is True
+    assert settings.missing() == []
+
+
+def test_unknown_log_level_falls_back_to_info():
+    assert Settings.from_env({"HUAWEI_LOG_LEVEL": "VERBOSE"}).log_level == "INFO"
+
+
+def test_unparsable_value_raises():
+    with pytest.raises(ValueError, match="HUAWEI_POLL_INTERVAL must be an integer"):
+        Settings.from_env({"HUAWEI_POLL_INTERVAL": "30s"})
+
+
+def test_validate_reports_all_problems():
+    with pytest.raises(ValueError) as exc:
+        Settings.from_env({"HUAWEI_MODBUS_PORT": "0", "HUAWEI_SLAVE_ID": "300", "HUAWEI_POLL_INTERVAL": "0"})
+
+    message = str(exc.value)
+    assert "modbus_port must be 1-65535" in message
+    assert "slave_id must be 0-247" in message
+    assert "poll_interval must be > 0" in message
+
+
+def test_sample_interval_must_be_shorter_than_poll_interval():
+    with pytest.raises(ValueError, match="sample_interval must be < poll_interval"):
+        Settings.from_env({"HUAWEI_POLL_INTERVAL": "30", "HUAWEI_SAMPLE_INTERVAL": "30"})
+    assert Settings.from_env({"HUAWEI_SAMPLE_INTERVAL": "2"}).sample_interval == 2.0
+
+
+def test_discovery_mode_is_validated():
+    assert Settings.from_env({"HUAWEI_DISCOVERY_MODE": "Device"}).discovery_mode == "device"
+    with pytest.raises(ValueError, match="discovery_mode must be one of entity, device"):
+        Settings.from_env({"HUAWEI_DISCOVERY_MODE": "single"})
+
+
+def test_options_to_env_matches_run_sh():
+    env = options_to_env({"modbus_host": "10.0.0.5", "mqtt_host": "", "history_enabled": True, "unknown": 1})
+
+    assert env == {"HUAWEI_MODBUS_HOST": "10.0.0.5", "HUAWEI_HISTORY_ENABLED": "true"}
+
+
+def test_load_settings_reads_options_without_run_sh(tmp_path, monkeypatch):
+    path = tmp_path / "options.json"
+    path.write_text(json.dumps({"modbus_host": "10.0.0.5", "mqtt_topic": "solar", "poll_interval": 20}))
+    monkeypatch.delenv("HUAWEI_MODBUS_HOST", raising=False)
+    monkeypatch.setenv("HUAWEI_OPTIONS_PATH", str(path))
+
+    settings = load_settings()
+
+    assert settings.modbus_host == "10.0.0.5"
+    assert settings.topic == "solar"
+    assert settings.poll_interval == 20
+
+
+def test_get_settings_is_cached_until_reset(monkeypatch):
+    monkeypatch.setenv("HUAWEI_POLL_INTERVAL", "30")
+    first = get_settings()
+    monkeypatch.setenv("HUAWEI_POLL_INTERVAL", "60")
+
+    assert get_settings() is first
+
+    reset_settings()
+    assert get_settings().poll_interval == 60
+    assert first.changed_fields(get_settings()) == ["poll_interval"]
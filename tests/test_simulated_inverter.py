@@ -0,0 +1,68 @@
+# tests\test_simulated_inverter.py
+
+"""Tests für den latenz-modellierten Inverter-Simulator."""
+
+import asyncio
+import time
+
+import pytest
+
+from tests.fixtures.mock_inverter import ModbusException
+from tests.fixtures.simulated_inverter import LatencyModel, SimulatedHuaweiSolar
+
+
+@pytest.mark.asyncio
+async def test_rtt_is_applied_per_request():
+    client = SimulatedHuaweiSolar(latency=LatencyModel(rtt=0.02))
+    start = time.perf_counter()
+    await client.get("active_power")
+    await client.get("input_power")
+    assert time.perf_counter() - start >= 0.04
+    assert client.stats.requests == 2
+
+
+@pytest.mark.asyncio
+async def test_timeout_probability_raises_timeout():
+    client = SimulatedHuaweiSolar(latency=LatencyModel(rtt=0, timeout_probability=1.0, timeout=0))
+    with pytest.raises(asyncio.TimeoutError):
+        await client.get("active_power")
+    assert client.stats.timeouts == 1
+
+
+@pytest.mark.asyncio
+async def test_unsupported_register_raises_modbus_exception():
+    client = SimulatedHuaweiSolar(latency=LatencyModel(rtt=0), unsupported={"pv_03_voltage"})
+    with pytest.raises(ModbusException):
+        await client.get("pv_03_voltage")
+
+
+@pytest.mark.asyncio
+async def test_single_connection_enforced():
+    first = await SimulatedHuaweiSolar.create("dongle-a")
+    try:
+        with pytest.raises(ConnectionRefusedError):
+            await SimulatedHuaweiSolar.create("dongle-a")
+    finally:
+        await first.stop()
+
+    # Nach stop() ist der Host wieder frei
+    second = await SimulatedHuaweiSolar.create("dongle-a")
+    await second.stop()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_serialized():
+    client = SimulatedHuaweiSolar(latency=LatencyModel(rtt=0.02))
+    start = time.perf_counter()
+    await asyncio.gather(*(client.get("active_power") for _ in range(3)))
+    assert time.perf_counter() - start >= 0.06
+    assert client.stats.lock_wait > 0
+
+
+@pytest.mark.asyncio
+async def test_same_seed_gives_same_values():
+    a = SimulatedHuaweiSolar(latency=LatencyModel(rtt=0), seed=7)
+    b = SimulatedHuaweiSolar(latency=LatencyModel(rtt=0), seed=7)
+    assert [(await a.get("input_power")).value for _ in range(5)] == [
+        (await b.get("input_power")).value for _ in range(5)
+    ]
@@ -0,0 +1,40 @@
+# tests\test_state_snapshot.py
+
+"""Tests für den Snapshot des letzten publizierten Payloads."""
+
+import json
+import os
+
+from bridge.state_snapshot import StateSnapshot
+
+
+def test_snapshot_survives_restart(tmp_path):
+    path = str(tmp_path / "last_state.json")
+    snapshot = StateSnapshot(path)
+    snapshot.update({"power_input": 4500, "model_name": "SUN2000", "last_update": 1706184000})
+    snapshot.save()
+
+    assert not os.path.exists(f"{path}.tmp")
+    assert StateSnapshot(path).load() == {"power_input": 4500, "model_name": "SUN2000", "last_update": 1706184000}
+
+
+def test_save_only_when_updated(tmp_path):
+    path = tmp_path / "last_state.json"
+    snapshot = StateSnapshot(str(path))
+    snapshot.save()
+    assert not path.exists()
+
+    snapshot.update({"power_input": 1, "last_update": 1})
+    snapshot.save_if_due()  # save_interval noch nicht vorbei
+    assert not path.exists()
+
+
+def test_missing_or_corrupt_snapshot_is_ignored(tmp_path):
+    path = tmp_path / "last_state.json"
+    assert StateSnapshot(str(path)).load() is None
+
+    path.write_text("{not json")
+    assert StateSnapshot(str(path)).load() is None
+
+    path.write_text(json.dumps({"saved_at": 1, "data": {"power_input": 1}}))  # ohne last_update
+    assert StateSnapshot(str(path)).load() is None
@@ -6,7 +6,7 @@ import time
 from unittest.mock import Mock
 
 import pytest
-from bridge.transform import _cleanup_result, get_value, transform_data
+from bridge.transform import _cleanup_result, get_value, transform_data, transform_filtered, transform_partial
 
 
 class TestGetValue:
@@ -159,3 +159,62 @@ class TestTransformData:
 
         assert len(result) == 1
         assert "last_update" in result
+
+    def test_transform_partial_no_defaults_no_timestamp(self):
+        """Partial transform maps only present registers."""
+        mock_power = Mock()
+        mock_power.value = 4800
+        mock_none = Mock()
+        mock_none.value = None
+
+        result = transform_partial({"input_power": mock_power, "active_power": mock_none})
+
+        assert result == {"power_input": 4800}
+
+
+class TestTransformFiltered:
+    """Test fused transform + filter stage."""
+
+    def _registers(self, **values):
+        registers = {}
+        for name, value in values.items():
+            register = Mock()
+            register.value = value
+            registers[name] = register
+        return registers
+
+    def test_matches_transform_then_filter(self):
+        """Same result as filter(transform_data()) - except last_update."""
+        from bridge.total_increasing_filter import TotalIncreasingFilter
+
+        registers = self._registers(
+            active_power=4500, input_power=65535, accumulated_yield_energy=1234.5, storage_state_of_capacity=85
+        )
+        fused_filter, classic_filter = TotalIncreasingFilter(), TotalIncreasingFilter()
+
+        fused = transform_filtered(registers, fused_filter)
+        classic = classic_filter.filter(transform_data(registers))
+
+        assert "last_update" not in fused
+        classic.pop("last_update")
+        assert fused == classic
+
+    def test_counter_protection_applied(self):
+        """Counter drop is replaced by last value in the same stage."""
+        from bridge.total_increasing_filter import TotalIncreasingFilter
+
+        filter_instance = TotalIncreasingFilter()
+        transform_filtered(self._registers(accumulated_yield_energy=1000.0), filter_instance)
+        result = transform_filtered(self._registers(accumulated_yield_energy=0), filter_instance)
+
+        assert result["energy_yield_accumulated"] == 1000.0
+
+    def test_phase_timings_reported(self):
+        """Transform and filter phase durations are filled in."""
+        from bridge.total_increasing_filter import TotalIncreasingFilter
+
+        timings = {}
+        transform_filtered(self._registers(active_power=4500), TotalIncreasingFilter(), timings)
+
+        assert set(timings) == {"transform", "filter"}
+        assert all(duration >= 0 for duration in timings.values())
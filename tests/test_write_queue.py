@@ -0,0 +1,133 @@
+# tests\test_write_queue.py
+
+"""Tests für die Schreib-Queue (Coalescing, Rate-Limit, Read-Back)."""
+
+import asyncio
+import threading
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from bridge.write_queue import WriteQueue
+
+
+def _client(readback=None):
+    """Mock-Client: set() merkt sich den Wert, get() liefert ihn (oder readback) zurück."""
+    client = AsyncMock()
+    written = {}
+
+    async def set_register(name, value):
+        written[name] = value
+        return True
+
+    async def get_register(name):
+        return Mock(value=written.get(name) if readback is None else readback)
+
+    client.set.side_effect = set_register
+    client.get.side_effect = get_register
+    return client
+
+
+def test_submit_rejects_invalid_commands():
+    queue = WriteQueue()
+
+    with pytest.raises(ValueError, match="not writable"):
+        queue.submit("power_active", "100")
+    with pytest.raises(ValueError, match="not a number"):
+        queue.submit("battery_max_charging_power", "full")
+    with pytest.raises(ValueError, match="not a whole number"):
+        queue.submit("battery_max_charging_power", "2500.4")
+    with pytest.raises(ValueError, match="not a whole number"):
+        queue.submit("battery_max_charging_power", "inf")
+    with pytest.raises(ValueError, match="out of range"):
+        queue.submit("battery_charging_cutoff_soc", "50")
+
+    assert queue.pending == {}
+
+
+def test_latest_value_wins():
+    queue = WriteQueue()
+
+    queue.submit("battery_max_charging_power", "1000")
+    queue.submit("battery_max_charging_power", "2500.0")
+
+    assert queue.pending == {"battery_max_charging_power": 2500}
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_and_confirms_by_read_back():
+    queue = WriteQueue()
+    client = _client()
+    queue.submit("battery_max_charging_power", "2500")
+
+    results = await queue.flush(client)
+
+    client.set.assert_awaited_once_with("storage_maximum_charging_power", 2500)
+    assert results == [
+        {
+            "key": "battery_max_charging_power",
+            "register": "storage_maximum_charging_power",
+            "value": 2500,
+            "readback": 2500,
+            "ok": True,
+        }
+    ]
+    assert queue.pending == {}
+
+
+@pytest.mark.asyncio
+async def test_flush_reports_mismatch_and_errors():
+    queue = WriteQueue()
+    queue.submit("battery_max_charging_power", "2500")
+    mismatch = await queue.flush(_client(readback=5000))
+
+    failing = AsyncMock()
+    failing.set.side_effect = RuntimeError("Register is not writable")
+    queue.submit("battery_max_discharging_power", "3000")
+    error = await queue.flush(failing)
+
+    assert mismatch[0]["ok"] is False
+    assert mismatch[0]["error"] == "read-back mismatch"
+    assert error[0]["ok"] is False
+    assert error[0]["error"] == "Register is not writable"
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_per_register():
+    queue = WriteQueue(min_interval=60)
+    client = _client()
+    queue.submit("battery_max_charging_power", "1000")
+    await queue.flush(client)
+
+    queue.submit("battery_max_charging_power", "2000")
+    queue.submit("battery_max_discharging_power", "3000")
+    results = await queue.flush(client)
+
+    # Anderes Register ist frei, das gleiche wartet (Wert bleibt in der Queue)
+    assert [r["key"] for r in results] == ["battery_max_discharging_power"]
+    assert queue.pending == {"battery_max_charging_power": 2000}
+    assert 59 < queue.next_due() <= 60
+    assert not queue.is_due()
+
+
+@pytest.mark.asyncio
+async def test_wait_wakes_on_submit_from_other_thread():
+    queue = WriteQueue()
+    loop = asyncio.get_running_loop()
+    queue.bind(loop)
+
+    timer = threading.Timer(0.05, queue.submit, ("battery_max_charging_power", "1500"))
+    timer.start()
+    start = loop.time()
+    due = await queue.wait(5)
+    timer.join()
+
+    assert due is True
+    assert loop.time() - start < 1
+
+
+@pytest.mark.asyncio
+async def test_wait_times_out_without_commands():
+    queue = WriteQueue()
+    queue.bind(asyncio.get_running_loop())
+
+    assert await queue.wait(0.01) is False